@@ -12,8 +12,98 @@ CHANNEL_ID = int(os.getenv("CHANNEL_ID"))
 OWNER_ID = int(os.getenv("OWNER_ID"))
 ADMINS = [int(x) for x in os.getenv("ADMINS", "").split(",")]
 
+# Storage backend: "mongo" (default), "sqlite" (single node, needs aiosqlite) or "memory"
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mongo").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "amongo.db")
+
 MONGO_URL = os.getenv("MONGO_URL") 
-MONGO_DB = os.getenv("MONGO_DB")
+MONGO_DB = os.getenv("MONGO_DB") or "AUCTIONBOT"
+MONGO_TLS = os.getenv("MONGO_TLS", "true").lower() != "false"
+
+# Mongo connection pool (shared by every handler and task)
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 50))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 5))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 300000))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", 2000))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000))
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "zstd,snappy,zlib")
+
+# Item IDs reserved per counter round trip (hi/lo allocator)
+ID_BLOCK_SIZE = int(os.getenv("ID_BLOCK_SIZE", 20))
+
+# Newest bids kept inline on a submission (full history lives in `bids`)
+BIDS_EMBEDDED_LIMIT = int(os.getenv("BIDS_EMBEDDED_LIMIT", 10))
+
+# Shutdown waits this long for background writes (e.g. bid history still retrying)
+BACKGROUND_FLUSH_SECONDS = int(os.getenv("BACKGROUND_FLUSH_SECONDS", 30))
+
+# Hot/cold split: finished submissions move to `submissions_archive`
+ARCHIVE_AFTER_HOURS = int(os.getenv("ARCHIVE_AFTER_HOURS", 24))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", 500))
+ARCHIVE_INTERVAL_MINUTES = int(os.getenv("ARCHIVE_INTERVAL_MINUTES", 30))
+
+# Draft submissions (photo sent, no base bid yet)
+DRAFT_RETENTION_HOURS = int(os.getenv("DRAFT_RETENTION_HOURS", 6))
+DRAFT_SWEEP_INTERVAL_MINUTES = int(os.getenv("DRAFT_SWEEP_INTERVAL_MINUTES", 30))
+
+# Audit log of admin actions (/audit); the Mongo TTL index reads the same variable
+AUDIT_RETENTION_DAYS = int(os.getenv("AUDIT_RETENTION_DAYS", 180))
+AUDIT_PAGE_SIZE = int(os.getenv("AUDIT_PAGE_SIZE", 10))
+
+# Submission event bus (utils/events.py): polling fallback interval and
+# how often the change-stream resume token is saved
+EVENT_POLL_SECONDS = int(os.getenv("EVENT_POLL_SECONDS", 10))
+EVENT_TOKEN_SAVE_SECONDS = int(os.getenv("EVENT_TOKEN_SAVE_SECONDS", 5))
+
+# Global bans are checked in memory (utils/ban_cache.py); changes made by
+# other processes are picked up via a version counter, with a periodic full reload.
+# Lists longer than the threshold are kept as a sorted int array.
+BAN_SYNC_SECONDS = int(os.getenv("BAN_SYNC_SECONDS", 30))
+BAN_FULL_RELOAD_MINUTES = int(os.getenv("BAN_FULL_RELOAD_MINUTES", 60))
+BAN_CACHE_COMPACT_THRESHOLD = int(os.getenv("BAN_CACHE_COMPACT_THRESHOLD", 100000))
+
+# Group / channel membership cache (utils/membership.py), kept fresh by
+# chat_member updates; the TTLs only cover missed updates
+MEMBERSHIP_TTL_SECONDS = int(os.getenv("MEMBERSHIP_TTL_SECONDS", 3600))
+MEMBERSHIP_NEGATIVE_TTL_SECONDS = int(os.getenv("MEMBERSHIP_NEGATIVE_TTL_SECONDS", 60))
+MEMBERSHIP_CACHE_SIZE = int(os.getenv("MEMBERSHIP_CACHE_SIZE", 50000))
+
+# get_chat results (usernames, titles) cached by utils/chat_cache.py
+CHAT_CACHE_TTL_SECONDS = int(os.getenv("CHAT_CACHE_TTL_SECONDS", 3600))
+CHAT_REFRESH_AHEAD_SECONDS = int(os.getenv("CHAT_REFRESH_AHEAD_SECONDS", 600))
+CHAT_CACHE_SIZE = int(os.getenv("CHAT_CACHE_SIZE", 1000))
+
+# In-memory model of running auctions behind /items and /myitems
+# (utils/live_auctions.py), compared with the database this often
+LIVE_MODEL_CHECK_SECONDS = int(os.getenv("LIVE_MODEL_CHECK_SECONDS", 300))
+
+# Rendered /items pages kept by utils/page_cache.py
+PAGE_CACHE_SIZE = int(os.getenv("PAGE_CACHE_SIZE", 500))
+
+# Cache tier shared by bot processes on one host (utils/shared_cache.py):
+# an SQLite file in WAL mode; unset = each process caches on its own
+SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH", "")
+SHARED_CACHE_POLL_MS = int(os.getenv("SHARED_CACHE_POLL_MS", 500))
+SHARED_CACHE_BUSY_MS = int(os.getenv("SHARED_CACHE_BUSY_MS", 50))
+SHARED_CACHE_LOG_RETENTION_SECONDS = int(os.getenv("SHARED_CACHE_LOG_RETENTION_SECONDS", 3600))
+
+# Startup warm-up (utils/warmup.py); /health answers 503 until it is done
+WARMUP_STAGE_TIMEOUT_SECONDS = int(os.getenv("WARMUP_STAGE_TIMEOUT_SECONDS", 60))
+
+# /export and `python -m utils.export`
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+# /import: bulk-imported items are inserted in batches, then
+# posted one by one by tasks/publisher.py
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 500))
+PUBLISH_INTERVAL_SECONDS = int(os.getenv("PUBLISH_INTERVAL_SECONDS", 30))
+PUBLISH_IDLE_SECONDS = int(os.getenv("PUBLISH_IDLE_SECONDS", 60))
+PUBLISH_MAX_ATTEMPTS = int(os.getenv("PUBLISH_MAX_ATTEMPTS", 3))
+# A claimed item still `publishing` after this long is assumed abandoned
+# (its process died) and goes back to the queue
+PUBLISH_LEASE_SECONDS = int(os.getenv("PUBLISH_LEASE_SECONDS", 600))
+
 GROUP_URL = os.getenv("GROUP_URL")
 CHANNEL_URL = os.getenv("CHANNEL_URL")
 SUPPORT_GROUP_URL = os.getenv("SUPPORT_GROUP_URL")
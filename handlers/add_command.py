@@ -15,8 +15,10 @@ from telegram.ext import (
     MessageHandler,
     filters,
 )
-from utils.database import db  # ✅ Using Mongo now
 from models.global_ban import GlobalBan  # ✅ Pydantic model version
+from utils.drafts import discard_draft
+from utils.ban_cache import is_banned
+from utils import membership
 
 # ====== CONFIG ======
 GROUP_ID = -1002677839849
@@ -57,18 +59,13 @@ async def safe_reply(update: Update, text: str, **kwargs):
 
 # ====== GLOBAL BAN CHECK ======
 async def is_globally_banned(user_id: int) -> bool:
-    """Check if a user is globally banned (MongoDB version)."""
-    banned = await db["global_bans"].find_one({"user_id": int(user_id)})
-    return banned is not None
+    """Check if a user is globally banned (in-memory list, see utils/ban_cache.py)."""
+    return await is_banned(user_id)
 
 # ====== MEMBERSHIP CHECK ======
 async def is_member(user_id: int, context: ContextTypes.DEFAULT_TYPE) -> bool:
-    try:
-        member_group = await context.bot.get_chat_member(GROUP_ID, user_id)
-        member_channel = await context.bot.get_chat_member(CHANNEL_ID, user_id)
-        return member_group.status not in ("left", "kicked") and member_channel.status not in ("left", "kicked")
-    except Exception:
-        return False
+    """Cached group + channel check (utils/membership.py)."""
+    return await membership.is_member(user_id, context, (GROUP_ID, CHANNEL_ID))
 
 # ====== ADD COMMAND ======
 async def add_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -199,6 +196,8 @@ async def cancel_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     if context.user_data:
+        if context.user_data.get("awaiting_bid"):
+            await discard_draft(context.user_data.get("submission_id"))
         context.user_data.clear()
         await safe_reply(update, "❌ Your submission process has been cancelled.")
     else:
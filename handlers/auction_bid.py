@@ -1,41 +1,33 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, CommandHandler, CallbackQueryHandler
-from motor.motor_asyncio import AsyncIOMotorClient
 from models.tables import Submission
-from config import GROUP_ID, CHANNEL_ID, GROUP_URL, CHANNEL_URL, MONGO_URL, MONGO_DB
+from config import GROUP_ID, CHANNEL_ID, GROUP_URL, CHANNEL_URL
+from storage import store, repository as repo
+from utils.codecs import canonical_user_id
+from utils.ban_cache import is_banned
+from utils.membership import is_member
 from utils.tg_links import build_user_link
-
-# ====== MONGO SETUP ======
-client = AsyncIOMotorClient(MONGO_URL)
-db = client[MONGO_DB]
+from utils.bids import record_bid, record_bid_later, bid_doc_id
+from utils import stats, live_auctions
+from utils.pagination import fetch_page, encode_cursor, fits_callback_data
+from utils.db_policy import BID, BROWSE, note_write, read_class_after_write
+from config import BIDS_EMBEDDED_LIMIT
 
 
 # ====== COMMON HELPER FUNCTIONS ======
 async def has_started_bot(user_id: int) -> bool:
-    return await db.users.find_one({"id": user_id}) is not None
-
-
-async def is_member(user_id: int, context: ContextTypes.DEFAULT_TYPE) -> bool:
-    try:
-        member_group = await context.bot.get_chat_member(GROUP_ID, user_id)
-        member_channel = await context.bot.get_chat_member(CHANNEL_ID, user_id)
-        return (
-            member_group.status not in ("left", "kicked")
-            and member_channel.status not in ("left", "kicked")
-        )
-    except Exception:
-        return False
+    return await store.get_user(canonical_user_id(user_id)) is not None
 
 
 async def check_user_status(user_id: int) -> str:
-    banned = await db.global_bans.find_one({"user_id": str(user_id)})
-    if banned:
+    if await is_banned(user_id):
         return "banned"
     return "ok"
 
 
 # =================== /bid Command ===================
+@repo.tracked("bid", budget=4)
 async def bid_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.effective_user
     chat_id = update.effective_chat.id
@@ -105,23 +97,23 @@ async def bid_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return
 
         # 3️⃣ Fetch item from DB
-        submission = await db.submissions.find_one({"_id": int(item_id)})
+        submission, _ = await repo.find(repo.BID_CHECK, int(item_id), op_class=BID)
         if not submission:
             await update.message.reply_text("❌ Item not found.")
             return
 
-        if submission.get("is_expired") or submission.get("status") in ["ended", "sold", "cancelled"]:
+        if submission.is_expired or submission.status in ["ended", "sold", "cancelled"]:
             await update.message.reply_text("🚫 This auction has already ended.")
             return
 
         # Prevent self-bidding
-        if str(submission.get("user_id")) == str(user.id):
+        if str(submission.user_id) == str(user.id):
             await update.message.reply_text("🚫 You cannot bid on your own item.")
             return
 
         # 4️⃣ Determine current bid logic properly
-        current_bid = submission.get("current_bid")
-        base_bid = submission.get("base_bid") or 0
+        current_bid = submission.current_bid
+        base_bid = submission.base_bid or 0
 
         if current_bid is None:
             current_bid = base_bid
@@ -135,37 +127,33 @@ async def bid_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         # 6️⃣ Atomic update (race condition safe)
         # If current_bid changed, update will fail
-        query_filter = {
-            "_id": item_id,
-            "$or": [
-                {"current_bid": submission.get("current_bid")},   # correct expected value
-                {"current_bid": {"$exists": False}},              # first bid safety
-            ]
-        }
-
-        update_data = {
-            "$set": {
+        bidder_name = f"@{user.username}" if user.username else user.first_name
+        bid_time = datetime.utcnow()
+        updated = await repo.place_bid(
+            repo.BID_PLACED,
+            item_id,
+            submission.current_bid,
+            {
                 "current_bid": bid_amount,
                 "last_bidder_id": user.id,
-                "last_bidder_username": f"@{user.username}" if user.username else user.first_name,
-                "last_bid_time": datetime.utcnow(),
+                "last_bidder_username": bidder_name,
+                "last_bid_time": bid_time,
             },
-            "$push": {
-                "previous_bidders": {
-                    "id": user.id,
-                    "username": f"@{user.username}" if user.username else user.first_name,
-                    "bid": bid_amount,
-                    "time": datetime.utcnow().isoformat(),
-                }
-            }
-        }
-
-        result = await db.submissions.find_one_and_update(query_filter, update_data)
+            # Only the newest bids stay embedded; the full history is in `bids`
+            {
+                "id": user.id,
+                "username": bidder_name,
+                "bid": bid_amount,
+                "time": bid_time.isoformat(),
+            },
+            BIDS_EMBEDDED_LIMIT,
+            op_class=BID,
+        )
 
         # ❌ Update failed → someone else outbid first
-        if not result:
-            latest = await db.submissions.find_one({"_id": item_id})
-            latest_bid = latest.get("current_bid") or latest.get("base_bid")
+        if not updated:
+            latest, _ = await repo.find(repo.BID_LATEST, item_id, op_class=BID)
+            latest_bid = latest.current_bid or latest.base_bid
             min_next = (latest_bid) + 5
             await update.message.reply_text(
                 f"⚠️ Someone else already placed a higher bid!\n"
@@ -174,16 +162,21 @@ async def bid_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
             return
 
-        # 7️⃣ Update succeeded → refresh post
-        updated = await db.submissions.find_one({"_id": item_id})
+        # 7️⃣ Update succeeded → store bid history, refresh post
+        # The bid stands either way; its history entry is retried until stored
+        if not await record_bid(item_id, user.id, bidder_name, bid_amount, bid_time, retries=1, op_class=BID):
+            record_bid_later(item_id, user.id, bidder_name, bid_amount, bid_time, op_class=BID)
+        note_write(("bids", item_id))  # /bids reads the primary until secondaries have it
+        stats.bid_placed(bid_amount)
+        live_auctions.apply(item_id, {"current_bid": bid_amount, "last_bidder_id": user.id})
         user_link = build_user_link(user)
 
         caption = (
             f"🆔 Item ID: {item_id}\n"
-            f"🎬 Anime: {updated.get('anime_name')}\n"
-            f"💞 {updated.get('type', '').capitalize()}: {updated.get('waifu_name')}\n"
-            f"💎 Rarity: {updated.get('rarity_name')} {updated.get('rarity')}\n\n"
-            f"💰 Base Bid: {updated.get('base_bid')}\n"
+            f"🎬 Anime: {updated.anime_name}\n"
+            f"💞 {(updated.type or '').capitalize()}: {updated.waifu_name}\n"
+            f"💎 Rarity: {updated.rarity_name} {updated.rarity}\n\n"
+            f"💰 Base Bid: {updated.base_bid}\n"
             f"🏆 Highest Bid: {bid_amount} by {user_link}"
         )
 
@@ -194,7 +187,7 @@ async def bid_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         try:
             await context.bot.edit_message_caption(
                 chat_id=int(CHANNEL_ID),
-                message_id=updated.get("channel_message_id"),
+                message_id=updated.channel_message_id,
                 caption=caption,
                 parse_mode="HTML",
                 reply_markup=keyboard,
@@ -206,7 +199,7 @@ async def bid_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         try:
             await context.bot.edit_message_caption(
                 chat_id=int(GROUP_ID),
-                message_id=updated.get("group_message_id"),
+                message_id=updated.group_message_id,
                 caption=caption,
                 parse_mode="HTML",
             )
@@ -250,8 +243,101 @@ async def recheck_bid(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
 
 
+# =================== /bids History ===================
+BIDS_PER_PAGE = 10
+_EPOCH = datetime(1970, 1, 1)
+
+
+# Page cursors are (bid time in epoch ms, amount, bidder): bids placed in the
+# same millisecond are ordered by their _id, which is rebuilt from the last two
+def _bid_key(bid: dict):
+    try:
+        _, amount, user_id = str(bid["_id"]).rsplit(":", 2)
+        return (bid["time"] - _EPOCH) // timedelta(milliseconds=1), int(amount), int(user_id)
+    except ValueError:
+        return None  # not a bid_doc_id; no page button rather than a wrong one
+
+
+async def render_bid_history(item_id: int, token=None):
+    """Returns (text, reply_markup) for one page of an item's bid history, newest first."""
+    async def fetch(after=None, before=None, limit=BIDS_PER_PAGE):
+        return await store.list_bids(
+            item_id, after=after, before=before, limit=limit,
+            fields=("user_id", "username", "bid", "time"),
+            op_class=read_class_after_write(("bids", item_id), BROWSE),
+        )
+
+    def key_from_cursor(key):
+        if not isinstance(key, tuple) or len(key) != 3:
+            return None  # time-only cursor from an older message
+        ms, amount, user_id = key
+        return _EPOCH + timedelta(milliseconds=ms), bid_doc_id(item_id, user_id, amount)
+
+    items, page, has_prev, has_next = await fetch_page(fetch, token, BIDS_PER_PAGE, key_from_cursor=key_from_cursor)
+
+    if not items:
+        return f"📭 No bids found for item <code>{item_id}</code>.", None
+
+    lines = []
+    for bid in items:
+        bidder = build_user_link(bid.get("user_id"), bid.get("username"), bid.get("username"))
+        lines.append(f"💰 <code>{bid.get('bid')}</code> — {bidder} • {bid['time'].strftime('%d %b %H:%M')} UTC")
+
+    nav_buttons = []
+    newest, oldest = _bid_key(items[0]), _bid_key(items[-1])
+    if has_prev and newest:
+        data = f"bids_{item_id}_{encode_cursor('p', newest, page - 1)}"
+        if fits_callback_data(data):
+            nav_buttons.append(InlineKeyboardButton("⏮️ Newer", callback_data=data))
+    if has_next and oldest:
+        data = f"bids_{item_id}_{encode_cursor('n', oldest, page + 1)}"
+        if fits_callback_data(data):
+            nav_buttons.append(InlineKeyboardButton("Older ⏭️", callback_data=data))
+
+    text = f"📜 <b>Bid History — Item {item_id}</b>\nPage {page}\n\n" + "\n".join(lines)
+    return text, InlineKeyboardMarkup([nav_buttons]) if nav_buttons else None
+
+
+async def bids_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if len(context.args) != 1 or not context.args[0].isdigit():
+        await update.message.reply_text("Usage: /bids <item_id>")
+        return
+
+    status = await check_user_status(update.effective_user.id)
+    if status == "banned":
+        await update.message.reply_text("🚫 You are globally banned from using this bot.")
+        return
+
+    text, reply_markup = await render_bid_history(int(context.args[0]))
+    await update.message.reply_text(
+        text, parse_mode="HTML", reply_markup=reply_markup, disable_web_page_preview=True
+    )
+
+
+async def bids_page_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    if query is None or query.data is None:
+        return
+    await query.answer()
+
+    data = query.data.split("_")
+    try:
+        item_id = int(data[1])
+    except (IndexError, ValueError):
+        return
+    token = data[2] if len(data) > 2 else None
+
+    text, reply_markup = await render_bid_history(item_id, token)
+    if query.message:
+        await query.edit_message_text(
+            text, parse_mode="HTML", reply_markup=reply_markup, disable_web_page_preview=True
+        )
+
+
 # ====== HANDLER LIST ======
 auction_bid_handlers = [
     CommandHandler("bid", bid_command),
+    CommandHandler("bids", bids_command),
     CallbackQueryHandler(recheck_bid, pattern="^recheck_bid$"),
+    CallbackQueryHandler(bids_page_handler, pattern="^bids_"),
 ]
@@ -0,0 +1,202 @@
+import hashlib
+import html
+from datetime import datetime, timedelta
+from typing import Optional
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.ext import ContextTypes, CommandHandler, CallbackQueryHandler
+from storage import store
+from utils.audit import ACTIONS
+from utils.db_policy import ANALYTICS
+from utils.pagination import fetch_page, encode_cursor, fits_callback_data, to_base36
+from utils.tg_links import build_user_link
+from config import OWNER_ID, ADMINS, AUDIT_PAGE_SIZE
+
+USAGE = (
+    "⚠️ Usage: /audit [actor=&lt;user_id&gt;] [target=&lt;user_or_item_id&gt;] "
+    f"[action={'|'.join(ACTIONS)}]\n"
+    "Example: /audit target=1234"
+)
+
+_EPOCH = datetime(1970, 1, 1)
+NO_FILTERS = {"actor_id": None, "target": None, "action": None}
+
+# Filtered views remembered for their page buttons (most recently used kept)
+AUDIT_VIEWS_KEPT = 200
+
+
+# Page cursors are (entry time in epoch µs, entry _id): entries logged in
+# the same instant are told apart by their _id
+def _entry_key(entry: dict) -> tuple:
+    return (entry["time"] - _EPOCH) // timedelta(microseconds=1), entry["_id"]
+
+
+def _key_from_cursor(key):
+    if not isinstance(key, tuple) or len(key) != 2:
+        return None  # time-only cursor from an older message
+    return _EPOCH + timedelta(microseconds=key[0]), key[1]
+
+
+def is_admin_or_owner(user_id: int) -> bool:
+    return user_id == OWNER_ID or user_id in ADMINS
+
+
+def parse_filters(args) -> dict:
+    """actor= / target= / action= arguments; raises ValueError on anything else."""
+    filters = dict(NO_FILTERS)
+    for arg in args:
+        key, _, value = arg.partition("=")
+        key = key.lower()
+        if key == "actor" and value.lstrip("-").isdigit():
+            filters["actor_id"] = int(value)
+        elif key == "target" and value:
+            filters["target"] = value
+        elif key == "action" and value.lower() in ACTIONS:
+            filters["action"] = value.lower()
+        else:
+            raise ValueError(arg)
+    return filters
+
+
+# Filters stay server-side: callback_data is audit_<view>_<cursor>, where
+# <view> is a short key into bot_data["audit_views"] ("" for the whole log).
+# A free-form target can neither blow the 64-byte limit nor break the split.
+def _view_key(filters: dict) -> str:
+    if filters == NO_FILTERS:
+        return ""
+    digest = hashlib.blake2b(repr(sorted(filters.items())).encode(), digest_size=5).digest()
+    return to_base36(int.from_bytes(digest, "big"))
+
+
+def remember_view(bot_data: dict, filters: dict) -> str:
+    view = _view_key(filters)
+    if view:
+        views = bot_data.setdefault("audit_views", {})
+        views.pop(view, None)
+        views[view] = dict(filters)
+        while len(views) > AUDIT_VIEWS_KEPT:
+            views.pop(next(iter(views)))
+    return view
+
+
+def recall_view(bot_data: dict, view: str) -> Optional[dict]:
+    """The filters behind a view key, or None once forgotten (restart, or pushed out)."""
+    if not view:
+        return dict(NO_FILTERS)
+    return bot_data.get("audit_views", {}).get(view)
+
+
+def _callback_data(view: str, token: str) -> str:
+    return f"audit_{view}_{token}"
+
+
+def _describe_filters(filters: dict) -> str:
+    labels = {"actor_id": "actor", "target": "target", "action": "action"}
+    active = [f"{labels[k]}={v}" for k, v in filters.items() if v is not None]
+    return ", ".join(active) if active else "all actions"
+
+
+def _format_entry(entry: dict) -> str:
+    actor = build_user_link(entry.get("actor_id"), None, html.escape(entry.get("actor_name") or "Admin"))
+    line = f"• {entry['time'].strftime('%d %b %H:%M')} — <b>{entry.get('action')}</b> by {actor}"
+    if entry.get("target") is not None:
+        line += f" → <code>{html.escape(entry['target'])}</code>"
+    details = entry.get("details") or {}
+    if details:
+        line += " — " + html.escape(", ".join(f"{k}: {v}" for k, v in details.items()))
+    return line
+
+
+# ================= PAGE RENDERING =================
+async def render_audit_page(filters: dict, token=None, view: str = ""):
+    """
+    Returns (text, reply_markup) for one page of the audit log, newest
+    first.  `view` is the remember_view() key of `filters`.
+    """
+    async def fetch(after=None, before=None, limit=AUDIT_PAGE_SIZE):
+        return await store.list_audit(**filters, after=after, before=before, limit=limit, op_class=ANALYTICS)
+
+    items, page, has_prev, has_next = await fetch_page(fetch, token, AUDIT_PAGE_SIZE, key_from_cursor=_key_from_cursor)
+
+    if not items:
+        return f"📭 No audit entries for {_describe_filters(filters)}.", None
+
+    nav_buttons, unpageable = [], False
+    for wanted, label, cursor in (
+        (has_prev, "⏮️ Newer", lambda: encode_cursor("p", _entry_key(items[0]), page - 1)),
+        (has_next, "Older ⏭️", lambda: encode_cursor("n", _entry_key(items[-1]), page + 1)),
+    ):
+        if not wanted:
+            continue
+        data = _callback_data(view, cursor())
+        if fits_callback_data(data):
+            nav_buttons.append(InlineKeyboardButton(label, callback_data=data))
+        else:
+            unpageable = True
+
+    text = (
+        f"🧾 <b>Audit Log — {_describe_filters(filters)}</b>\nPage {page} (UTC)\n\n"
+        + "\n".join(_format_entry(entry) for entry in items)
+    )
+    if unpageable:
+        text += "\n\nℹ️ Paging is not available for this view; narrow the filters to see more."
+    return text, InlineKeyboardMarkup([nav_buttons]) if nav_buttons else None
+
+
+# ================= /AUDIT COMMAND =================
+async def audit_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if not is_admin_or_owner(update.effective_user.id):
+        return
+
+    try:
+        filters = parse_filters(context.args)
+    except ValueError:
+        await update.message.reply_text(USAGE, parse_mode="HTML")
+        return
+
+    view = remember_view(context.bot_data, filters)
+    text, reply_markup = await render_audit_page(filters, view=view)
+    await update.message.reply_text(
+        text, parse_mode="HTML", reply_markup=reply_markup, disable_web_page_preview=True
+    )
+
+
+async def audit_page_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    if query is None or query.data is None:
+        return
+    if not is_admin_or_owner(query.from_user.id):
+        await query.answer("🚫 Admins only.", show_alert=True)
+        return
+
+    data = query.data.split("_")
+    if len(data) == 3:
+        _, view, token = data
+        filters = recall_view(context.bot_data, view)
+    elif len(data) == 5:
+        # Older buttons carried the filters: audit_<actor>_<target>_<action>_<cursor>
+        _, actor_id, target, action, token = data
+        filters = {
+            "actor_id": int(actor_id) if actor_id.lstrip("-").isdigit() else None,
+            "target": target or None,
+            "action": action if action in ACTIONS else None,
+        }
+    else:
+        filters = token = None
+    if filters is None:
+        await query.answer("⌛ This /audit view has expired. Run /audit again.", show_alert=True)
+        return
+    await query.answer()
+
+    view = remember_view(context.bot_data, filters)
+    text, reply_markup = await render_audit_page(filters, token, view)
+    if query.message:
+        await query.edit_message_text(
+            text, parse_mode="HTML", reply_markup=reply_markup, disable_web_page_preview=True
+        )
+
+
+# ================= HANDLER REGISTRATION =================
+audit_handlers = [
+    CommandHandler("audit", audit_command),
+    CallbackQueryHandler(audit_page_handler, pattern="^audit_"),
+]
@@ -2,7 +2,10 @@ from datetime import datetime
 from bson import ObjectId
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, MessageHandler, filters
-from utils.database import db
+from storage import store
+from utils.drafts import DRAFT_STATUS, record_draft_event
+from utils.submission_rules import parse_base_bid
+from utils import stats
 from .add_command import is_private_chat, RARITY_MAP
 from config import LOG_GROUP_ID
 
@@ -18,11 +21,11 @@ async def handle_base_bid(update: Update, context: ContextTypes.DEFAULT_TYPE):
     text = update.message.text.strip()
 
     # Validate numeric input
-    if not text.isdigit():
+    base_bid = parse_base_bid(text)
+    if base_bid is None:
         await update.message.reply_text("⚠️ Please enter a valid number for base bid.")
         return
 
-    base_bid = int(text)
     context.user_data.pop("awaiting_bid", None)
 
     submission_id = context.user_data.get("submission_id")
@@ -31,14 +34,22 @@ async def handle_base_bid(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     # ✅ Update existing submission with base bid
-    await db["submissions"].update_one(
-        {"_id": submission_id},
-        {"$set": {
+    promoted = await store.update_submission(
+        submission_id,
+        {
             "base_bid": base_bid,
             "status": "pending",
             "submitted_time": datetime.utcnow(),
-        }},
+        },
+        expect={"status": DRAFT_STATUS},
     )
+    if not promoted:
+        # The draft expired (or was swept) while the user was away
+        context.user_data.clear()
+        await update.message.reply_text("⌛ This submission expired. Please start again with /add.")
+        return
+    record_draft_event("completed")
+    stats.item_submitted()
 
     # Build log caption
     log_caption = (
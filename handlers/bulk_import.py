@@ -0,0 +1,54 @@
+from telegram import Update
+from telegram.ext import ContextTypes, CommandHandler
+from utils.bulk_import import detect_format, read_rows, import_items, format_report
+from utils.audit import audit
+from config import OWNER_ID, ADMINS
+
+USAGE = (
+    "⚠️ Reply to a .csv or .jsonl file with /import [seller=&lt;user_id&gt;]\n"
+    "Columns: file_id, type, rarity, caption, base_bid "
+    "(optional: seller_id, seller_username, seller_name)"
+)
+
+
+# ================= /IMPORT COMMAND =================
+async def import_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    user = update.effective_user
+
+    # Only owner or admins
+    if user.id != OWNER_ID and user.id not in ADMINS:
+        return
+
+    reply = update.message.reply_to_message
+    document = reply.document if reply else None
+    fmt = detect_format(document.file_name) if document else None
+    if not fmt:
+        await update.message.reply_text(USAGE, parse_mode="HTML")
+        return
+
+    # Rows without seller_id are listed under the importing admin (or seller=<id>)
+    seller = {"user_id": user.id, "username": user.username, "user_name": user.full_name}
+    for arg in context.args:
+        arg = arg.lower()
+        if arg.startswith("seller=") and arg[7:].isdigit():
+            seller = {"user_id": int(arg[7:]), "username": None, "user_name": None}
+        else:
+            await update.message.reply_text(USAGE, parse_mode="HTML")
+            return
+
+    await update.message.reply_text(f"⏳ Importing {document.file_name}...")
+    try:
+        file = await context.bot.get_file(document.file_id)
+        data = bytes(await file.download_as_bytearray())
+        report = await import_items(read_rows(data, fmt), seller)
+    except Exception as e:
+        print(f"❌ Import failed: {e}")
+        await update.message.reply_text(f"❌ Import failed: {e}")
+        return
+
+    audit("import", user, report["batch"], inserted=report["inserted"])
+    await update.message.reply_text(format_report(report), parse_mode="HTML")
+
+
+# ================= HANDLER REGISTRATION =================
+import_handler = CommandHandler("import", import_command)
@@ -0,0 +1,71 @@
+from telegram import Update
+from telegram.ext import ContextTypes, CommandHandler
+from utils.export import COLLECTIONS, FORMATS, run_export, send_exports, describe, parse_since
+from utils.background import spawn
+from config import OWNER_ID, ADMINS, LOG_GROUP_ID, EXPORT_DIR, EXPORT_BATCH_SIZE
+
+USAGE = (
+    "⚠️ Usage: /export [all|submissions|archive|bids|users] [jsonl|csv|parquet] [since=YYYY-MM-DD|since=last]\n"
+    "Example: /export bids csv since=last"
+)
+
+# One export at a time: they share EXPORT_DIR and its watermarks
+_running = {"export": None}
+
+
+# ================= BACKGROUND EXPORT =================
+async def _export_and_report(bot, chat_id: int, collections: list, fmt: str, since):
+    """Runs outside the handler so /bid and /items keep flowing; reports back to `chat_id`."""
+    try:
+        results = await run_export(collections, fmt, EXPORT_DIR, since, EXPORT_BATCH_SIZE)
+        await send_exports(bot, LOG_GROUP_ID, results)
+    except Exception as e:
+        print(f"❌ Export failed: {e}")
+        await bot.send_message(chat_id=chat_id, text=f"❌ Export failed: {e}")
+        return
+    finally:
+        _running["export"] = None
+
+    summary = "\n".join(f"• {describe(result)}" for result in results)
+    await bot.send_message(chat_id=chat_id, text=f"✅ Export sent to the log group.\n{summary}")
+
+
+# ================= /EXPORT COMMAND =================
+async def export_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    user_id = update.effective_user.id
+
+    # Only owner or admins
+    if user_id != OWNER_ID and user_id not in ADMINS:
+        return
+
+    collections, fmt, since = [], "jsonl", None
+    try:
+        for arg in context.args:
+            arg = arg.lower()
+            if arg == "all":
+                collections = list(COLLECTIONS)
+            elif arg in COLLECTIONS:
+                collections.append(arg)
+            elif arg in FORMATS:
+                fmt = arg
+            elif arg.startswith("since="):
+                since = parse_since(arg.split("=", 1)[1])
+            else:
+                raise ValueError(arg)
+    except ValueError:
+        await update.message.reply_text(USAGE)
+        return
+    collections = collections or list(COLLECTIONS)
+
+    if _running["export"]:
+        await update.message.reply_text(f"⏳ An export is already running ({_running['export']}); try again when it is done.")
+        return
+
+    description = f"{', '.join(collections)} as {fmt}"
+    _running["export"] = description
+    spawn(_export_and_report(context.bot, update.effective_chat.id, collections, fmt, since), "export")
+    await update.message.reply_text(f"⏳ Export of {description} started; I'll report here when it is done.")
+
+
+# ================= HANDLER REGISTRATION =================
+export_handler = CommandHandler("export", export_command)
@@ -1,13 +1,16 @@
 import asyncio
 from datetime import datetime
-from bson import ObjectId
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, CommandHandler
-from utils.database import db
+from storage import repository as repo
+from utils.db_policy import ADMIN
 from config import LOG_GROUP_ID, GROUP_ID, ADMINS, OWNER_ID
 from utils.tg_links import build_user_link
+from utils.audit import audit
+from utils import stats, live_auctions
 
 
+@repo.tracked("forceend", budget=2)
 async def forceend_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.effective_user
 
@@ -19,84 +22,74 @@ async def forceend_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("⚠️ Usage: /forceend <item_id>")
         return
 
-    item_id_raw = context.args[0]
-
-    # --- Detect integer counter ID or ObjectId ---
-    if item_id_raw.isdigit():
-        item_id = int(item_id_raw)
-    elif ObjectId.is_valid(item_id_raw):
-        item_id = ObjectId(item_id_raw)
-    else:
+    item_id = repo.parse_item_id(context.args[0])
+    if item_id is None:
         await update.message.reply_text("❌ Invalid Item ID format.")
         return
 
     try:
-        submission = await db.submissions.find_one({"_id": item_id})
-        if not submission:
-            await update.message.reply_text("❌ No item found with that ID.")
-            return
-
-        if submission.get("status") not in ["approved"]:
-            await update.message.reply_text("⚠️ This auction is not active or already ended.")
+        # --- Stop auction immediately (only if it is still running) ---
+        # Admin reads/writes go to the primary with majority write concern
+        submission = await repo.end_auction(repo.AUCTION_RESULT, item_id, ended_at=datetime.utcnow(), op_class=ADMIN)
+        if submission is None:
+            existing, _ = await repo.find(repo.ITEM_STATUS, item_id, op_class=ADMIN)
+            if not existing:
+                await update.message.reply_text("❌ No item found with that ID.")
+            else:
+                await update.message.reply_text("⚠️ This auction is not active or already ended.")
             return
+        audit("forceend", user, submission.id, final_bid=submission.current_bid, winner=submission.last_bidder_id)
+        stats.auction_ended(submission)
+        live_auctions.discard(submission.id)
 
-        # --- Stop auction immediately ---
-        await db.submissions.update_one(
-            {"_id": item_id},
-            {"$set": {
-                "is_expired": True,
-                "status": "ended",
-                "expires_at": datetime.utcnow(),
-            }}
-        )
-
-        type_name = submission.get("type", "Waifu").capitalize()
-        rarity_text = f"💎 Rarity: {submission.get('rarity_name', '')} ({submission.get('rarity', '')})"
+        type_name = (submission.type or "Waifu").capitalize()
+        rarity_text = f"💎 Rarity: {submission.rarity_name or ''} ({submission.rarity or ''})"
 
         owner_link = (
-            build_user_link(submission.get("user_id"), submission.get("username"))
-            if submission.get("user_id") else "Unknown Seller"
+            build_user_link(submission.user_id, submission.username)
+            if submission.user_id else "Unknown Seller"
         )
         winner_link = (
-            build_user_link(submission.get("last_bidder_id"), submission.get("last_bidder_username"))
-            if submission.get("last_bidder_id") else "No Winner"
+            build_user_link(submission.last_bidder_id, submission.last_bidder_username)
+            if submission.last_bidder_id else "No Winner"
         )
+        final_bid = submission.current_bid if submission.current_bid is not None else "N/A"
 
         announcement = (
             f"🚨 <b>Auction Force-Ended by Admin!</b>\n\n"
-            f"💞 <b>{type_name}</b>: <code>{submission.get('waifu_name', '')}</code>\n"
-            f"🎬 <b>Anime:</b> <code>{submission.get('anime_name', '')}</code>\n"
+            f"💞 <b>{type_name}</b>: <code>{submission.waifu_name or ''}</code>\n"
+            f"🎬 <b>Anime:</b> <code>{submission.anime_name or ''}</code>\n"
             f"{rarity_text}\n\n"
-            f"💰 <b>Winning Bid:</b> <code>{submission.get('current_bid', 'N/A')}</code>\n"
+            f"💰 <b>Winning Bid:</b> <code>{final_bid}</code>\n"
             f"👤 <b>Seller:</b> {owner_link}\n"
             f"🏆 <b>Winner:</b> {winner_link}\n\n"
-            f"🆔 <b>Item ID:</b> <code>{str(submission.get('_id'))}</code>\n"
+            f"🆔 <b>Item ID:</b> <code>{submission.id}</code>\n"
             f"🛑 <i>Ended manually by admin {build_user_link(user.id, user.username)}</i>"
         )
 
         # --- Buttons ---
         buttons = []
-        if submission.get("user_id"):
-            buttons.append(InlineKeyboardButton("👤 Contact Seller", url=f"tg://user?id={submission['user_id']}"))
-        if submission.get("last_bidder_id"):
-            buttons.append(InlineKeyboardButton("🏆 Contact Winner", url=f"tg://user?id={submission['last_bidder_id']}"))
+        if submission.user_id:
+            buttons.append(InlineKeyboardButton("👤 Contact Seller", url=f"tg://user?id={submission.user_id}"))
+        if submission.last_bidder_id:
+            buttons.append(InlineKeyboardButton("🏆 Contact Winner", url=f"tg://user?id={submission.last_bidder_id}"))
         reply_markup = InlineKeyboardMarkup([buttons]) if buttons else None
 
         # === 1️⃣ Send announcement to group ===
         await context.bot.send_photo(
             chat_id=GROUP_ID,
-            photo=submission.get("file_id"),
+            photo=submission.file_id,
             caption=announcement,
             parse_mode="HTML",
             reply_markup=reply_markup
         )
 
         # === 2️⃣ Edit channel post ===
-        if submission.get("channel_message_id"):
+        if submission.channel_message_id:
             try:
                 await context.bot.edit_message_caption(
-                    chat_id=submission.get("channel_id"),
-                    message_id=submission.get("channel_message_id"),
+                    chat_id=submission.channel_id,
+                    message_id=submission.channel_message_id,
                     caption=f"{announcement}\n\n⏰ <b>Auction Force-Ended by Admin</b>",
                     parse_mode="HTML"
                 )
@@ -104,17 +97,17 @@ async def forceend_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 print(f"⚠️ Failed to edit channel caption: {e}")
 
         # === 3️⃣ Notify winner ===
-        if submission.get("last_bidder_id"):
+        if submission.last_bidder_id:
             try:
                 msg = (
                     f"⚠️ <b>Admin Notice</b>\n\n"
-                    f"Your auction win for <b>{submission.get('waifu_name', '')}</b> "
+                    f"Your auction win for <b>{submission.waifu_name or ''}</b> "
                     f"was force-ended by admin.\n"
-                    f"💰 Final Bid: <code>{submission.get('current_bid', 'N/A')}</code>\n"
-                    f"🆔 Item ID: <code>{str(submission.get('_id'))}</code>"
+                    f"💰 Final Bid: <code>{final_bid}</code>\n"
+                    f"🆔 Item ID: <code>{submission.id}</code>"
                 )
                 await context.bot.send_message(
-                    chat_id=submission["last_bidder_id"],
+                    chat_id=submission.last_bidder_id,
                     text=msg,
                     parse_mode="HTML"
                 )
@@ -122,16 +115,16 @@ async def forceend_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 print(f"⚠️ Failed to notify winner: {e}")
 
         # === 4️⃣ Notify seller ===
-        if submission.get("user_id"):
+        if submission.user_id:
             try:
                 msg = (
                     f"🕊️ <b>Your auction has been force-ended by admin.</b>\n\n"
-                    f"💞 <b>{submission.get('waifu_name', '')}</b>\n"
+                    f"💞 <b>{submission.waifu_name or ''}</b>\n"
                     f"🏆 Winner: {winner_link}\n"
-                    f"💰 Final Bid: <code>{submission.get('current_bid', 'N/A')}</code>"
+                    f"💰 Final Bid: <code>{final_bid}</code>"
                 )
                 await context.bot.send_message(
-                    chat_id=submission["user_id"],
+                    chat_id=submission.user_id,
                     text=msg,
                     parse_mode="HTML"
                 )
@@ -143,7 +136,7 @@ async def forceend_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             try:
                 await context.bot.send_photo(
                     chat_id=LOG_GROUP_ID,
-                    photo=submission.get("file_id"),
+                    photo=submission.file_id,
                     caption=f"🛑 <b>Force-End Log</b>\n\n{announcement}",
                     parse_mode="HTML"
                 )
@@ -151,7 +144,7 @@ async def forceend_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 print(f"⚠️ Failed to send log: {e}")
 
         await update.message.reply_text(
-            f"✅ Auction ID <code>{str(submission.get('_id'))}</code> force-ended successfully!",
+            f"✅ Auction ID <code>{submission.id}</code> force-ended successfully!",
             parse_mode="HTML"
         )
 
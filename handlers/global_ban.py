@@ -2,9 +2,15 @@ import asyncio
 from datetime import datetime
 from telegram import Update
 from telegram.ext import ContextTypes, CommandHandler
-from utils.database import db
+from storage import store
+from utils.codecs import canonical_user_id
 from bson import ObjectId
 from config import LOG_GROUP_ID, OWNER_ID, ADMINS
+from utils.db_policy import ADMIN
+from utils.audit import audit
+from utils import stats
+from utils.ban_cache import mark_banned, mark_unbanned
+from utils.chat_cache import get_chat
 
 # ===== CHECK IF USER IS ADMIN OR OWNER =====
 def is_admin_or_owner(user_id: int) -> bool:
@@ -26,7 +32,7 @@ async def aban(update: Update, context: ContextTypes.DEFAULT_TYPE):
     else:
         try:
             target_id = int(context.args[0])
-            target = await context.bot.get_chat(target_id)
+            target = await get_chat(context.bot, target_id)
         except Exception:
             return await update.message.reply_text("❌ Invalid user ID.")
 
@@ -38,21 +44,21 @@ async def aban(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     reason = " ".join(context.args[1:]) if len(context.args) > 1 else "No reason provided."
 
-    # Check if already banned
-    existing = await db.global_bans.find_one({"user_id": target.id})
-    if existing:
+    # Insert new ban (admin writes go to the primary with majority write concern)
+    added = await store.add_ban({
+        "user_id": canonical_user_id(target.id),
+        "reason": reason,
+        "banned_by": user.id,
+        "timestamp": datetime.utcnow()
+    }, op_class=ADMIN)
+    if not added:
         return await update.message.reply_text(
             f"⚠️ {target.mention_html()} is already globally banned.",
             parse_mode="HTML"
         )
-
-    # Insert new ban
-    await db.global_bans.insert_one({
-        "user_id": target.id,
-        "reason": reason,
-        "banned_by": user.id,
-        "timestamp": datetime.utcnow()
-    })
+    await mark_banned(target.id)
+    audit("aban", user, target.id, reason=reason)
+    stats.user_banned()
 
     log_text = (
         f"🚨 <b>Global Ban Executed</b>\n\n"
@@ -84,18 +90,19 @@ async def unaban(update: Update, context: ContextTypes.DEFAULT_TYPE):
     else:
         try:
             target_id = int(context.args[0])
-            target = await context.bot.get_chat(target_id)
+            target = await get_chat(context.bot, target_id)
         except Exception:
             return await update.message.reply_text("❌ Invalid user ID.")
 
-    existing = await db.global_bans.find_one({"user_id": target.id})
-    if not existing:
+    removed = await store.remove_ban(canonical_user_id(target.id), op_class=ADMIN)
+    if not removed:
         return await update.message.reply_text(
             f"⚠️ {target.mention_html()} is not globally banned.",
             parse_mode="HTML"
         )
-
-    await db.global_bans.delete_one({"user_id": target.id})
+    await mark_unbanned(target.id)
+    audit("unaban", user, target.id)
+    stats.user_banned(False)
 
     log_text = (
         f"✅ <b>Global Unban Executed</b>\n\n"
@@ -9,6 +9,7 @@ USER_COMMANDS = [
     ("/items", "View all active auction items"),
     ("/myitems", "View your submitted items"),
     ("/bid &lt;item_id&gt; &lt;amount&gt;", "Place a bid on an item"),
+    ("/bids &lt;item_id&gt;", "Show the bid history of an item"),
     ("/help", "Show all available commands"),
 ]
 
@@ -17,6 +18,9 @@ ADMIN_COMMANDS = [
     ("/unaban &lt;user_id&gt;", "Unban a globally banned user"),
     ("/forceend &lt;item_id&gt;", "Force-end an auction manually"),
     ("/rm &lt;item_id(s)&gt;", "Remove one or multiple items by ID"),
+    ("/export [collection] [format] [since=...]", "Export data to the log group"),
+    ("/import [seller=&lt;user_id&gt;]", "Bulk-import listings to the publish queue (reply to a CSV/JSONL file)"),
+    ("/audit [actor=…] [target=…] [action=…]", "Browse the admin audit log"),
 ]
 
 # ================= HELPER FUNCTION =================
@@ -2,38 +2,85 @@ from datetime import datetime
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, CommandHandler, CallbackQueryHandler
 from handlers.add_command import is_globally_banned
-from utils.database import db  # using Motor (async MongoDB client)
-from bson import ObjectId
-from config import GROUP_ID, CHANNEL_ID, GROUP_URL, CHANNEL_URL, RARITY_MAP
+from storage import store
+from utils.ban_cache import is_banned
+from utils.membership import is_member
+from utils.chat_cache import private_post_link
+from utils import live_auctions
+from utils.page_cache import cached_page
+from utils.single_flight import single_flight
+from utils.pagination import fetch_page, encode_cursor, fits_callback_data
+from utils.db_policy import BROWSE
+from config import GROUP_URL, CHANNEL_URL, RARITY_MAP
 
 
-# ================= HELPER FUNCTIONS =================
+ITEMS_PER_PAGE = 10
 
-async def has_started_bot(user_id: int) -> bool:
-    """Check if user has started the bot."""
-    user = await db.users.find_one({"id": user_id})
-    return user is not None
+# Rarity name -> emoji for listing rows
+RARITY_EMOJI = {name: emoji for emoji, name in RARITY_MAP.items()}
 
+# Only the fields a listing page renders
+LISTING_FIELDS = ("waifu_name", "anime_name", "rarity_name", "channel_id", "channel_message_id")
 
-async def is_member(user_id: int, context: ContextTypes.DEFAULT_TYPE) -> bool:
-    """Check if user is in both group and channel."""
-    try:
-        member_group = await context.bot.get_chat_member(GROUP_ID, user_id)
-        member_channel = await context.bot.get_chat_member(CHANNEL_ID, user_id)
-        return (
-            member_group.status not in ("left", "kicked")
-            and member_channel.status not in ("left", "kicked")
-        )
-    except Exception:
-        return False
 
+# ================= HELPER FUNCTIONS =================
 
 async def check_user_status(user_id: int) -> str:
     """Check global ban and bot start status. Returns 'banned', 'not_started', or 'ok'."""
-    if await db.global_bans.find_one({"user_id": str(user_id)}):
+    if await is_banned(user_id):
         return "banned"
 
     
+async def count_live(category: str, rarity_name: str = None) -> int:
+    """Count of live auctions: in-memory model, or an index-backed count before it is loaded."""
+    count = live_auctions.count_live(category, rarity_name)
+    if count is not None:
+        return count
+    return await single_flight(
+        ("count_live", category, rarity_name),
+        lambda: store.count_live(category, datetime.utcnow(), rarity_name, op_class=BROWSE),
+    )
+
+
+def live_page_fetcher(category: str, rarity_name: str = None):
+    """`fetch` callable for utils.pagination.fetch_page over live auctions."""
+    now = datetime.utcnow()
+
+    async def fetch(after=None, before=None, limit=ITEMS_PER_PAGE):
+        page = live_auctions.list_live(category, rarity_name, after=after, before=before, limit=limit, fields=LISTING_FIELDS)
+        if page is not None:
+            return page
+        # Everyone paging the same listing at once shares one query
+        return await single_flight(
+            ("list_live", category, rarity_name, after, before, limit),
+            lambda: store.list_live(
+                category, now, rarity_name, after=after, before=before, limit=limit,
+                fields=LISTING_FIELDS, op_class=BROWSE,
+            ),
+        )
+
+    return fetch
+
+
+def item_link(item: dict) -> str:
+    message_id = item.get("channel_message_id")
+    return private_post_link(item.get("channel_id"), message_id) or f"{CHANNEL_URL}/{message_id}"
+
+
+def build_nav_buttons(prefix: str, items: list, page: int, has_prev: bool, has_next: bool) -> list:
+    """Prev/Next buttons carrying keyset cursors (first/last _id of the page)."""
+    nav_buttons = []
+    if has_prev:
+        data = f"{prefix}_{encode_cursor('p', items[0]['_id'], page - 1)}"
+        if fits_callback_data(data):
+            nav_buttons.append(InlineKeyboardButton("⏮️ Prev", callback_data=data))
+    if has_next:
+        data = f"{prefix}_{encode_cursor('n', items[-1]['_id'], page + 1)}"
+        if fits_callback_data(data):
+            nav_buttons.append(InlineKeyboardButton("Next ⏭️", callback_data=data))
+    return nav_buttons
+
+
 # ================= MAIN COMMAND HANDLER =================
 
 async def items_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -103,17 +150,8 @@ async def recheck_items(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def show_category_selection(update: Update, context: ContextTypes.DEFAULT_TYPE, from_callback=False):
     """Displays Waifu / Husbando category options."""
-    now = datetime.utcnow()
-    waifu_count = await db.submissions.count_documents({
-        "type": "waifu",
-        "status": "approved",
-        "expires_at": {"$gt": now}
-    })
-    husbando_count = await db.submissions.count_documents({
-        "type": "husbando",
-        "status": "approved",
-        "expires_at": {"$gt": now}
-    })
+    waifu_count = await count_live("waifu")
+    husbando_count = await count_live("husbando")
 
     keyboard = []
     if waifu_count > 0:
@@ -154,7 +192,7 @@ async def type_selection_handler(update: Update, context: ContextTypes.DEFAULT_T
     _, _, category = query.data.split("_")
     keyboard = [
         [
-            InlineKeyboardButton("🌟 View All (Default)", callback_data=f"view_all_{category}_1"),
+            InlineKeyboardButton("🌟 View All (Default)", callback_data=f"view_all_{category}"),
             InlineKeyboardButton("🎯 Filter by Rarity", callback_data=f"filter_rarity_{category}")
         ],
         [InlineKeyboardButton("⬅️ Back", callback_data="back")]
@@ -183,48 +221,44 @@ async def view_all_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     data = query.data.split("_")
     category = data[2]
-    page = int(data[3]) if len(data) > 3 else 1
+    token = data[3] if len(data) > 3 else None
 
-    now = datetime.utcnow()
-    cursor = db.submissions.find({
-        "type": category,
-        "status": "approved",
-        "expires_at": {"$gt": now}
-    }).sort("_id", 1)
-
-    results = [doc async for doc in cursor]
-    total_items = len(results)
-    items_per_page = 10
-    start = (page - 1) * items_per_page
-    end = start + items_per_page
-    current_page_items = results[start:end]
+    text, reply_markup = await cached_page(
+        ("all", category, token),
+        live_auctions.catalog_version(category),
+        lambda: render_view_all(category, token),
+    )
+    if query.message:
+        await query.edit_message_text(
+            text=text,
+            parse_mode="HTML",
+            disable_web_page_preview=True,
+            reply_markup=reply_markup
+        )
+
+
+async def render_view_all(category: str, token: str = None):
+    """(text, reply_markup) for one "View All" page."""
+    current_page_items, page, has_prev, has_next = await fetch_page(
+        live_page_fetcher(category), token, ITEMS_PER_PAGE
+    )
 
     if not current_page_items:
-        if query.message:
-            await query.edit_message_text(f"No ongoing {category} auctions found.", parse_mode="HTML")
-        return
+        return f"No ongoing {category} auctions found.", None
+
+    total_items = await count_live(category)
 
     items_list = ""
     for item in current_page_items:
         name = item.get("waifu_name", "Unnamed")
         anime = item.get("anime_name", "Unknown anime")
-        message_id = item.get("channel_message_id")
-        channel_id = item.get("channel_id")
-        if channel_id and str(channel_id).startswith("-100"):
-            link = f"https://t.me/c/{str(channel_id)[4:]}/{message_id}"
-        else:
-            link = f"{CHANNEL_URL}/{message_id}"
-
-        emoji = next((k for k, v in RARITY_MAP.items() if v == item.get("rarity_name")), "⭐")
+        link = item_link(item)
+        emoji = RARITY_EMOJI.get(item.get("rarity_name"), "⭐")
         items_list += f"{emoji} <a href='{link}'>{item.get('_id')}. {name}</a> ({anime})\n"
 
-    total_pages = (total_items + items_per_page - 1) // items_per_page
+    total_pages = max((total_items + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE, page)
     buttons = []
-    nav_buttons = []
-    if page > 1:
-        nav_buttons.append(InlineKeyboardButton("⏮️ Prev", callback_data=f"view_all_{category}_{page-1}"))
-    if end < total_items:
-        nav_buttons.append(InlineKeyboardButton("Next ⏭️", callback_data=f"view_all_{category}_{page+1}"))
+    nav_buttons = build_nav_buttons(f"view_all_{category}", current_page_items, page, has_prev, has_next)
     if nav_buttons:
         buttons.append(nav_buttons)
 
@@ -233,13 +267,8 @@ async def view_all_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         InlineKeyboardButton("🗑️ Delete", callback_data="delete")
     ])
 
-    if query.message:
-        await query.edit_message_text(
-            text=f"<b>💫 All {category.capitalize()} Auctions</b>\nPage {page}/{total_pages}\n\n{items_list}",
-            parse_mode="HTML",
-            disable_web_page_preview=True,
-            reply_markup=InlineKeyboardMarkup(buttons)
-        )
+    text = f"<b>💫 All {category.capitalize()} Auctions</b>\nPage {page}/{total_pages}\n\n{items_list}"
+    return text, InlineKeyboardMarkup(buttons)
 
 
 # ================= FILTER BY RARITY =================
@@ -259,16 +288,16 @@ async def filter_rarity_handler(update: Update, context: ContextTypes.DEFAULT_TY
     _, _, category = query.data.split("_")
     keyboard = [
         [
-            InlineKeyboardButton("🔵", callback_data=f"select_rarity_{category}_🔵_1"),
-            InlineKeyboardButton("🔴", callback_data=f"select_rarity_{category}_🔴_1"),
-            InlineKeyboardButton("🟠", callback_data=f"select_rarity_{category}_🟠_1"),
+            InlineKeyboardButton("🔵", callback_data=f"select_rarity_{category}_🔵"),
+            InlineKeyboardButton("🔴", callback_data=f"select_rarity_{category}_🔴"),
+            InlineKeyboardButton("🟠", callback_data=f"select_rarity_{category}_🟠"),
         ],
         [
-            InlineKeyboardButton("🟡", callback_data=f"select_rarity_{category}_🟡_1"),
-            InlineKeyboardButton("💮", callback_data=f"select_rarity_{category}_💮_1"),
-            InlineKeyboardButton("🔮", callback_data=f"select_rarity_{category}_🔮_1"),
+            InlineKeyboardButton("🟡", callback_data=f"select_rarity_{category}_🟡"),
+            InlineKeyboardButton("💮", callback_data=f"select_rarity_{category}_💮"),
+            InlineKeyboardButton("🔮", callback_data=f"select_rarity_{category}_🔮"),
         ],
-        [InlineKeyboardButton("🎐", callback_data=f"select_rarity_{category}_🎐_1")],
+        [InlineKeyboardButton("🎐", callback_data=f"select_rarity_{category}_🎐")],
         [InlineKeyboardButton("⬅️ Back", callback_data=f"select_type_{category}")]
     ]
     if query.message:
@@ -296,51 +325,48 @@ async def rarity_selection_handler(update: Update, context: ContextTypes.DEFAULT
     data = query.data.split("_")
     category = data[2]
     emoji = data[3]
-    page = int(data[4]) if len(data) > 4 else 1
+    token = data[4] if len(data) > 4 else None
     rarity_name = RARITY_MAP.get(emoji, "Unknown")
 
-    now = datetime.utcnow()
-    cursor = db.submissions.find({
-        "type": category,
-        "rarity_name": rarity_name,
-        "status": "approved",
-        "expires_at": {"$gt": now}
-    }).sort("_id", 1)
-
-    results = [doc async for doc in cursor]
-    total_items = len(results)
-    items_per_page = 10
-    start = (page - 1) * items_per_page
-    end = start + items_per_page
-    current_page_items = results[start:end]
+    text, reply_markup = await cached_page(
+        ("rarity", category, emoji, token),
+        live_auctions.catalog_version(category, rarity_name),
+        lambda: render_rarity_page(category, emoji, token),
+    )
+    if query.message:
+        if reply_markup is None:
+            # Empty listing: plain text, as before
+            await query.edit_message_text(text)
+            return
+        await query.edit_message_text(
+            text=text,
+            parse_mode="HTML",
+            disable_web_page_preview=True,
+            reply_markup=reply_markup
+        )
+
+
+async def render_rarity_page(category: str, emoji: str, token: str = None):
+    """(text, reply_markup) for one page of a rarity filter."""
+    rarity_name = RARITY_MAP.get(emoji, "Unknown")
+    current_page_items, page, has_prev, has_next = await fetch_page(
+        live_page_fetcher(category, rarity_name), token, ITEMS_PER_PAGE
+    )
 
     if not current_page_items:
-        if query.message:
-            await query.edit_message_text(
-                f"No ongoing {category} found with rarity {rarity_name} ({emoji})."
-            )
-        return
+        return f"No ongoing {category} found with rarity {rarity_name} ({emoji}).", None
+
+    total_items = await count_live(category, rarity_name)
 
     items_list = ""
     for item in current_page_items:
         name = item.get("waifu_name", "Unnamed")
         anime = item.get("anime_name", "Unknown anime")
-        message_id = item.get("channel_message_id")
-        channel_id = item.get("channel_id")
-        if channel_id and str(channel_id).startswith("-100"):
-            link = f"https://t.me/c/{str(channel_id)[4:]}/{message_id}"
-        else:
-            link = f"{CHANNEL_URL}/{message_id}"
-
-        items_list += f"• <a href='{link}'>{item.get('_id')}. {name}</a> ({anime})\n"
+        items_list += f"• <a href='{item_link(item)}'>{item.get('_id')}. {name}</a> ({anime})\n"
 
-    total_pages = (total_items + items_per_page - 1) // items_per_page
+    total_pages = max((total_items + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE, page)
     buttons = []
-    nav_buttons = []
-    if page > 1:
-        nav_buttons.append(InlineKeyboardButton("⏮️ Prev", callback_data=f"select_rarity_{category}_{emoji}_{page-1}"))
-    if end < total_items:
-        nav_buttons.append(InlineKeyboardButton("Next ⏭️", callback_data=f"select_rarity_{category}_{emoji}_{page+1}"))
+    nav_buttons = build_nav_buttons(f"select_rarity_{category}_{emoji}", current_page_items, page, has_prev, has_next)
     if nav_buttons:
         buttons.append(nav_buttons)
 
@@ -349,13 +375,8 @@ async def rarity_selection_handler(update: Update, context: ContextTypes.DEFAULT
         InlineKeyboardButton("🗑️ Delete", callback_data="delete")
     ])
 
-    if query.message:
-        await query.edit_message_text(
-            text=f"{emoji} <b>{rarity_name}</b> {category.capitalize()}s\nPage {page}/{total_pages}\n\n{items_list}",
-            parse_mode="HTML",
-            disable_web_page_preview=True,
-            reply_markup=InlineKeyboardMarkup(buttons)
-        )
+    text = f"{emoji} <b>{rarity_name}</b> {category.capitalize()}s\nPage {page}/{total_pages}\n\n{items_list}"
+    return text, InlineKeyboardMarkup(buttons)
 
 
 # ================= BACK & DELETE =================
@@ -372,11 +393,10 @@ async def back_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await query.edit_message_text("🚫 You are globally banned from using this bot.")
         return
 
-    now = datetime.utcnow()
     keyboard = []
-    if await db.submissions.count_documents({"type": "waifu", "status": "approved", "expires_at": {"$gt": now}}) > 0:
+    if await count_live("waifu") > 0:
         keyboard.append([InlineKeyboardButton("💖 Waifu", callback_data="select_type_waifu")])
-    if await db.submissions.count_documents({"type": "husbando", "status": "approved", "expires_at": {"$gt": now}}) > 0:
+    if await count_live("husbando") > 0:
         keyboard.append([InlineKeyboardButton("💪 Husbando", callback_data="select_type_husbando")])
 
     if not keyboard and query.message:
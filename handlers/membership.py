@@ -0,0 +1,18 @@
+from telegram import Update
+from telegram.ext import ContextTypes, ChatMemberHandler
+from utils.membership import record_member_update
+
+
+# ================= JOIN / LEAVE TRACKING =================
+async def track_membership(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Keeps utils/membership.py in step with joins and leaves in any chat the bot admins."""
+    change = update.chat_member
+    if not change:
+        return
+    record_member_update(change.chat.id, change.new_chat_member.user.id, change.new_chat_member.status)
+
+
+# ================= HANDLER REGISTRATION =================
+membership_handlers = [
+    ChatMemberHandler(track_membership, ChatMemberHandler.CHAT_MEMBER),
+]
@@ -1,7 +1,10 @@
 # my_items_handler_list.py
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import CommandHandler, CallbackQueryHandler, ContextTypes
-from utils.database import db
+from storage import store
+from utils.codecs import canonical_user_id
+from utils.db_policy import BROWSE
+from utils import live_auctions
 from models.tables import Submission
 from config import BOT_USERNAME  # your bot username without @
 
@@ -28,17 +31,14 @@ async def myitems_type_handler(update: Update, context: ContextTypes.DEFAULT_TYP
     query = update.callback_query
     await query.answer()
 
-    user_id = str(query.from_user.id)
     selected_type = query.data.split(":")[1]  # "waifu" or "husbando"
 
-    # Fetch user submissions of this type
-    submissions_cursor = db.submissions.find({
-        "user_id": user_id,
-        "type": selected_type,
-        "status": "approved",
-        "is_expired": False
-    })
-    submissions = await submissions_cursor.to_list(length=100)
+    # Fetch user submissions of this type (in-memory model once it is loaded)
+    user_id = canonical_user_id(query.from_user.id)
+    fields = ("waifu_name", "anime_name", "current_bid", "base_bid")
+    submissions = live_auctions.list_seller_live(user_id, selected_type, limit=100, fields=fields)
+    if submissions is None:
+        submissions = await store.list_seller_live(user_id, selected_type, limit=100, fields=fields, op_class=BROWSE)
 
     if not submissions:
         # Show message with button to start DM with bot
@@ -1,15 +1,17 @@
-import re
 from datetime import datetime
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, MessageHandler, filters
-from utils.database import db, get_next_sequence  # ✅ include auto-increment helper
+from storage import store, get_next_sequence  # ✅ include auto-increment helper
+from utils.codecs import canonical_user_id
+from utils.drafts import DRAFT_STATUS, discard_draft, record_draft_event
+from utils.submission_rules import check_caption, parse_caption
 from models.tables import Submission
 from .add_command import is_private_chat, is_member, RARITY_MAP, GROUP_URL, CHANNEL_URL
 
 
 # ====== PHOTO HANDLER ======
 async def handle_photo(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handles photo submissions and stores them in MongoDB."""
+    """Handles photo submissions and stores them as drafts."""
     if not is_private_chat(update):
         return
     if not update.message or not update.message.photo:
@@ -46,50 +48,23 @@ async def handle_photo(update: Update, context: ContextTypes.DEFAULT_TYPE):
     selected_type = context.user_data["type"]
     selected_rarity = context.user_data["rarity"]
 
-    # --- Validation ---
-    if "waifu" in caption.lower() and selected_type != "waifu":
-        await update.message.reply_text("❌ You selected Husbando, but this looks like a Waifu.")
-        return
-    if "husbando" in caption.lower() and selected_type != "husbando":
-        await update.message.reply_text("❌ You selected Waifu, but this looks like a Husbando.")
-        return
-
-    found_rarity = next((emoji for emoji in RARITY_MAP if emoji in caption), None)
-    if not found_rarity:
-        await update.message.reply_text(f"⚠️ Please include a rarity emoji in your caption (like {selected_rarity}).")
-        return
-    if found_rarity != selected_rarity:
-        await update.message.reply_text(
-            f"❌ You selected rarity {selected_rarity} ({RARITY_MAP.get(selected_rarity, 'Unknown')}), "
-            f"but your caption has {found_rarity} ({RARITY_MAP.get(found_rarity, 'Unknown')})."
-        )
+    # --- Validation (same rules as bulk import) ---
+    error = check_caption(caption, selected_type, selected_rarity)
+    if error:
+        await update.message.reply_text(error)
         return
 
     # --- Extract Info ---
-    lines = [line.strip() for line in caption.strip().split("\n") if line.strip()]
-    anime_name = "Unknown"
-    waifu_name = "Unknown"
-    optional_tag = "—"
-
-    if len(lines) > 1:
-        anime_name = re.sub(r"\s*\d+\/\d+\.?\s*$", "", lines[1]).strip()
-    if len(lines) > 2:
-        waifu_line = lines[2].strip()
-        parts = waifu_line.split(":")
-        if len(parts) > 1:
-            waifu_name = parts[1].split("x1")[0].strip()
-        else:
-            waifu_name = waifu_line
-    if len(lines) > 3:
-        possible_tag = lines[-1]
-        if "RARITY" not in possible_tag.upper():
-            optional_tag = possible_tag
+    parsed = parse_caption(caption)
+    anime_name = parsed["anime_name"]
+    waifu_name = parsed["waifu_name"]
+    optional_tag = parsed["optional_tag"]
 
     file_id = update.message.photo[-1].file_id
 
     # ✅ Create Submission instance
     submission = Submission(
-        user_id=str(user.id),
+        user_id=canonical_user_id(user.id),
         username=user.username or None,
         user_name=user.full_name,
         type=selected_type,
@@ -101,9 +76,13 @@ async def handle_photo(update: Update, context: ContextTypes.DEFAULT_TYPE):
         optional_tag=optional_tag,
         file_id=file_id,
         submitted_time=datetime.utcnow(),
-        status="draft",  # not yet finalized
+        status=DRAFT_STATUS,  # not yet finalized
     )
 
+    # ✅ A new photo replaces any draft still waiting for its base bid
+    if context.user_data.get("awaiting_bid"):
+        await discard_draft(context.user_data.get("submission_id"), reason="replaced")
+
     # ✅ Get next auto-increment ID
     next_id = await get_next_sequence("submission_id")
 
@@ -111,8 +90,9 @@ async def handle_photo(update: Update, context: ContextTypes.DEFAULT_TYPE):
     submission_dict = submission.dict(by_alias=True)
     submission_dict["_id"] = next_id
 
-    # ✅ Insert into MongoDB
-    await db["submissions"].insert_one(submission_dict)
+    # ✅ Store the draft
+    await store.insert_submission(submission_dict)
+    record_draft_event("created")
 
     # ✅ Store temporarily for next step
     context.user_data.update({
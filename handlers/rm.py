@@ -1,10 +1,13 @@
-from bson import ObjectId
 from telegram import Update
 from telegram.ext import ContextTypes, CommandHandler
-from utils.database import db
+from storage import repository as repo
+from utils.db_policy import ADMIN
+from utils.audit import audit
+from utils import stats, live_auctions
 from config import OWNER_ID, ADMINS, CHANNEL_ID, GROUP_ID
 
 
+@repo.tracked("rm")
 async def rm_items(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
 
@@ -21,44 +24,44 @@ async def rm_items(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     # --- Parse BOTH integer ID & ObjectId ---
     for arg in context.args:
-        if arg.isdigit():
-            item_ids.append(int(arg))
-        elif ObjectId.is_valid(arg):
-            item_ids.append(ObjectId(arg))
-        else:
+        item_id = repo.parse_item_id(arg)
+        if item_id is None:
             await update.message.reply_text(f"⚠️ Invalid ID: {arg}")
             return
+        item_ids.append(item_id)
 
     deleted_count = 0
 
     for item_id in item_ids:
-        item = await db.submissions.find_one({"_id": item_id})
+        # Delete database record (live or archived); it tells us which posts to remove
+        # Admin reads/writes go to the primary with majority write concern
+        item = await repo.remove(repo.POST_MESSAGES, item_id, op_class=ADMIN)
 
         if not item:
             continue
+        deleted_count += 1
+        audit("rm", update.effective_user, item.id)
+        stats.item_removed(item.status)
+        live_auctions.discard(item.id)
 
         # Try deleting Telegram messages
         try:
             # Delete channel message if exists
-            if item.get("channel_message_id"):
+            if item.channel_message_id:
                 await context.bot.delete_message(
-                    chat_id=item.get("channel_id") or CHANNEL_ID,
-                    message_id=item["channel_message_id"]
+                    chat_id=item.channel_id or CHANNEL_ID,
+                    message_id=item.channel_message_id
                 )
 
             # Delete group message if exists
-            if item.get("group_message_id"):
+            if item.group_message_id:
                 await context.bot.delete_message(
-                    chat_id=item.get("group_id") or GROUP_ID,
-                    message_id=item["group_message_id"]
+                    chat_id=item.group_id or GROUP_ID,
+                    message_id=item.group_message_id
                 )
         except Exception:
             pass  # Ignore Telegram API errors
 
-        # Delete database record
-        await db.submissions.delete_one({"_id": item_id})
-        deleted_count += 1
-
     # Final output
     if deleted_count > 0:
         await update.message.reply_text(f"✅ Successfully deleted {deleted_count} item(s).")
@@ -2,7 +2,10 @@ from datetime import datetime
 from bson import ObjectId
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from utils.database import db
+from storage import store
+from utils.codecs import canonical_user_id
+from utils.ban_cache import is_banned
+from utils import stats
 from config import (
     WELCOME_MESSAGE,
     GROUP_URL,
@@ -19,31 +22,20 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     # ====== Global Ban Check ======
-    banned = await db.global_bans.find_one({"user_id": str(user.id)})
-    if banned:
+    if await is_banned(user.id):
         if update.message:
             await update.message.reply_text("🚫 You are globally banned from using this bot.")
         return
 
-    # ====== Upsert User in MongoDB ======
-    existing_user = await db.users.find_one({"user_id": user.id})
-    is_new_user = False
-
-    if not existing_user:
-        new_user = {
-            "user_id": user.id,
-            "full_name": user.full_name or "Unknown",
-            "username": user.username,
-            "created_at": datetime.utcnow(),
-            "last_seen": datetime.utcnow(),
-        }
-        await db.users.insert_one(new_user)
-        is_new_user = True
-    else:
-        await db.users.update_one(
-            {"user_id": user.id},
-            {"$set": {"last_seen": datetime.utcnow()}}
-        )
+    # ====== Upsert User ======
+    is_new_user = await store.touch_user(
+        canonical_user_id(user.id),
+        user.full_name or "Unknown",
+        user.username,
+        datetime.utcnow(),
+    )
+    if is_new_user:
+        stats.user_created()
 
     # ====== Inline Buttons ======
     keyboard = [
@@ -1,7 +1,20 @@
 from datetime import datetime
 from telegram import Update
 from telegram.ext import ContextTypes, CommandHandler
-from utils.database import db
+from storage import store, allocator_stats
+from storage.repository import round_trip_stats
+from utils.drafts import draft_stats
+from utils.events import event_stats
+from utils.ban_cache import ban_cache_stats
+from utils.membership import membership_stats
+from utils.chat_cache import chat_cache_stats
+from utils.live_auctions import live_model_stats
+from utils.page_cache import page_cache_stats
+from utils.single_flight import single_flight_stats
+from utils.shared_cache import shared_cache_stats
+from utils.warmup import warmup_stats
+from utils.stats import read_stats, clearing_prices
+from utils.db_policy import ANALYTICS
 from config import OWNER_ID, ADMINS
 
 
@@ -17,52 +30,113 @@ async def status_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     text_msg = "📊 <b>System Status Overview</b>\n\n"
 
-    # ================= MONGODB CONNECTION =================
+    # ================= ROLLUPS (one read; also proves the connection) =================
     try:
-        await db.command("ping")
-        mongo_status = "✅ Connected"
+        overall, today = await read_stats(op_class=ANALYTICS)
+        db_status = "✅ Connected"
     except Exception:
-        mongo_status = "❌ Disconnected"
+        overall = today = None
+        db_status = "❌ Disconnected"
 
     # ================= BOT STATUS =================
     bot_status = "✅ Running"
 
-    # ================= USER STATS =================
-    try:
-        active_users = await db.users.count_documents({"is_banned": {"$ne": True}})
-        inactive_users = await db.users.count_documents({"is_banned": True})
-    except Exception:
-        active_users = "⚠️ Error"
-        inactive_users = "⚠️ Error"
-
-    # ================= AUCTION STATS =================
-    try:
-        active_auctions = await db.submissions.count_documents({"status": "active"})
-        inactive_auctions = await db.submissions.count_documents({"status": "ended"})
-    except Exception:
-        active_auctions = "⚠️ Error"
-        inactive_auctions = "⚠️ Error"
-
-    # ================= ITEM STATS =================
-    try:
-        active_items = await db.submissions.count_documents({"status": "active"})
-        pending_items = await db.submissions.count_documents({"status": "pending"})
-    except Exception:
-        active_items = "⚠️ Error"
-        pending_items = "⚠️ Error"
+    # ================= CONNECTION POOL =================
+    diagnostics = store.diagnostics()
+    pool = diagnostics.get("pool")
+    allocators = allocator_stats()
+    drafts = draft_stats()
+    round_trips = round_trip_stats()
+    feed = event_stats()
+    bans = ban_cache_stats()
+    members = membership_stats()
+    chats = chat_cache_stats()
+    live_model = live_model_stats()
+    pages = page_cache_stats()
+    flights = single_flight_stats()
+    shared = shared_cache_stats()
+    warmup = warmup_stats()
 
     # ================= TIMESTAMP =================
     last_update = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     # ================= BUILD MESSAGE =================
+    if overall is None:
+        text_msg += "⚠️ Stats unavailable\n\n"
+    else:
+        def n(name):
+            return overall.get(name, 0)
+
+        text_msg += (
+            f"🧑‍💻 <b>Active Users:</b> {n('users') - n('banned_users')} (+{today.get('users', 0)} today)\n"
+            f"😴 <b>Banned Users:</b> {n('banned_users')}\n\n"
+            f"🏷️ <b>Live Auctions:</b> {n('live')}\n"
+            f"💤 <b>Ended Auctions:</b> {n('ended')} ({n('sold')} sold)\n"
+            f"⏳ <b>Pending Items:</b> {n('pending')}\n\n"
+            f"💸 <b>Bids:</b> {n('bids')} totalling {n('bid_volume')} "
+            f"(today {today.get('bids', 0)} / {today.get('bid_volume', 0)})\n"
+            f"💰 <b>GMV:</b> {n('gmv')} (today {today.get('gmv', 0)})\n"
+        )
+        prices = clearing_prices(overall)
+        if prices:
+            text_msg += "📈 <b>Avg clearing price:</b> " + ", ".join(
+                f"{name} {avg:.0f} ({sold})" for name, sold, avg in prices
+            ) + "\n"
+        text_msg += "\n"
+    text_msg += f"🧩 <b>Database ({diagnostics['backend']}):</b> {db_status}\n"
+    if pool:
+        text_msg += (
+            f"🔌 <b>Pool:</b> {pool['connections_open']}/{pool['max_pool_size']} conns, "
+            f"wait avg {pool['avg_wait_ms']} ms / max {pool['max_wait_ms']} ms, "
+            f"{pool['failed_checkouts']} timeouts\n"
+        )
+    for allocator in allocators:
+        text_msg += (
+            f"🔢 <b>IDs ({allocator['name']}):</b> {allocator['issued']} issued, "
+            f"{allocator['refills']} refills, {allocator['remaining_in_block']} left in block, "
+            f"{allocator['wasted']} wasted\n"
+        )
+    for handler in round_trips:
+        text_msg += (
+            f"🔁 <b>Round trips ({handler['name']}):</b> avg {handler['avg']:.1f}, max {handler['max']} "
+            f"over {handler['calls']} calls, {handler['over_budget']} over budget\n"
+        )
+    text_msg += (
+        f"📝 <b>Drafts:</b> {drafts['created']} created, {drafts['completed']} completed, "
+        f"{drafts['cancelled'] + drafts['replaced']} cancelled, {drafts['swept']} expired "
+        f"(abandonment {drafts['abandonment_rate']:.0%})\n"
+        f"📡 <b>Events ({feed['mode']}):</b> "
+        f"{', '.join(f'{n} {kind}' for kind, n in feed['dispatched'].items())}, "
+        f"{feed['subscribers']} subscribers, {feed['failed_callbacks']} failed callbacks\n"
+        f"🚫 <b>Ban list ({bans['mode']}):</b> {bans['size']} IDs, {bans['bytes'] // 1024} KiB, "
+        f"{bans['lookups']} lookups, {bans['fallbacks']} DB fallbacks, {bans['reloads']} loads\n"
+        f"👥 <b>Membership cache:</b> {members['size']} entries, hit rate {members['hit_rate']:.0%}, "
+        f"{members['misses']} API lookups, {members['updates']} join/leave updates, {members['api_errors']} errors\n"
+        f"💬 <b>Chat cache:</b> {chats['size']} chats, hit rate {chats['hit_rate']:.0%}, "
+        f"{chats['refreshes']} refreshed ahead, {chats['errors']} errors\n"
+        f"🏷️ <b>Live model:</b> {live_model['size']} auctions, {live_model['reads']} reads, "
+        f"{live_model['fallbacks']} DB fallbacks, {live_model['drift']} drift / {live_model['rebuilds']} rebuilds\n"
+        f"📄 <b>Page cache:</b> {pages['size']} pages, hit rate {pages['hit_rate']:.0%}, "
+        f"{pages['stale']} invalidated, render avg {pages['avg_render_ms']} ms / max {pages['render_ms_max']:.1f} ms\n"
+        f"🪂 <b>Single-flight:</b> {flights['flights']} reads, {flights['shared']} callers served by "
+        f"a read in flight ({flights['shared_rate']:.0%})\n"
+    )
+    if shared["enabled"]:
+        text_msg += (
+            f"🗄️ <b>Shared cache:</b> hit rate {shared['hit_rate']:.0%}, {shared['writes']} writes, "
+            f"{shared['invalidations_sent']} invalidations sent / {shared['invalidations_received']} received, "
+            f"{shared['errors']} errors\n"
+        )
+    if warmup["total_ms"] is not None:
+        text_msg += (
+            f"🔥 <b>Warm-up:</b> {warmup['total_ms']:.0f} ms ("
+            + ", ".join(
+                f"{name} {stage['ms']:.0f} ms" + ("" if stage["ok"] else " ❌")
+                for name, stage in warmup["stages"].items()
+            )
+            + ")\n"
+        )
     text_msg += (
-        f"🧑‍💻 <b>Active Users:</b> {active_users}\n"
-        f"😴 <b>Inactive/Banned Users:</b> {inactive_users}\n\n"
-        f"🏷️ <b>Active Auctions:</b> {active_auctions}\n"
-        f"💤 <b>Inactive Auctions:</b> {inactive_auctions}\n\n"
-        f"📦 <b>Active Items:</b> {active_items}\n"
-        f"⏳ <b>Pending Items:</b> {pending_items}\n\n"
-        f"🧩 <b>MongoDB Status:</b> {mongo_status}\n"
         f"🤖 <b>Bot Status:</b> {bot_status}\n"
         f"🕒 <b>Last Update:</b> {last_update}\n"
     )
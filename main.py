@@ -6,16 +6,20 @@ import requests
 import logging
 from http.server import BaseHTTPRequestHandler, HTTPServer
 import os
+from telegram import Update
 from telegram.ext import ApplicationBuilder, CommandHandler 
 
 # Configuration and Utilities
-from config import BOT_TOKEN
-from utils.database import db  # MongoDB client
-from utils.database import init_db  # type: ignore
+from config import BOT_TOKEN, BACKGROUND_FLUSH_SECONDS
+from storage import store, close_allocators  # Mongo / SQLite / in-memory (STORAGE_BACKEND)
+from utils.background import flush_background
+from utils.stats import ensure_stats
+from utils.warmup import warm_up, is_ready
+from utils import shared_cache
 
 # Handlers
 from handlers.start_handler import start_command
-from handlers.add_command import add_handlers
+from handlers.add_command import add_handlers, GROUP_ID, CHANNEL_ID
 from handlers.photo_handler import photo_handlers
 from handlers.bid_handler import bid_handlers
 from handlers.approval_handler import approval_handlers
@@ -26,11 +30,22 @@ from handlers.global_ban import aban, unaban
 from handlers.rm import register_remove_handlers
 from handlers.forceend import forceend_handler
 from handlers.status import status_handler
+from handlers.export import export_handler
+from handlers.bulk_import import import_handler
+from handlers.audit import audit_handlers
+from handlers.membership import membership_handlers
 from handlers.help import help_handler
 
 # Background Tasks
 from tasks.cleanup import remove_expired_bids
 from tasks.auction_expiry import start_expiry_task
+from tasks.archiver import start_archiver_task
+from tasks.draft_sweeper import start_draft_sweeper_task
+from tasks.publisher import start_publisher_task
+from tasks.event_feed import start_event_feed_task
+from tasks.ban_sync import start_ban_sync_task
+from tasks.live_auctions import start_live_model_check_task
+from tasks.shared_cache import start_shared_cache_task
 
 
 # ============================================================
@@ -45,8 +60,15 @@ logging.basicConfig(
 )
 
 # --- Simple web server so Render sees your app as active ---
+# 503 until the startup warm-up is done (utils/warmup.py), so a new
+# deploy only gets traffic once its caches are loaded
 class HealthCheckHandler(BaseHTTPRequestHandler):
     def do_GET(self):
+        if not is_ready():
+            self.send_response(503)
+            self.end_headers()
+            self.wfile.write(b"Bot is warming up")
+            return
         self.send_response(200)
         self.end_headers()
         self.wfile.write(b"Bot is alive and running!")
@@ -77,9 +99,15 @@ def keep_alive():
 # ✅ MAIN BOT INITIALIZATION
 # ============================================================
 async def main():
-    logging.info("🔄 Initializing MongoDB...")
-    await init_db()
-    logging.info("✅ MongoDB connected successfully.")
+    logging.info(f"🔄 Initializing storage ({store.name})...")
+    await store.init()
+    logging.info("✅ Storage ready.")
+
+    # First start with rollups: build them before any task or update can increment them
+    try:
+        await ensure_stats()
+    except Exception as e:
+        print(f"⚠️ Stats rebuild failed: {e}")
 
     # Create bot application
     app = ApplicationBuilder().token(BOT_TOKEN).build()
@@ -90,6 +118,8 @@ async def main():
     app.add_handler(CommandHandler("aban", aban))
     app.add_handler(CommandHandler("unaban", unaban))
     app.add_handler(status_handler)
+    app.add_handler(export_handler)
+    app.add_handler(import_handler)
     app.add_handler(forceend_handler())
     
     # ================== 2️⃣ COMBINED SPECIALIZED HANDLERS ==================
@@ -100,7 +130,9 @@ async def main():
         approval_handlers +
         auction_bid_handlers +
         items_handlers +
-        myitems_handlers
+        myitems_handlers +
+        audit_handlers +
+        membership_handlers
     )
     for handler in all_specialized_handlers:
         app.add_handler(handler)
@@ -116,9 +148,27 @@ async def main():
     # ================== 5️⃣ BACKGROUND TASKS ==================
     asyncio.create_task(remove_expired_bids(app.bot))
     asyncio.create_task(start_expiry_task(app.bot, 1))
+    asyncio.create_task(start_archiver_task())
+    asyncio.create_task(start_draft_sweeper_task())
+    asyncio.create_task(start_publisher_task(app.bot, app.job_queue))
+    asyncio.create_task(start_event_feed_task())
+    asyncio.create_task(start_ban_sync_task())
+    asyncio.create_task(start_live_model_check_task())
+    asyncio.create_task(start_shared_cache_task())
+
+    # ================== 6️⃣ WARM-UP ==================
+    # Bans, live auctions, chats and DB connections, before the first update
+    await warm_up(app.bot, (GROUP_ID, CHANNEL_ID))
 
     logging.info("🤖 Bot is running...")
-    await app.run_polling()
+    try:
+        # chat_member updates (membership cache) are only sent when asked for
+        await app.run_polling(allowed_updates=Update.ALL_TYPES)
+    finally:
+        await flush_background(timeout=BACKGROUND_FLUSH_SECONDS)
+        await close_allocators()
+        await store.close()
+        shared_cache.close()
 
 
 # ============================================================
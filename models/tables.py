@@ -79,7 +79,7 @@ class PyObjectId(ObjectId):
 # === Submission Model ===
 class Submission(BaseModel):
     id: Optional[PyObjectId] = Field(default_factory=PyObjectId, alias="_id")
-    user_id: Optional[str]
+    user_id: Optional[int]  # canonical int64 Telegram ID (see utils/codecs.py)
     user_name: Optional[str]
     username: Optional[str]
     type: Optional[str]
@@ -110,7 +110,7 @@ class Submission(BaseModel):
 
 # === User Model ===
 class User(BaseModel):
-    id: int  # Telegram user ID
+    user_id: int  # Telegram user ID
     full_name: str
     username: Optional[str] = None
     is_banned: bool = False
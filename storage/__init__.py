@@ -0,0 +1,115 @@
+# storage/__init__.py
+"""
+Pluggable storage.
+
+    from storage import store
+    doc, archived = await store.get_submission(item_id)
+
+`store` is created on first use from STORAGE_BACKEND in config.py:
+
+    mongo   (default) MongoDB through the shared Motor client
+    sqlite  one local SQLite file in WAL mode (SQLITE_PATH), needs aiosqlite
+    memory  process memory only; for load tests and local experiments
+
+All three pass the same conformance suite:  python -m storage.conformance
+
+Item IDs come from `get_next_sequence()`, which hands them out from
+per-process hi/lo blocks (utils/id_allocator.py) reserved through the
+store's counters.
+"""
+from storage.base import (
+    Storage,
+    LIVE_STATUS,
+    DRAFT_STATUS,
+    QUEUED_STATUS,
+    PUBLISHING_STATUS,
+    FINISHED_STATUSES,
+    OPEN_STATUSES,
+    ChangeStreamUnavailable,
+    ResumeTokenLost,
+)
+from utils.id_allocator import BlockAllocator
+
+__all__ = [
+    "Storage", "LIVE_STATUS", "DRAFT_STATUS", "QUEUED_STATUS", "PUBLISHING_STATUS", "FINISHED_STATUSES",
+    "OPEN_STATUSES", "ChangeStreamUnavailable", "ResumeTokenLost", "BACKENDS", "create_store", "get_store",
+    "set_store", "get_allocator", "get_next_sequence", "allocator_stats", "close_allocators",
+]
+
+BACKENDS = ("mongo", "sqlite", "memory")
+
+_store = None
+
+
+def create_store(backend: str, **options) -> Storage:
+    backend = (backend or "mongo").lower()
+    if backend == "mongo":
+        from storage.mongo import MongoStorage
+
+        return MongoStorage(**options)
+    if backend == "sqlite":
+        from storage.sqlite import SQLiteStorage
+
+        return SQLiteStorage(**options)
+    if backend == "memory":
+        from storage.memory import MemoryStorage
+
+        return MemoryStorage()
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend!r} (expected one of {', '.join(BACKENDS)})")
+
+
+def get_store() -> Storage:
+    """The process-wide store, built from config on first call."""
+    global _store
+    if _store is None:
+        from config import STORAGE_BACKEND, SQLITE_PATH
+
+        options = {"path": SQLITE_PATH} if STORAGE_BACKEND == "sqlite" else {}
+        _store = create_store(STORAGE_BACKEND, **options)
+    return _store
+
+
+def set_store(store: Storage):
+    """Swap the process-wide store (load tests, conformance runs)."""
+    global _store
+    _store = store
+    _allocators.clear()
+
+
+def __getattr__(name: str):
+    if name == "store":
+        return get_store()
+    raise AttributeError(f"module 'storage' has no attribute {name!r}")
+
+
+# ====== ID ALLOCATION ======
+_allocators: dict[str, BlockAllocator] = {}
+
+
+def get_allocator(name: str) -> BlockAllocator:
+    """One hi/lo allocator per counter name, shared by the whole process."""
+    if name not in _allocators:
+        from config import ID_BLOCK_SIZE
+
+        _allocators[name] = BlockAllocator(get_store(), name, ID_BLOCK_SIZE)
+    return _allocators[name]
+
+
+async def get_next_sequence(name: str) -> int:
+    """
+    Generates auto-increment numeric ID for any counter.
+    IDs come from a block reserved in memory, so most calls need no round trip.
+    Example: await get_next_sequence("submission_id")
+    """
+    return await get_allocator(name).next_id()
+
+
+def allocator_stats() -> list[dict]:
+    """Refill / waste counters for every allocator in use."""
+    return [allocator.stats() for allocator in _allocators.values()]
+
+
+async def close_allocators():
+    """Record unused reserved IDs before the process exits."""
+    for allocator in _allocators.values():
+        await allocator.close()
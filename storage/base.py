@@ -0,0 +1,353 @@
+# storage/base.py
+"""
+Storage interface shared by every backend.
+
+Handlers and tasks never talk to a driver directly; they call the methods
+below on `storage.store`.  Documents are plain dicts shaped exactly like the
+Mongo documents the bot has always written (`_id`, `status`, `expires_at`,
+...), so a backend only decides *where* they live.
+
+Conventions every backend follows (checked by storage/conformance.py):
+
+- `fields` is an iterable of field names to return (`_id` is always
+  included).  `None` returns the whole document, except for submissions,
+  where the embedded `previous_bidders` history is left out.
+- `op_class` (see utils/db_policy.py) selects read routing / write concern
+  on Mongo and is ignored elsewhere.
+- Paged listings take `after` / `before` keys in display order and return
+  items in display order; with `before`, the `limit` items closest to the
+  key are returned.
+- Datetimes are naive UTC, as produced by `datetime.utcnow()`.
+"""
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from datetime import datetime
+from typing import AsyncIterator, Iterable, Optional
+
+from bson import ObjectId
+
+LIVE_STATUS = "approved"
+DRAFT_STATUS = "draft"
+
+# Bulk-imported items waiting for tasks/publisher.py, and the one being posted
+QUEUED_STATUS = "queued"
+PUBLISHING_STATUS = "publishing"
+
+# Statuses that are final; such items are moved to the archive
+FINISHED_STATUSES = ("ended", "rejected", "sold", "cancelled")
+
+# Statuses that can still change; the polling event feed watches these
+OPEN_STATUSES = ("pending", QUEUED_STATUS, PUBLISHING_STATUS, LIVE_STATUS)
+
+HISTORY_FIELD = "previous_bidders"
+
+# Collections `Storage.scan` can read, with the time field `since` filters on
+SCAN_TIME_FIELDS = {
+    "submissions": "submitted_time",
+    "submissions_archive": "submitted_time",
+    "bids": "time",
+    "users": "created_at",
+}
+
+Fields = Optional[Iterable[str]]
+
+# Round trips made by the current handler invocation (see storage/repository.py)
+_round_trips: ContextVar = ContextVar("round_trips", default=None)
+
+
+def note_round_trip(count: int = 1):
+    """Backends call this once per request they send to the database."""
+    counter = _round_trips.get()
+    if counter is not None:
+        counter[0] += count
+
+
+class ChangeStreamUnavailable(Exception):
+    """The backend (or a standalone mongod) cannot stream changes; poll instead."""
+
+
+class ResumeTokenLost(Exception):
+    """The saved resume token fell off the oplog; restart the stream from now."""
+
+
+# ====== DOCUMENT HELPERS ======
+def project(doc: Optional[dict], fields: Fields, exclude_history: bool = False) -> Optional[dict]:
+    """Applies a `fields` selection to a document held in memory."""
+    if doc is None:
+        return None
+    if fields is None:
+        if exclude_history:
+            return {k: v for k, v in doc.items() if k != HISTORY_FIELD}
+        return dict(doc)
+    wanted = set(fields) | {"_id"}
+    return {k: v for k, v in doc.items() if k in wanted}
+
+
+def id_order(item_id) -> tuple:
+    """Sort key for submission IDs: counter integers before legacy ObjectIds, as Mongo orders them."""
+    return (1, item_id) if isinstance(item_id, ObjectId) else (0, item_id)
+
+
+def matches(doc: dict, expect: Optional[dict]) -> bool:
+    """Equality check used for guarded writes (`expect={"status": "draft"}`)."""
+    return not expect or all(doc.get(k) == v for k, v in expect.items())
+
+
+def bid_matches(doc: dict, expected_bid) -> bool:
+    """Compare-and-set condition of `place_bid`: unchanged bid, or no bid yet."""
+    return "current_bid" not in doc or doc["current_bid"] == expected_bid
+
+
+def apply_increments(doc: dict, changes: dict):
+    """Mongo-style $inc with dotted paths, for backends without one."""
+    for path, amount in changes.items():
+        *parents, leaf = path.split(".")
+        target = doc
+        for key in parents:
+            target = target.setdefault(key, {})
+        target[leaf] = target.get(leaf, 0) + amount
+
+
+def push_history(doc: dict, entry: dict, limit: int):
+    """Appends to the embedded bid history, keeping only the newest `limit`."""
+    history = list(doc.get(HISTORY_FIELD) or [])
+    history.append(entry)
+    doc[HISTORY_FIELD] = history[-limit:] if limit > 0 else []
+
+
+# ====== INTERFACE ======
+class Storage(ABC):
+    name = "abstract"
+
+    # ---- lifecycle ----
+    @abstractmethod
+    async def init(self):
+        """Connects and creates tables / indexes. Safe to call repeatedly."""
+
+    @abstractmethod
+    async def close(self):
+        ...
+
+    @abstractmethod
+    async def ping(self):
+        """Raises if the store is unreachable."""
+
+    def diagnostics(self) -> dict:
+        """Backend-specific numbers for /status (connection pool, file path, ...)."""
+        return {"backend": self.name}
+
+    # ---- counters ----
+    @abstractmethod
+    async def reserve_ids(self, name: str, count: int) -> int:
+        """Atomically adds `count` to counter `name`; returns the new highest ID."""
+
+    @abstractmethod
+    async def add_wasted_ids(self, name: str, count: int):
+        """Records reserved IDs that were never issued."""
+
+    @abstractmethod
+    async def get_counter(self, name: str) -> int:
+        """Current value of counter `name` without changing it (0 if never used)."""
+
+    # ---- submissions ----
+    @abstractmethod
+    async def get_submission(self, item_id, fields: Fields = None, op_class: str = None) -> tuple[Optional[dict], bool]:
+        """Live first, then the archive. Returns (document, archived) or (None, False)."""
+
+    @abstractmethod
+    async def insert_submission(self, doc: dict):
+        ...
+
+    @abstractmethod
+    async def insert_submissions(self, docs: list[dict]) -> tuple[int, list]:
+        """
+        Unordered bulk insert: every document that can be inserted is.
+        Returns (inserted count, `_id`s rejected as duplicates).
+        """
+
+    @abstractmethod
+    async def update_submission(self, item_id, changes: dict, expect: dict = None, op_class: str = None) -> bool:
+        """Sets `changes` on a live submission if it matches `expect`. Returns whether it matched."""
+
+    @abstractmethod
+    async def update_and_get(
+        self, item_id, changes: dict, expect: dict = None, fields: Fields = None, op_class: str = None
+    ) -> Optional[dict]:
+        """Like `update_submission`, but returns the updated document (or None) in the same round trip."""
+
+    @abstractmethod
+    async def delete_submission(self, item_id, expect: dict = None, op_class: str = None) -> bool:
+        """Deletes a submission (live or archived) if it matches `expect`."""
+
+    @abstractmethod
+    async def pop_submission(self, item_id, fields: Fields = None, op_class: str = None) -> Optional[dict]:
+        """Deletes a submission (live or archived) and returns what was deleted, or None."""
+
+    @abstractmethod
+    async def place_bid(
+        self,
+        item_id,
+        expected_bid,
+        changes: dict,
+        history_entry: dict,
+        history_limit: int,
+        fields: Fields = None,
+        op_class: str = None,
+    ) -> Optional[dict]:
+        """
+        Compare-and-set on `current_bid`: applies `changes` and appends
+        `history_entry` only if the bid is still `expected_bid` (or unset).
+        Returns the updated document (without its history), or None.
+        """
+
+    @abstractmethod
+    async def list_live(
+        self,
+        item_type: str,
+        now: datetime,
+        rarity_name: str = None,
+        after=None,
+        before=None,
+        limit: int = 10,
+        fields: Fields = None,
+        op_class: str = None,
+    ) -> list[dict]:
+        """Running auctions of one type (optionally one rarity), ordered by `_id`."""
+
+    @abstractmethod
+    async def count_live(self, item_type: str, now: datetime, rarity_name: str = None, op_class: str = None) -> int:
+        ...
+
+    @abstractmethod
+    async def list_seller_live(
+        self, user_id: int, item_type: str, limit: int = 100, fields: Fields = None, op_class: str = None
+    ) -> list[dict]:
+        """A seller's approved, not yet expired items of one type."""
+
+    @abstractmethod
+    async def list_expired_live(self, now: datetime, fields: Fields = None) -> list[dict]:
+        """Approved items past `expires_at` that are not flagged `is_expired` yet."""
+
+    @abstractmethod
+    async def count_submissions(self, status: str, op_class: str = None) -> int:
+        ...
+
+    @abstractmethod
+    async def list_by_status(self, status: str, limit: int = 10, fields: Fields = None) -> list[dict]:
+        """Oldest (lowest `_id`) submissions with `status`; used for the publish queue."""
+
+    @abstractmethod
+    async def list_open(self, fields: Fields = None) -> list[dict]:
+        """Every submission whose status is in OPEN_STATUSES (snapshot for the polling event feed)."""
+
+    @abstractmethod
+    async def archive_finished(self, cutoff: datetime, limit: int) -> int:
+        """Moves up to `limit` finished submissions that expired before `cutoff` to the archive."""
+
+    @abstractmethod
+    async def delete_drafts_before(self, cutoff: datetime) -> int:
+        ...
+
+    # ---- users ----
+    @abstractmethod
+    async def get_user(self, user_id: int, op_class: str = None) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def touch_user(self, user_id: int, full_name: str, username: Optional[str], now: datetime) -> bool:
+        """Creates the user or refreshes `last_seen`. Returns True for a new user."""
+
+    @abstractmethod
+    async def count_users(self, banned: bool, op_class: str = None) -> int:
+        ...
+
+    # ---- global bans ----
+    @abstractmethod
+    async def get_ban(self, user_id: int, op_class: str = None) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def add_ban(self, doc: dict, op_class: str = None) -> bool:
+        """Inserts a ban document (keyed by `user_id`). False if already banned."""
+
+    @abstractmethod
+    async def remove_ban(self, user_id: int, op_class: str = None) -> bool:
+        ...
+
+    @abstractmethod
+    async def list_banned_ids(self) -> list[int]:
+        ...
+
+    # ---- bulk reads ----
+    @abstractmethod
+    def scan(self, collection: str, since: datetime = None, batch_size: int = 1000) -> AsyncIterator[list[dict]]:
+        """
+        Async iterator over every document of `collection` (see
+        SCAN_TIME_FIELDS) in batches of `batch_size`, in key order; with
+        `since`, only documents whose time field is >= `since`.  Only one
+        batch is held in memory at a time.
+        """
+
+    # ---- bid history ----
+    @abstractmethod
+    async def record_bid(self, doc: dict, op_class: str = None) -> bool:
+        """Idempotent insert keyed by `doc["_id"]`. Returns True if it was new."""
+
+    @abstractmethod
+    async def list_bids(
+        self, item_id, after=None, before=None, limit: int = 10, fields: Fields = None, op_class: str = None
+    ) -> list[dict]:
+        """
+        An item's bids, newest first (ties on `time` by `_id`).  `after` /
+        `before` are the (time, _id) of a bid: the page starts just past it.
+        """
+
+    # ---- change feed (see utils/events.py) ----
+    def watch_submissions(self, resume_token=None) -> AsyncIterator[tuple[dict, object]]:
+        """
+        Yields (change, resume token) for every write to `submissions`, where
+        change is {"op": "insert" | "update" | "delete", "_id", "fields"}.
+        Raises ChangeStreamUnavailable where changes can only be polled.
+        """
+        raise ChangeStreamUnavailable(f"{self.name} has no change streams")
+
+    async def load_resume_token(self, name: str):
+        return None
+
+    async def save_resume_token(self, name: str, token):
+        pass
+
+    # ---- stats rollups (see utils/stats.py) ----
+    @abstractmethod
+    async def inc_stats(self, keys: list[str], changes: dict):
+        """Adds `changes` (dotted path -> number) to each stats document in `keys`, creating them as needed."""
+
+    @abstractmethod
+    async def get_stats(self, keys: list[str], op_class: str = None) -> dict[str, dict]:
+        """The existing stats documents among `keys`, by `_id`, in one read."""
+
+    @abstractmethod
+    async def replace_stats(self, docs: list[dict]):
+        """
+        Writes rebuilt stats documents over the stored ones, each replaced
+        (or created) as a whole.  Documents not in `docs` are left alone.
+        """
+
+    # ---- audit log ----
+    @abstractmethod
+    async def record_audit(self, doc: dict):
+        """Appends one entry; unacknowledged where the backend allows it."""
+
+    @abstractmethod
+    async def list_audit(
+        self, actor_id: int = None, target: str = None, action: str = None,
+        after=None, before=None, limit: int = 10, op_class: str = None,
+    ) -> list[dict]:
+        """
+        Entries matching every given filter, newest first (ties on `time` by
+        `_id`).  `after` / `before` are the (time, _id) of an entry.
+        """
+
+    @abstractmethod
+    async def prune_audit(self, cutoff: datetime) -> int:
+        """Deletes entries older than `cutoff` (Mongo expires them with a TTL index instead)."""
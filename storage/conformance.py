@@ -0,0 +1,629 @@
+# storage/conformance.py
+"""
+Conformance and benchmark suite shared by every storage backend.
+
+    python -m storage.conformance                          # memory + sqlite
+    python -m storage.conformance --backend mongo --mongo-url mongodb://localhost:27017
+    python -m storage.conformance --bench 10000            # also time the hot paths
+
+Every check runs against a fresh, empty store, so a backend passes only if
+it behaves exactly like the others for everything the handlers rely on.
+The Mongo run uses (and drops) a throwaway database.  The exit status is
+non-zero when any check fails.
+
+tests/test_storage_conformance.py runs the same checks under pytest, one
+test per check and backend (Mongo when TEST_MONGO_URL or a local mongod
+is available).
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from storage import create_store
+from storage.base import LIVE_STATUS, DRAFT_STATUS, QUEUED_STATUS
+from utils.id_allocator import BlockAllocator
+from utils.pagination import fetch_page, encode_cursor, decode_cursor, fits_callback_data
+from bson import ObjectId
+
+CONFORMANCE_DB = "AUCTIONBOT_CONFORMANCE"
+
+
+class CheckFailed(AssertionError):
+    pass
+
+
+def expect(condition, message: str):
+    if not condition:
+        raise CheckFailed(message)
+
+
+def submission(item_id: int, now: datetime, **overrides) -> dict:
+    doc = {
+        "_id": item_id,
+        "user_id": 1000 + item_id % 7,
+        "user_name": f"User {item_id % 7}",
+        "username": None,
+        "type": "waifu" if item_id % 2 else "husbando",
+        "rarity": "🔵",
+        "rarity_name": "Common" if item_id % 3 else "Rare",
+        "anime_name": "Naruto",
+        "waifu_name": f"Character {item_id}",
+        "optional_tag": "—",
+        "caption": f"🔵 RARITY\nNaruto 1/1\n{item_id}: Character {item_id} x1",
+        "file_id": f"file-{item_id}",
+        "submitted_time": now - timedelta(hours=1),
+        "status": LIVE_STATUS,
+        "base_bid": 100,
+        "channel_id": -100123,
+        "previous_bidders": [],
+        "channel_message_id": item_id,
+        "group_message_id": item_id,
+        "expires_at": now + timedelta(days=1),
+        "is_expired": False,
+        "current_bid": 0,
+        "last_bidder_id": None,
+        "last_bidder_username": None,
+        "last_bid_time": None,
+    }
+    doc.update(overrides)
+    return doc
+
+
+# ====== CHECKS ======
+async def check_submission_round_trip(store):
+    now = datetime(2025, 1, 1, 12, 0, 0, 123000)
+    doc = submission(1, now, previous_bidders=[{"id": 5, "bid": 105}])
+    await store.insert_submission(doc)
+
+    found, archived = await store.get_submission(1)
+    expect(not archived, "live item reported as archived")
+    expected = {k: v for k, v in doc.items() if k != "previous_bidders"}
+    expect(found == expected, f"round trip changed the document: {found}")
+
+    found, _ = await store.get_submission(1, fields=("waifu_name", "status"))
+    expect(found == {"_id": 1, "waifu_name": "Character 1", "status": LIVE_STATUS}, f"bad projection: {found}")
+
+    found, archived = await store.get_submission(999)
+    expect(found is None and archived is False, "missing item should be (None, False)")
+
+
+async def check_guarded_update_and_delete(store):
+    now = datetime.utcnow()
+    await store.insert_submission(submission(1, now, status=DRAFT_STATUS))
+
+    expect(not await store.update_submission(1, {"status": "pending"}, expect={"status": "approved"}),
+           "update ignored `expect`")
+    expect(await store.update_submission(1, {"status": "pending", "base_bid": 50}, expect={"status": DRAFT_STATUS}),
+           "guarded update did not match")
+    found, _ = await store.get_submission(1, fields=("status", "base_bid"))
+    expect(found["status"] == "pending" and found["base_bid"] == 50, f"update not applied: {found}")
+    expect(not await store.update_submission(2, {"status": "x"}), "update of a missing item matched")
+
+    expect(not await store.delete_submission(1, expect={"status": DRAFT_STATUS}), "delete ignored `expect`")
+    expect(await store.delete_submission(1), "delete did not match")
+    expect((await store.get_submission(1))[0] is None, "deleted item still readable")
+
+
+async def check_update_and_pop_return_documents(store):
+    now = datetime.utcnow()
+    await store.insert_submission(submission(1, now, previous_bidders=[{"id": 1}]))
+
+    expect(await store.update_and_get(1, {"status": "ended"}, expect={"status": "pending"}) is None,
+           "update_and_get ignored `expect`")
+    updated = await store.update_and_get(
+        1, {"status": "ended", "expires_at": now - timedelta(hours=1)}, expect={"status": LIVE_STATUS}, fields=("status",)
+    )
+    expect(updated == {"_id": 1, "status": "ended"}, f"update_and_get returned {updated}")
+    expect(await store.update_and_get(2, {"status": "x"}) is None, "update_and_get of a missing item matched")
+
+    await store.archive_finished(now, 10)
+    popped = await store.pop_submission(1, fields=("status", "waifu_name"))
+    expect(popped == {"_id": 1, "status": "ended", "waifu_name": "Character 1"}, f"pop of archived item returned {popped}")
+    expect(await store.pop_submission(1) is None, "second pop found the item again")
+    expect((await store.get_submission(1))[0] is None, "popped item still readable")
+
+
+async def check_round_trip_counting(store):
+    from storage.base import _round_trips
+
+    now = datetime.utcnow()
+    await store.insert_submission(submission(1, now))
+    counter = [0]
+    token = _round_trips.set(counter)
+    try:
+        await store.get_submission(1, fields=("status",))
+        await store.update_and_get(1, {"base_bid": 20}, fields=("base_bid",))
+    finally:
+        _round_trips.reset(token)
+    expect(counter[0] == 2, f"expected 2 round trips, counted {counter[0]}")
+
+
+async def check_place_bid_compare_and_set(store):
+    now = datetime.utcnow()
+    doc = submission(1, now)
+    del doc["current_bid"]  # first bid on an item without the field
+    await store.insert_submission(doc)
+
+    def bid(amount):
+        return {"current_bid": amount, "last_bidder_id": amount}, {"id": amount, "bid": amount}
+
+    changes, entry = bid(105)
+    updated = await store.place_bid(1, None, changes, entry, 3)
+    expect(updated is not None and updated["current_bid"] == 105, f"first bid rejected: {updated}")
+    expect("previous_bidders" not in updated, "place_bid returned the history")
+
+    changes, entry = bid(107)
+    updated = await store.place_bid(1, 105, changes, entry, 3, fields=("current_bid",))
+    expect(updated == {"_id": 1, "current_bid": 107}, f"place_bid ignored `fields`: {updated}")
+
+    changes, entry = bid(110)
+    expect(await store.place_bid(1, 100, changes, entry, 3) is None, "stale bid accepted")
+
+    for previous, amount in ((107, 110), (110, 115), (115, 120), (120, 125)):
+        changes, entry = bid(amount)
+        expect(await store.place_bid(1, previous, changes, entry, 3) is not None, f"bid {amount} rejected")
+
+    found, _ = await store.get_submission(1, fields=("current_bid", "previous_bidders"))
+    history = [b["bid"] for b in found["previous_bidders"]]
+    expect(found["current_bid"] == 125, "current_bid not updated")
+    expect(history == [115, 120, 125], f"history not trimmed to the newest 3: {history}")
+
+    expect(await store.place_bid(99, 0, *bid(5), 3) is None, "bid on a missing item accepted")
+
+
+async def check_concurrent_bids(store):
+    now = datetime.utcnow()
+    await store.insert_submission(submission(1, now, current_bid=100))
+
+    async def attempt(user):
+        return await store.place_bid(1, 100, {"current_bid": 105, "last_bidder_id": user}, {"id": user}, 10)
+
+    results = await asyncio.gather(*(attempt(user) for user in range(20)))
+    winners = [r for r in results if r is not None]
+    expect(len(winners) == 1, f"{len(winners)} concurrent bids won the same compare-and-set")
+
+
+async def check_live_listing(store):
+    now = datetime.utcnow()
+    for item_id in range(1, 61):
+        overrides = {}
+        if item_id % 10 == 0:
+            overrides["expires_at"] = now - timedelta(minutes=1)  # expired
+        if item_id % 11 == 0:
+            overrides["status"] = "pending"
+        await store.insert_submission(submission(item_id, now, **overrides))
+
+    def visible(doc_id, item_type, rarity=None):
+        return (
+            doc_id % 10 != 0 and doc_id % 11 != 0
+            and ("waifu" if doc_id % 2 else "husbando") == item_type
+            and (rarity is None or ("Common" if doc_id % 3 else "Rare") == rarity)
+        )
+
+    for item_type, rarity in (("waifu", None), ("husbando", None), ("waifu", "Rare")):
+        wanted = [i for i in range(1, 61) if visible(i, item_type, rarity)]
+        count = await store.count_live(item_type, now, rarity)
+        expect(count == len(wanted), f"count_live({item_type}, {rarity}) = {count}, expected {len(wanted)}")
+
+        async def fetch(after=None, before=None, limit=4):
+            return await store.list_live(item_type, now, rarity, after=after, before=before, limit=limit,
+                                         fields=("waifu_name",))
+
+        seen, token, pages = [], None, []
+        while True:
+            items, page, has_prev, has_next = await fetch_page(fetch, token, 4)
+            pages.append([i["_id"] for i in items])
+            seen.extend(i["_id"] for i in items)
+            expect(all(set(i) == {"_id", "waifu_name"} for i in items), "listing ignored `fields`")
+            if not has_next:
+                break
+            token = encode_cursor("n", items[-1]["_id"], page + 1)
+        expect(seen == wanted, f"forward pages {seen} != {wanted}")
+
+        if len(pages) > 1:
+            last = pages[-1]
+            items, page, has_prev, _ = await fetch_page(fetch, encode_cursor("p", last[0], len(pages) - 1), 4)
+            expect([i["_id"] for i in items] == pages[-2], f"prev page {items} != {pages[-2]}")
+            expect(has_prev == (len(pages) > 2), "wrong has_prev on the way back")
+
+
+async def check_legacy_id_listing(store):
+    legacy = [ObjectId() for _ in range(5)]
+    for key in (legacy[0], 12345):
+        token = encode_cursor("n", key, 7)
+        expect(decode_cursor(token) == ("n", key, 7), f"cursor round trip {key!r} -> {token}")
+    token = encode_cursor("p", ObjectId("f" * 24), 999)
+    expect(fits_callback_data(f"select_rarity_husbando_🔮_{token}"), f"ObjectId cursor too long: {token}")
+    if store.name == "sqlite":
+        return  # integer keys only; legacy ObjectId items exist in Mongo
+
+    now = datetime.utcnow()
+    wanted = [1, 3, 5, 7, 9] + legacy
+    for n, item_id in enumerate(wanted, start=1):
+        await store.insert_submission(submission(n, now, _id=item_id, type="waifu"))
+
+    async def fetch(after=None, before=None, limit=3):
+        return await store.list_live("waifu", now, after=after, before=before, limit=limit, fields=("waifu_name",))
+
+    seen, token, pages = [], None, []
+    while True:
+        items, page, has_prev, has_next = await fetch_page(fetch, token, 3)
+        pages.append([i["_id"] for i in items])
+        seen.extend(pages[-1])
+        if not has_next:
+            break
+        token = encode_cursor("n", items[-1]["_id"], page + 1)
+    expect(seen == wanted, f"pages across counter / ObjectId IDs {seen} != {wanted}")
+    items, _, _, _ = await fetch_page(fetch, encode_cursor("p", pages[2][0], 2), 3)
+    expect([i["_id"] for i in items] == pages[1], f"prev page from an ObjectId cursor: {items}")
+
+
+async def check_seller_and_expired(store):
+    now = datetime.utcnow()
+    await store.insert_submission(submission(1, now, user_id=7))
+    await store.insert_submission(submission(3, now, user_id=7, is_expired=True))
+    await store.insert_submission(submission(5, now, user_id=8))
+    await store.insert_submission(submission(7, now, user_id=7, expires_at=now - timedelta(hours=1)))
+    await store.insert_submission(submission(9, now, status="pending", expires_at=now - timedelta(hours=1)))
+
+    mine = await store.list_seller_live(7, "waifu", fields=("waifu_name",))
+    expect(sorted(i["_id"] for i in mine) == [1, 7], f"seller listing: {mine}")
+
+    expired = await store.list_expired_live(now, fields=("channel_message_id",))
+    expect([i["_id"] for i in expired] == [7], f"expired listing: {expired}")
+    expect(await store.count_submissions(LIVE_STATUS) == 4, "count_submissions")
+
+
+async def check_archive_and_drafts(store):
+    now = datetime.utcnow()
+    old = now - timedelta(days=3)
+    await store.insert_submission(submission(1, now, status="ended", expires_at=old))
+    await store.insert_submission(submission(2, now, status="rejected", expires_at=old))
+    await store.insert_submission(submission(3, now, status="ended", expires_at=now))          # too recent
+    await store.insert_submission(submission(4, now, expires_at=old))                           # still approved
+    await store.insert_submission(submission(5, now, status=DRAFT_STATUS, submitted_time=old))
+    await store.insert_submission(submission(6, now, status=DRAFT_STATUS, submitted_time=now))
+
+    cutoff = now - timedelta(days=1)
+    expect(await store.archive_finished(cutoff, 1) == 1, "archive batch size ignored")
+    expect(await store.archive_finished(cutoff, 10) == 1, "second batch should move the rest")
+    expect(await store.archive_finished(cutoff, 10) == 0, "archive is not idempotent")
+
+    found, archived = await store.get_submission(2)
+    expect(found is not None and archived and "archived_at" in found, f"archived lookup: {found}, {archived}")
+    expect((await store.get_submission(3))[1] is False, "recent finished item archived")
+    expect(await store.delete_submission(1), "could not delete an archived item")
+
+    expect(await store.delete_drafts_before(now - timedelta(hours=1)) == 1, "draft sweep count")
+    expect((await store.get_submission(6))[0] is not None, "fresh draft swept")
+
+
+async def check_users_and_bans(store):
+    now = datetime.utcnow().replace(microsecond=0)  # Mongo stores milliseconds
+    expect(await store.touch_user(42, "Alice", "alice", now), "first touch not reported as new")
+    expect(not await store.touch_user(42, "Alice", "alice", now + timedelta(minutes=5)), "second touch reported new")
+    user = await store.get_user(42)
+    expect(user["full_name"] == "Alice" and user["last_seen"] == now + timedelta(minutes=5), f"user doc: {user}")
+    expect(await store.get_user(43) is None, "unknown user found")
+    expect(await store.count_users(banned=False) == 1 and await store.count_users(banned=True) == 0, "count_users")
+
+    ban = {"user_id": 42, "reason": "spam", "banned_by": 1, "timestamp": now}
+    expect(await store.add_ban(ban), "ban not added")
+    expect(not await store.add_ban(ban), "duplicate ban added")
+    expect((await store.get_ban(42))["reason"] == "spam", "ban lookup")
+    expect(await store.list_banned_ids() == [42], "list_banned_ids")
+    expect(await store.remove_ban(42), "ban not removed")
+    expect(not await store.remove_ban(42), "removed a missing ban")
+    expect(await store.get_ban(42) is None, "ban still present")
+
+
+async def check_bid_history(store):
+    start = datetime(2025, 1, 1)
+    for n in range(25):
+        doc = {"_id": f"1:{100 + n}:{n}", "item_id": 1, "user_id": n, "username": None, "bid": 100 + n,
+               "time": start + timedelta(minutes=n)}
+        expect(await store.record_bid(doc), "new bid not recorded")
+    expect(not await store.record_bid({**doc, "bid": 1}), "duplicate bid recorded")
+    await store.record_bid({"_id": "2:5:1", "item_id": 2, "user_id": 1, "username": None, "bid": 5, "time": start})
+
+    epoch = datetime(1970, 1, 1)
+
+    def cursor(direction, bid, page):  # packed as handlers/auction_bid.py does: (epoch ms, amount, bidder)
+        _, amount, user_id = bid["_id"].rsplit(":", 2)
+        ms = (bid["time"] - epoch) // timedelta(milliseconds=1)
+        return encode_cursor(direction, (ms, int(amount), int(user_id)), page)
+
+    def pager(item_id):
+        async def fetch(after=None, before=None, limit=10):
+            return await store.list_bids(item_id, after=after, before=before, limit=limit, fields=("bid", "time"))
+
+        def key_from_cursor(key):
+            if not isinstance(key, tuple):
+                return None
+            ms, amount, user_id = key
+            return epoch + timedelta(milliseconds=ms), f"{item_id}:{amount}:{user_id}"
+
+        return lambda token, limit: fetch_page(fetch, token, limit, key_from_cursor=key_from_cursor)
+
+    page_of = pager(1)
+    items, page, has_prev, has_next = await page_of(None, 10)
+    expect([b["bid"] for b in items] == list(range(124, 114, -1)) and has_next and not has_prev, "first bid page")
+    expect(items[-1]["bid"] == 115 and items[0]["time"] == start + timedelta(minutes=24), "bid fields")
+
+    older, page, has_prev, has_next = await page_of(cursor("n", items[-1], 2), 10)
+    expect([b["bid"] for b in older] == list(range(114, 104, -1)) and has_prev and has_next, "second bid page")
+
+    newer, page, has_prev, _ = await page_of(cursor("p", older[0], 1), 10)
+    expect([b["bid"] for b in newer] == [b["bid"] for b in items] and page == 1 and not has_prev, "back to newest")
+    expect(len(await store.list_bids(2)) == 1, "bids leaked across items")
+
+    # Bids placed in the same millisecond are told apart by _id: no skips, no repeats
+    tie = start + timedelta(days=1)
+    for n in range(7):
+        await store.record_bid({"_id": f"3:{200 + n}:{n}", "item_id": 3, "user_id": n, "username": None,
+                                "bid": 200 + n, "time": tie})
+    page_of = pager(3)
+    pages, token = [], None
+    while True:
+        items, page, has_prev, has_next = await page_of(token, 3)
+        pages.append([b["bid"] for b in items])
+        if not has_next:
+            break
+        token = cursor("n", items[-1], page + 1)
+    seen = [bid for p in pages for bid in p]
+    expect(sorted(seen) == list(range(200, 207)) and len(seen) == 7, f"tied bids paged: {pages}")
+    back, page, has_prev, _ = await page_of(token, 3)
+    back, page, has_prev, _ = await page_of(cursor("p", back[0], page - 1), 3)
+    expect([b["bid"] for b in back] == pages[-2] and has_prev, f"tied bids paged back: {back} vs {pages}")
+    expect(await page_of("n5.2", 3) == (await page_of(None, 3)), "time-only cursor falls back to the first page")
+
+
+async def check_scan(store):
+    now = datetime.utcnow().replace(microsecond=0)
+    for n in range(1, 24):
+        await store.insert_submission(submission(n, now, submitted_time=now - timedelta(hours=n)))
+    for n in range(5):
+        await store.touch_user(n, f"User {n}", None, now - timedelta(days=n))
+
+    batches = [batch async for batch in store.scan("submissions", batch_size=10)]
+    expect([len(b) for b in batches] == [10, 10, 3], f"batch sizes: {[len(b) for b in batches]}")
+    expect([d["_id"] for b in batches for d in b] == list(range(1, 24)), "scan order / completeness")
+
+    recent = [d["_id"] async for b in store.scan("submissions", since=now - timedelta(hours=5)) for d in b]
+    expect(sorted(recent) == [1, 2, 3, 4, 5], f"submissions since: {recent}")
+    users = [d["user_id"] async for b in store.scan("users", since=now - timedelta(days=2)) for d in b]
+    expect(sorted(users) == [0, 1, 2], f"users since: {users}")
+    expect([b async for b in store.scan("bids")] == [], "scan of an empty collection yielded batches")
+
+
+async def check_bulk_insert_and_queue(store):
+    now = datetime.utcnow().replace(microsecond=0)
+    await store.insert_submission(submission(3, now))
+    docs = [submission(n, now, status=QUEUED_STATUS) for n in range(1, 7)]
+    inserted, duplicates = await store.insert_submissions(docs)
+    expect(inserted == 5 and duplicates == [3], f"bulk insert: {inserted} inserted, duplicates {duplicates}")
+    doc, _ = await store.get_submission(6)
+    expect(doc and doc["status"] == QUEUED_STATUS and doc["submitted_time"] == now - timedelta(hours=1), "bulk-inserted document")
+
+    queued = await store.list_by_status(QUEUED_STATUS, limit=3, fields=("_id",))
+    expect([d["_id"] for d in queued] == [1, 2, 4], f"queue order: {queued}")
+    expect(await store.list_by_status("missing") == [], "unknown status")
+    expect(await store.insert_submissions([]) == (0, []), "empty bulk insert")
+
+
+async def check_audit_log(store):
+    now = datetime.utcnow().replace(microsecond=0)
+    for n in range(12):
+        await store.record_audit({
+            "time": now - timedelta(minutes=n),
+            "action": "rm" if n % 3 else "aban",
+            "actor_id": 1 + n % 2,
+            "actor_name": "Admin",
+            "target": str(100 + n % 4),
+            "details": {"n": n},
+        })
+
+    page = await store.list_audit(limit=5)
+    expect([e["details"]["n"] for e in page] == [0, 1, 2, 3, 4], f"newest first: {page}")
+    expect(all("_id" in e for e in page), "entries carry an _id")
+    older = await store.list_audit(after=(page[-1]["time"], page[-1]["_id"]), limit=5)
+    expect([e["details"]["n"] for e in older] == [5, 6, 7, 8, 9], "older page")
+    newer = await store.list_audit(before=(older[0]["time"], older[0]["_id"]), limit=3)
+    expect([e["details"]["n"] for e in newer] == [2, 3, 4], f"newer page: {newer}")
+
+    # A burst logged in one instant pages by _id: no skips, no repeats
+    burst = now + timedelta(minutes=1, milliseconds=123)
+    for n in range(5):
+        await store.record_audit({"time": burst, "action": "rm", "actor_id": 9, "actor_name": "Admin",
+                                  "target": "900", "details": {"n": 100 + n}})
+    seen, after = [], None
+    while True:
+        batch = await store.list_audit(actor_id=9, after=after, limit=2)
+        if not batch:
+            break
+        seen += [e["details"]["n"] for e in batch]
+        after = (batch[-1]["time"], batch[-1]["_id"])
+    expect(seen == [104, 103, 102, 101, 100], f"burst paged: {seen}")
+    middle = await store.list_audit(actor_id=9, limit=5)
+    newer = await store.list_audit(actor_id=9, before=(middle[2]["time"], middle[2]["_id"]), limit=5)
+    expect([e["details"]["n"] for e in newer] == [104, 103], f"burst paged back: {newer}")
+
+    by_actor = await store.list_audit(actor_id=2, action="rm")
+    expect([e["details"]["n"] for e in by_actor] == [1, 5, 7, 11], f"actor + action filter: {by_actor}")
+    by_target = await store.list_audit(target="101")
+    expect([e["details"]["n"] for e in by_target] == [1, 5, 9], f"target filter: {by_target}")
+
+    if store.name != "mongo":  # Mongo expires entries with a TTL index instead
+        expect(await store.prune_audit(now - timedelta(minutes=9, seconds=30)) == 2, "prune count")
+        expect(len(await store.list_audit(limit=20)) == 15, "entries after prune")
+
+
+async def check_stats_rollups(store):
+    day = "day:2026-01-02"
+    await store.inc_stats(["global", day], {"bids": 1, "bid_volume": 150, "by_rarity.Rare.gmv": 150})
+    await store.inc_stats(["global"], {"bids": 1, "bid_volume": 50, "live": -1})
+    docs = await store.get_stats(["global", day, "day:missing"])
+    expect(set(docs) == {"global", day}, f"stats keys: {set(docs)}")
+    expect(docs["global"]["bids"] == 2 and docs["global"]["bid_volume"] == 200, f"global: {docs['global']}")
+    expect(docs["global"]["live"] == -1 and docs[day]["bids"] == 1, "negative / per-day increments")
+    expect(docs[day]["by_rarity"]["Rare"]["gmv"] == 150, f"dotted path: {docs[day]}")
+
+    await store.replace_stats([{"_id": "global", "users": 3}, {"_id": "day:2026-01-03", "users": 1}])
+    docs = await store.get_stats(["global", day, "day:2026-01-03"])
+    expect(docs["global"] == {"_id": "global", "users": 3}, f"replaced as a whole: {docs['global']}")
+    expect(docs["day:2026-01-03"]["users"] == 1 and docs[day]["bids"] == 1, f"created / left alone: {docs}")
+    await store.inc_stats(["global"], {"users": 1})
+    await store.replace_stats([])
+    expect((await store.get_stats(["global"]))["global"]["users"] == 4, "increment after a rebuild")
+
+
+async def check_counters(store):
+    expect(await store.reserve_ids("submission_id", 5) == 5, "first reservation")
+    expect(await store.reserve_ids("submission_id", 3) == 8, "second reservation")
+    await store.add_wasted_ids("submission_id", 2)
+    expect(await store.get_counter("submission_id") == 8, "get_counter after reservations")
+    expect(await store.get_counter("never_used") == 0, "get_counter of an unknown counter")
+
+    allocators = [BlockAllocator(store, "item", block_size=4) for _ in range(3)]
+    ids = await asyncio.gather(*(allocators[n % 3].next_id() for n in range(50)))
+    expect(len(set(ids)) == 50, "allocators sharing a counter handed out duplicate IDs")
+    block = await allocators[0].reserve_range(10)
+    expect(len(block) == 10 and not set(block) & set(ids), "reserve_range overlaps issued IDs")
+
+
+CHECKS = [
+    check_submission_round_trip,
+    check_guarded_update_and_delete,
+    check_update_and_pop_return_documents,
+    check_round_trip_counting,
+    check_place_bid_compare_and_set,
+    check_concurrent_bids,
+    check_live_listing,
+    check_legacy_id_listing,
+    check_seller_and_expired,
+    check_archive_and_drafts,
+    check_users_and_bans,
+    check_bid_history,
+    check_scan,
+    check_bulk_insert_and_queue,
+    check_audit_log,
+    check_stats_rollups,
+    check_counters,
+]
+
+
+# ====== BACKEND FACTORIES ======
+async def open_store(backend: str, workdir: str, args, label: str):
+    """Fresh, empty, initialized store for one check."""
+    if backend == "sqlite":
+        store = create_store("sqlite", path=os.path.join(workdir, f"{label}.db"))
+    elif backend == "mongo":
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        client = AsyncIOMotorClient(args.mongo_url, serverSelectionTimeoutMS=10000)
+        await client.drop_database(args.db)
+        store = create_store("mongo", database=client[args.db])
+    else:
+        store = create_store(backend)
+    await store.init()
+    return store
+
+
+async def run_checks(backend: str, args) -> int:
+    failures = 0
+    workdir = tempfile.mkdtemp(prefix=f"amongo-{backend}-")
+    try:
+        for check in CHECKS:
+            store = await open_store(backend, workdir, args, check.__name__)
+            try:
+                await check(store)
+                print(f"✅ {backend:<7} {check.__name__}")
+            except Exception as e:
+                failures += 1
+                print(f"❌ {backend:<7} {check.__name__}: {type(e).__name__}: {e}")
+            finally:
+                await store.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return failures
+
+
+# ====== BENCHMARK ======
+async def _timed(fn, rounds: int) -> dict:
+    samples = []
+    for n in range(rounds):
+        started = time.perf_counter()
+        await fn(n)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": statistics.median(samples),
+        "p99_ms": samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+        "ops_s": rounds / (sum(samples) / 1000) if sum(samples) else float("inf"),
+    }
+
+
+async def run_benchmark(backend: str, args):
+    workdir = tempfile.mkdtemp(prefix=f"amongo-bench-{backend}-")
+    store = await open_store(backend, workdir, args, "bench")
+    try:
+        now = datetime.utcnow()
+        size = args.bench
+        started = time.perf_counter()
+        for item_id in range(1, size + 1):
+            await store.insert_submission(submission(item_id, now))
+        print(f"⏱️ {backend:<7} inserted {size} submissions in {time.perf_counter() - started:.2f}s")
+        for user_id in range(0, size, 50):
+            await store.add_ban({"user_id": user_id, "reason": "bench", "banned_by": 1, "timestamp": now})
+
+        rounds = min(args.rounds, size)
+        results = {
+            "get_submission": await _timed(lambda n: store.get_submission(n * 7 % size + 1), rounds),
+            "list_live page": await _timed(
+                lambda n: store.list_live("waifu", now, after=n * 13 % size, limit=11, fields=("waifu_name",)), rounds
+            ),
+            "count_live": await _timed(lambda n: store.count_live("waifu", now), min(rounds, 50)),
+            "get_ban": await _timed(lambda n: store.get_ban(n * 31 % size), rounds),
+            "place_bid": await _timed(
+                lambda n: store.place_bid(n % size + 1, 0 if n < size else 100 + n - size,
+                                          {"current_bid": 100 + n}, {"bid": 100 + n}, 10),
+                rounds,
+            ),
+        }
+        for name, row in results.items():
+            print(f"⏱️ {backend:<7} {name:<15} p50 {row['p50_ms']:.3f} ms  p99 {row['p99_ms']:.3f} ms  "
+                  f"{row['ops_s']:.0f} ops/s")
+    finally:
+        await store.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+# ====== CLI ======
+async def _main(args) -> int:
+    failures = 0
+    for backend in args.backend:
+        if backend == "mongo" and not args.mongo_url:
+            print("❌ mongo needs --mongo-url (or CONFORMANCE_MONGO_URL); its database is dropped.")
+            failures += 1
+            continue
+        failures += await run_checks(backend, args)
+        if args.bench:
+            await run_benchmark(backend, args)
+    print(f"{'❌' if failures else '✅'} {failures} failure(s).")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the storage conformance suite (and optional benchmark).")
+    parser.add_argument("--backend", nargs="+", default=["memory", "sqlite"], choices=["memory", "sqlite", "mongo"])
+    parser.add_argument("--mongo-url", default=os.getenv("CONFORMANCE_MONGO_URL"), help="disposable MongoDB server")
+    parser.add_argument("--db", default=CONFORMANCE_DB)
+    parser.add_argument("--bench", type=int, default=0, help="benchmark with this many submissions")
+    parser.add_argument("--rounds", type=int, default=1000, help="timed operations per benchmark")
+    sys.exit(asyncio.run(_main(parser.parse_args())))
@@ -0,0 +1,370 @@
+# storage/memory.py
+"""
+In-memory backend, for load tests and local runs without a database.
+
+Everything lives in dicts owned by the process and is lost on exit.
+Documents are deep-copied on the way in and out, so callers can never
+mutate stored state by accident (the same guarantee a real database gives).
+Every data call counts as one round trip, so load tests see the same
+round-trip numbers a networked backend would report.
+"""
+import copy
+from datetime import datetime
+from typing import Optional
+
+from storage.base import (
+    Storage,
+    LIVE_STATUS,
+    DRAFT_STATUS,
+    FINISHED_STATUSES,
+    OPEN_STATUSES,
+    SCAN_TIME_FIELDS,
+    Fields,
+    project,
+    note_round_trip,
+    matches,
+    id_order,
+    bid_matches,
+    push_history,
+    apply_increments,
+)
+
+
+class MemoryStorage(Storage):
+    name = "memory"
+
+    def __init__(self):
+        self.submissions: dict = {}
+        self.archive: dict = {}
+        self.users: dict = {}
+        self.bans: dict = {}
+        self.bids: dict = {}
+        self.counters: dict = {}
+        self.audit: list = []
+        self.stats: dict = {}
+
+    # ====== LIFECYCLE ======
+    async def init(self):
+        return True
+
+    async def close(self):
+        pass
+
+    async def ping(self):
+        return True
+
+    def diagnostics(self) -> dict:
+        return {
+            "backend": self.name,
+            "submissions": len(self.submissions),
+            "archived": len(self.archive),
+            "bids": len(self.bids),
+        }
+
+    # ====== COUNTERS ======
+    async def reserve_ids(self, name: str, count: int) -> int:
+        note_round_trip()
+        counter = self.counters.setdefault(name, {"sequence_value": 0, "wasted_ids": 0})
+        counter["sequence_value"] += count
+        return counter["sequence_value"]
+
+    async def add_wasted_ids(self, name: str, count: int):
+        note_round_trip()
+        counter = self.counters.setdefault(name, {"sequence_value": 0, "wasted_ids": 0})
+        counter["wasted_ids"] += count
+
+    async def get_counter(self, name: str) -> int:
+        note_round_trip()
+        return self.counters.get(name, {}).get("sequence_value", 0)
+
+    # ====== SUBMISSIONS ======
+    async def get_submission(self, item_id, fields: Fields = None, op_class: str = None):
+        note_round_trip()
+        doc = self.submissions.get(item_id)
+        if doc is not None:
+            return copy.deepcopy(project(doc, fields, exclude_history=True)), False
+        doc = self.archive.get(item_id)
+        if doc is not None:
+            return copy.deepcopy(project(doc, fields, exclude_history=True)), True
+        return None, False
+
+    async def insert_submission(self, doc: dict):
+        note_round_trip()
+        if doc["_id"] in self.submissions:
+            raise KeyError(f"Duplicate submission _id: {doc['_id']}")
+        self.submissions[doc["_id"]] = copy.deepcopy(doc)
+
+    async def insert_submissions(self, docs):
+        note_round_trip()
+        inserted, duplicates = 0, []
+        for doc in docs:
+            if doc["_id"] in self.submissions:
+                duplicates.append(doc["_id"])
+                continue
+            self.submissions[doc["_id"]] = copy.deepcopy(doc)
+            inserted += 1
+        return inserted, duplicates
+
+    async def update_submission(self, item_id, changes: dict, expect: dict = None, op_class: str = None) -> bool:
+        note_round_trip()
+        doc = self.submissions.get(item_id)
+        if doc is None or not matches(doc, expect):
+            return False
+        doc.update(copy.deepcopy(changes))
+        return True
+
+    async def update_and_get(self, item_id, changes, expect=None, fields=None, op_class=None):
+        if not await self.update_submission(item_id, changes, expect):
+            return None
+        return copy.deepcopy(project(self.submissions[item_id], fields, exclude_history=True))
+
+    async def delete_submission(self, item_id, expect: dict = None, op_class: str = None) -> bool:
+        note_round_trip()
+        for collection in (self.submissions, self.archive):
+            doc = collection.get(item_id)
+            if doc is not None and matches(doc, expect):
+                del collection[item_id]
+                return True
+        return False
+
+    async def pop_submission(self, item_id, fields=None, op_class=None):
+        note_round_trip()
+        for collection in (self.submissions, self.archive):
+            doc = collection.pop(item_id, None)
+            if doc is not None:
+                return project(doc, fields, exclude_history=True)
+        return None
+
+    async def place_bid(self, item_id, expected_bid, changes, history_entry, history_limit, fields=None, op_class=None):
+        note_round_trip()
+        doc = self.submissions.get(item_id)
+        if doc is None or not bid_matches(doc, expected_bid):
+            return None
+        doc.update(copy.deepcopy(changes))
+        push_history(doc, copy.deepcopy(history_entry), history_limit)
+        return copy.deepcopy(project(doc, fields, exclude_history=True))
+
+    def _live(self, item_type: str, now: datetime, rarity_name: str = None):
+        for doc in self.submissions.values():
+            if (
+                doc.get("status") == LIVE_STATUS
+                and doc.get("type") == item_type
+                and (rarity_name is None or doc.get("rarity_name") == rarity_name)
+                and doc.get("expires_at") is not None
+                and doc["expires_at"] > now
+            ):
+                yield doc
+
+    async def list_live(self, item_type, now, rarity_name=None, after=None, before=None, limit=10, fields=None, op_class=None):
+        note_round_trip()
+        docs = sorted(self._live(item_type, now, rarity_name), key=lambda d: id_order(d["_id"]))
+        if before is not None:
+            docs = [d for d in docs if id_order(d["_id"]) < id_order(before)][-limit:]
+        else:
+            if after is not None:
+                docs = [d for d in docs if id_order(d["_id"]) > id_order(after)]
+            docs = docs[:limit]
+        return [copy.deepcopy(project(d, fields, exclude_history=True)) for d in docs]
+
+    async def count_live(self, item_type, now, rarity_name=None, op_class=None) -> int:
+        note_round_trip()
+        return sum(1 for _ in self._live(item_type, now, rarity_name))
+
+    async def list_seller_live(self, user_id, item_type, limit=100, fields=None, op_class=None):
+        note_round_trip()
+        docs = [
+            d for d in self.submissions.values()
+            if d.get("user_id") == user_id
+            and d.get("type") == item_type
+            and d.get("status") == LIVE_STATUS
+            and d.get("is_expired") is False
+        ]
+        return [copy.deepcopy(project(d, fields, exclude_history=True)) for d in docs[:limit]]
+
+    async def list_expired_live(self, now, fields=None):
+        note_round_trip()
+        docs = [
+            d for d in self.submissions.values()
+            if d.get("status") == LIVE_STATUS
+            and d.get("is_expired") is not True
+            and d.get("expires_at") is not None
+            and d["expires_at"] <= now
+        ]
+        return [copy.deepcopy(project(d, fields, exclude_history=True)) for d in docs]
+
+    async def count_submissions(self, status, op_class=None) -> int:
+        note_round_trip()
+        return sum(1 for d in self.submissions.values() if d.get("status") == status)
+
+    async def list_by_status(self, status, limit=10, fields=None):
+        note_round_trip()
+        docs = sorted((d for d in self.submissions.values() if d.get("status") == status), key=lambda d: d["_id"])
+        return [copy.deepcopy(project(d, fields, exclude_history=True)) for d in docs[:limit]]
+
+    async def list_open(self, fields=None):
+        note_round_trip()
+        return [
+            copy.deepcopy(project(d, fields, exclude_history=True))
+            for d in self.submissions.values() if d.get("status") in OPEN_STATUSES
+        ]
+
+    async def archive_finished(self, cutoff, limit) -> int:
+        note_round_trip()
+        ids = sorted(
+            d["_id"] for d in self.submissions.values()
+            if d.get("status") in FINISHED_STATUSES
+            and d.get("expires_at") is not None
+            and d["expires_at"] <= cutoff
+        )[:limit]
+        now = datetime.utcnow()
+        for item_id in ids:
+            doc = self.submissions.pop(item_id)
+            doc["archived_at"] = now
+            self.archive.setdefault(item_id, doc)
+        return len(ids)
+
+    async def delete_drafts_before(self, cutoff) -> int:
+        note_round_trip()
+        ids = [
+            d["_id"] for d in self.submissions.values()
+            if d.get("status") == DRAFT_STATUS and d.get("submitted_time") is not None and d["submitted_time"] <= cutoff
+        ]
+        for item_id in ids:
+            del self.submissions[item_id]
+        return len(ids)
+
+    # ====== USERS ======
+    async def get_user(self, user_id, op_class=None) -> Optional[dict]:
+        note_round_trip()
+        return copy.deepcopy(self.users.get(user_id))
+
+    async def touch_user(self, user_id, full_name, username, now) -> bool:
+        note_round_trip()
+        existing = self.users.get(user_id)
+        if existing is not None:
+            existing["last_seen"] = now
+            return False
+        self.users[user_id] = {
+            "user_id": user_id,
+            "full_name": full_name,
+            "username": username,
+            "created_at": now,
+            "last_seen": now,
+        }
+        return True
+
+    async def count_users(self, banned, op_class=None) -> int:
+        note_round_trip()
+        return sum(1 for u in self.users.values() if (u.get("is_banned") is True) == banned)
+
+    # ====== GLOBAL BANS ======
+    async def get_ban(self, user_id, op_class=None) -> Optional[dict]:
+        note_round_trip()
+        return copy.deepcopy(self.bans.get(user_id))
+
+    async def add_ban(self, doc, op_class=None) -> bool:
+        note_round_trip()
+        if doc["user_id"] in self.bans:
+            return False
+        self.bans[doc["user_id"]] = copy.deepcopy(doc)
+        return True
+
+    async def remove_ban(self, user_id, op_class=None) -> bool:
+        note_round_trip()
+        return self.bans.pop(user_id, None) is not None
+
+    async def list_banned_ids(self) -> list[int]:
+        note_round_trip()
+        return list(self.bans)
+
+    # ====== BULK READS ======
+    async def scan(self, collection, since=None, batch_size=1000):
+        source = {
+            "submissions": self.submissions,
+            "submissions_archive": self.archive,
+            "bids": self.bids,
+            "users": self.users,
+        }[collection]
+        time_field = SCAN_TIME_FIELDS[collection]
+        try:
+            keys = sorted(source)
+        except TypeError:  # mixed legacy ObjectId / int keys
+            keys = sorted(source, key=str)
+        for start in range(0, len(keys), batch_size):
+            note_round_trip()
+            batch = []
+            for key in keys[start:start + batch_size]:
+                doc = source.get(key)
+                if doc is None:
+                    continue
+                if since is not None and (doc.get(time_field) is None or doc[time_field] < since):
+                    continue
+                batch.append(copy.deepcopy(doc))
+            if batch:
+                yield batch
+
+    # ====== BID HISTORY ======
+    async def record_bid(self, doc, op_class=None) -> bool:
+        note_round_trip()
+        if doc["_id"] in self.bids:
+            return False
+        self.bids[doc["_id"]] = copy.deepcopy(doc)
+        return True
+
+    async def list_bids(self, item_id, after=None, before=None, limit=10, fields=None, op_class=None):
+        note_round_trip()
+        docs = sorted(
+            (b for b in self.bids.values() if b.get("item_id") == item_id),
+            key=lambda b: (b["time"], b["_id"]),
+            reverse=True,
+        )
+        if before is not None:
+            docs = [b for b in docs if (b["time"], b["_id"]) > before][-limit:]
+        else:
+            if after is not None:
+                docs = [b for b in docs if (b["time"], b["_id"]) < after]
+            docs = docs[:limit]
+        return [copy.deepcopy(project(b, fields)) for b in docs]
+
+    # ====== STATS ROLLUPS ======
+    async def inc_stats(self, keys, changes):
+        note_round_trip()
+        for key in keys:
+            apply_increments(self.stats.setdefault(key, {"_id": key}), changes)
+
+    async def get_stats(self, keys, op_class=None):
+        note_round_trip()
+        return {key: copy.deepcopy(self.stats[key]) for key in keys if key in self.stats}
+
+    async def replace_stats(self, docs):
+        note_round_trip()
+        self.stats.update({doc["_id"]: copy.deepcopy(doc) for doc in docs})
+
+    # ====== AUDIT LOG ======
+    async def record_audit(self, doc):
+        note_round_trip()
+        entry = copy.deepcopy(doc)
+        entry["_id"] = len(self.audit) + 1
+        self.audit.append(entry)
+
+    async def list_audit(self, actor_id=None, target=None, action=None, after=None, before=None, limit=10, op_class=None):
+        note_round_trip()
+        filters = {"actor_id": actor_id, "target": target, "action": action}
+        docs = sorted(
+            (e for e in self.audit if all(v is None or e.get(k) == v for k, v in filters.items())),
+            key=lambda e: (e["time"], e["_id"]),
+            reverse=True,
+        )
+        if before is not None:
+            docs = [e for e in docs if (e["time"], e["_id"]) > before][-limit:]
+        else:
+            if after is not None:
+                docs = [e for e in docs if (e["time"], e["_id"]) < after]
+            docs = docs[:limit]
+        return copy.deepcopy(docs)
+
+    async def prune_audit(self, cutoff) -> int:
+        note_round_trip()
+        kept = [e for e in self.audit if e["time"] >= cutoff]
+        pruned, self.audit = len(self.audit) - len(kept), kept
+        return pruned
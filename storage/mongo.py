@@ -0,0 +1,494 @@
+# storage/mongo.py
+"""
+MongoDB backend (Motor), the production default.
+
+By default it uses the process-wide client from utils/database.py, so every
+handler still shares one connection pool; pass another Motor database to
+point it elsewhere (conformance runs, scripts).  Operations tagged with an
+`op_class` go through utils/db_policy.py for read routing, write concern
+and maxTimeMS.  The query shapes match the indexes in utils/indexes.py and
+are checked by `python -m utils.query_plans`.
+"""
+from datetime import datetime
+from typing import Optional
+
+from bson import ObjectId
+from pymongo import ReplaceOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from pymongo.write_concern import WriteConcern
+
+from storage.base import (
+    Storage,
+    LIVE_STATUS,
+    DRAFT_STATUS,
+    FINISHED_STATUSES,
+    OPEN_STATUSES,
+    HISTORY_FIELD,
+    SCAN_TIME_FIELDS,
+    Fields,
+    ChangeStreamUnavailable,
+    ResumeTokenLost,
+    note_round_trip,
+)
+from utils.db_policy import policy_collection, max_time_ms, ANALYTICS
+from utils.indexes import ensure_indexes
+
+
+def _projection(fields: Fields, exclude_history: bool = False) -> Optional[dict]:
+    if fields is None:
+        return {HISTORY_FIELD: 0} if exclude_history else None
+    return {field: 1 for field in fields}
+
+
+# Server error codes: change streams need a replica set; resume token gone from the oplog
+_NO_CHANGE_STREAMS = (40573, 40324)
+_RESUME_TOKEN_LOST = (260, 280, 286)
+
+# Inserts carry the full document, updates only the changed fields; the bid
+# history is never needed by listeners
+_WATCH_PIPELINE = [
+    {"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete"]}}},
+    {"$project": {f"fullDocument.{HISTORY_FIELD}": 0, f"updateDescription.updatedFields.{HISTORY_FIELD}": 0}},
+]
+
+
+def _change_from_stream(change: dict) -> dict:
+    op = change["operationType"]
+    if op in ("insert", "replace"):
+        fields = change.get("fullDocument") or {}
+        op = "insert"
+    elif op == "update":
+        fields = change["updateDescription"].get("updatedFields", {})
+    else:
+        fields = {}
+    return {"op": op, "_id": change["documentKey"]["_id"], "fields": {k: v for k, v in fields.items() if k != "_id"}}
+
+
+class MongoStorage(Storage):
+    name = "mongo"
+
+    def __init__(self, database=None):
+        # `database=None` means the shared client configured in config.py
+        self._shared = database is None
+        if self._shared:
+            from utils.database import db as database
+        self.db = database
+
+    # ====== HELPERS ======
+    def _coll(self, name: str, op_class: str = None):
+        if op_class:
+            return policy_collection(name, op_class, self.db)
+        return self.db[name]
+
+    @staticmethod
+    def _options(op_class: str = None) -> dict:
+        return {"max_time_ms": max_time_ms(op_class)} if op_class else {}
+
+    # ====== LIFECYCLE ======
+    async def init(self, retries: int = 5, delay: int = 3):
+        if self._shared:
+            # Ping with retries, counter, indexes, usage / migration reports
+            from utils.database import init_db
+
+            return await init_db(retries, delay)
+        await self.db.command("ping")
+        await ensure_indexes(self.db)
+        return True
+
+    async def close(self):
+        if not self._shared:
+            self.db.client.close()
+
+    async def ping(self):
+        note_round_trip()
+        await self.db.command("ping")
+
+    def diagnostics(self) -> dict:
+        info = {"backend": self.name, "database": self.db.name}
+        if self._shared:
+            from utils.database import pool_stats
+
+            info["pool"] = pool_stats()
+        return info
+
+    # ====== COUNTERS ======
+    async def reserve_ids(self, name: str, count: int) -> int:
+        note_round_trip()
+        counter = await self.db.counters.find_one_and_update(
+            {"_id": name},
+            {"$inc": {"sequence_value": count}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return counter["sequence_value"]
+
+    async def add_wasted_ids(self, name: str, count: int):
+        note_round_trip()
+        await self.db.counters.update_one({"_id": name}, {"$inc": {"wasted_ids": count}})
+
+    async def get_counter(self, name: str) -> int:
+        note_round_trip()
+        counter = await self.db.counters.find_one({"_id": name}, {"sequence_value": 1})
+        return (counter or {}).get("sequence_value", 0)
+
+    # ====== SUBMISSIONS ======
+    async def get_submission(self, item_id, fields: Fields = None, op_class: str = None):
+        projection = _projection(fields, exclude_history=True)
+        options = self._options(op_class)
+        note_round_trip()
+        doc = await self._coll("submissions", op_class).find_one({"_id": item_id}, projection, **options)
+        if doc is not None:
+            return doc, False
+        note_round_trip()
+        doc = await self._coll("submissions_archive", op_class).find_one({"_id": item_id}, projection, **options)
+        return doc, doc is not None
+
+    async def insert_submission(self, doc: dict):
+        note_round_trip()
+        await self.db.submissions.insert_one(doc)
+
+    async def insert_submissions(self, docs):
+        if not docs:
+            return 0, []
+        note_round_trip()
+        try:
+            result = await self.db.submissions.insert_many(docs, ordered=False)
+            return len(result.inserted_ids), []
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            other_errors = [err for err in errors if err.get("code") != 11000]
+            if other_errors:
+                raise
+            return e.details.get("nInserted", 0), [docs[err["index"]]["_id"] for err in errors]
+
+    async def update_submission(self, item_id, changes: dict, expect: dict = None, op_class: str = None) -> bool:
+        note_round_trip()
+        result = await self._coll("submissions", op_class).update_one(
+            {"_id": item_id, **(expect or {})}, {"$set": changes}
+        )
+        return result.matched_count > 0
+
+    async def update_and_get(self, item_id, changes, expect=None, fields=None, op_class=None):
+        note_round_trip()
+        return await self._coll("submissions", op_class).find_one_and_update(
+            {"_id": item_id, **(expect or {})},
+            {"$set": changes},
+            projection=_projection(fields, exclude_history=True),
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def delete_submission(self, item_id, expect: dict = None, op_class: str = None) -> bool:
+        for name in ("submissions", "submissions_archive"):
+            note_round_trip()
+            result = await self._coll(name, op_class).delete_one({"_id": item_id, **(expect or {})})
+            if result.deleted_count:
+                return True
+        return False
+
+    async def pop_submission(self, item_id, fields=None, op_class=None):
+        projection = _projection(fields, exclude_history=True)
+        for name in ("submissions", "submissions_archive"):
+            note_round_trip()
+            doc = await self._coll(name, op_class).find_one_and_delete({"_id": item_id}, projection=projection)
+            if doc is not None:
+                return doc
+        return None
+
+    async def place_bid(self, item_id, expected_bid, changes, history_entry, history_limit, fields=None, op_class=None):
+        note_round_trip()
+        return await self._coll("submissions", op_class).find_one_and_update(
+            {
+                "_id": item_id,
+                "$or": [
+                    {"current_bid": expected_bid},       # nobody outbid us meanwhile
+                    {"current_bid": {"$exists": False}},  # first bid safety
+                ],
+            },
+            {
+                "$set": changes,
+                # Only the newest bids stay embedded; the full history is in `bids`
+                "$push": {HISTORY_FIELD: {"$each": [history_entry], "$slice": -history_limit}},
+            },
+            projection=_projection(fields, exclude_history=True),
+            return_document=ReturnDocument.AFTER,
+            **({"maxTimeMS": max_time_ms(op_class)} if op_class else {}),
+        )
+
+    @staticmethod
+    def _live_query(item_type: str, now: datetime, rarity_name: str = None) -> dict:
+        query = {"status": LIVE_STATUS, "type": item_type, "expires_at": {"$gt": now}}
+        if rarity_name is not None:
+            query["rarity_name"] = rarity_name
+        return query
+
+    @staticmethod
+    def _id_range(after=None, before=None) -> dict:
+        # $gt / $lt only compare within one BSON type, but _id sorts counter
+        # integers before legacy ObjectIds: crossing that boundary has to be
+        # spelled out
+        if before is not None:
+            if isinstance(before, ObjectId):
+                return {"$or": [{"_id": {"$lt": before}}, {"_id": {"$type": "number"}}]}
+            return {"_id": {"$lt": before}}
+        if after is not None:
+            if isinstance(after, ObjectId):
+                return {"_id": {"$gt": after}}
+            return {"$or": [{"_id": {"$gt": after}}, {"_id": {"$type": "objectId"}}]}
+        return {}
+
+    async def list_live(self, item_type, now, rarity_name=None, after=None, before=None, limit=10, fields=None, op_class=None):
+        query = {**self._live_query(item_type, now, rarity_name), **self._id_range(after, before)}
+        order = -1 if before is not None else 1
+        cursor = self._coll("submissions", op_class).find(
+            query, _projection(fields, exclude_history=True), **self._options(op_class)
+        ).sort("_id", order).limit(limit)
+        note_round_trip()
+        items = await cursor.to_list(length=limit)
+        return items[::-1] if order == -1 else items
+
+    async def count_live(self, item_type, now, rarity_name=None, op_class=None) -> int:
+        options = {"maxTimeMS": max_time_ms(op_class)} if op_class else {}
+        note_round_trip()
+        return await self._coll("submissions", op_class).count_documents(
+            self._live_query(item_type, now, rarity_name), **options
+        )
+
+    async def list_seller_live(self, user_id, item_type, limit=100, fields=None, op_class=None):
+        cursor = self._coll("submissions", op_class).find(
+            {"user_id": user_id, "type": item_type, "status": LIVE_STATUS, "is_expired": False},
+            _projection(fields, exclude_history=True),
+            **self._options(op_class),
+        )
+        note_round_trip()
+        return await cursor.to_list(length=limit)
+
+    async def list_expired_live(self, now, fields=None):
+        cursor = self.db.submissions.find(
+            {"status": LIVE_STATUS, "is_expired": {"$ne": True}, "expires_at": {"$lte": now}},
+            _projection(fields, exclude_history=True),
+        )
+        note_round_trip()
+        return await cursor.to_list(length=None)
+
+    async def count_submissions(self, status, op_class=None) -> int:
+        options = {"maxTimeMS": max_time_ms(op_class)} if op_class else {}
+        note_round_trip()
+        return await self._coll("submissions", op_class).count_documents({"status": status}, **options)
+
+    async def list_by_status(self, status, limit=10, fields=None):
+        note_round_trip()
+        cursor = self.db.submissions.find(
+            {"status": status}, _projection(fields, exclude_history=True)
+        ).sort("_id", 1).limit(limit)
+        return await cursor.to_list(length=limit)
+
+    async def list_open(self, fields=None):
+        note_round_trip()
+        cursor = self.db.submissions.find({"status": {"$in": list(OPEN_STATUSES)}}, _projection(fields, exclude_history=True))
+        return await cursor.to_list(length=None)
+
+    async def archive_finished(self, cutoff, limit) -> int:
+        """
+        Copy first, then delete: a crash in between only leaves a duplicate
+        that the next run skips (duplicate _id), never a lost item.
+        """
+        finished = {"$in": list(FINISHED_STATUSES)}
+        note_round_trip()
+        batch = await self.db.submissions.find(
+            {"status": finished, "expires_at": {"$lte": cutoff}}
+        ).sort("_id", 1).limit(limit).to_list(length=limit)
+        if not batch:
+            return 0
+
+        now = datetime.utcnow()
+        for doc in batch:
+            doc["archived_at"] = now
+        try:
+            note_round_trip()
+            await self.db.submissions_archive.insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            # Only duplicate keys (already archived by an earlier run) are expected
+            other_errors = [err for err in e.details.get("writeErrors", []) if err.get("code") != 11000]
+            if other_errors:
+                raise
+
+        note_round_trip()
+        result = await self.db.submissions.delete_many({
+            "_id": {"$in": [doc["_id"] for doc in batch]},
+            "status": finished,  # skip anything revived meanwhile
+        })
+        return result.deleted_count
+
+    async def delete_drafts_before(self, cutoff) -> int:
+        note_round_trip()
+        result = await self.db.submissions.delete_many({
+            "status": DRAFT_STATUS,
+            "submitted_time": {"$lte": cutoff},
+        })
+        return result.deleted_count
+
+    # ====== USERS ======
+    async def get_user(self, user_id, op_class=None) -> Optional[dict]:
+        note_round_trip()
+        return await self._coll("users", op_class).find_one({"user_id": user_id}, **self._options(op_class))
+
+    async def touch_user(self, user_id, full_name, username, now) -> bool:
+        note_round_trip()
+        result = await self.db.users.update_one(
+            {"user_id": user_id},
+            {
+                "$set": {"last_seen": now},
+                "$setOnInsert": {"full_name": full_name, "username": username, "created_at": now},
+            },
+            upsert=True,
+        )
+        return result.upserted_id is not None
+
+    async def count_users(self, banned, op_class=None) -> int:
+        query = {"is_banned": True} if banned else {"is_banned": {"$ne": True}}
+        options = {"maxTimeMS": max_time_ms(op_class)} if op_class else {}
+        note_round_trip()
+        return await self._coll("users", op_class).count_documents(query, **options)
+
+    # ====== GLOBAL BANS ======
+    async def get_ban(self, user_id, op_class=None) -> Optional[dict]:
+        note_round_trip()
+        return await self._coll("global_bans", op_class).find_one({"user_id": user_id}, **self._options(op_class))
+
+    async def add_ban(self, doc, op_class=None) -> bool:
+        # ban_user_id is not unique (legacy duplicates), so upsert on user_id
+        note_round_trip()
+        result = await self._coll("global_bans", op_class).update_one(
+            {"user_id": doc["user_id"]}, {"$setOnInsert": doc}, upsert=True
+        )
+        return result.upserted_id is not None
+
+    async def remove_ban(self, user_id, op_class=None) -> bool:
+        note_round_trip()
+        result = await self._coll("global_bans", op_class).delete_many({"user_id": user_id})
+        return result.deleted_count > 0
+
+    async def list_banned_ids(self) -> list[int]:
+        note_round_trip()
+        return await self.db.global_bans.distinct("user_id")
+
+    # ====== BULK READS ======
+    async def scan(self, collection, since=None, batch_size=1000):
+        # Analytics routing (secondaries) but no maxTimeMS: a full scan may legitimately run for minutes
+        time_field = SCAN_TIME_FIELDS[collection]
+        query = {time_field: {"$gte": since}} if since is not None else {}
+        cursor = self._coll(collection, ANALYTICS).find(query).sort("_id", 1).batch_size(batch_size)
+        batch = []
+        async for doc in cursor:
+            if not batch:
+                note_round_trip()
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    # ====== BID HISTORY ======
+    async def record_bid(self, doc, op_class=None) -> bool:
+        fields = {k: v for k, v in doc.items() if k != "_id"}
+        try:
+            note_round_trip()
+            result = await self._coll("bids", op_class).update_one(
+                {"_id": doc["_id"]}, {"$setOnInsert": fields}, upsert=True
+            )
+        except DuplicateKeyError:
+            return False  # concurrent retry of the same bid
+        return result.upserted_id is not None
+
+    @staticmethod
+    def _newest_first(after=None, before=None) -> tuple[dict, int]:
+        """Keyset filter and sort direction over (time, _id), for lists shown newest first."""
+        if before is not None:
+            time, doc_id = before
+            return {"$or": [{"time": {"$gt": time}}, {"time": time, "_id": {"$gt": doc_id}}]}, 1
+        if after is not None:
+            time, doc_id = after
+            return {"$or": [{"time": {"$lt": time}}, {"time": time, "_id": {"$lt": doc_id}}]}, -1
+        return {}, -1
+
+    async def list_bids(self, item_id, after=None, before=None, limit=10, fields=None, op_class=None):
+        keyset, order = self._newest_first(after, before)
+        query = {"item_id": item_id, **keyset}
+        cursor = self._coll("bids", op_class).find(
+            query, _projection(fields), **self._options(op_class)
+        ).sort([("time", order), ("_id", order)]).limit(limit)
+        note_round_trip()
+        items = await cursor.to_list(length=limit)
+        return items[::-1] if order == 1 else items
+
+    # ====== CHANGE FEED ======
+    async def watch_submissions(self, resume_token=None):
+        try:
+            async with self.db.submissions.watch(_WATCH_PIPELINE, resume_after=resume_token) as stream:
+                async for change in stream:
+                    yield _change_from_stream(change), stream.resume_token
+        except OperationFailure as e:
+            if e.code in _NO_CHANGE_STREAMS:
+                raise ChangeStreamUnavailable(str(e)) from e
+            if e.code in _RESUME_TOKEN_LOST:
+                raise ResumeTokenLost(str(e)) from e
+            raise
+
+    async def load_resume_token(self, name):
+        doc = await self.db.stream_state.find_one({"_id": name})
+        return doc.get("token") if doc else None
+
+    async def save_resume_token(self, name, token):
+        await self.db.stream_state.update_one(
+            {"_id": name}, {"$set": {"token": token, "saved_at": datetime.utcnow()}}, upsert=True
+        )
+
+    # ====== STATS ROLLUPS ======
+    async def inc_stats(self, keys, changes):
+        note_round_trip()
+        await self.db.stats.bulk_write(
+            [UpdateOne({"_id": key}, {"$inc": changes}, upsert=True) for key in keys], ordered=False
+        )
+
+    async def get_stats(self, keys, op_class=None):
+        note_round_trip()
+        cursor = self._coll("stats", op_class).find({"_id": {"$in": list(keys)}}, **self._options(op_class))
+        return {doc["_id"]: doc for doc in await cursor.to_list(length=len(keys))}
+
+    async def replace_stats(self, docs):
+        # Upserting replacements rather than delete + insert: an $inc upsert
+        # landing in between would fail the insert on a duplicate _id
+        if not docs:
+            return
+        note_round_trip()
+        await self.db.stats.bulk_write(
+            [ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in docs], ordered=False
+        )
+
+    # ====== AUDIT LOG ======
+    async def record_audit(self, doc):
+        # w=0: the entry is sent without waiting for the server to acknowledge it
+        note_round_trip()
+        await self.db.audit_log.with_options(write_concern=WriteConcern(w=0)).insert_one(dict(doc))
+
+    async def list_audit(self, actor_id=None, target=None, action=None, after=None, before=None, limit=10, op_class=None):
+        query = {}
+        if actor_id is not None:
+            query["actor_id"] = actor_id
+        if target is not None:
+            query["target"] = target
+        if action is not None:
+            query["action"] = action
+        keyset, order = self._newest_first(after, before)
+        query.update(keyset)
+        cursor = (
+            self._coll("audit_log", op_class).find(query, **self._options(op_class))
+            .sort([("time", order), ("_id", order)]).limit(limit)
+        )
+        note_round_trip()
+        items = await cursor.to_list(length=limit)
+        return items[::-1] if order == 1 else items
+
+    async def prune_audit(self, cutoff) -> int:
+        return 0  # the `audit_by_time` TTL index (utils/indexes.py) expires entries
@@ -0,0 +1,203 @@
+# storage/repository.py
+"""
+Named submission queries for the hot paths.
+
+Each call site asks for a submission through a named query that declares
+the exact fields it uses, and gets back an immutable record (a namedtuple
+with one attribute per field, `id` standing in for `_id`) instead of the
+whole document:
+
+    from storage import repository as repo
+
+    item_id = repo.parse_item_id(context.args[0])
+    item = await repo.end_auction(repo.AUCTION_RESULT, item_id, op_class=ADMIN)
+    if item:
+        print(item.waifu_name, item.current_bid)
+
+Adding a field to a handler therefore means adding it to its query here,
+which keeps projections honest as the handlers grow.
+
+Handlers wrapped in `@tracked("name")` count the database round trips
+each invocation makes (backends report them through
+`storage.base.note_round_trip`).  The totals are shown by /status, and
+an invocation over its budget is printed as a warning.
+"""
+import functools
+import time
+from collections import namedtuple
+from datetime import datetime
+from typing import Optional, Union
+
+from bson import ObjectId
+
+from storage import get_store, LIVE_STATUS
+from storage.base import _round_trips
+from utils.single_flight import single_flight
+
+
+# ====== NAMED QUERIES ======
+class NamedQuery:
+    """A field list plus the record type its results are returned as."""
+
+    __slots__ = ("name", "fields", "record")
+
+    def __init__(self, name: str, fields: tuple):
+        self.name = name
+        self.fields = fields
+        self.record = namedtuple(name, ("id",) + fields, defaults=(None,) * (len(fields) + 1))
+
+    def wrap(self, doc: Optional[dict]):
+        if doc is None:
+            return None
+        return self.record(doc["_id"], *(doc.get(field) for field in self.fields))
+
+    def __repr__(self):
+        return f"<NamedQuery {self.name} ({', '.join(self.fields)})>"
+
+
+# /bid: eligibility checks before the compare-and-set
+BID_CHECK = NamedQuery("BidCheck", ("status", "is_expired", "user_id", "current_bid", "base_bid"))
+
+# /bid: what the refreshed channel / group caption needs after a successful bid
+BID_PLACED = NamedQuery(
+    "BidPlaced",
+    ("type", "anime_name", "waifu_name", "rarity", "rarity_name", "base_bid", "channel_message_id", "group_message_id"),
+)
+
+# /bid: the bid that beat us when the compare-and-set fails
+BID_LATEST = NamedQuery("BidLatest", ("current_bid", "base_bid"))
+
+# approve / reject buttons in the log group
+APPROVAL = NamedQuery(
+    "ApprovalItem",
+    (
+        "status", "type", "user_id", "user_name", "username", "anime_name", "waifu_name",
+        "rarity", "rarity_name", "base_bid", "optional_tag", "submitted_time", "file_id",
+    ),
+)
+
+# paced publishing of bulk-imported items (tasks/publisher.py)
+PUBLISH_QUEUE = NamedQuery("QueuedItem", APPROVAL.fields + ("publish_attempts", "group_message_id"))
+
+# end-of-auction announcements (expiry task and /forceend)
+AUCTION_RESULT = NamedQuery(
+    "AuctionResult",
+    (
+        "type", "user_id", "username", "last_bidder_id", "last_bidder_username", "waifu_name",
+        "anime_name", "rarity", "rarity_name", "current_bid", "optional_tag", "file_id",
+        "channel_id", "channel_message_id",
+    ),
+)
+
+# why a guarded write did not match: missing item, or which status it is in
+ITEM_STATUS = NamedQuery("ItemStatus", ("status",))
+
+# /rm: the posts to delete along with the item
+POST_MESSAGES = NamedQuery("PostMessages", ("status", "channel_id", "channel_message_id", "group_id", "group_message_id"))
+
+
+# ====== ID PARSING ======
+def parse_item_id(raw) -> Optional[Union[int, ObjectId]]:
+    """
+    Item IDs are counter integers; very old items still have ObjectIds.
+    Returns None for anything else.
+    """
+    raw = str(raw).strip()
+    if raw.isdigit():
+        return int(raw)
+    if ObjectId.is_valid(raw):
+        return ObjectId(raw)
+    return None
+
+
+# ====== QUERIES ======
+async def find(query: NamedQuery, item_id, op_class: str = None):
+    """
+    Live first, then the archive. Returns (record, archived) or (None, False).
+    Identical concurrent lookups share one read (utils/single_flight.py).
+    """
+    async def read():
+        doc, archived = await get_store().get_submission(item_id, query.fields, op_class=op_class)
+        return query.wrap(doc), archived
+
+    return await single_flight(("find", query.name, item_id, op_class), read)
+
+
+async def update(query: NamedQuery, item_id, changes: dict, expect: dict = None, op_class: str = None):
+    """Guarded update that returns the updated record (or None) in the same round trip."""
+    doc = await get_store().update_and_get(item_id, changes, expect, query.fields, op_class=op_class)
+    return query.wrap(doc)
+
+
+async def end_auction(query: NamedQuery, item_id, ended_at: datetime = None, op_class: str = None):
+    """
+    Claims a running auction: flips it to ended only if it is still live, so
+    the expiry task and /forceend can never announce the same item twice.
+    `ended_at` also moves `expires_at` (early endings).
+    Returns the record, or None if it was not live.
+    """
+    changes = {"is_expired": True, "status": "ended"}
+    if ended_at is not None:
+        changes["expires_at"] = ended_at
+    return await update(query, item_id, changes, expect={"status": LIVE_STATUS}, op_class=op_class)
+
+
+async def remove(query: NamedQuery, item_id, op_class: str = None):
+    """Deletes a submission (live or archived) and returns its record, or None."""
+    return query.wrap(await get_store().pop_submission(item_id, query.fields, op_class=op_class))
+
+
+async def place_bid(query: NamedQuery, item_id, expected_bid, changes: dict, history_entry: dict, history_limit: int, op_class: str = None):
+    doc = await get_store().place_bid(
+        item_id, expected_bid, changes, history_entry, history_limit, fields=query.fields, op_class=op_class
+    )
+    return query.wrap(doc)
+
+
+async def list_expired_ids(now: datetime) -> list:
+    """IDs of live auctions past their end time (only `_id` is fetched)."""
+    return [doc["_id"] for doc in await get_store().list_expired_live(now, fields=("_id",))]
+
+
+# ====== ROUND-TRIP ACCOUNTING ======
+_stats: dict[str, dict] = {}
+
+
+def tracked(name: str, budget: int = None):
+    """
+    Counts the round trips one invocation of the wrapped coroutine makes.
+    With `budget`, invocations that need more are printed as warnings.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            counter = [0]
+            token = _round_trips.set(counter)
+            started = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                _round_trips.reset(token)
+                _record(name, counter[0], time.perf_counter() - started, budget)
+
+        return wrapper
+
+    return decorator
+
+
+def _record(name: str, round_trips: int, elapsed: float, budget: Optional[int]):
+    stats = _stats.setdefault(name, {"name": name, "calls": 0, "round_trips": 0, "max": 0, "over_budget": 0})
+    stats["calls"] += 1
+    stats["round_trips"] += round_trips
+    stats["max"] = max(stats["max"], round_trips)
+    if budget is not None and round_trips > budget:
+        stats["over_budget"] += 1
+        print(f"⚠️ {name} made {round_trips} round trips (budget {budget}) in {elapsed * 1000:.0f} ms")
+
+
+def round_trip_stats() -> list[dict]:
+    """Per-handler totals since startup, with the average per invocation."""
+    return [
+        {**stats, "avg": stats["round_trips"] / stats["calls"]}
+        for stats in sorted(_stats.values(), key=lambda s: s["name"])
+    ]
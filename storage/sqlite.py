@@ -0,0 +1,666 @@
+# storage/sqlite.py
+"""
+SQLite backend (aiosqlite), for small single-node deployments.
+
+    STORAGE_BACKEND=sqlite SQLITE_PATH=/data/amongo.db python main.py
+
+Each table keeps the full document as JSON in `doc`, plus the handful of
+columns the bot filters and sorts on, with indexes mirroring
+utils/indexes.py.  The database runs in WAL mode, so reads never wait for
+the writer, and every read-modify-write (bids, guarded updates, counters)
+runs inside `BEGIN IMMEDIATE`, which keeps it atomic even when several
+processes share the file.
+
+Datetimes are stored as integer microseconds since the epoch (naive UTC),
+in the indexed columns and as {"$date": us} inside the JSON.
+"""
+import asyncio
+import json
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Optional
+
+try:
+    import aiosqlite
+except ImportError:  # optional dependency, only needed for STORAGE_BACKEND=sqlite
+    aiosqlite = None
+
+from storage.base import (
+    Storage,
+    LIVE_STATUS,
+    DRAFT_STATUS,
+    FINISHED_STATUSES,
+    OPEN_STATUSES,
+    SCAN_TIME_FIELDS,
+    Fields,
+    note_round_trip,
+    project,
+    matches,
+    bid_matches,
+    push_history,
+    apply_increments,
+)
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Set while a `_write` transaction runs, so its inner reads are not counted separately
+_in_transaction: ContextVar = ContextVar("sqlite_in_transaction", default=False)
+
+SUBMISSION_COLUMNS = ("status", "type", "rarity_name", "user_id", "is_expired", "expires_at", "submitted_time")
+
+SCHEMA = [
+    *(
+        f"""CREATE TABLE IF NOT EXISTS {table} (
+            id INTEGER PRIMARY KEY,
+            status TEXT,
+            type TEXT,
+            rarity_name TEXT,
+            user_id INTEGER,
+            is_expired INTEGER,
+            expires_at INTEGER,
+            submitted_time INTEGER,
+            doc TEXT NOT NULL
+        )"""
+        for table in ("submissions", "submissions_archive")
+    ),
+    """CREATE TABLE IF NOT EXISTS users (
+        user_id INTEGER PRIMARY KEY,
+        is_banned INTEGER NOT NULL DEFAULT 0,
+        doc TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS global_bans (
+        user_id INTEGER PRIMARY KEY,
+        doc TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS bids (
+        id TEXT PRIMARY KEY,
+        item_id INTEGER NOT NULL,
+        time INTEGER NOT NULL,
+        doc TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS audit_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        time INTEGER NOT NULL,
+        action TEXT,
+        actor_id INTEGER,
+        target TEXT,
+        doc TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS stats (
+        id TEXT PRIMARY KEY,
+        doc TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS counters (
+        name TEXT PRIMARY KEY,
+        sequence_value INTEGER NOT NULL DEFAULT 0,
+        wasted_ids INTEGER NOT NULL DEFAULT 0
+    )""",
+    # Same shapes as utils/indexes.py (equality -> sort -> range)
+    "CREATE INDEX IF NOT EXISTS live_by_type ON submissions (status, type, expires_at)",
+    "CREATE INDEX IF NOT EXISTS live_by_type_id ON submissions (status, type, id, expires_at)",
+    "CREATE INDEX IF NOT EXISTS live_by_type_rarity_id ON submissions (status, type, rarity_name, id, expires_at)",
+    "CREATE INDEX IF NOT EXISTS expiry_sweep ON submissions (status, is_expired, expires_at)",
+    "CREATE INDEX IF NOT EXISTS draft_sweep ON submissions (submitted_time) WHERE status = 'draft'",
+    "CREATE INDEX IF NOT EXISTS archive_sweep ON submissions (status, expires_at)",
+    "CREATE INDEX IF NOT EXISTS seller_items ON submissions (user_id, type, status)",
+    "CREATE INDEX IF NOT EXISTS publish_queue ON submissions (status, id)",
+    "CREATE INDEX IF NOT EXISTS archive_seller_items ON submissions_archive (user_id, type, status)",
+    # /bids pages order by (time, id); id is not the rowid here, so it is indexed
+    "DROP INDEX IF EXISTS bids_by_item_time",
+    "CREATE INDEX IF NOT EXISTS bids_by_item_time_id ON bids (item_id, time, id)",
+    "CREATE INDEX IF NOT EXISTS audit_by_time ON audit_log (time)",
+    "CREATE INDEX IF NOT EXISTS audit_by_actor ON audit_log (actor_id, time)",
+    "CREATE INDEX IF NOT EXISTS audit_by_target ON audit_log (target, time)",
+]
+
+
+# ====== ENCODING ======
+def to_micros(value: Optional[datetime]) -> Optional[int]:
+    if value is None:
+        return None
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def from_micros(value: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=value)
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return {"$date": to_micros(value)}
+    return str(value)  # e.g. a stray ObjectId
+
+
+def _json_hook(obj: dict):
+    if len(obj) == 1 and "$date" in obj:
+        return from_micros(obj["$date"])
+    return obj
+
+
+def encode(doc: dict) -> str:
+    return json.dumps(doc, default=_json_default, ensure_ascii=False, separators=(",", ":"))
+
+
+def decode(text: str) -> dict:
+    return json.loads(text, object_hook=_json_hook)
+
+
+def _int_key(item_id) -> Optional[int]:
+    """SQLite only holds numeric item IDs (legacy ObjectIds never existed here)."""
+    if isinstance(item_id, bool):
+        return None
+    if isinstance(item_id, int):
+        return item_id
+    if isinstance(item_id, str) and item_id.isdigit():
+        return int(item_id)
+    return None
+
+
+def _submission_row(doc: dict) -> tuple:
+    is_expired = doc.get("is_expired")
+    return (
+        doc["_id"],
+        doc.get("status"),
+        doc.get("type"),
+        doc.get("rarity_name"),
+        doc.get("user_id"),
+        None if is_expired is None else int(bool(is_expired)),
+        to_micros(doc.get("expires_at")),
+        to_micros(doc.get("submitted_time")),
+        encode(doc),
+    )
+
+
+_INSERT_SUBMISSION = (
+    "INSERT {verb} INTO {table} (id, status, type, rarity_name, user_id, is_expired, expires_at, submitted_time, doc) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+class SQLiteStorage(Storage):
+    name = "sqlite"
+
+    def __init__(self, path: str = "amongo.db"):
+        if aiosqlite is None:
+            raise RuntimeError("STORAGE_BACKEND=sqlite needs the aiosqlite package (pip install aiosqlite)")
+        self.path = path
+        self._conn = None
+        self._write_lock = asyncio.Lock()
+
+    # ====== CONNECTION ======
+    async def init(self):
+        if self._conn is not None:
+            return True
+        conn = await aiosqlite.connect(self.path, isolation_level=None)  # explicit transactions
+        await conn.execute("PRAGMA journal_mode=WAL")
+        await conn.execute("PRAGMA synchronous=NORMAL")  # durable across app crashes in WAL mode
+        await conn.execute("PRAGMA busy_timeout=5000")
+        await conn.execute("PRAGMA foreign_keys=OFF")
+        for statement in SCHEMA:
+            await conn.execute(statement)
+        self._conn = conn
+        print(f"✅ SQLite storage ready ({self.path}, WAL)")
+        return True
+
+    async def close(self):
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+    async def ping(self):
+        await self._fetchone("SELECT 1")
+
+    def diagnostics(self) -> dict:
+        return {"backend": self.name, "path": self.path}
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            raise RuntimeError("SQLite storage used before init()")
+        return self._conn
+
+    async def _fetchone(self, sql: str, params: tuple = ()):
+        if not _in_transaction.get():
+            note_round_trip()
+        async with self.conn.execute(sql, params) as cursor:
+            return await cursor.fetchone()
+
+    async def _fetchall(self, sql: str, params: tuple = ()):
+        if not _in_transaction.get():
+            note_round_trip()
+        async with self.conn.execute(sql, params) as cursor:
+            return await cursor.fetchall()
+
+    async def _write(self, fn):
+        """
+        Runs `fn()` inside one IMMEDIATE transaction (one writer at a time).
+        The whole transaction counts as a single round trip.
+        """
+        note_round_trip()
+        async with self._write_lock:
+            token = _in_transaction.set(True)
+            await self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = await fn()
+            except BaseException:
+                await self.conn.execute("ROLLBACK")
+                raise
+            finally:
+                _in_transaction.reset(token)
+            await self.conn.execute("COMMIT")
+            return result
+
+    # ====== COUNTERS ======
+    async def reserve_ids(self, name: str, count: int) -> int:
+        async def op():
+            row = await self._fetchone(
+                "INSERT INTO counters (name, sequence_value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET sequence_value = sequence_value + excluded.sequence_value "
+                "RETURNING sequence_value",
+                (name, count),
+            )
+            return row[0]
+
+        return await self._write(op)
+
+    async def add_wasted_ids(self, name: str, count: int):
+        async def op():
+            await self.conn.execute(
+                "INSERT INTO counters (name, wasted_ids) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET wasted_ids = wasted_ids + excluded.wasted_ids",
+                (name, count),
+            )
+
+        await self._write(op)
+
+    async def get_counter(self, name: str) -> int:
+        row = await self._fetchone("SELECT sequence_value FROM counters WHERE name = ?", (name,))
+        return row[0] if row else 0
+
+    # ====== SUBMISSIONS ======
+    async def _load(self, table: str, key: int) -> Optional[dict]:
+        row = await self._fetchone(f"SELECT doc FROM {table} WHERE id = ?", (key,))
+        return decode(row[0]) if row else None
+
+    async def _store(self, table: str, doc: dict, replace: bool = True):
+        await self.conn.execute(
+            _INSERT_SUBMISSION.format(verb="OR REPLACE" if replace else "", table=table),
+            _submission_row(doc),
+        )
+
+    async def get_submission(self, item_id, fields: Fields = None, op_class: str = None):
+        key = _int_key(item_id)
+        if key is None:
+            return None, False
+        for table, archived in (("submissions", False), ("submissions_archive", True)):
+            doc = await self._load(table, key)
+            if doc is not None:
+                return project(doc, fields, exclude_history=True), archived
+        return None, False
+
+    async def insert_submission(self, doc: dict):
+        if _int_key(doc.get("_id")) is None:
+            raise ValueError(f"SQLite storage needs a numeric _id, got {doc.get('_id')!r}")
+        await self._write(lambda: self._store("submissions", doc, replace=False))
+
+    async def insert_submissions(self, docs):
+        for doc in docs:
+            if _int_key(doc.get("_id")) is None:
+                raise ValueError(f"SQLite storage needs a numeric _id, got {doc.get('_id')!r}")
+
+        async def op():
+            inserted, duplicates = 0, []
+            for doc in docs:
+                cursor = await self.conn.execute(
+                    _INSERT_SUBMISSION.format(verb="OR IGNORE", table="submissions"), _submission_row(doc)
+                )
+                if cursor.rowcount:
+                    inserted += 1
+                else:
+                    duplicates.append(doc["_id"])
+            return inserted, duplicates
+
+        return await self._write(op)
+
+    async def update_submission(self, item_id, changes: dict, expect: dict = None, op_class: str = None) -> bool:
+        key = _int_key(item_id)
+        if key is None:
+            return False
+
+        async def op():
+            doc = await self._load("submissions", key)
+            if doc is None or not matches(doc, expect):
+                return False
+            doc.update(changes)
+            await self._store("submissions", doc)
+            return True
+
+        return await self._write(op)
+
+    async def update_and_get(self, item_id, changes, expect=None, fields=None, op_class=None):
+        key = _int_key(item_id)
+        if key is None:
+            return None
+
+        async def op():
+            doc = await self._load("submissions", key)
+            if doc is None or not matches(doc, expect):
+                return None
+            doc.update(changes)
+            await self._store("submissions", doc)
+            return project(doc, fields, exclude_history=True)
+
+        return await self._write(op)
+
+    async def delete_submission(self, item_id, expect: dict = None, op_class: str = None) -> bool:
+        key = _int_key(item_id)
+        if key is None:
+            return False
+
+        async def op():
+            for table in ("submissions", "submissions_archive"):
+                doc = await self._load(table, key)
+                if doc is not None and matches(doc, expect):
+                    await self.conn.execute(f"DELETE FROM {table} WHERE id = ?", (key,))
+                    return True
+            return False
+
+        return await self._write(op)
+
+    async def pop_submission(self, item_id, fields=None, op_class=None):
+        key = _int_key(item_id)
+        if key is None:
+            return None
+
+        async def op():
+            for table in ("submissions", "submissions_archive"):
+                doc = await self._load(table, key)
+                if doc is not None:
+                    await self.conn.execute(f"DELETE FROM {table} WHERE id = ?", (key,))
+                    return project(doc, fields, exclude_history=True)
+            return None
+
+        return await self._write(op)
+
+    async def place_bid(self, item_id, expected_bid, changes, history_entry, history_limit, fields=None, op_class=None):
+        key = _int_key(item_id)
+        if key is None:
+            return None
+
+        async def op():
+            doc = await self._load("submissions", key)
+            if doc is None or not bid_matches(doc, expected_bid):
+                return None
+            doc.update(changes)
+            push_history(doc, history_entry, history_limit)
+            await self._store("submissions", doc)
+            return project(doc, fields, exclude_history=True)
+
+        return await self._write(op)
+
+    @staticmethod
+    def _live_where(item_type: str, now: datetime, rarity_name: str = None) -> tuple[str, list]:
+        where = "status = ? AND type = ?"
+        params = [LIVE_STATUS, item_type]
+        if rarity_name is not None:
+            where += " AND rarity_name = ?"
+            params.append(rarity_name)
+        where += " AND expires_at > ?"
+        params.append(to_micros(now))
+        return where, params
+
+    async def list_live(self, item_type, now, rarity_name=None, after=None, before=None, limit=10, fields=None, op_class=None):
+        where, params = self._live_where(item_type, now, rarity_name)
+        order = "ASC"
+        if before is not None:
+            where += " AND id < ?"
+            params.append(before)
+            order = "DESC"
+        elif after is not None:
+            where += " AND id > ?"
+            params.append(after)
+        rows = await self._fetchall(
+            f"SELECT doc FROM submissions WHERE {where} ORDER BY id {order} LIMIT ?", (*params, limit)
+        )
+        items = [project(decode(row[0]), fields, exclude_history=True) for row in rows]
+        return items[::-1] if order == "DESC" else items
+
+    async def count_live(self, item_type, now, rarity_name=None, op_class=None) -> int:
+        where, params = self._live_where(item_type, now, rarity_name)
+        row = await self._fetchone(f"SELECT COUNT(*) FROM submissions WHERE {where}", tuple(params))
+        return row[0]
+
+    async def list_seller_live(self, user_id, item_type, limit=100, fields=None, op_class=None):
+        rows = await self._fetchall(
+            "SELECT doc FROM submissions WHERE user_id = ? AND type = ? AND status = ? AND is_expired = 0 LIMIT ?",
+            (user_id, item_type, LIVE_STATUS, limit),
+        )
+        return [project(decode(row[0]), fields, exclude_history=True) for row in rows]
+
+    async def list_expired_live(self, now, fields=None):
+        rows = await self._fetchall(
+            "SELECT doc FROM submissions WHERE status = ? AND (is_expired IS NULL OR is_expired = 0) AND expires_at <= ?",
+            (LIVE_STATUS, to_micros(now)),
+        )
+        return [project(decode(row[0]), fields, exclude_history=True) for row in rows]
+
+    async def count_submissions(self, status, op_class=None) -> int:
+        row = await self._fetchone("SELECT COUNT(*) FROM submissions WHERE status = ?", (status,))
+        return row[0]
+
+    async def list_by_status(self, status, limit=10, fields=None):
+        rows = await self._fetchall(
+            "SELECT doc FROM submissions WHERE status = ? ORDER BY id LIMIT ?", (status, limit)
+        )
+        return [project(decode(row[0]), fields, exclude_history=True) for row in rows]
+
+    async def list_open(self, fields=None):
+        placeholders = ",".join("?" * len(OPEN_STATUSES))
+        rows = await self._fetchall(f"SELECT doc FROM submissions WHERE status IN ({placeholders})", OPEN_STATUSES)
+        return [project(decode(row[0]), fields, exclude_history=True) for row in rows]
+
+    async def archive_finished(self, cutoff, limit) -> int:
+        placeholders = ",".join("?" * len(FINISHED_STATUSES))
+
+        async def op():
+            rows = await self._fetchall(
+                f"SELECT doc FROM submissions WHERE status IN ({placeholders}) AND expires_at <= ? ORDER BY id LIMIT ?",
+                (*FINISHED_STATUSES, to_micros(cutoff), limit),
+            )
+            now = datetime.utcnow()
+            for row in rows:
+                doc = decode(row[0])
+                doc["archived_at"] = now
+                await self._store("submissions_archive", doc)
+                await self.conn.execute("DELETE FROM submissions WHERE id = ?", (doc["_id"],))
+            return len(rows)
+
+        # One transaction per batch, so the copy and the delete land together
+        return await self._write(op)
+
+    async def delete_drafts_before(self, cutoff) -> int:
+        async def op():
+            cursor = await self.conn.execute(
+                "DELETE FROM submissions WHERE status = ? AND submitted_time <= ?",
+                (DRAFT_STATUS, to_micros(cutoff)),
+            )
+            return cursor.rowcount
+
+        return await self._write(op)
+
+    # ====== USERS ======
+    async def get_user(self, user_id, op_class=None) -> Optional[dict]:
+        row = await self._fetchone("SELECT doc FROM users WHERE user_id = ?", (user_id,))
+        return decode(row[0]) if row else None
+
+    async def touch_user(self, user_id, full_name, username, now) -> bool:
+        async def op():
+            row = await self._fetchone("SELECT doc FROM users WHERE user_id = ?", (user_id,))
+            if row:
+                doc = decode(row[0])
+                doc["last_seen"] = now
+                await self.conn.execute("UPDATE users SET doc = ? WHERE user_id = ?", (encode(doc), user_id))
+                return False
+            doc = {
+                "user_id": user_id,
+                "full_name": full_name,
+                "username": username,
+                "created_at": now,
+                "last_seen": now,
+            }
+            await self.conn.execute(
+                "INSERT INTO users (user_id, is_banned, doc) VALUES (?, 0, ?)", (user_id, encode(doc))
+            )
+            return True
+
+        return await self._write(op)
+
+    async def count_users(self, banned, op_class=None) -> int:
+        row = await self._fetchone("SELECT COUNT(*) FROM users WHERE is_banned = ?", (int(banned),))
+        return row[0]
+
+    # ====== GLOBAL BANS ======
+    async def get_ban(self, user_id, op_class=None) -> Optional[dict]:
+        row = await self._fetchone("SELECT doc FROM global_bans WHERE user_id = ?", (user_id,))
+        return decode(row[0]) if row else None
+
+    async def add_ban(self, doc, op_class=None) -> bool:
+        async def op():
+            cursor = await self.conn.execute(
+                "INSERT OR IGNORE INTO global_bans (user_id, doc) VALUES (?, ?)", (doc["user_id"], encode(doc))
+            )
+            return cursor.rowcount > 0
+
+        return await self._write(op)
+
+    async def remove_ban(self, user_id, op_class=None) -> bool:
+        async def op():
+            cursor = await self.conn.execute("DELETE FROM global_bans WHERE user_id = ?", (user_id,))
+            return cursor.rowcount > 0
+
+        return await self._write(op)
+
+    async def list_banned_ids(self) -> list[int]:
+        return [row[0] for row in await self._fetchall("SELECT user_id FROM global_bans")]
+
+    # ====== BULK READS ======
+    # Indexed time column per table, where there is one (users are filtered after decoding)
+    _SCAN_TIME_COLUMNS = {"submissions": "submitted_time", "submissions_archive": "submitted_time", "bids": "time"}
+
+    async def scan(self, collection, since=None, batch_size=1000):
+        time_field = SCAN_TIME_FIELDS[collection]
+        column = self._SCAN_TIME_COLUMNS.get(collection)
+        where, params = "rowid > ?", []
+        if since is not None and column:
+            where += f" AND {column} >= ?"
+            params.append(to_micros(since))
+        last = -(2 ** 63)  # rowid is the user_id for users, which can be 0 or negative
+        while True:
+            # Keyset on rowid, so every batch is one short indexed read
+            rows = await self._fetchall(
+                f"SELECT rowid, doc FROM {collection} WHERE {where} ORDER BY rowid LIMIT ?",
+                (last, *params, batch_size),
+            )
+            if not rows:
+                return
+            last = rows[-1][0]
+            batch = [decode(row[1]) for row in rows]
+            if since is not None and not column:
+                batch = [d for d in batch if d.get(time_field) is not None and d[time_field] >= since]
+            if batch:
+                yield batch
+            if len(rows) < batch_size:
+                return
+
+    # ====== BID HISTORY ======
+    async def record_bid(self, doc, op_class=None) -> bool:
+        async def op():
+            cursor = await self.conn.execute(
+                "INSERT OR IGNORE INTO bids (id, item_id, time, doc) VALUES (?, ?, ?, ?)",
+                (doc["_id"], doc["item_id"], to_micros(doc["time"]), encode(doc)),
+            )
+            return cursor.rowcount > 0
+
+        return await self._write(op)
+
+    async def list_bids(self, item_id, after=None, before=None, limit=10, fields=None, op_class=None):
+        key = _int_key(item_id)
+        if key is None:
+            return []
+        where, params, order = "item_id = ?", [key], "DESC"
+        if before is not None:
+            where += " AND (time, id) > (?, ?)"
+            params.extend((to_micros(before[0]), before[1]))
+            order = "ASC"
+        elif after is not None:
+            where += " AND (time, id) < (?, ?)"
+            params.extend((to_micros(after[0]), after[1]))
+        rows = await self._fetchall(
+            f"SELECT doc FROM bids WHERE {where} ORDER BY time {order}, id {order} LIMIT ?", (*params, limit)
+        )
+        items = [project(decode(row[0]), fields) for row in rows]
+        return items[::-1] if order == "ASC" else items
+
+    # ====== STATS ROLLUPS ======
+    async def inc_stats(self, keys, changes):
+        async def op():
+            for key in keys:
+                row = await self._fetchone("SELECT doc FROM stats WHERE id = ?", (key,))
+                doc = decode(row[0]) if row else {"_id": key}
+                apply_increments(doc, changes)
+                await self.conn.execute("INSERT OR REPLACE INTO stats (id, doc) VALUES (?, ?)", (key, encode(doc)))
+
+        await self._write(op)
+
+    async def get_stats(self, keys, op_class=None):
+        keys = list(keys)
+        rows = await self._fetchall(
+            f"SELECT doc FROM stats WHERE id IN ({','.join('?' * len(keys))})", keys
+        )
+        return {doc["_id"]: doc for doc in (decode(row[0]) for row in rows)}
+
+    async def replace_stats(self, docs):
+        async def op():
+            await self.conn.executemany(
+                "INSERT OR REPLACE INTO stats (id, doc) VALUES (?, ?)", [(doc["_id"], encode(doc)) for doc in docs]
+            )
+
+        await self._write(op)
+
+    # ====== AUDIT LOG ======
+    async def record_audit(self, doc):
+        async def op():
+            await self.conn.execute(
+                "INSERT INTO audit_log (time, action, actor_id, target, doc) VALUES (?, ?, ?, ?, ?)",
+                (to_micros(doc["time"]), doc.get("action"), doc.get("actor_id"), doc.get("target"), encode(doc)),
+            )
+
+        await self._write(op)
+
+    async def list_audit(self, actor_id=None, target=None, action=None, after=None, before=None, limit=10, op_class=None):
+        where, params, order = ["1 = 1"], [], "DESC"
+        for column, value in (("actor_id", actor_id), ("target", target), ("action", action)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        # The time indexes end with the rowid (id), so (time, id) order comes from them
+        if before is not None:
+            where.append("(time, id) > (?, ?)")
+            params.extend((to_micros(before[0]), before[1]))
+            order = "ASC"
+        elif after is not None:
+            where.append("(time, id) < (?, ?)")
+            params.extend((to_micros(after[0]), after[1]))
+        rows = await self._fetchall(
+            f"SELECT id, doc FROM audit_log WHERE {' AND '.join(where)} ORDER BY time {order}, id {order} LIMIT ?",
+            (*params, limit),
+        )
+        items = [{**decode(row[1]), "_id": row[0]} for row in rows]
+        return items[::-1] if order == "ASC" else items
+
+    async def prune_audit(self, cutoff) -> int:
+        async def op():
+            cursor = await self.conn.execute("DELETE FROM audit_log WHERE time < ?", (to_micros(cutoff),))
+            return cursor.rowcount
+
+        return await self._write(op)
@@ -0,0 +1,31 @@
+import asyncio
+from datetime import datetime, timedelta
+from storage import store
+from utils.audit import prune_audit_log
+from config import ARCHIVE_AFTER_HOURS, ARCHIVE_BATCH_SIZE, ARCHIVE_INTERVAL_MINUTES
+
+
+async def archive_finished_submissions(batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    cutoff = datetime.utcnow() - timedelta(hours=ARCHIVE_AFTER_HOURS)
+    total = 0
+    while True:
+        # Copy-then-delete per batch; see store.archive_finished
+        moved = await store.archive_finished(cutoff, batch_size)
+        total += moved
+        if moved < batch_size:
+            break
+        await asyncio.sleep(1)  # keep the database responsive between batches
+    if total:
+        print(f"🗄️ Archived {total} finished submission(s).")
+    return total
+
+
+async def start_archiver_task(interval_minutes: int = ARCHIVE_INTERVAL_MINUTES):
+    """Run the archiver (and audit-log retention) every `interval_minutes` minutes."""
+    while True:
+        try:
+            await archive_finished_submissions()
+            await prune_audit_log()
+        except Exception as e:
+            print(f"⚠️ Archiver task error: {e}")
+        await asyncio.sleep(interval_minutes * 60)
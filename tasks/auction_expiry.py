@@ -1,53 +1,56 @@
 import asyncio
 from datetime import datetime
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
-from utils.database import submissions_collection as db
+from storage import repository as repo
 from config import LOG_GROUP_ID, GROUP_ID
 from utils.tg_links import build_user_link
+from utils import stats, live_auctions
 
 
+@repo.tracked("expiry")
 async def check_expired_auctions(bot):
     now = datetime.utcnow()
 
-    expired_items_cursor = db.find({
-        "status": "approved",
-        "is_expired": {"$ne": True},
-        "expires_at": {"$lte": now}
-    })
+    expired_ids = await repo.list_expired_ids(now)
 
-    expired_items = [item async for item in expired_items_cursor]
-
-    if not expired_items:
+    if not expired_ids:
         print("✅ No expired auctions found.")
         return
 
-    for submission in expired_items:
-        item_id = submission.get("_id")
+    for item_id in expired_ids:
         try:
             print(f"🔍 Processing expired auction ID: {item_id}")
 
+            # === Claim it first, so it is announced exactly once ===
+            submission = await repo.end_auction(repo.AUCTION_RESULT, item_id)
+            if submission is None:
+                print(f"↪️ Auction {item_id} was already ended elsewhere, skipping.")
+                continue
+            stats.auction_ended(submission)
+            live_auctions.discard(item_id)
+
             # === Prepare announcement text ===
-            type_name = (submission.get("type") or "Waifu").capitalize()
-            rarity_text = f"💎 Rarity: {submission.get('rarity_name', '')} ({submission.get('rarity', '')})"
+            type_name = (submission.type or "Waifu").capitalize()
+            rarity_text = f"💎 Rarity: {submission.rarity_name or ''} ({submission.rarity or ''})"
 
-            owner_id = submission.get("user_id")
-            winner_id = submission.get("last_bidder_id")
+            owner_id = submission.user_id
+            winner_id = submission.last_bidder_id
 
-            owner_link = build_user_link(owner_id, submission.get("username")) if owner_id else "Unknown Seller"
-            winner_link = build_user_link(winner_id, submission.get("last_bidder_username")) if winner_id else "No Winner"
+            owner_link = build_user_link(owner_id, submission.username) if owner_id else "Unknown Seller"
+            winner_link = build_user_link(winner_id, submission.last_bidder_username) if winner_id else "No Winner"
 
             announcement = (
                 f"🎉 <b>Auction Ended!</b>\n\n"
-                f"💞 <b>{type_name}</b>: <code>{submission.get('waifu_name', '')}</code>\n"
-                f"🎬 <b>Anime:</b> <code>{submission.get('anime_name', '')}</code>\n"
+                f"💞 <b>{type_name}</b>: <code>{submission.waifu_name or ''}</code>\n"
+                f"🎬 <b>Anime:</b> <code>{submission.anime_name or ''}</code>\n"
                 f"{rarity_text}\n\n"
-                f"💰 <b>Winning Bid:</b> <code>{submission.get('current_bid', 'N/A')}</code>\n"
+                f"💰 <b>Winning Bid:</b> <code>{submission.current_bid if submission.current_bid is not None else 'N/A'}</code>\n"
                 f"👤 <b>Seller:</b> {owner_link}\n"
                 f"🏆 <b>Winner:</b> {winner_link}\n\n"
                 f"🆔 <b>Item ID:</b> <code>{item_id}</code>"
             )
 
-            optional_tag = submission.get("optional_tag")
+            optional_tag = submission.optional_tag
             if optional_tag and optional_tag != "—":
                 announcement += f"\n{optional_tag}"
 
@@ -63,7 +66,7 @@ async def check_expired_auctions(bot):
             try:
                 await bot.send_photo(
                     chat_id=GROUP_ID,
-                    photo=submission.get("file_id"),
+                    photo=submission.file_id,
                     caption=announcement,
                     parse_mode="HTML",
                     reply_markup=reply_markup
@@ -72,8 +75,8 @@ async def check_expired_auctions(bot):
                 print(f"⚠️ Failed to send group announcement for item {item_id}: {e}")
 
             # === 2️⃣ Edit channel message ===
-            channel_message_id = submission.get("channel_message_id")
-            channel_id = submission.get("channel_id")
+            channel_message_id = submission.channel_message_id
+            channel_id = submission.channel_id
             if channel_message_id and channel_id:
                 try:
                     await bot.edit_message_caption(
@@ -92,9 +95,9 @@ async def check_expired_auctions(bot):
                     winner_msg = (
                         f"🎉 Congratulations {winner_link}!\n\n"
                         f"You’ve <b>won</b> the auction for:\n"
-                        f"💞 <b>{type_name}</b>: {submission.get('waifu_name', '')}\n"
-                        f"🎬 <b>Anime:</b> {submission.get('anime_name', '')}\n\n"
-                        f"💰 <b>Final Bid:</b> <code>{submission.get('current_bid')}</code>\n"
+                        f"💞 <b>{type_name}</b>: {submission.waifu_name or ''}\n"
+                        f"🎬 <b>Anime:</b> {submission.anime_name or ''}\n\n"
+                        f"💰 <b>Final Bid:</b> <code>{submission.current_bid}</code>\n"
                         f"🆔 <b>Item ID:</b> <code>{item_id}</code>\n\n"
                         f"Please contact the seller for delivery 💎"
                     )
@@ -107,9 +110,9 @@ async def check_expired_auctions(bot):
                 try:
                     owner_msg = (
                         f"🕊️ Hello {owner_link},\n\n"
-                        f"Your auction for <b>{submission.get('waifu_name', '')}</b> has ended!\n"
+                        f"Your auction for <b>{submission.waifu_name or ''}</b> has ended!\n"
                         f"🏆 <b>Winner:</b> {winner_link}\n"
-                        f"💰 <b>Final Bid:</b> <code>{submission.get('current_bid')}</code>\n\n"
+                        f"💰 <b>Final Bid:</b> <code>{submission.current_bid}</code>\n\n"
                         f"🆔 <b>Item ID:</b> <code>{item_id}</code>\n"
                         f"You can contact the winner directly."
                     )
@@ -122,20 +125,14 @@ async def check_expired_auctions(bot):
                 try:
                     await bot.send_photo(
                         chat_id=LOG_GROUP_ID,
-                        photo=submission.get("file_id"),
+                        photo=submission.file_id,
                         caption=f"✅ <b>Auction Ended Log</b>\n\n{announcement}",
                         parse_mode="HTML"
                     )
                 except Exception as e:
                     print(f"⚠️ Failed to send log for item {item_id}: {e}")
 
-            # === 6️⃣ Update MongoDB status ===
-            await db.update_one(
-                {"_id": item_id},
-                {"$set": {"is_expired": True, "status": "ended"}}
-            )
-
-            print(f"🕒 Auction ended: {submission.get('waifu_name') or submission.get('anime_name')} (ID: {item_id})")
+            print(f"🕒 Auction ended: {submission.waifu_name or submission.anime_name} (ID: {item_id})")
             await asyncio.sleep(1)
 
         except Exception as e:
@@ -0,0 +1,13 @@
+import asyncio
+from utils.ban_cache import sync_bans
+from config import BAN_SYNC_SECONDS, BAN_FULL_RELOAD_MINUTES
+
+
+async def start_ban_sync_task(interval_seconds: int = BAN_SYNC_SECONDS):
+    """Keep the in-process ban list in step with other processes (see utils/ban_cache.py)."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await sync_bans(full_reload_seconds=BAN_FULL_RELOAD_MINUTES * 60)
+        except Exception as e:
+            print(f"⚠️ Ban sync error: {e}")
@@ -0,0 +1,13 @@
+import asyncio
+from utils.drafts import sweep_abandoned_drafts
+from config import DRAFT_SWEEP_INTERVAL_MINUTES
+
+
+async def start_draft_sweeper_task(interval_minutes: int = DRAFT_SWEEP_INTERVAL_MINUTES):
+    """Remove abandoned drafts every `interval_minutes` minutes."""
+    while True:
+        try:
+            await sweep_abandoned_drafts()
+        except Exception as e:
+            print(f"⚠️ Draft sweeper error: {e}")
+        await asyncio.sleep(interval_minutes * 60)
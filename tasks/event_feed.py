@@ -0,0 +1,94 @@
+import asyncio
+import time
+from storage import store, ChangeStreamUnavailable, ResumeTokenLost
+from utils import events
+from config import EVENT_POLL_SECONDS, EVENT_TOKEN_SAVE_SECONDS
+
+STREAM_NAME = "submission_events"
+
+# Fields compared between snapshots by the polling fallback
+WATCHED_FIELDS = (
+    "status", "type", "rarity_name", "current_bid", "last_bidder_id", "last_bidder_username",
+    "expires_at", "is_expired",
+)
+
+
+# ====== CHANGE STREAM ======
+async def follow_change_stream():
+    """Feeds the bus from the change stream until it closes or fails."""
+    token = await store.load_resume_token(STREAM_NAME)
+    pending, last_saved = None, time.monotonic()
+    try:
+        async for change, token in store.watch_submissions(token):
+            events.set_mode("stream")
+            await events.dispatch_change(change, "stream")
+            # Saved every few seconds, not per event; a restart replays at most that window
+            pending = token
+            if time.monotonic() - last_saved >= EVENT_TOKEN_SAVE_SECONDS:
+                await store.save_resume_token(STREAM_NAME, pending)
+                pending, last_saved = None, time.monotonic()
+    finally:
+        if pending is not None:
+            try:
+                await store.save_resume_token(STREAM_NAME, pending)
+            except Exception as e:
+                print(f"⚠️ Could not save resume token: {e}")
+
+
+# ====== POLLING FALLBACK ======
+async def diff_snapshots(previous: dict, current: dict) -> list[dict]:
+    """Changes between two {_id: doc} snapshots of the open submissions."""
+    changes = []
+    for item_id, doc in current.items():
+        old = previous.get(item_id)
+        if old is None:
+            changes.append({"op": "insert", "_id": item_id, "fields": {k: v for k, v in doc.items() if k != "_id"}})
+            continue
+        changed = {k: v for k, v in doc.items() if old.get(k) != v}
+        if changed:
+            changes.append({"op": "update", "_id": item_id, "fields": changed})
+
+    # Items that left the open set ended, were rejected, archived or removed
+    for item_id in previous.keys() - current.keys():
+        doc, _ = await store.get_submission(item_id, WATCHED_FIELDS)
+        if doc is None:
+            changes.append({"op": "delete", "_id": item_id, "fields": {}})
+            continue
+        old = previous[item_id]
+        changed = {k: doc.get(k) for k in WATCHED_FIELDS if old.get(k) != doc.get(k)}
+        changes.append({"op": "update", "_id": item_id, "fields": changed})
+    return changes
+
+
+async def poll_open_submissions(interval_seconds: int = EVENT_POLL_SECONDS):
+    events.set_mode("poll")
+    previous = None
+    while True:
+        try:
+            current = {doc["_id"]: doc for doc in await store.list_open(WATCHED_FIELDS)}
+            if previous is not None:
+                for change in await diff_snapshots(previous, current):
+                    await events.dispatch_change(change, "poll")
+            previous = current
+        except Exception as e:
+            print(f"⚠️ Event poll error: {e}")
+        await asyncio.sleep(interval_seconds)
+
+
+# ====== TASK ======
+async def start_event_feed_task(poll_seconds: int = EVENT_POLL_SECONDS):
+    """Change stream when the database offers one, otherwise snapshot polling."""
+    while True:
+        try:
+            await follow_change_stream()
+            print("⚠️ Change stream closed; reopening.")
+        except ChangeStreamUnavailable as e:
+            print(f"ℹ️ No change streams ({e}); polling open submissions every {poll_seconds}s.")
+            await poll_open_submissions(poll_seconds)
+        except ResumeTokenLost as e:
+            print(f"⚠️ Resume token expired ({e}); restarting the change stream from now.")
+            await store.save_resume_token(STREAM_NAME, None)
+            continue
+        except Exception as e:
+            print(f"⚠️ Event feed error: {e}")
+        await asyncio.sleep(5)
@@ -0,0 +1,13 @@
+import asyncio
+from utils.live_auctions import check_live_auctions
+from config import LIVE_MODEL_CHECK_SECONDS
+
+
+async def start_live_model_check_task(interval_seconds: int = LIVE_MODEL_CHECK_SECONDS):
+    """Rebuild the live auction model whenever it no longer matches the database."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await check_live_auctions()
+        except Exception as e:
+            print(f"⚠️ Live model check error: {e}")
@@ -0,0 +1,80 @@
+import asyncio
+from datetime import datetime, timedelta
+from storage import store, repository as repo, LIVE_STATUS, QUEUED_STATUS, PUBLISHING_STATUS
+from utils.db_policy import ADMIN
+from utils.publishing import publish_submission
+from utils import stats
+from config import PUBLISH_INTERVAL_SECONDS, PUBLISH_IDLE_SECONDS, PUBLISH_MAX_ATTEMPTS, PUBLISH_LEASE_SECONDS
+
+
+async def publish_next(bot, job_queue=None) -> bool:
+    """
+    Posts the oldest queued (bulk-imported) item. Returns False when the
+    queue is empty. The item is claimed first (with the claim time as a
+    lease), so two bot processes never post the same one.
+    """
+    queued = await store.list_by_status(QUEUED_STATUS, limit=1, fields=("_id",))
+    if not queued:
+        return False
+
+    item = await repo.update(
+        repo.PUBLISH_QUEUE, queued[0]["_id"], {"status": PUBLISHING_STATUS, "publishing_since": datetime.utcnow()},
+        expect={"status": QUEUED_STATUS}, op_class=ADMIN,
+    )
+    if item is None:
+        return True  # claimed by another process in the meantime
+
+    posted, _ = await publish_submission(bot, item, job_queue, changes={"status": LIVE_STATUS})
+    if posted:
+        stats.item_published()
+        print(f"📣 Published imported item {item.id}")
+        return True
+
+    # Retry later; give up (rejected, archived later) after PUBLISH_MAX_ATTEMPTS
+    attempts = (item.publish_attempts or 0) + 1
+    status = QUEUED_STATUS if attempts < PUBLISH_MAX_ATTEMPTS else "rejected"
+    await store.update_submission(item.id, {"status": status, "publish_attempts": attempts}, op_class=ADMIN)
+    if status == "rejected":
+        stats.publish_failed()
+    print(f"⚠️ Could not publish imported item {item.id} (attempt {attempts}), now {status}")
+    return True
+
+
+async def requeue_interrupted():
+    """
+    Items whose claim is older than PUBLISH_LEASE_SECONDS (the process
+    posting them died) go back to the queue.  Newer claims may belong to
+    another process that is posting them right now and are left alone.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=PUBLISH_LEASE_SECONDS)
+    for doc in await store.list_by_status(PUBLISHING_STATUS, limit=100, fields=("_id", "publishing_since")):
+        since = doc.get("publishing_since")
+        if since is not None and since > cutoff:
+            continue
+        # Guarded on the same claim, in case it was requeued and claimed again meanwhile
+        requeued = await store.update_submission(
+            doc["_id"], {"status": QUEUED_STATUS},
+            expect={"status": PUBLISHING_STATUS, "publishing_since": since}, op_class=ADMIN,
+        )
+        if requeued:
+            print(f"🔄 Requeued interrupted item {doc['_id']}")
+
+
+async def start_publisher_task(bot, job_queue=None, interval_seconds: int = PUBLISH_INTERVAL_SECONDS):
+    """
+    Post queued items one every `interval_seconds`, checking every
+    PUBLISH_IDLE_SECONDS when idle (and then also for abandoned claims).
+    """
+    published = False
+    while True:
+        if not published:
+            try:
+                await requeue_interrupted()
+            except Exception as e:
+                print(f"⚠️ Publisher requeue error: {e}")
+        try:
+            published = await publish_next(bot, job_queue)
+        except Exception as e:
+            print(f"⚠️ Publisher error: {e}")
+            published = False
+        await asyncio.sleep(interval_seconds if published else PUBLISH_IDLE_SECONDS)
@@ -0,0 +1,24 @@
+import asyncio
+import time
+from utils import shared_cache
+from config import SHARED_CACHE_POLL_MS
+
+PRUNE_EVERY_SECONDS = 600
+
+
+async def start_shared_cache_task(interval_ms: int = SHARED_CACHE_POLL_MS):
+    """Apply other processes' invalidations and prune the shared cache (see utils/shared_cache.py)."""
+    if not shared_cache.enabled():
+        return
+    last_prune = time.monotonic()
+    while True:
+        await asyncio.sleep(interval_ms / 1000)
+        try:
+            shared_cache.poll_invalidations()
+            if time.monotonic() - last_prune >= PRUNE_EVERY_SECONDS:
+                last_prune = time.monotonic()
+                removed = shared_cache.prune()
+                if removed:
+                    print(f"🧹 Shared cache pruned {removed} row(s).")
+        except Exception as e:
+            print(f"⚠️ Shared cache poll error: {e}")
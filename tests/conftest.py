@@ -0,0 +1,71 @@
+# tests/conftest.py
+"""
+Shared fixtures.
+
+`mongo_url` is a disposable MongoDB for the tests that need a real
+server: TEST_MONGO_URL (or PLANCHECK_MONGO_URL), else a `mongod` on PATH
+started in a temp dir for the session.  Without either those tests skip.
+Every test uses its own database and drops it afterwards.
+
+`store` is a fresh memory / SQLite store installed as the process-wide
+one (storage.set_store), so helpers that call get_store() use it.
+"""
+import os
+import shutil
+import tempfile
+
+# config.py needs the bot's settings; harmless values for the tests
+for name, value in {
+    "LOG_GROUP_ID": "-1001", "GROUP_ID": "-1002", "CHANNEL_ID": "-1003", "OWNER_ID": "1", "ADMINS": "1",
+    "MONGO_URL": "mongodb://127.0.0.1:1", "MONGO_TLS": "false", "STORAGE_BACKEND": "memory",
+}.items():
+    os.environ.setdefault(name, value)
+
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from storage import create_store, set_store
+from utils.query_plans import spawn_mongod
+
+
+def _reachable(url: str, timeout_ms: int) -> bool:
+    client = MongoClient(url, serverSelectionTimeoutMS=timeout_ms)
+    try:
+        client.admin.command("ping")
+        return True
+    except PyMongoError:
+        return False
+    finally:
+        client.close()
+
+
+@pytest.fixture(scope="session")
+def mongo_url():
+    process = data_dir = None
+    url = os.getenv("TEST_MONGO_URL") or os.getenv("PLANCHECK_MONGO_URL")
+    if not url and shutil.which("mongod"):
+        process, url, data_dir = spawn_mongod()
+    try:
+        # a freshly spawned mongod needs a few seconds before it accepts connections
+        if not url or not _reachable(url, 20000 if process else 2000):
+            pytest.skip("no MongoDB reachable: set TEST_MONGO_URL or put mongod on PATH")
+        yield url
+    finally:
+        if process:
+            process.terminate()
+            process.wait(timeout=30)
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request):
+    workdir = tempfile.mkdtemp(prefix="amongo-test-")
+    options = {"path": os.path.join(workdir, "test.db")} if request.param == "sqlite" else {}
+    store = create_store(request.param, **options)
+    set_store(store)
+    try:
+        yield store
+    finally:
+        set_store(None)
+        shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,77 @@
+# tests/test_audit_paging.py
+"""/audit page buttons: long or underscore-laden filters, expired views."""
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from config import OWNER_ID as ADMIN_ID
+from handlers.audit import audit_command, audit_page_handler
+from utils.pagination import fits_callback_data
+
+
+class _Message:
+    def __init__(self, sent: list):
+        self.sent = sent
+
+    async def reply_text(self, text, reply_markup=None, **kwargs):
+        self.sent.append((text, reply_markup))
+
+    async def edit_message_text(self, text, reply_markup=None, **kwargs):
+        self.sent.append((text, reply_markup))
+
+
+class _Query:
+    def __init__(self, data: str, sent: list):
+        self.data, self.from_user, self.message, self.sent = data, SimpleNamespace(id=ADMIN_ID), _Message(sent), sent
+        self.alerts = []
+
+    async def answer(self, text=None, show_alert=False):
+        if text:
+            self.alerts.append(text)
+
+    async def edit_message_text(self, text, reply_markup=None, **kwargs):
+        self.sent.append((text, reply_markup))
+
+
+def _buttons(markup) -> dict:
+    return {b.text: b.callback_data for row in (markup.inline_keyboard if markup else []) for b in row}
+
+
+async def _page_through(store, args: list, entry: dict, count: int) -> tuple[list, list, list]:
+    """Runs /audit <args>, then follows "Older" to the end. Returns (pages, callback data, alerts)."""
+    await store.init()
+    try:
+        start = datetime(2026, 1, 1)
+        for n in range(count):
+            await store.record_audit({**entry, "time": start - timedelta(seconds=n), "details": {"n": n}})
+
+        sent, bot_data = [], {}
+        update = SimpleNamespace(effective_user=SimpleNamespace(id=ADMIN_ID), message=_Message(sent))
+        context = SimpleNamespace(args=args, bot_data=bot_data)
+        await audit_command(update, context)
+        datas, alerts = [], []
+        while (data := _buttons(sent[-1][1]).get("Older ⏭️")) is not None and len(datas) < count:
+            datas.append(data)
+            query = _Query(data, sent)
+            await audit_page_handler(SimpleNamespace(callback_query=query), context)
+            alerts += query.alerts
+
+        # After a restart the view is gone: the admin is told so
+        query = _Query(datas[0], sent)
+        await audit_page_handler(SimpleNamespace(callback_query=query), SimpleNamespace(bot_data={}))
+        alerts += query.alerts
+        return [text for text, _ in sent], datas, alerts
+    finally:
+        await store.close()
+
+
+def test_long_filters_page_through(store, monkeypatch):
+    monkeypatch.setattr("handlers.audit.store", store)  # bound at import
+    entry = {"action": "forceend", "actor_id": 1234567890, "actor_name": "Admin", "target": "9876543210_x"}
+    args = ["actor=1234567890", "target=9876543210_x", "action=forceend"]
+    pages, datas, alerts = asyncio.run(_page_through(store, args, entry, 25))
+
+    assert len(datas) == 2 and all(fits_callback_data(data) for data in datas)
+    assert [page.count("<b>forceend</b>") for page in pages] == [10, 10, 5]
+    assert "n: 0" in pages[0] and "n: 24" in pages[2]
+    assert alerts == ["⌛ This /audit view has expired. Run /audit again."]
@@ -0,0 +1,74 @@
+# tests/test_bids.py
+"""
+Bid history writes (utils/bids.py): a failed write after the bid's
+compare-and-set is retried in the background until it is stored.
+"""
+import asyncio
+from datetime import datetime
+
+from utils import bids
+from utils.background import flush_background
+
+
+def flaky(store, failures: int):
+    """Makes the store's next `failures` record_bid calls fail; returns the attempt log."""
+    attempts = []
+    record_bid = store.record_bid
+
+    async def record(doc, op_class=None):
+        attempts.append(doc["_id"])
+        if len(attempts) <= failures:
+            raise ConnectionError("primary stepped down")
+        return await record_bid(doc, op_class=op_class)
+
+    store.record_bid = record
+    return attempts
+
+
+def test_failed_history_write_is_retried_until_stored(store, monkeypatch):
+    monkeypatch.setattr(bids, "RETRY_MAX_SECONDS", 0.01)
+    attempts = flaky(store, failures=6)
+
+    async def scenario():
+        await store.init()
+        try:
+            when = datetime.utcnow()
+            stored_inline = await bids.record_bid(7, 42, "@bidder", 150, when, retries=1, store=store)
+            if not stored_inline:
+                bids.record_bid_later(7, 42, "@bidder", 150, when)
+            await flush_background()
+            return stored_inline, await store.list_bids(7)
+        finally:
+            await store.close()
+
+    stored_inline, history = asyncio.run(scenario())
+    assert not stored_inline
+    assert attempts == ["7:150:42"] * 7
+    assert [(entry["user_id"], entry["bid"]) for entry in history] == [(42, 150)]
+
+
+def test_retrying_twice_stores_the_bid_once(store):
+    async def scenario():
+        await store.init()
+        try:
+            when = datetime.utcnow()
+            for _ in range(2):
+                await bids.record_bid(7, 42, "@bidder", 150, when, store=store)
+            return await store.list_bids(7)
+        finally:
+            await store.close()
+
+    assert len(asyncio.run(scenario())) == 1
+
+
+def test_shutdown_stops_waiting_for_a_write_that_cannot_land(store, monkeypatch):
+    monkeypatch.setattr(bids, "RETRY_MAX_SECONDS", 0.01)
+    flaky(store, failures=10 ** 6)
+
+    async def scenario():
+        bids.record_bid_later(7, 42, "@bidder", 150, datetime.utcnow())
+        started = asyncio.get_running_loop().time()
+        await flush_background(timeout=0.2)
+        return asyncio.get_running_loop().time() - started
+
+    assert asyncio.run(scenario()) < 1
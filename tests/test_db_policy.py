@@ -0,0 +1,90 @@
+# tests/test_db_policy.py
+"""
+Per-operation-class Mongo settings (utils/db_policy.py), checked on the
+collection handles the driver builds (no server needed), and /bids
+reading the primary right after a bid.
+"""
+import asyncio
+from datetime import datetime
+
+import pytest
+from pymongo import MongoClient
+from pymongo.read_preferences import Primary, SecondaryPreferred
+
+import handlers.auction_bid as auction_bid
+from utils import db_policy
+from utils.db_policy import ADMIN, ANALYTICS, BID, BROWSE
+
+EXPECTED = {
+    # class:   (read mode,          maxStalenessSeconds, write concern,                      maxTimeMS)
+    BROWSE:    (SecondaryPreferred, 90,  {"w": 1},                             2000),
+    BID:       (Primary,            -1,  {"w": "majority", "wtimeout": 3000},  3000),
+    ADMIN:     (Primary,            -1,  {"w": "majority", "wtimeout": 10000}, 10000),
+    ANALYTICS: (SecondaryPreferred, 300, {"w": 1},                             30000),
+}
+
+
+@pytest.fixture
+def database():
+    client = MongoClient("mongodb://127.0.0.1:1", connect=False)
+    yield client["POLICY_TEST"]
+    client.close()
+
+
+@pytest.mark.parametrize("op_class", sorted(EXPECTED))
+def test_collection_handles_carry_the_class_policy(op_class, database, monkeypatch):
+    monkeypatch.setattr(db_policy, "_collection_cache", {})
+    coll = db_policy.policy_collection("submissions", op_class, database)
+    mode, max_staleness, write_concern, time_limit = EXPECTED[op_class]
+    assert isinstance(coll.read_preference, mode)
+    assert coll.read_preference.max_staleness == max_staleness
+    assert coll.write_concern.document == write_concern
+    assert db_policy.max_time_ms(op_class) == time_limit
+    assert db_policy.policy_collection("submissions", op_class, database) is coll
+
+
+def test_environment_overrides(monkeypatch):
+    monkeypatch.setenv("MONGO_POLICY_BROWSE_READ", "primaryPreferred")
+    monkeypatch.setenv("MONGO_POLICY_BROWSE_MAX_STALENESS", "30")    # below the driver minimum
+    monkeypatch.setenv("MONGO_POLICY_BID_W", "1")
+    monkeypatch.setenv("MONGO_POLICY_ADMIN_MAX_TIME_MS", "0")         # 0 = no limit
+    browse, bid, admin = (db_policy.load_policy(op_class) for op_class in (BROWSE, BID, ADMIN))
+    assert db_policy.build_read_preference(browse).mongos_mode == "primaryPreferred"
+    assert db_policy.build_read_preference(browse).max_staleness == db_policy.MIN_MAX_STALENESS
+    assert db_policy.build_write_concern(bid).document == {"w": 1}
+    assert admin["max_time_ms"] is None
+    with pytest.raises(ValueError):
+        db_policy.load_policy("reporting")
+
+
+def test_bid_history_reads_the_primary_right_after_a_bid(store, monkeypatch):
+    monkeypatch.setattr(db_policy, "_recent_writes", {})
+    monkeypatch.setattr(auction_bid, "store", store)
+    routed = []
+    list_bids = store.list_bids
+
+    async def recording(item_id, **kwargs):
+        routed.append(kwargs["op_class"])
+        return await list_bids(item_id, **kwargs)
+
+    store.list_bids = recording
+
+    async def scenario():
+        await store.init()
+        try:
+            await auction_bid.render_bid_history(7)                 # nobody bid here yet
+            await store.record_bid({"_id": "7:150:42", "item_id": 7, "user_id": 42, "username": "@bidder",
+                                    "bid": 150, "time": datetime.utcnow()})
+            db_policy.note_write(("bids", 7))                       # what /bid does after the bid
+            text, _ = await auction_bid.render_bid_history(7)
+            await auction_bid.render_bid_history(8)                 # other items keep using secondaries
+            db_policy._recent_writes[("bids", 7)] -= db_policy.staleness_window(BROWSE)   # secondaries caught up
+            await auction_bid.render_bid_history(7)
+            return text
+        finally:
+            await store.close()
+
+    text = asyncio.run(scenario())
+    assert "150" in text
+    assert routed == [BROWSE, BID, BROWSE, BROWSE]
+    assert db_policy.staleness_window(BROWSE) >= 90 and db_policy.staleness_window(BID) == 0
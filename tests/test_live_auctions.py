@@ -0,0 +1,215 @@
+# tests/test_live_auctions.py
+"""
+The in-memory live auction model (utils/live_auctions.py) against the
+memory and SQLite stores: keyset pages, catalog versions, lazy expiry,
+events and drift rebuilds.
+"""
+import asyncio
+import copy
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from storage.conformance import submission
+from utils import live_auctions
+from utils.background import flush_background
+
+_PRISTINE_STATE = copy.deepcopy(live_auctions._state)
+_PRISTINE_METRICS = dict(live_auctions.LIVE_MODEL_METRICS)
+
+
+@pytest.fixture(autouse=True)
+def fresh_model(monkeypatch):
+    monkeypatch.setattr(live_auctions, "_state", copy.deepcopy(_PRISTINE_STATE))
+    monkeypatch.setattr(live_auctions, "LIVE_MODEL_METRICS", dict(_PRISTINE_METRICS))
+
+
+def run(store, scenario):
+    async def wrapper():
+        await store.init()
+        try:
+            return await scenario()
+        finally:
+            await flush_background()
+            await store.close()
+    return asyncio.run(wrapper())
+
+
+def _ids(docs) -> list:
+    return [doc["_id"] for doc in docs]
+
+
+async def _seed(store, now, ids, **overrides):
+    for item_id in ids:
+        await store.insert_submission(submission(item_id, now, **overrides))
+
+
+def test_reads_fall_back_until_loaded(store):
+    assert live_auctions.count_live("waifu") is None
+    assert live_auctions.list_live("waifu") is None
+    assert live_auctions.catalog_version("waifu") is None
+    assert live_auctions.live_model_stats()["fallbacks"] == 2
+
+
+def test_load_keeps_only_running_auctions(store):
+    async def scenario():
+        now = datetime.utcnow()
+        await _seed(store, now, range(1, 11))
+        await store.insert_submission(submission(11, now, status="pending"))
+        await store.insert_submission(submission(13, now, is_expired=True))
+        await store.insert_submission(submission(15, now, expires_at=now - timedelta(minutes=1)))
+        loaded = await live_auctions.load_live_auctions()
+        return loaded, live_auctions.count_live("waifu"), live_auctions.count_live("waifu", "Rare")
+
+    loaded, waifus, rare_waifus = run(store, scenario)
+    assert loaded == 10
+    assert waifus == 5            # 1, 3, 5, 7, 9
+    assert rare_waifus == 2       # 3, 9
+
+
+def test_keyset_pages_match_the_store(store):
+    # Legacy ObjectId items only exist where Mongo (and so memory) allows them
+    legacy = [] if store.name == "sqlite" else sorted(ObjectId() for _ in range(4))
+
+    async def scenario():
+        now = datetime.utcnow()
+        await _seed(store, now, range(1, 30, 2))                 # 15 counter-ID waifus
+        for oid in legacy:   # legacy ObjectId items, listed after every counter ID
+            await store.insert_submission(submission(1, now, _id=oid))
+        await live_auctions.load_live_auctions()
+
+        pages, model_pages, after = [], [], None
+        while True:
+            page = await store.list_live("waifu", now, after=after, limit=4, fields=("waifu_name",))
+            model_page = live_auctions.list_live("waifu", after=after, limit=4, fields=("waifu_name",))
+            pages.append(page)
+            model_pages.append(model_page)
+            if len(page) < 4:
+                break
+            after = page[-1]["_id"]
+        first_after_counters = legacy[0] if legacy else 31
+        before_legacy = live_auctions.list_live("waifu", before=first_after_counters, limit=3)
+        before_store = await store.list_live("waifu", now, before=first_after_counters, limit=3)
+        return pages, model_pages, before_legacy, before_store
+
+    pages, model_pages, before_legacy, before_store = run(store, scenario)
+    assert model_pages == pages
+    assert _ids(doc for page in model_pages for doc in page) == list(range(1, 30, 2)) + legacy
+    assert model_pages[0][0] == {"_id": 1, "waifu_name": "Character 1"}
+    assert _ids(before_legacy) == _ids(before_store) == [25, 27, 29]
+
+
+def test_catalog_version_follows_listed_changes_only(store):
+    async def scenario():
+        now = datetime.utcnow()
+        await _seed(store, now, [1, 3])          # waifus: 1 Common, 3 Rare
+        await live_auctions.load_live_auctions()
+        version = live_auctions.catalog_version
+        seen = {"start": (version("waifu"), version("waifu", "Common"), version("waifu", "Rare"))}
+
+        live_auctions.apply(1, {"current_bid": 150, "last_bidder_id": 9})
+        seen["bid"] = (version("waifu"), version("waifu", "Common"), version("waifu", "Rare"))
+
+        live_auctions.apply(1, {"waifu_name": "Renamed"})
+        seen["rename"] = (version("waifu"), version("waifu", "Common"), version("waifu", "Rare"))
+
+        await store.insert_submission(submission(5, now))   # Common waifu approved elsewhere
+        await live_auctions.on_event({"kind": "status", "item_id": 5})
+        seen["appears"] = (version("waifu"), version("waifu", "Common"), version("waifu", "Rare"))
+
+        live_auctions.discard(3)
+        seen["ends"] = (version("waifu"), version("waifu", "Common"), version("waifu", "Rare"))
+        seen["husbando"] = version("husbando")
+        return seen, live_auctions.list_live("waifu", fields=("waifu_name", "current_bid"))
+
+    seen, listing = run(store, scenario)
+    start = seen["start"]
+    assert seen["bid"] == start                                       # bids keep cached pages
+    assert seen["rename"][0] != start[0] and seen["rename"][1] != start[1]
+    assert seen["rename"][2] == start[2]                              # other rarity untouched
+    assert seen["appears"][1] != seen["rename"][1] and seen["appears"][2] == start[2]
+    assert seen["ends"][2] != start[2] and seen["ends"][1] == seen["appears"][1]
+    assert seen["husbando"] == (start[0][0], 0)
+    assert listing == [
+        {"_id": 1, "waifu_name": "Renamed", "current_bid": 150},
+        {"_id": 5, "waifu_name": "Character 5", "current_bid": 0},
+    ]
+
+
+def test_items_expire_lazily(store):
+    async def scenario():
+        now = datetime.utcnow()
+        await _seed(store, now, [1, 3])
+        await store.insert_submission(submission(5, now, expires_at=datetime.utcnow() + timedelta(milliseconds=300)))
+        await live_auctions.load_live_auctions()
+        before = (live_auctions.count_live("waifu"), live_auctions.catalog_version("waifu"))
+        await asyncio.sleep(0.4)
+        after = (live_auctions.count_live("waifu"), live_auctions.catalog_version("waifu"))
+        return before, after
+
+    (count_before, version_before), (count_after, version_after) = run(store, scenario)
+    assert (count_before, count_after) == (3, 2)
+    assert version_after != version_before
+
+
+def test_events_and_refresh(store):
+    async def scenario():
+        now = datetime.utcnow()
+        await _seed(store, now, [1, 3, 5])
+        await live_auctions.load_live_auctions()
+        await live_auctions.on_event({"kind": "bid", "item_id": 1, "fields": {"current_bid": 300}})
+        await live_auctions.on_event({"kind": "removed", "item_id": 3})
+        await store.update_submission(5, {"status": "ended", "is_expired": True})
+        await live_auctions.on_event({"kind": "status", "item_id": 5})
+        await store.insert_submission(submission(7, now, status="approved"))
+        live_auctions.refresh(7)
+        await flush_background()
+        return live_auctions.list_live("waifu", fields=("current_bid",)), live_auctions.list_seller_live(1000, "waifu")
+
+    listing, seller_items = run(store, scenario)
+    assert listing == [{"_id": 1, "current_bid": 300}, {"_id": 7, "current_bid": 0}]
+    assert _ids(seller_items) == [7]   # user_id 1000 + id % 7
+
+
+def test_drift_check_rebuilds_from_the_database(store):
+    async def scenario():
+        now = datetime.utcnow()
+        await _seed(store, now, [1, 3, 5])
+        await live_auctions.load_live_auctions()
+        version = live_auctions.catalog_version("waifu")
+
+        # Writes this process never heard about
+        await store.insert_submission(submission(7, now))
+        await store.delete_submission(3)
+        await store.update_submission(5, {"waifu_name": "Changed"})
+        drift = await live_auctions.check_live_auctions()
+        again = await live_auctions.check_live_auctions()
+        return drift, again, version, live_auctions.catalog_version("waifu"), live_auctions.list_live("waifu")
+
+    drift, again, version_before, version_after, listing = run(store, scenario)
+    assert (drift, again) == (3, 0)
+    assert version_after[0] == version_before[0] + 1   # new epoch: every cached page is stale
+    assert _ids(listing) == [1, 5, 7] and listing[1]["waifu_name"] == "Changed"
+    assert live_auctions.live_model_stats()["drift"] == 3
+
+
+def test_drift_check_racing_a_change_is_discarded(store, monkeypatch):
+    async def scenario():
+        now = datetime.utcnow()
+        await _seed(store, now, [1, 3])
+        await live_auctions.load_live_auctions()
+        snapshot = live_auctions._snapshot
+
+        async def snapshot_during_a_bid():
+            docs = await snapshot()
+            live_auctions.apply(1, {"current_bid": 500})   # lands while the check reads
+            return docs
+
+        monkeypatch.setattr(live_auctions, "_snapshot", snapshot_during_a_bid)
+        return await live_auctions.check_live_auctions(), live_auctions.list_live("waifu", fields=("current_bid",))
+
+    drift, listing = run(store, scenario)
+    assert drift == 0                               # not counted, not rebuilt from the older read
+    assert listing[0] == {"_id": 1, "current_bid": 500}
+    assert live_auctions.live_model_stats()["rebuilds"] == 1
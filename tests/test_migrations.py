@@ -0,0 +1,49 @@
+# tests/test_migrations.py
+"""Identifier migrations against a disposable MongoDB (see conftest.py)."""
+import asyncio
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from utils.migrations import MIGRATIONS, _after_id, run_migration
+
+SUBMISSIONS = next(m for m in MIGRATIONS if m["name"] == "submissions_user_id")
+
+
+def test_after_id_brackets_later_types():
+    assert _after_id(7) == {"$or": [{"_id": {"$gt": 7}}, {"_id": {"$type": "string"}}, {"_id": {"$type": "objectId"}}]}
+    assert _after_id("a") == {"$or": [{"_id": {"$gt": "a"}}, {"_id": {"$type": "objectId"}}]}
+    oid = ObjectId()
+    assert _after_id(oid) == {"_id": {"$gt": oid}}
+
+
+async def _migrate_mixed_ids(url: str, batch_size: int):
+    client = AsyncIOMotorClient(url)
+    db = client["AMONGO_TEST_MIGRATIONS"]
+    try:
+        await client.drop_database(db.name)
+        # More counter IDs than one batch, then legacy ObjectIds after them in _id order
+        int_ids = list(range(1, 2 * batch_size + 2))
+        legacy_ids = [ObjectId() for _ in range(batch_size + 1)]
+        await db.submissions.insert_many(
+            [{"_id": item_id, "user_id": str(1000 + n)} for n, item_id in enumerate(int_ids + legacy_ids)]
+        )
+
+        totals = await run_migration(db, SUBMISSIONS, batch_size=batch_size, pause=0)
+        left = await db.submissions.count_documents({"user_id": {"$type": "string"}})
+        state = await db.migrations.find_one({"_id": SUBMISSIONS["name"]})
+        converted = await db.submissions.find_one({"_id": legacy_ids[-1]})
+        return totals, left, state, converted
+    finally:
+        await client.drop_database(db.name)
+        client.close()
+
+
+def test_migration_crosses_from_int_to_objectid_ids(mongo_url):
+    batch_size = 3
+    totals, left, state, converted = asyncio.run(_migrate_mixed_ids(mongo_url, batch_size))
+    total = (2 * batch_size + 1) + (batch_size + 1)
+    assert left == 0, f"{left} documents still have a string user_id"
+    assert totals["converted"] == totals["scanned"] == total
+    assert state["done"] and isinstance(state["last_id"], ObjectId)
+    assert converted["user_id"] == 1000 + total - 1
@@ -0,0 +1,113 @@
+# tests/test_page_cache.py
+"""
+Rendered /items pages (utils/page_cache.py): served while the catalog
+version they were rendered from holds, LRU-bounded, one render per
+concurrent miss.
+"""
+import asyncio
+import copy
+from collections import OrderedDict
+from datetime import datetime
+
+import pytest
+
+from storage.conformance import submission
+from utils import live_auctions, page_cache
+from utils.background import flush_background
+
+_PRISTINE_STATE = copy.deepcopy(live_auctions._state)
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(page_cache, "_pages", OrderedDict())
+    monkeypatch.setattr(page_cache, "PAGE_CACHE_METRICS", dict.fromkeys(page_cache.PAGE_CACHE_METRICS, 0))
+    monkeypatch.setattr(live_auctions, "_state", copy.deepcopy(_PRISTINE_STATE))
+
+
+def renderer(text: str, calls: list, delay: float = 0):
+    async def render():
+        calls.append(text)
+        await asyncio.sleep(delay)
+        return text, None
+    return render
+
+
+def test_pages_are_served_while_their_version_holds():
+    async def scenario():
+        calls = []
+        first = await page_cache.cached_page(("waifu", None, ""), (1, 1), renderer("v1", calls))
+        again = await page_cache.cached_page(("waifu", None, ""), (1, 1), renderer("unused", calls))
+        newer = await page_cache.cached_page(("waifu", None, ""), (1, 2), renderer("v2", calls))
+        return calls, first, again, newer
+
+    calls, first, again, newer = asyncio.run(scenario())
+    assert calls == ["v1", "v2"]
+    assert first == again == ("v1", None) and newer == ("v2", None)
+    stats = page_cache.page_cache_stats()
+    assert (stats["misses"], stats["hits"], stats["stale"], stats["renders"]) == (1, 1, 1, 2)
+    assert stats["size"] == 1
+
+
+def test_nothing_is_cached_without_a_version():
+    async def scenario():
+        calls = []
+        for _ in range(2):
+            await page_cache.cached_page(("waifu", None, ""), None, renderer("db", calls))
+        return calls
+
+    assert asyncio.run(scenario()) == ["db", "db"]
+    assert page_cache.page_cache_stats()["size"] == 0
+
+
+def test_least_recently_used_pages_are_evicted(monkeypatch):
+    monkeypatch.setattr(page_cache, "PAGE_CACHE_SIZE", 2)
+    page_cache.put_page("a", (1, 1), "A", None)
+    page_cache.put_page("b", (1, 1), "B", None)
+    assert page_cache.get_page("a", (1, 1)) == ("A", None)   # "b" is now the oldest
+    page_cache.put_page("c", (1, 1), "C", None)
+    assert page_cache.get_page("b", (1, 1)) is None
+    assert page_cache.get_page("a", (1, 1)) == ("A", None)
+    assert page_cache.get_page("c", (1, 1)) == ("C", None)
+
+
+def test_concurrent_misses_share_one_render():
+    async def scenario():
+        calls = []
+        pages = await asyncio.gather(*(
+            page_cache.cached_page(("husbando", "Rare", ""), (1, 4), renderer("rare", calls, delay=0.05))
+            for _ in range(20)
+        ))
+        return calls, pages
+
+    calls, pages = asyncio.run(scenario())
+    assert calls == ["rare"]
+    assert set(pages) == {("rare", None)}
+
+
+def test_only_changed_listings_are_rendered_again(store):
+    async def scenario():
+        await store.init()
+        try:
+            now = datetime.utcnow()
+            for item_id in (1, 3, 5):   # waifus: 1, 5 Common; 3 Rare
+                await store.insert_submission(submission(item_id, now))
+            await live_auctions.load_live_auctions()
+            calls = []
+
+            async def show_both():
+                for rarity_name in ("Common", "Rare"):
+                    version = live_auctions.catalog_version("waifu", rarity_name)
+                    await page_cache.cached_page(("waifu", rarity_name, ""), version, renderer(rarity_name, calls))
+
+            await show_both()
+            live_auctions.apply(1, {"current_bid": 500})        # a bid
+            await show_both()
+            live_auctions.discard(3)                            # a Rare auction ends
+            await show_both()
+            return calls
+        finally:
+            await flush_background()
+            await store.close()
+
+    assert asyncio.run(scenario()) == ["Common", "Rare", "Rare"]
@@ -0,0 +1,76 @@
+# tests/test_query_plans.py
+"""
+Explain-plan regression tests: one test per query shape in
+utils/query_plans.QUERY_SHAPES.  A shape fails on a COLLSCAN or when
+it examines more than DEFAULT_MAX_RATIO documents per returned document.
+
+The plan tests need a disposable MongoDB (the `mongo_url` fixture in
+conftest.py); PLANCHECK_SCALE sets the number of seeded submissions
+(default 10000).  The capture tests run without one.
+"""
+import asyncio
+import os
+from datetime import datetime
+
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from storage.mongo import MongoStorage
+from utils.query_plans import PLAN_DB, QUERY_SHAPES, build_query_shapes, seed_and_check
+
+SHAPE_NAMES = [shape["name"] for shape in QUERY_SHAPES]
+
+
+async def _run_check(url: str) -> list[dict]:
+    client = AsyncIOMotorClient(url)
+    db = client[f"{PLAN_DB}_PYTEST"]
+    try:
+        return await seed_and_check(db, scale=int(os.getenv("PLANCHECK_SCALE", "10000")))
+    finally:
+        await client.drop_database(db.name)
+        client.close()
+
+
+@pytest.fixture(scope="module")
+def plan_results(mongo_url):
+    return {row["name"]: row for row in asyncio.run(_run_check(mongo_url))}
+
+
+def test_shape_names_are_unique():
+    assert len(SHAPE_NAMES) == len(set(SHAPE_NAMES))
+
+
+def test_shapes_are_what_the_storage_methods_send():
+    now = datetime(2026, 1, 1)
+    shapes = {shape["name"]: shape for shape in asyncio.run(build_query_shapes(now))}
+    assert list(shapes) == SHAPE_NAMES
+    next_page = shapes["items.view_all_next_page"]
+    assert next_page["collection"] == "submissions" and next_page["kind"] == "find"
+    assert next_page["filter"] == {
+        "status": "approved", "type": "waifu", "expires_at": {"$gt": now},
+        **MongoStorage._id_range(after=1000),
+    }
+    assert (next_page["sort"], next_page["limit"]) == ({"_id": 1}, 11)
+    assert shapes["bids.history_page"]["sort"] == {"time": -1, "_id": -1}
+    assert shapes["items.count_by_type"]["kind"] == "count"
+    assert shapes["archiver.batch"]["max_ratio"] is None
+
+
+def test_storage_changes_reach_the_shapes(monkeypatch):
+    live_query = MongoStorage._live_query
+    monkeypatch.setattr(
+        MongoStorage, "_live_query",
+        staticmethod(lambda *args: {**live_query(*args), "channel_message_id": {"$exists": True}}),
+    )
+    shapes = {shape["name"]: shape for shape in asyncio.run(build_query_shapes(datetime.utcnow()))}
+    assert shapes["items.by_rarity"]["filter"]["channel_message_id"] == {"$exists": True}
+    assert shapes["items.count_by_type"]["filter"]["channel_message_id"] == {"$exists": True}
+
+
+@pytest.mark.parametrize("name", SHAPE_NAMES)
+def test_query_plan(plan_results, name):
+    row = plan_results[name]
+    assert row["ok"], (
+        f"{name} ({row['source']}): {row['reason']}; plan {' > '.join(reversed(row['stages']))}, "
+        f"returned={row['returned']} docs={row['docs_examined']} keys={row['keys_examined']}"
+    )
@@ -0,0 +1,139 @@
+# tests/test_shared_cache.py
+"""
+The cross-process cache tier (utils/shared_cache.py) on a temp
+SHARED_CACHE_PATH.  "Sibling" writes come from a separate Python process
+on the same file, as they would from another bot worker.
+"""
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from utils import shared_cache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def cache_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "shared.db")
+    monkeypatch.setattr(shared_cache, "SHARED_CACHE_PATH", path)
+    monkeypatch.setattr(shared_cache, "_state", {"conn": None, "last_seq": 0, "disabled": False})
+    monkeypatch.setattr(shared_cache, "_callbacks", {})
+    monkeypatch.setattr(shared_cache, "SHARED_CACHE_METRICS", dict.fromkeys(shared_cache.SHARED_CACHE_METRICS, 0))
+    yield path
+    shared_cache.close()
+
+
+def sibling(path: str, code: str) -> str:
+    """Runs `code` (with `shared_cache` imported) in another process on the same file; returns its last line."""
+    script = f"from utils import shared_cache\n{code}\nshared_cache.close()"
+    env = {**os.environ, "SHARED_CACHE_PATH": path, "PYTHONPATH": ROOT}
+    result = subprocess.run([sys.executable, "-c", script], env=env, cwd=ROOT, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    return result.stdout.splitlines()[-1] if result.stdout else ""
+
+
+def test_disabled_without_a_path(monkeypatch):
+    monkeypatch.setattr(shared_cache, "_state", {"conn": None, "last_seq": 0, "disabled": True})
+    monkeypatch.setattr(shared_cache, "SHARED_CACHE_METRICS", dict.fromkeys(shared_cache.SHARED_CACHE_METRICS, 0))
+    shared_cache.put("member", "1:2", True)
+    shared_cache.invalidate("member", "1:2")
+    assert shared_cache.get("member", "1:2", "default") == "default"
+    assert shared_cache.poll_invalidations() == 0
+    assert shared_cache.shared_cache_stats()["misses"] == 0
+
+
+def test_values_are_shared_between_processes(cache_path):
+    shared_cache.put("chat", -100123, {"title": "Auctions", "members": 42})
+    out = sibling(cache_path, "print(shared_cache.get('chat', '-100123'))")
+    assert out.strip() == "{'title': 'Auctions', 'members': 42}"
+
+    sibling(cache_path, "shared_cache.put('member', '-100123:7', True, ttl=3600)")
+    assert shared_cache.get("member", "-100123:7") is True
+    stats = shared_cache.shared_cache_stats()
+    assert (stats["hits"], stats["misses"], stats["writes"]) == (1, 0, 1)
+
+
+def test_entries_expire(cache_path):
+    shared_cache.put("member", "1:2", False, ttl=0.05)
+    assert shared_cache.get("member", "1:2") is False
+    time.sleep(0.1)
+    assert shared_cache.get("member", "1:2", "gone") == "gone"
+
+
+def test_a_read_from_before_an_invalidation_is_never_served(cache_path):
+    seen = shared_cache.current_version()        # then the slow Telegram / Mongo read starts...
+    sibling(cache_path, "shared_cache.invalidate('member', '1:2')")   # ...while a sibling changes it
+    shared_cache.put("member", "1:2", "stale", version=seen)
+    assert shared_cache.get("member", "1:2") is None
+
+    shared_cache.put("member", "1:2", "fresh", version=shared_cache.current_version())
+    assert shared_cache.get("member", "1:2") == "fresh"
+    shared_cache.put("member", "1:2", "older", version=seen)      # cannot overwrite a newer entry
+    assert shared_cache.get("member", "1:2") == "fresh"
+
+
+def test_namespace_invalidation_hides_every_older_entry(cache_path):
+    for key in ("a", "b"):
+        shared_cache.put("bans", key, key)
+    seen = shared_cache.current_version()
+    sibling(cache_path, "shared_cache.invalidate('bans')")
+    shared_cache.put("bans", "c", "c", version=seen)
+    assert [shared_cache.get("bans", key) for key in ("a", "b", "c")] == [None, None, None]
+    shared_cache.put("bans", "a", "again")
+    assert shared_cache.get("bans", "a") == "again"
+
+
+def test_poll_applies_sibling_invalidations_in_order(cache_path):
+    received = []
+    shared_cache.on_invalidate("member", lambda key: received.append(("member", key)))
+    shared_cache.on_invalidate("bans", lambda key: received.append(("bans", key)))
+    shared_cache.current_version()               # opens the file: earlier log rows are not ours to replay
+
+    shared_cache.invalidate("member", "own")     # this process already dropped it
+    sibling(cache_path, "\n".join((
+        "shared_cache.invalidate('member', '1:2')",
+        "shared_cache.invalidate('bans')",
+        "shared_cache.invalidate('chat', '9')",
+        "shared_cache.invalidate('member', '3:4')",
+    )))
+    assert shared_cache.poll_invalidations() == 4
+    assert received == [("member", "1:2"), ("bans", None), ("member", "3:4")]
+    assert shared_cache.poll_invalidations() == 0
+    assert shared_cache.shared_cache_stats()["invalidations_received"] == 4
+    assert shared_cache.shared_cache_stats()["invalidations_sent"] == 1
+
+
+def test_a_new_process_starts_after_the_existing_log(cache_path):
+    sibling(cache_path, "shared_cache.invalidate('member', '1:2')")
+    received = []
+    shared_cache.on_invalidate("member", received.append)
+    assert shared_cache.poll_invalidations() == 0
+    assert received == []
+
+
+def test_prune_drops_expired_entries_and_old_log_rows(cache_path, monkeypatch):
+    monkeypatch.setattr(shared_cache, "SHARED_CACHE_LOG_RETENTION_SECONDS", 60)
+    shared_cache.put("member", "old", 1)
+    shared_cache.put("member", "short", 2, ttl=30)
+    shared_cache.invalidate("chat", "1")
+    shared_cache.put("member", "new", 3)
+    conn = shared_cache._conn()
+    count = lambda table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    assert shared_cache.prune() == 0
+    # Two minutes on: the log row is past retention, and so is "old" (written
+    # before it); "short" has expired; "new" is kept
+    assert shared_cache.prune(now=time.time() + 120) == 3
+    assert (count("entries"), count("invalidations")) == (1, 0)
+    assert shared_cache.get("member", "new") == 3
+
+
+def test_an_unusable_file_counts_as_a_miss(cache_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_cache, "SHARED_CACHE_PATH", str(tmp_path))   # a directory
+    assert shared_cache.get("member", "1:2", "default") == "default"
+    shared_cache.put("member", "1:2", True)
+    assert not shared_cache.enabled()
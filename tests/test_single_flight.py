@@ -0,0 +1,112 @@
+# tests/test_single_flight.py
+"""
+Coalescing of identical concurrent reads (utils/single_flight.py) and the
+repository lookups built on it.
+"""
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from storage import repository as repo
+from storage.conformance import submission
+from utils import single_flight as flights
+from utils.db_policy import BID, BROWSE
+from utils.single_flight import single_flight
+
+
+@pytest.fixture(autouse=True)
+def fresh_flights(monkeypatch):
+    monkeypatch.setattr(flights, "_inflight", {})
+    monkeypatch.setattr(flights, "SINGLE_FLIGHT_METRICS", dict.fromkeys(flights.SINGLE_FLIGHT_METRICS, 0))
+
+
+def slow_read(calls: list, result, delay: float = 0.05):
+    async def read():
+        calls.append(result)
+        await asyncio.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return read
+
+
+def test_concurrent_callers_share_one_read():
+    async def scenario():
+        calls = []
+        results = await asyncio.gather(*(single_flight("k", slow_read(calls, n)) for n in range(10)))
+        return calls, results
+
+    calls, results = asyncio.run(scenario())
+    assert calls == [0]
+    assert results == [0] * 10
+    stats = flights.single_flight_stats()
+    assert (stats["flights"], stats["shared"], stats["in_flight"]) == (1, 9, 0)
+    assert stats["shared_rate"] == 0.9
+
+
+def test_distinct_keys_and_later_calls_read_again():
+    async def scenario():
+        calls = []
+        together = await asyncio.gather(single_flight("a", slow_read(calls, "a")), single_flight("b", slow_read(calls, "b")))
+        later = await single_flight("a", slow_read(calls, "a again"))
+        return calls, together, later
+
+    calls, together, later = asyncio.run(scenario())
+    assert calls == ["a", "b", "a again"]      # nothing is cached once a read finishes
+    assert together == ["a", "b"] and later == "a again"
+
+
+def test_every_caller_gets_the_exception():
+    async def scenario():
+        calls = []
+        return calls, await asyncio.gather(
+            *(single_flight("k", slow_read(calls, LookupError("down"))) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    calls, results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(isinstance(result, LookupError) for result in results)
+    assert results[0] is results[1] is results[2]
+    assert flights.single_flight_stats()["in_flight"] == 0
+
+
+def test_cancelling_one_caller_keeps_the_read_for_the_others():
+    async def scenario():
+        calls = []
+        first = asyncio.create_task(single_flight("k", slow_read(calls, "ok", delay=0.1)))
+        second = asyncio.create_task(single_flight("k", slow_read(calls, "unused")))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return calls, await second, first.cancelled()
+
+    calls, result, cancelled = asyncio.run(scenario())
+    assert calls == ["ok"] and result == "ok" and cancelled
+
+
+def test_repository_lookups_coalesce(store, monkeypatch):
+    reads = []
+    get_submission = store.get_submission
+
+    async def counted(item_id, fields=None, op_class=None):
+        reads.append((item_id, op_class))
+        await asyncio.sleep(0.02)
+        return await get_submission(item_id, fields, op_class=op_class)
+
+    monkeypatch.setattr(store, "get_submission", counted)
+
+    async def scenario():
+        await store.init()
+        try:
+            await store.insert_submission(submission(7, datetime.utcnow(), current_bid=250))
+            same = await asyncio.gather(*(repo.find(repo.BID_CHECK, 7, op_class=BID) for _ in range(25)))
+            other_class = await repo.find(repo.BID_CHECK, 7, op_class=BROWSE)
+            return same, other_class
+        finally:
+            await store.close()
+
+    same, (other_record, _) = asyncio.run(scenario())
+    assert reads == [(7, BID), (7, BROWSE)]
+    assert {record.current_bid for record, archived in same} == {250}
+    assert other_record.id == 7
@@ -0,0 +1,85 @@
+# tests/test_stats.py
+"""Incrementally maintained /status rollups agree with a full rebuild."""
+import asyncio
+from datetime import datetime
+
+from storage import LIVE_STATUS, repository as repo
+from storage.conformance import submission
+from utils import stats
+from utils.background import flush_background
+
+# Levels the rebuild computes for `global` only; daily documents just record their changes
+LEVELS = ("live", "pending", "banned_users")
+
+
+async def _scripted_day(store) -> tuple[dict, dict]:
+    """Runs a day of activity through the stats helpers; returns (incremental, rebuilt) documents."""
+    await store.init()
+    try:
+        now = datetime.utcnow()
+        for user_id in (1, 2, 3):
+            if await store.touch_user(user_id, f"User {user_id}", None, now):
+                stats.user_created()
+        await store.touch_user(1, "User 1", None, now)  # returning user: not counted
+
+        for user_id in (2, 3):
+            await store.add_ban({"user_id": user_id, "reason": "spam", "banned_by": 1, "timestamp": now})
+            stats.user_banned()
+        await store.remove_ban(3)
+        stats.user_banned(False)
+
+        for item_id in (1, 2, 3, 4):
+            await store.insert_submission(submission(item_id, now, status="pending", submitted_time=now))
+            stats.item_submitted()
+        for item_id in (1, 2, 3):
+            await store.update_submission(item_id, {"status": LIVE_STATUS})
+            stats.item_decided(approved=True)
+        await store.update_submission(4, {"status": "rejected"})
+        stats.item_decided(approved=False)
+
+        for user_id, amount in ((1, 150), (3, 200)):
+            await store.record_bid({"_id": f"1:{amount}:{user_id}", "item_id": 1, "user_id": user_id,
+                                    "username": None, "bid": amount, "time": now})
+            stats.bid_placed(amount)
+        await store.update_submission(1, {"current_bid": 200, "last_bidder_id": 3})
+
+        for item_id in (1, 2):  # one sold, one without bids
+            stats.auction_ended(await repo.end_auction(repo.AUCTION_RESULT, item_id, ended_at=now))
+
+        await flush_background()
+        keys = [stats.GLOBAL, stats.day_key(now)]
+        incremental = await store.get_stats(keys)
+        rebuilt = await stats.rebuild_stats(store)
+        return incremental, {key: rebuilt[key] for key in keys}
+    finally:
+        await store.close()
+
+
+def test_incremental_rollups_match_a_rebuild(store):
+    incremental, rebuilt = asyncio.run(_scripted_day(store))
+    overall = incremental[stats.GLOBAL]
+    assert {name: overall.get(name, 0) for name in stats.COUNTERS} == {
+        "users": 3, "banned_users": 1, "submitted": 4, "pending": 0, "approved": 3, "rejected": 1,
+        "live": 1, "ended": 2, "sold": 1, "bids": 2, "bid_volume": 350, "gmv": 200,
+    }
+    for key, doc in incremental.items():
+        counters = [name for name in stats.COUNTERS if key == stats.GLOBAL or name not in LEVELS]
+        assert {name: doc.get(name, 0) for name in counters} == {name: rebuilt[key].get(name, 0) for name in counters}, key
+        assert doc.get("by_rarity") == rebuilt[key].get("by_rarity"), key
+
+
+async def _rebuild_keeps_later_increments(store) -> dict:
+    await store.init()
+    try:
+        await store.inc_stats([stats.GLOBAL, "day:2026-01-01"], {"bids": 5})
+        await stats.rebuild_stats(store)  # empty collections: rewrites `global` only
+        await store.inc_stats([stats.GLOBAL], {"bids": 1})
+        return await store.get_stats([stats.GLOBAL, "day:2026-01-01"])
+    finally:
+        await store.close()
+
+
+def test_rebuild_overwrites_and_keeps_other_documents(store):
+    docs = asyncio.run(_rebuild_keeps_later_increments(store))
+    assert docs[stats.GLOBAL].get("bids") == 1
+    assert docs["day:2026-01-01"]["bids"] == 5
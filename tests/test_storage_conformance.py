@@ -0,0 +1,45 @@
+# tests/test_storage_conformance.py
+"""
+The shared storage suite (storage/conformance.py) under pytest: every
+check against every backend, each on a fresh store.  Mongo runs when the
+`mongo_url` fixture finds a server (see conftest.py) and skips otherwise.
+"""
+import asyncio
+import shutil
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+
+from storage.conformance import CHECKS, CONFORMANCE_DB, open_store, run_benchmark
+
+BACKENDS = ["memory", "sqlite", "mongo"]
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    mongo_url = request.getfixturevalue("mongo_url") if request.param == "mongo" else None
+    workdir = tempfile.mkdtemp(prefix=f"amongo-{request.param}-")
+    args = SimpleNamespace(mongo_url=mongo_url, db=f"{CONFORMANCE_DB}_PYTEST", bench=50, rounds=20)
+    try:
+        yield request.param, workdir, args
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+async def _run_check(check, name: str, workdir: str, args):
+    store = await open_store(name, workdir, args, check.__name__)
+    try:
+        await check(store)
+    finally:
+        await store.close()
+
+
+@pytest.mark.parametrize("check", CHECKS, ids=lambda check: check.__name__)
+def test_conformance(backend, check):
+    asyncio.run(_run_check(check, *backend))
+
+
+def test_benchmark_runs(backend):
+    name, _, args = backend
+    asyncio.run(run_benchmark(name, args))
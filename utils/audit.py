@@ -0,0 +1,39 @@
+# utils/audit.py
+"""
+Audit trail of admin actions, browsed with /audit.
+
+    audit("aban", user, target.id, reason=reason)
+
+Handlers call `audit()` once the action succeeded.  The entry is written
+in the background (utils/background.py), so a slow or failing write never
+delays the reply.  Entries expire after
+AUDIT_RETENTION_DAYS: a TTL index on Mongo, `prune_audit_log()` from the
+archiver task elsewhere.
+"""
+from datetime import datetime, timedelta
+
+from storage import store
+from utils.background import spawn
+from config import AUDIT_RETENTION_DAYS
+
+ACTIONS = ("approve", "reject", "forceend", "rm", "aban", "unaban", "import")
+
+
+def audit(action: str, actor, target=None, **details):
+    """Records that `actor` (a Telegram user) did `action` to `target` (a user or item ID)."""
+    entry = {
+        "time": datetime.utcnow(),
+        "action": action,
+        "actor_id": actor.id,
+        "actor_name": actor.full_name,
+        "target": None if target is None else str(target),
+        "details": details,
+    }
+    spawn(store.record_audit(entry), f"audit {action} by {actor.id}")
+
+
+async def prune_audit_log() -> int:
+    pruned = await store.prune_audit(datetime.utcnow() - timedelta(days=AUDIT_RETENTION_DAYS))
+    if pruned:
+        print(f"🧾 Pruned {pruned} audit entr{'y' if pruned == 1 else 'ies'}.")
+    return pruned
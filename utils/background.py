@@ -0,0 +1,44 @@
+# utils/background.py
+"""
+Fire-and-forget database writes (audit entries, stats increments), and
+long jobs a handler should not wait for (/export).
+
+`spawn()` runs a coroutine in its own task, so the handler never waits for
+it and the write is not counted in the handler's round trips.  Failures
+are printed, never raised.  `flush_background()` waits for the writes
+still in flight (on shutdown, for at most BACKGROUND_FLUSH_SECONDS: a
+bid history write retrying against a database that is down gives up
+there; `python -m utils.bids` replays it from `previous_bidders`).
+"""
+import asyncio
+from typing import Awaitable
+
+from storage.base import _round_trips
+
+# Strong references to in-flight writes (the event loop only keeps weak ones)
+_pending: set = set()
+
+
+def spawn(coro: Awaitable, label: str):
+    task = asyncio.create_task(_run(coro, label))
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+
+async def _run(coro: Awaitable, label: str):
+    _round_trips.set(None)  # this task's context only
+    try:
+        await coro
+    except Exception as e:
+        print(f"⚠️ Background write failed ({label}): {e}")
+
+
+async def flush_background(timeout: float = None):
+    """Waits for the writes in flight; with `timeout`, gives up on those still retrying after it."""
+    if not _pending:
+        return
+    done, pending = await asyncio.wait(list(_pending), timeout=timeout)
+    if pending:
+        print(f"⚠️ {len(pending)} background write(s) still retrying at shutdown; abandoned.")
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,184 @@
+# utils/ban_cache.py
+"""
+In-process copy of the global ban list.
+
+Every command used to look the user up in `global_bans` first.  The list
+is now loaded once at startup and checked in memory; `is_banned` only
+goes to the database while the list has not been loaded yet.
+
+Keeping it fresh:
+
+    /aban, /unaban      update the local copy right after the write and
+                        bump the `ban_list_version` counter
+    tasks/ban_sync.py   reads that counter every BAN_SYNC_SECONDS and
+                        reloads when another process changed it, plus a
+                        full reload every BAN_FULL_RELOAD_MINUTES for
+                        bans written straight into the database
+
+With a shared cache (utils/shared_cache.py, namespace "bans") the list
+is also kept there with its version: a process that (re)loads takes it
+from there instead of Mongo when the versions match, and /aban or
+/unaban in one process makes the others sync at once.  The periodic full
+reload always reads the database (the version does not move for bans
+written there directly), and the shared copy expires after
+BAN_FULL_RELOAD_MINUTES for the same reason.
+
+Up to BAN_CACHE_COMPACT_THRESHOLD IDs are kept in a set.  Larger lists
+are kept as a sorted array of 64-bit ints (8 bytes per ID instead of
+~70) and looked up with a binary search; both are exact, so there is no
+database fallback on hits.
+"""
+import bisect
+import sys
+import time
+from array import array
+
+from storage import get_store
+from utils import shared_cache
+from utils.background import spawn
+from utils.codecs import canonical_user_id
+from config import BAN_CACHE_COMPACT_THRESHOLD, BAN_FULL_RELOAD_MINUTES
+
+VERSION_COUNTER = "ban_list_version"
+
+_state = {
+    "ids": None,         # set[int] or sorted array('q'); None until loaded
+    "version": None,     # ban_list_version seen at the last load
+    "loaded_at": None,   # time.monotonic() of the last load
+}
+
+# In-process counters, shown in /status
+BAN_CACHE_METRICS = {
+    "lookups": 0,
+    "fallbacks": 0,
+    "reloads": 0,
+}
+
+
+def _build(ids) -> object:
+    ids = {canonical_user_id(user_id) for user_id in ids}
+    if len(ids) > BAN_CACHE_COMPACT_THRESHOLD:
+        return array("q", sorted(ids))
+    return ids
+
+
+def _contains(ids, user_id: int) -> bool:
+    if isinstance(ids, array):
+        pos = bisect.bisect_left(ids, user_id)
+        return pos < len(ids) and ids[pos] == user_id
+    return user_id in ids
+
+
+# ====== LOAD ======
+def _share(version: int, ids):
+    shared_cache.put("bans", "ids", {"version": version, "ids": list(ids)}, ttl=BAN_FULL_RELOAD_MINUTES * 60)
+
+
+async def load_bans(version: int = None, force: bool = False) -> int:
+    """
+    (Re)loads the whole list. Returns how many users are banned.
+    `force` skips the shared cache and reads the database.
+    """
+    store = get_store()
+    if version is None:
+        version = await store.get_counter(VERSION_COUNTER)
+    shared = None if force else shared_cache.get("bans", "ids")
+    if shared is not None and shared["version"] == version:
+        ids = shared["ids"]
+    else:
+        ids = await store.list_banned_ids()
+        _share(version, ids)
+    _state["ids"] = _build(ids)
+    _state["version"] = version
+    _state["loaded_at"] = time.monotonic()
+    BAN_CACHE_METRICS["reloads"] += 1
+    return len(_state["ids"])
+
+
+async def sync_bans(full_reload_seconds: float = None) -> bool:
+    """Reloads if the version counter moved (or the copy is too old). True if it reloaded."""
+    version = await get_store().get_counter(VERSION_COUNTER)
+    stale = (
+        full_reload_seconds is not None
+        and _state["loaded_at"] is not None
+        and time.monotonic() - _state["loaded_at"] >= full_reload_seconds
+    )
+    if _state["ids"] is not None and version == _state["version"] and not stale:
+        return False
+    # A full reload is for bans written straight into the database, which
+    # the shared copy cannot know about
+    count = await load_bans(version, force=stale)
+    print(f"🚫 Ban list reloaded: {count} user(s), version {version}.")
+    return True
+
+
+# ====== LOOKUP ======
+async def is_banned(user_id) -> bool:
+    """O(1) in-memory check once loaded; a `global_bans` read before that."""
+    user_id = canonical_user_id(user_id)
+    BAN_CACHE_METRICS["lookups"] += 1
+    ids = _state["ids"]
+    if ids is None:
+        BAN_CACHE_METRICS["fallbacks"] += 1
+        return await get_store().get_ban(user_id) is not None
+    return _contains(ids, user_id)
+
+
+# ====== LOCAL CHANGES (/aban, /unaban) ======
+async def _apply(user_id: int, banned: bool):
+    ids = _state["ids"]
+    if isinstance(ids, array):
+        pos = bisect.bisect_left(ids, user_id)
+        present = pos < len(ids) and ids[pos] == user_id
+        if banned and not present:
+            ids.insert(pos, user_id)
+        elif not banned and present:
+            del ids[pos]
+    elif ids is not None:
+        if banned:
+            ids.add(user_id)
+        else:
+            ids.discard(user_id)
+    # Other processes notice this on their next sync
+    version = await get_store().reserve_ids(VERSION_COUNTER, 1)
+    if _state["version"] is not None and version == _state["version"] + 1:
+        # Nobody else changed the list in between; no reload needed here
+        _state["version"] = version
+        # Siblings on this host pick the new list up from the shared cache
+        shared_cache.invalidate("bans")
+        _share(version, ids or ())
+
+
+async def mark_banned(user_id):
+    """Call after a successful `store.add_ban`."""
+    await _apply(canonical_user_id(user_id), True)
+
+
+async def mark_unbanned(user_id):
+    """Call after a successful `store.remove_ban`."""
+    await _apply(canonical_user_id(user_id), False)
+
+
+def _on_shared_invalidate(key):
+    if _state["ids"] is not None:
+        spawn(sync_bans(), "ban sync")
+
+
+shared_cache.on_invalidate("bans", _on_shared_invalidate)
+
+
+def ban_cache_stats() -> dict:
+    ids = _state["ids"]
+    if ids is None:
+        size, memory, mode = 0, 0, "not loaded"
+    elif isinstance(ids, array):
+        size, memory, mode = len(ids), ids.itemsize * len(ids), "sorted array"
+    else:
+        size, memory, mode = len(ids), sys.getsizeof(ids) + sum(sys.getsizeof(i) for i in ids), "set"
+    return {
+        **BAN_CACHE_METRICS,
+        "size": size,
+        "bytes": memory,
+        "mode": mode,
+        "version": _state["version"],
+    }
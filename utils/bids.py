@@ -0,0 +1,109 @@
+# utils/bids.py
+"""
+Bid history storage.
+
+Every accepted bid is its own document in the `bids` collection (table),
+indexed by (item_id, time).  The submission itself only embeds the latest
+`BIDS_EMBEDDED_LIMIT` entries in `previous_bidders`, so hot items no longer
+grow without bound.
+
+The submission's compare-and-set on `current_bid` (`store.place_bid`)
+remains the source of truth for who is winning.  The bid document is
+written right after it with a deterministic `_id` through
+`store.record_bid`, which never overwrites, so the write is idempotent and
+can be retried (or replayed from `previous_bidders`) without creating
+duplicates.  /bid tries it once inline and, if that fails, keeps retrying
+in the background (`record_bid_later`) until it is stored.
+
+Copy the history of existing items with:  python -m utils.bids
+"""
+import asyncio
+from datetime import datetime
+from typing import Optional
+
+from utils.background import spawn
+
+# Longest pause between two attempts of a background retry
+RETRY_MAX_SECONDS = 30
+
+
+def bid_doc_id(item_id, user_id: int, amount: int) -> str:
+    # Accepted bids strictly increase per item, so (item, amount, user) is unique.
+    return f"{item_id}:{amount}:{user_id}"
+
+
+async def record_bid(
+    item_id, user_id: int, username: str, amount: int, time: datetime,
+    retries: Optional[int] = 3, op_class: str = None, store=None,
+):
+    """
+    Idempotently store an accepted bid (in `store`, default the process-wide
+    one).  `retries=None` keeps trying until it is stored.
+    """
+    if store is None:
+        from storage import store
+
+    doc = {
+        "_id": bid_doc_id(item_id, user_id, amount),
+        "item_id": item_id,
+        "user_id": user_id,
+        "username": username,
+        "bid": amount,
+        # Millisecond precision everywhere, so /bids page cursors (epoch ms) are exact
+        "time": time.replace(microsecond=time.microsecond // 1000 * 1000),
+    }
+    doc_id = doc["_id"]
+    attempt = 0
+    while retries is None or attempt < retries:
+        attempt += 1
+        try:
+            await store.record_bid(doc, op_class=op_class)
+            if attempt > 1:
+                print(f"✅ Recorded bid {doc_id} (attempt {attempt})")
+            return True
+        except Exception as e:
+            print(f"⚠️ Failed to record bid {doc_id} (attempt {attempt}): {e}")
+            if retries is None or attempt < retries:
+                await asyncio.sleep(min(0.2 * attempt, RETRY_MAX_SECONDS))
+    return False
+
+
+def record_bid_later(item_id, user_id: int, username: str, amount: int, time: datetime, op_class: str = None):
+    """Keeps retrying in the background until the bid is stored (the bid itself already went through)."""
+    spawn(
+        record_bid(item_id, user_id, username, amount, time, retries=None, op_class=op_class),
+        f"bid history {bid_doc_id(item_id, user_id, amount)}",
+    )
+
+
+# ====== BACKFILL ======
+async def backfill_bids(db, batch_size: int = 200):
+    """
+    Copies bids embedded in `previous_bidders` into the `bids` collection.
+    Mongo only (older deployments); safe to re-run, every write is idempotent.
+    """
+    from storage.mongo import MongoStorage
+
+    store = MongoStorage(db)
+    copied = 0
+    cursor = db.submissions.find(
+        {"previous_bidders.0": {"$exists": True}},
+        {"previous_bidders": 1},
+        batch_size=batch_size,
+    )
+    async for submission in cursor:
+        for entry in submission.get("previous_bidders", []):
+            try:
+                time = datetime.fromisoformat(entry["time"])
+                await record_bid(submission["_id"], entry["id"], entry.get("username"), entry["bid"], time, store=store)
+                copied += 1
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"⚠️ Skipping malformed bid on item {submission['_id']}: {e}")
+    print(f"✅ Backfilled {copied} bid(s) into the bids collection.")
+    return copied
+
+
+if __name__ == "__main__":
+    from utils.database import db
+
+    asyncio.run(backfill_bids(db))
@@ -0,0 +1,248 @@
+# utils/bulk_import.py
+"""
+Bulk import of pre-approved listings (e.g. moving from another auction house).
+
+    /import                      (reply to a .csv or .jsonl document)
+    python -m utils.bulk_import items.csv --seller-id 123
+
+One row per item, with columns / keys:
+
+    file_id    Telegram photo file_id (required)
+    type       waifu | husbando
+    rarity     rarity emoji (🔵) or name (Common)
+    caption    the photo caption, checked and parsed exactly like /add
+    base_bid   whole number
+    seller_id, seller_username, seller_name   optional; default: the importer
+
+Valid rows get IDs from one block reservation and are written with an
+unordered bulk insert, so a thousand rows take a few round trips.  The
+items are queued: tasks/publisher.py posts them to the group and channel
+one at a time, and only then do they go live (listed in /items, open for
+/bid), since /items links, /bid caption edits and the expiry announcement
+all need the posts.
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import sys
+import time
+from datetime import datetime
+from typing import Iterable, Optional
+
+from config import RARITY_MAP, IMPORT_BATCH_SIZE, PUBLISH_INTERVAL_SECONDS
+from models.tables import Submission
+from storage import QUEUED_STATUS
+from utils import stats
+from utils.codecs import canonical_user_id
+from utils.submission_rules import ITEM_TYPES, check_caption, parse_caption, parse_base_bid
+
+# Rarity names are accepted too ("Common" -> "🔵")
+_RARITY_BY_NAME = {name.lower(): emoji for emoji, name in RARITY_MAP.items()}
+
+# Invalid rows listed in the report
+MAX_REPORTED_ERRORS = 20
+
+
+# ====== READING ======
+def read_rows(data: bytes, fmt: str) -> Iterable[tuple[int, Optional[dict], Optional[str]]]:
+    """Yields (row number, row, parse error) from CSV or JSONL bytes."""
+    text = data.decode("utf-8-sig")
+    if fmt == "csv":
+        # Numbered by record (the header is row 1); captions span several lines
+        for row_no, row in enumerate(csv.DictReader(io.StringIO(text)), start=2):
+            yield row_no, row, None
+        return
+    if fmt == "jsonl":
+        for line_no, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, None, f"invalid JSON ({e.msg})"
+                continue
+            if not isinstance(row, dict):
+                yield line_no, None, "expected a JSON object"
+                continue
+            yield line_no, row, None
+        return
+    raise ValueError(f"Unknown import format {fmt!r} (expected csv or jsonl)")
+
+
+def detect_format(filename: str) -> Optional[str]:
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    return None
+
+
+# ====== VALIDATION ======
+def build_submission(row: dict, seller: dict, batch_id: str, now: datetime) -> tuple[Optional[dict], Optional[str]]:
+    """Turns one row into a submission document (without `_id`), or returns why it was rejected."""
+    def field(name):
+        value = row.get(name)
+        return str(value).strip() if value is not None else ""
+
+    file_id = field("file_id")
+    if not file_id:
+        return None, "missing file_id"
+
+    item_type = field("type").lower()
+    if item_type not in ITEM_TYPES:
+        return None, f"type must be one of {', '.join(ITEM_TYPES)}"
+
+    rarity = field("rarity")
+    rarity = rarity if rarity in RARITY_MAP else _RARITY_BY_NAME.get(rarity.lower())
+    if not rarity:
+        return None, f"unknown rarity {field('rarity')!r}"
+
+    caption = str(row.get("caption") or "")
+    error = check_caption(caption, item_type, rarity)
+    if error:
+        return None, error
+
+    base_bid = parse_base_bid(field("base_bid"))
+    if base_bid is None:
+        return None, "base_bid must be a whole number"
+
+    seller_id = field("seller_id")
+    if seller_id:
+        try:
+            seller = {
+                "user_id": canonical_user_id(seller_id),
+                "username": field("seller_username") or None,
+                "user_name": field("seller_name") or None,
+            }
+        except (TypeError, ValueError):
+            return None, f"invalid seller_id {seller_id!r}"
+
+    doc = Submission(
+        **seller,
+        type=item_type,
+        rarity=rarity,
+        rarity_name=RARITY_MAP.get(rarity, "Unknown"),
+        caption=caption,
+        **parse_caption(caption),
+        file_id=file_id,
+        submitted_time=now,
+        status=QUEUED_STATUS,
+        base_bid=base_bid,
+    ).dict(by_alias=True)
+    doc["import_batch"] = batch_id
+    return doc, None
+
+
+# ====== IMPORT ======
+async def import_items(
+    rows: Iterable[tuple[int, Optional[dict], Optional[str]]],
+    seller: dict,
+    store=None,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> dict:
+    """
+    Validates every row, reserves one contiguous ID range for the valid
+    ones and bulk-inserts them into the publish queue.  `seller`
+    ({"user_id", "username", "user_name"}) is used for rows without their
+    own seller_id.
+    """
+    from storage import get_allocator
+
+    if store is None:
+        from storage import store
+
+    started = time.perf_counter()
+    now = datetime.utcnow()
+    batch_id = f"import-{now.strftime('%Y%m%d-%H%M%S')}"
+
+    docs, errors, total = [], [], 0
+    for line_no, row, error in rows:
+        total += 1
+        if row is not None:
+            doc, error = build_submission(row, seller, batch_id, now)
+        if error:
+            errors.append((line_no, error))
+        else:
+            docs.append(doc)
+
+    inserted = 0
+    if docs:
+        # One counter round trip for the whole file; the range is fresh, so no _id can collide
+        ids = await get_allocator("submission_id").reserve_range(len(docs))
+        for doc, item_id in zip(docs, ids):
+            doc["_id"] = item_id
+        for start in range(0, len(docs), batch_size):
+            count, _ = await store.insert_submissions(docs[start:start + batch_size])
+            inserted += count
+
+    stats.items_imported(inserted)
+
+    report = {
+        "batch": batch_id,
+        "rows": total,
+        "inserted": inserted,
+        "invalid": len(errors),
+        "errors": errors[:MAX_REPORTED_ERRORS],
+        "first_id": docs[0]["_id"] if docs else None,
+        "last_id": docs[-1]["_id"] if docs else None,
+        "seconds": time.perf_counter() - started,
+    }
+    print(
+        f"📥 Import {batch_id}: {inserted}/{total} rows queued, "
+        f"{len(errors)} invalid ({report['seconds']:.2f}s)"
+    )
+    return report
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"📥 <b>Import {report['batch']}</b>",
+        f"✅ Inserted: {report['inserted']} of {report['rows']} rows",
+    ]
+    if report["first_id"] is not None:
+        lines.append(f"🆔 IDs: {report['first_id']}–{report['last_id']}")
+    if report["inserted"]:
+        lines.append(f"⏳ Queued for publishing, one every {PUBLISH_INTERVAL_SECONDS}s")
+    if report["invalid"]:
+        lines.append(f"⚠️ Invalid rows: {report['invalid']}")
+        lines += [f"• row {line_no}: {error}" for line_no, error in report["errors"]]
+    lines.append(f"⏱️ {report['seconds']:.2f}s")
+    return "\n".join(lines)
+
+
+# ====== CLI ======
+async def _main(args) -> int:
+    from storage import store, close_allocators
+    from utils.background import flush_background
+
+    fmt = args.format or detect_format(args.path)
+    if not fmt:
+        print("❌ Cannot tell the format from the file name; pass --format csv|jsonl.")
+        return 2
+    with open(args.path, "rb") as f:
+        data = f.read()
+
+    seller = {"user_id": canonical_user_id(args.seller_id), "username": args.seller_username, "user_name": args.seller_name}
+    await store.init()
+    try:
+        report = await import_items(read_rows(data, fmt), seller, store=store)
+    finally:
+        await flush_background()
+        await close_allocators()
+        await store.close()
+    for line_no, error in report["errors"]:
+        print(f"⚠️ row {line_no}: {error}")
+    return 0 if report["inserted"] or not report["rows"] else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-import pre-approved listings from CSV or JSONL.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "jsonl"])
+    parser.add_argument("--seller-id", type=int, required=True, help="seller for rows without seller_id")
+    parser.add_argument("--seller-username")
+    parser.add_argument("--seller-name")
+    sys.exit(asyncio.run(_main(parser.parse_args())))
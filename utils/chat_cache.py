@@ -0,0 +1,150 @@
+# utils/chat_cache.py
+"""
+Cached `bot.get_chat` results (usernames, titles, mention links).
+
+Publishing an approved item used to call get_chat on the group and the
+channel every time, only to read their usernames.  Chats are now cached
+for CHAT_CACHE_TTL_SECONDS:
+
+    fresh        served from memory
+    near expiry  (less than CHAT_REFRESH_AHEAD_SECONDS left) served from
+                 memory while one background refresh runs
+    expired      fetched again before answering
+
+The group and channel are warmed at startup (`warm_chats`).  Errors are
+raised to the caller as before and never cached.
+
+With a shared cache (utils/shared_cache.py, namespace "chat") a local
+miss is served from there before calling Telegram, and every fetch is
+stored there for the other processes.
+
+Private-link prefixes (`t.me/c/<id>`) need no API call at all; see
+`private_post_link`.
+"""
+import asyncio
+import time
+
+from telegram import Chat
+
+from utils import shared_cache
+from utils.background import spawn
+from config import CHAT_CACHE_TTL_SECONDS, CHAT_REFRESH_AHEAD_SECONDS, CHAT_CACHE_SIZE
+
+# chat_id -> (telegram.Chat, fetched at time.monotonic())
+_cache: dict = {}
+_refreshing: set = set()
+
+# In-process counters, shown in /status
+CHAT_CACHE_METRICS = {
+    "hits": 0,
+    "misses": 0,
+    "refreshes": 0,
+    "errors": 0,
+}
+
+
+def _keep(chat_id, chat):
+    if len(_cache) >= CHAT_CACHE_SIZE and chat_id not in _cache:
+        # Drop the oldest entry
+        del _cache[min(_cache, key=lambda key: _cache[key][1])]
+    _cache[chat_id] = (chat, time.monotonic())
+
+
+async def _fetch(bot, chat_id: int):
+    seen = shared_cache.current_version()
+    try:
+        chat = await bot.get_chat(chat_id)
+    except Exception:
+        CHAT_CACHE_METRICS["errors"] += 1
+        raise
+    _keep(chat_id, chat)
+    shared_cache.put("chat", chat_id, chat.to_dict(), ttl=CHAT_CACHE_TTL_SECONDS, version=seen)
+    return chat
+
+
+def _from_shared(bot, chat_id):
+    data = shared_cache.get("chat", chat_id)
+    if data is None:
+        return None
+    chat = Chat.de_json(data, bot)
+    _keep(chat_id, chat)
+    return chat
+
+
+async def _refresh(bot, chat_id: int):
+    try:
+        await _fetch(bot, chat_id)
+        CHAT_CACHE_METRICS["refreshes"] += 1
+    except Exception as e:
+        print(f"⚠️ Chat refresh failed ({chat_id}): {e}")
+    finally:
+        _refreshing.discard(chat_id)
+
+
+# ====== LOOKUP ======
+async def get_chat(bot, chat_id):
+    """Same as `bot.get_chat(chat_id)`, served from the cache when possible."""
+    key = int(chat_id) if str(chat_id).lstrip("-").isdigit() else chat_id
+    entry = _cache.get(key)
+    if entry:
+        chat, fetched_at = entry
+        age = time.monotonic() - fetched_at
+        if age < CHAT_CACHE_TTL_SECONDS:
+            CHAT_CACHE_METRICS["hits"] += 1
+            if age >= CHAT_CACHE_TTL_SECONDS - CHAT_REFRESH_AHEAD_SECONDS and key not in _refreshing:
+                _refreshing.add(key)
+                spawn(_refresh(bot, key), "chat refresh")
+            return chat
+    CHAT_CACHE_METRICS["misses"] += 1
+    chat = _from_shared(bot, key)
+    if chat is not None:
+        return chat
+    return await _fetch(bot, key)
+
+
+async def chat_username(bot, chat_id):
+    """The chat's public @username (without @), or None for private chats."""
+    chat = await get_chat(bot, chat_id)
+    return getattr(chat, "username", None)
+
+
+async def public_post_link(bot, chat_id, message_id):
+    """https://t.me/<username>/<message_id>, or None if the chat has no username."""
+    username = await chat_username(bot, chat_id)
+    return f"https://t.me/{username}/{message_id}" if username else None
+
+
+def private_post_link(chat_id, message_id):
+    """https://t.me/c/<internal id>/<message_id> for supergroups and channels, else None."""
+    if chat_id and str(chat_id).startswith("-100"):
+        return f"https://t.me/c/{str(chat_id)[4:]}/{message_id}"
+    return None
+
+
+async def _warm_chat(bot, chat_id) -> bool:
+    try:
+        chat = await get_chat(bot, chat_id)
+        print(f"💬 Cached chat {chat_id} ({getattr(chat, 'title', None) or getattr(chat, 'username', None)})")
+        return True
+    except Exception as e:
+        print(f"⚠️ Could not warm chat {chat_id}: {e}")
+        return False
+
+
+async def warm_chats(bot, chat_ids) -> int:
+    """Fetches the chats concurrently. Returns how many are now cached."""
+    results = await asyncio.gather(*(_warm_chat(bot, chat_id) for chat_id in dict.fromkeys(chat_ids)))
+    return sum(results)
+
+
+def forget_chat(chat_id):
+    _cache.pop(int(chat_id), None)
+
+
+def chat_cache_stats() -> dict:
+    lookups = CHAT_CACHE_METRICS["hits"] + CHAT_CACHE_METRICS["misses"]
+    return {
+        **CHAT_CACHE_METRICS,
+        "size": len(_cache),
+        "hit_rate": round(CHAT_CACHE_METRICS["hits"] / lookups, 3) if lookups else 0.0,
+    }
@@ -0,0 +1,43 @@
+# utils/codecs.py
+"""
+Canonical storage types for identifiers.
+
+Telegram user IDs are always stored as int64 under the `user_id` field, in
+every collection (`users`, `global_bans`, `submissions`).  All reads and
+writes go through these helpers so a lookup always hits the one typed index.
+Older documents are converted by `python -m utils.migrations`.
+"""
+from typing import Any
+
+
+def canonical_user_id(value: Any) -> int:
+    """
+    Normalize a Telegram user ID (int, numeric str, or object with `.id`).
+    Raises ValueError for anything that isn't an integer ID.
+    """
+    if hasattr(value, "id"):
+        value = value.id
+    if isinstance(value, bool):
+        raise ValueError(f"Invalid user id: {value!r}")
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and value.strip().lstrip("-").isdigit():
+        return int(value.strip())
+    raise ValueError(f"Invalid user id: {value!r}")
+
+
+def user_filter(user_id: Any) -> dict:
+    """Filter for the `users` collection."""
+    return {"user_id": canonical_user_id(user_id)}
+
+
+def ban_filter(user_id: Any) -> dict:
+    """Filter for the `global_bans` collection."""
+    return {"user_id": canonical_user_id(user_id)}
+
+
+def seller_filter(user_id: Any) -> dict:
+    """Filter for submissions owned by a user."""
+    return {"user_id": canonical_user_id(user_id)}
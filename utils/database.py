@@ -34,24 +34,145 @@
 
 
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
 import certifi
-import os
-from dotenv import load_dotenv
 import asyncio
+import importlib.util
+import threading
+import time
+from config import (
+    MONGO_URL,
+    MONGO_DB,
+    MONGO_TLS,
+    MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE,
+    MONGO_MAX_IDLE_TIME_MS,
+    MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    MONGO_COMPRESSORS,
+)
+from utils.indexes import ensure_indexes, index_usage_report
+from utils.migrations import pending_migrations
 
-load_dotenv()
 
-MONGO_URL = os.getenv("MONGO_URL")
+# ====== POOL-WAIT MONITOR ======
+class PoolWaitMonitor(monitoring.ConnectionPoolListener):
+    """
+    Measures how long operations wait to check a connection out of the pool.
+    Checkout start/finish events fire on the same driver thread, so the
+    start time is kept in a thread-local.
+    """
 
-client = AsyncIOMotorClient(
-    MONGO_URL,
-    tls=True,
-    tlsCAFile=certifi.where(),  # Important for secure connection
-    serverSelectionTimeoutMS=5000
-)
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.failed_checkouts = 0
+            self.total_wait_ms = 0.0
+            self.max_wait_ms = 0.0
+            self.connections_open = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            avg = self.total_wait_ms / self.checkouts if self.checkouts else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "failed_checkouts": self.failed_checkouts,
+                "avg_wait_ms": round(avg, 3),
+                "max_wait_ms": round(self.max_wait_ms, 3),
+                "connections_open": self.connections_open,
+                "max_pool_size": MONGO_MAX_POOL_SIZE,
+            }
+
+    def _elapsed_ms(self) -> float:
+        started = getattr(self._local, "started", None)
+        self._local.started = None
+        return (time.perf_counter() - started) * 1000 if started else 0.0
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        waited = self._elapsed_ms()
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_ms += waited
+            self.max_wait_ms = max(self.max_wait_ms, waited)
+
+    def connection_check_out_failed(self, event):
+        self._elapsed_ms()
+        with self._lock:
+            self.failed_checkouts += 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_open += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_open = max(0, self.connections_open - 1)
+
+    # Events we don't need, but the listener interface requires
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_checked_in(self, event): pass
+
+
+pool_monitor = PoolWaitMonitor()
+
+# Compression libraries are optional; only advertise the ones installed.
+_COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
+
+def _available_compressors(wanted: str) -> list[str]:
+    names = [c.strip() for c in wanted.split(",") if c.strip()]
+    return [
+        c for c in names
+        if c in _COMPRESSOR_MODULES and importlib.util.find_spec(_COMPRESSOR_MODULES[c]) is not None
+    ]
+
+
+# ====== CLIENT FACTORY ======
+def create_client(url: str = MONGO_URL) -> AsyncIOMotorClient:
+    """
+    Builds the Motor client. The whole process must share the one returned
+    by this module (`client` / `db`) so every handler uses the same pool.
+    """
+    options = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "event_listeners": [pool_monitor],
+    }
+    compressors = _available_compressors(MONGO_COMPRESSORS)
+    if compressors:
+        options["compressors"] = ",".join(compressors)
+    if MONGO_TLS:
+        options["tls"] = True
+        options["tlsCAFile"] = certifi.where()  # Important for secure connection
+
+    return AsyncIOMotorClient(url, **options)
+
+
+def pool_stats() -> dict:
+    """Connection-pool wait statistics (for /status and pool sizing)."""
+    return pool_monitor.stats()
 
-db = client.get_database("AUCTIONBOT")
+
+client = create_client()
+
+db = client.get_database(MONGO_DB)
 submissions_collection = db["submissions"]
+archive_collection = db["submissions_archive"]
 counters_collection = db["counters"]
 
 
@@ -63,6 +184,10 @@ async def init_db(retries=5, delay=3):
             print("✅ MongoDB connected successfully")
             # 🔹 Ensure the counter document exists on first connection
             await ensure_counter_exists()
+            # 🔹 Create / reconcile the indexes every handler query relies on
+            await ensure_indexes(db)
+            await report_unused_indexes()
+            await warn_pending_migrations()
             return True
         except Exception as e:
             print(f"⚠️ MongoDB connection attempt {attempt} failed: {e}")
@@ -72,6 +197,31 @@ async def init_db(retries=5, delay=3):
                 raise
 
 
+# ====== INDEX REPORT ======
+async def report_unused_indexes():
+    """Log indexes that no query uses (best effort, never fails startup)."""
+    try:
+        unused = await index_usage_report(db)
+    except Exception as e:
+        print(f"⚠️ Could not build index usage report: {e}")
+        return
+    for row in unused:
+        origin = "registered" if row["registered"] else "unregistered"
+        print(f"📉 Unused index {row['collection']}.{row['name']} ({origin}, ops={row['ops']})")
+
+
+# ====== MIGRATION CHECK ======
+async def warn_pending_migrations():
+    """Lookups only match canonical types; warn if legacy documents remain."""
+    try:
+        pending = await pending_migrations(db)
+    except Exception as e:
+        print(f"⚠️ Could not check pending migrations: {e}")
+        return
+    if pending:
+        print(f"⚠️ Legacy identifier types found ({', '.join(pending)}). Run: python -m utils.migrations")
+
+
 # ====== COUNTER SETUP ======
 async def ensure_counter_exists():
     """
@@ -87,18 +237,3 @@ async def ensure_counter_exists():
         print("🆕 Created initial counter document for submissions.")
     else:
         print("ℹ️ Counter document already exists.")
-
-
-# ====== AUTO-INCREMENT FUNCTION ======
-async def get_next_sequence(name: str):
-    """
-    Generates auto-increment numeric ID (1, 2, 3...) for any collection.
-    Example: await get_next_sequence("submission_id")
-    """
-    counter = await counters_collection.find_one_and_update(
-        {"_id": name},
-        {"$inc": {"sequence_value": 1}},
-        upsert=True,
-        return_document=True
-    )
-    return counter["sequence_value"]
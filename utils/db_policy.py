@@ -0,0 +1,190 @@
+# utils/db_policy.py
+"""
+Read-routing / write-concern policy per operation class.
+
+Handlers tag each Mongo operation with one of the classes below and get a
+collection handle configured for it:
+
+    browse     /items, /myitems, /bids pages   -> secondaries OK, fast timeout
+    bid        /bid compare-and-set            -> primary, majority writes
+    admin      approve, forceend, rm, bans     -> primary, majority writes
+    analytics  /status counts, exports         -> secondaries, long timeout
+
+    coll = policy_collection("submissions", BROWSE)
+    await coll.find(query, max_time_ms=max_time_ms(BROWSE))
+
+A secondary may lag by up to maxStalenessSeconds, so a browse read right
+after this process wrote the same data could miss the write.  Writers
+call `note_write(key)`; readers ask `read_class_after_write(key, BROWSE)`
+and get the primary-reading BID class while that window is open (e.g.
+/bids straight after a /bid).
+
+Every setting can be overridden from the environment, e.g.
+MONGO_POLICY_BROWSE_READ=primaryPreferred, MONGO_POLICY_BID_W=1,
+MONGO_POLICY_ANALYTICS_MAX_STALENESS=300, MONGO_POLICY_ADMIN_MAX_TIME_MS=20000.
+
+On a standalone server every read preference resolves to the primary, so
+the policies are harmless there.  To exercise routing locally, start a
+single-node replica set and point the bot at it:
+
+    mongod --replSet rs0 --dbpath /tmp/rs0 --port 27017
+    mongosh --eval "rs.initiate()"
+    MONGO_URL="mongodb://localhost:27017/?replicaSet=rs0" MONGO_TLS=false python -m utils.db_policy
+"""
+import os
+import time
+from pymongo.read_preferences import Primary, PrimaryPreferred, Secondary, SecondaryPreferred, Nearest
+from pymongo.write_concern import WriteConcern
+
+# ====== OPERATION CLASSES ======
+BROWSE = "browse"
+BID = "bid"
+ADMIN = "admin"
+ANALYTICS = "analytics"
+
+OP_CLASSES = (BROWSE, BID, ADMIN, ANALYTICS)
+
+DEFAULT_POLICIES = {
+    BROWSE: {"read": "secondaryPreferred", "max_staleness": 90, "w": 1, "max_time_ms": 2000},
+    BID: {"read": "primary", "max_staleness": None, "w": "majority", "max_time_ms": 3000},
+    ADMIN: {"read": "primary", "max_staleness": None, "w": "majority", "max_time_ms": 10000},
+    ANALYTICS: {"read": "secondaryPreferred", "max_staleness": 300, "w": 1, "max_time_ms": 30000},
+}
+
+_READ_MODES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+# Driver minimum for maxStalenessSeconds
+MIN_MAX_STALENESS = 90
+
+# Staleness is estimated from server heartbeats (default every 10 s), so a
+# secondary can be this much further behind than maxStalenessSeconds
+HEARTBEAT_SECONDS = 10
+
+
+def _env(op_class: str, key: str, default):
+    raw = os.getenv(f"MONGO_POLICY_{op_class.upper()}_{key.upper()}")
+    if raw is None or raw == "":
+        return default
+    if key == "w":
+        return int(raw) if raw.isdigit() else raw
+    if key in ("max_staleness", "max_time_ms"):
+        return int(raw) if int(raw) > 0 else None
+    return raw
+
+
+def load_policy(op_class: str) -> dict:
+    if op_class not in DEFAULT_POLICIES:
+        raise ValueError(f"Unknown operation class: {op_class}")
+    return {key: _env(op_class, key, value) for key, value in DEFAULT_POLICIES[op_class].items()}
+
+
+def build_read_preference(policy: dict):
+    mode = _READ_MODES.get(policy["read"])
+    if mode is None:
+        raise ValueError(f"Unknown read preference: {policy['read']}")
+    if mode is Primary:
+        return Primary()  # maxStalenessSeconds is not allowed with primary
+    staleness = policy.get("max_staleness")
+    if staleness:
+        return mode(max_staleness=max(staleness, MIN_MAX_STALENESS))
+    return mode()
+
+
+def build_write_concern(policy: dict) -> WriteConcern:
+    w = policy["w"]
+    if w == "majority":
+        return WriteConcern(w="majority", wtimeout=policy.get("max_time_ms") or 0)
+    return WriteConcern(w=w)
+
+
+POLICIES = {op_class: load_policy(op_class) for op_class in OP_CLASSES}
+
+_collection_cache = {}
+
+
+# ====== PUBLIC API ======
+def policy_collection(name: str, op_class: str, database=None):
+    """Collection handle with the read preference / write concern of `op_class`."""
+    if database is None:
+        from utils.database import db as database
+
+    key = (database.name, name, op_class)
+    if key not in _collection_cache:
+        policy = POLICIES[op_class]
+        _collection_cache[key] = database[name].with_options(
+            read_preference=build_read_preference(policy),
+            write_concern=build_write_concern(policy),
+        )
+    return _collection_cache[key]
+
+
+def max_time_ms(op_class: str):
+    """Server-side time limit (maxTimeMS) for operations of `op_class`."""
+    return POLICIES[op_class]["max_time_ms"]
+
+
+# ====== READ-YOUR-WRITES ======
+# key -> monotonic time of this process's last write to it
+_recent_writes: dict = {}
+RECENT_WRITES_KEPT = 10000
+
+
+def staleness_window(op_class: str) -> float:
+    """Seconds a read of `op_class` may lag behind the primary (0 = reads the primary)."""
+    policy = POLICIES[op_class]
+    if policy["read"] == "primary":
+        return 0
+    return max(policy.get("max_staleness") or 0, MIN_MAX_STALENESS) + HEARTBEAT_SECONDS
+
+
+def note_write(key):
+    """Records that this process just wrote `key` (e.g. ("bids", item_id))."""
+    now = time.monotonic()
+    _recent_writes[key] = now
+    if len(_recent_writes) > RECENT_WRITES_KEPT:
+        horizon = now - max(staleness_window(op_class) for op_class in OP_CLASSES)
+        for old_key in [k for k, at in _recent_writes.items() if at < horizon]:
+            del _recent_writes[old_key]
+
+
+def read_class_after_write(key, op_class: str, primary_class: str = BID) -> str:
+    """`op_class`, or `primary_class` while a secondary might not have this process's last write to `key` yet."""
+    written_at = _recent_writes.get(key)
+    if written_at is not None and time.monotonic() - written_at < staleness_window(op_class):
+        return primary_class
+    return op_class
+
+
+def describe_policies() -> list[str]:
+    lines = []
+    for op_class in OP_CLASSES:
+        policy = POLICIES[op_class]
+        lines.append(
+            f"{op_class:<10} read={build_read_preference(policy).mongos_mode} "
+            f"maxStaleness={policy['max_staleness']} w={policy['w']} maxTimeMS={policy['max_time_ms']}"
+        )
+    return lines
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    async def _probe():
+        from utils.database import client, db
+
+        for line in describe_policies():
+            print(line)
+        await db.command("ping")
+        print(f"Topology: {client.topology_description.topology_type_name}")
+        for op_class in OP_CLASSES:
+            coll = policy_collection("submissions", op_class)
+            await coll.find_one({}, {"_id": 1}, max_time_ms=max_time_ms(op_class))
+            print(f"✅ {op_class} read OK")
+
+    asyncio.run(_probe())
@@ -0,0 +1,54 @@
+# utils/drafts.py
+"""
+Draft submissions.
+
+`handle_photo` stores a `status: "draft"` document as soon as a photo
+arrives; it becomes `pending` once the seller sends a base bid.  Drafts
+that are cancelled are deleted right away, and abandoned ones are removed
+by `tasks/draft_sweeper.py` after `DRAFT_RETENTION_HOURS`.
+"""
+from datetime import datetime, timedelta
+from storage import store, DRAFT_STATUS
+from config import DRAFT_RETENTION_HOURS
+
+# In-process counters, shown in /status
+DRAFT_METRICS = {
+    "created": 0,
+    "completed": 0,
+    "cancelled": 0,
+    "replaced": 0,
+    "swept": 0,
+}
+
+
+def record_draft_event(event: str, count: int = 1):
+    DRAFT_METRICS[event] = DRAFT_METRICS.get(event, 0) + count
+
+
+def draft_stats() -> dict:
+    finished = DRAFT_METRICS["completed"] + DRAFT_METRICS["cancelled"] + DRAFT_METRICS["replaced"] + DRAFT_METRICS["swept"]
+    abandoned = DRAFT_METRICS["cancelled"] + DRAFT_METRICS["replaced"] + DRAFT_METRICS["swept"]
+    return {
+        **DRAFT_METRICS,
+        "abandonment_rate": round(abandoned / finished, 3) if finished else 0.0,
+    }
+
+
+async def discard_draft(submission_id, reason: str = "cancelled") -> bool:
+    """Deletes a draft (only while it is still a draft)."""
+    if not submission_id:
+        return False
+    if await store.delete_submission(submission_id, expect={"status": DRAFT_STATUS}):
+        record_draft_event(reason)
+        return True
+    return False
+
+
+async def sweep_abandoned_drafts(retention_hours: int = DRAFT_RETENTION_HOURS) -> int:
+    """Deletes drafts older than the retention window. Returns how many were removed."""
+    cutoff = datetime.utcnow() - timedelta(hours=retention_hours)
+    deleted = await store.delete_drafts_before(cutoff)
+    if deleted:
+        record_draft_event("swept", deleted)
+        print(f"🧹 Swept {deleted} abandoned draft(s).")
+    return deleted
@@ -0,0 +1,86 @@
+# utils/events.py
+"""
+In-process event bus for submission lifecycle events.
+
+    from utils import events
+
+    async def on_bid(event):
+        ...
+    events.subscribe(on_bid, "bid")
+
+tasks/event_feed.py feeds it from a Mongo change stream on `submissions`
+(resume token kept in `stream_state`).  Where change streams are not
+available (standalone mongod, SQLite, memory) it diffs a snapshot of the
+open submissions every EVENT_POLL_SECONDS instead.  Events are dicts:
+
+    {"kind": "status", "item_id": 42, "status": "approved", "fields": {...},
+     "source": "stream" | "poll", "at": datetime}
+
+    status   the item was created or its status changed
+    bid      current_bid changed (fields has current_bid / last_bidder_*)
+    removed  the item was deleted (/rm, or moved to the archive)
+
+`fields` holds only what changed (the whole document on creation).
+Delivery is at-least-once: after a restart the stream resumes from the
+last saved token, so an event can be seen twice.  Callbacks run in order
+and must be quick and idempotent; an exception in one is printed and
+never reaches the others.
+"""
+from datetime import datetime
+from typing import Awaitable, Callable
+
+KINDS = ("status", "bid", "removed")
+
+_subscribers: list[tuple[frozenset, Callable[[dict], Awaitable]]] = []
+
+_stats = {"mode": "starting", "dispatched": {kind: 0 for kind in KINDS}, "failed_callbacks": 0, "last_event_at": None}
+
+
+def subscribe(callback: Callable[[dict], Awaitable], *kinds: str):
+    """Calls `await callback(event)` for events of the given kinds (all kinds if none)."""
+    unknown = set(kinds) - set(KINDS)
+    if unknown:
+        raise ValueError(f"Unknown event kind(s): {', '.join(sorted(unknown))}")
+    _subscribers.append((frozenset(kinds or KINDS), callback))
+
+
+def events_from_change(change: dict, source: str) -> list[dict]:
+    """Turns a storage change ({"op", "_id", "fields"}) into zero or more events."""
+    fields = change.get("fields") or {}
+    base = {"item_id": change["_id"], "fields": fields, "source": source, "at": datetime.utcnow()}
+    if change["op"] == "delete":
+        return [{"kind": "removed", **base}]
+
+    events = []
+    if "status" in fields:
+        events.append({"kind": "status", "status": fields["status"], **base})
+    if change["op"] == "update" and "current_bid" in fields:
+        events.append({"kind": "bid", **base})
+    return events
+
+
+async def publish(event: dict):
+    for kinds, callback in list(_subscribers):
+        if event["kind"] not in kinds:
+            continue
+        try:
+            await callback(event)
+        except Exception as e:
+            _stats["failed_callbacks"] += 1
+            print(f"⚠️ Event callback {getattr(callback, '__name__', callback)} failed on {event['kind']}: {e}")
+    _stats["dispatched"][event["kind"]] += 1
+    _stats["last_event_at"] = event["at"]
+
+
+async def dispatch_change(change: dict, source: str):
+    for event in events_from_change(change, source):
+        await publish(event)
+
+
+def set_mode(mode: str):
+    """"stream" or "poll", shown in /status."""
+    _stats["mode"] = mode
+
+
+def event_stats() -> dict:
+    return {**_stats, "dispatched": dict(_stats["dispatched"]), "subscribers": len(_subscribers)}
@@ -0,0 +1,335 @@
+# utils/export.py
+"""
+Streaming export of submissions, bids and users for offline analysis.
+
+    /export [all|submissions|archive|bids|users] [jsonl|csv|parquet] [since=YYYY-MM-DD|since=last]
+    python -m utils.export --collections bids users --format csv --since last --send
+
+Documents are read with `store.scan()` one batch at a time and written
+straight to a file, so memory stays flat no matter how many documents
+there are.  Encoding and compressing a batch runs in a worker thread
+(asyncio.to_thread), so the event loop keeps serving updates meanwhile:
+
+    jsonl    gzip'd, one full document per line (datetimes as ISO 8601)
+    csv      gzip'd, the fixed columns below (nested values as JSON)
+    parquet  same columns, one row group per batch (needs pyarrow)
+
+`since` keeps documents whose creation time (SCAN_TIME_FIELDS in
+storage/base.py) is at or after the given date.  `since=last` continues
+from the previous successful export of that collection; the watermarks
+live next to the files in EXPORT_DIR/watermarks.json.  Note that the
+watermark is on creation time, so later status changes of older items
+need a full export.
+"""
+import argparse
+import asyncio
+import csv
+import gzip
+import json
+import os
+import resource
+import sys
+import time
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency, only needed for parquet exports
+    pa = pq = None
+
+from storage.base import SCAN_TIME_FIELDS
+
+FORMATS = ("jsonl", "csv", "parquet")
+
+# Short names accepted by /export and the CLI
+COLLECTIONS = {
+    "submissions": "submissions",
+    "archive": "submissions_archive",
+    "bids": "bids",
+    "users": "users",
+}
+
+# Telegram bots can upload documents up to 50 MB
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+
+_SUBMISSION_COLUMNS = [
+    ("_id", "str"),
+    ("status", "str"),
+    ("type", "str"),
+    ("user_id", "int"),
+    ("user_name", "str"),
+    ("username", "str"),
+    ("anime_name", "str"),
+    ("waifu_name", "str"),
+    ("rarity", "str"),
+    ("rarity_name", "str"),
+    ("optional_tag", "str"),
+    ("base_bid", "int"),
+    ("current_bid", "int"),
+    ("last_bidder_id", "int"),
+    ("last_bidder_username", "str"),
+    ("last_bid_time", "time"),
+    ("submitted_time", "time"),
+    ("expires_at", "time"),
+    ("is_expired", "bool"),
+    ("file_id", "str"),
+    ("channel_id", "int"),
+    ("channel_message_id", "int"),
+    ("group_message_id", "int"),
+    ("archived_at", "time"),
+]
+
+# Columns of the csv / parquet formats (jsonl keeps whole documents)
+COLUMNS = {
+    "submissions": _SUBMISSION_COLUMNS,
+    "submissions_archive": _SUBMISSION_COLUMNS,
+    "bids": [
+        ("_id", "str"),
+        ("item_id", "int"),
+        ("user_id", "int"),
+        ("username", "str"),
+        ("bid", "int"),
+        ("time", "time"),
+    ],
+    "users": [
+        ("_id", "str"),
+        ("user_id", "int"),
+        ("full_name", "str"),
+        ("username", "str"),
+        ("is_banned", "bool"),
+        ("created_at", "time"),
+        ("last_seen", "time"),
+    ],
+}
+
+
+# ====== VALUE CONVERSION ======
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)  # ObjectId, Decimal128, ...
+
+
+def _to_json(doc: dict) -> str:
+    return json.dumps(doc, default=_json_default, ensure_ascii=False)
+
+
+def _coerce(value, kind: str):
+    """Fits one field into its column type; anything that does not fit becomes None."""
+    if value is None:
+        return None
+    try:
+        if kind == "int":
+            return int(value)
+        if kind == "bool":
+            return bool(value)
+        if kind == "time":
+            return value if isinstance(value, datetime) else None
+        if isinstance(value, (dict, list)):
+            return _to_json(value)
+        return str(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# ====== WRITERS ======
+class _JsonlWriter:
+    def __init__(self, path: str, collection: str):
+        self.file = gzip.open(path, "wt", encoding="utf-8")
+
+    def write(self, batch: list[dict]):
+        self.file.write("".join(_to_json(doc) + "\n" for doc in batch))
+
+    def close(self):
+        self.file.close()
+
+
+class _CsvWriter:
+    def __init__(self, path: str, collection: str):
+        self.columns = COLUMNS[collection]
+        self.file = gzip.open(path, "wt", encoding="utf-8", newline="")
+        self.csv = csv.writer(self.file)
+        self.csv.writerow([name for name, _ in self.columns])
+
+    def write(self, batch: list[dict]):
+        for doc in batch:
+            row = []
+            for name, kind in self.columns:
+                value = _coerce(doc.get(name), kind)
+                row.append(value.isoformat() if isinstance(value, datetime) else value)
+            self.csv.writerow(row)
+
+    def close(self):
+        self.file.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path: str, collection: str):
+        if pa is None:
+            raise RuntimeError("Parquet export needs pyarrow: pip install pyarrow")
+        self.columns = COLUMNS[collection]
+        self.schema = pa.schema([(name, self._arrow_type(kind)) for name, kind in self.columns])
+        self.writer = pq.ParquetWriter(path, self.schema, compression="gzip")
+
+    @staticmethod
+    def _arrow_type(kind: str):
+        if kind == "time":
+            return pa.timestamp("us")
+        return getattr(pa, {"str": "string", "int": "int64", "bool": "bool_"}[kind])()
+
+    def write(self, batch: list[dict]):
+        arrays = {name: [_coerce(doc.get(name), kind) for doc in batch] for name, kind in self.columns}
+        self.writer.write_table(pa.Table.from_pydict(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+_WRITERS = {"jsonl": _JsonlWriter, "csv": _CsvWriter, "parquet": _ParquetWriter}
+_EXTENSIONS = {"jsonl": "jsonl.gz", "csv": "csv.gz", "parquet": "parquet"}
+
+
+# ====== WATERMARKS ======
+def _watermark_path(out_dir: str) -> str:
+    return os.path.join(out_dir, "watermarks.json")
+
+
+def load_watermarks(out_dir: str) -> dict[str, datetime]:
+    try:
+        with open(_watermark_path(out_dir)) as f:
+            return {name: datetime.fromisoformat(value) for name, value in json.load(f).items()}
+    except FileNotFoundError:
+        return {}
+
+
+def save_watermark(out_dir: str, collection: str, value: datetime):
+    marks = {name: mark.isoformat() for name, mark in load_watermarks(out_dir).items()}
+    marks[collection] = value.isoformat()
+    tmp = _watermark_path(out_dir) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(marks, f, indent=2)
+    os.replace(tmp, _watermark_path(out_dir))
+
+
+def parse_since(raw: str):
+    """`None`, `"last"` or an ISO date / datetime (naive UTC)."""
+    if raw is None or raw == "last":
+        return raw
+    return datetime.fromisoformat(raw)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# ====== EXPORT ======
+async def export_collection(store, collection: str, fmt: str, out_dir: str, since=None, batch_size: int = 1000) -> dict:
+    """
+    Streams one collection into a file in `out_dir`. `since` is a datetime,
+    "last" (previous watermark) or None (everything).
+    """
+    if collection not in SCAN_TIME_FIELDS:
+        raise ValueError(f"Cannot export {collection!r}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r} (expected one of {', '.join(FORMATS)})")
+
+    os.makedirs(out_dir, exist_ok=True)
+    if since == "last":
+        since = load_watermarks(out_dir).get(collection)
+
+    # Anything created after this moment is picked up by the next `since=last`
+    started_at = datetime.utcnow()
+    stamp = started_at.strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(out_dir, f"{collection}-{stamp}.{_EXTENSIONS[fmt]}")
+    tmp_path = path + ".part"
+
+    started = time.perf_counter()
+    rows = 0
+    writer = await asyncio.to_thread(_WRITERS[fmt], tmp_path, collection)
+    try:
+        async for batch in store.scan(collection, since=since, batch_size=batch_size):
+            await asyncio.to_thread(writer.write, batch)
+            rows += len(batch)
+    except BaseException:
+        writer.close()
+        os.remove(tmp_path)
+        raise
+    await asyncio.to_thread(writer.close)
+    os.replace(tmp_path, path)
+    save_watermark(out_dir, collection, started_at)
+
+    result = {
+        "collection": collection,
+        "path": path,
+        "rows": rows,
+        "bytes": os.path.getsize(path),
+        "since": since,
+        "seconds": time.perf_counter() - started,
+    }
+    print(
+        f"📤 Exported {rows} {collection} to {path} "
+        f"({result['bytes'] / 1024:.0f} KB, {result['seconds']:.1f}s, peak RSS {peak_rss_mb():.0f} MB)"
+    )
+    return result
+
+
+async def run_export(collections: list[str], fmt: str, out_dir: str, since=None, batch_size: int = 1000, store=None) -> list[dict]:
+    if store is None:
+        from storage import store
+    return [
+        await export_collection(store, COLLECTIONS.get(name, name), fmt, out_dir, since, batch_size)
+        for name in collections
+    ]
+
+
+def describe(result: dict) -> str:
+    since = result["since"].strftime("%Y-%m-%d %H:%M") if result["since"] else "the beginning"
+    return f"{result['collection']}: {result['rows']} rows since {since} ({result['bytes'] / 1024:.0f} KB)"
+
+
+async def send_exports(bot, chat_id: int, results: list[dict]):
+    """Uploads the files as documents; files over the Telegram limit stay on disk."""
+    for result in results:
+        caption = f"📤 {describe(result)}"
+        if result["bytes"] > MAX_UPLOAD_BYTES:
+            await bot.send_message(chat_id=chat_id, text=f"{caption}\n⚠️ Too large to upload, kept at {result['path']}")
+            continue
+        with open(result["path"], "rb") as f:
+            await bot.send_document(
+                chat_id=chat_id, document=f, filename=os.path.basename(result["path"]), caption=caption
+            )
+
+
+# ====== CLI ======
+async def _main(args) -> int:
+    from storage import store
+    from config import EXPORT_DIR, LOG_GROUP_ID
+
+    await store.init()
+    try:
+        results = await run_export(
+            args.collections, args.format, args.out or EXPORT_DIR, parse_since(args.since), args.batch_size, store
+        )
+        if args.send:
+            from telegram import Bot
+            from config import BOT_TOKEN
+
+            async with Bot(BOT_TOKEN) as bot:
+                await send_exports(bot, LOG_GROUP_ID, results)
+    finally:
+        await store.close()
+    print(f"✅ Export finished, peak RSS {peak_rss_mb():.0f} MB.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream bot data to gzip'd JSONL / CSV or Parquet files.")
+    parser.add_argument("--collections", nargs="+", default=list(COLLECTIONS), choices=list(COLLECTIONS))
+    parser.add_argument("--format", default="jsonl", choices=FORMATS)
+    parser.add_argument("--since", help="ISO date/datetime (UTC), or 'last' to continue from the previous export")
+    parser.add_argument("--out", help="output directory (default EXPORT_DIR)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--send", action="store_true", help="also upload the files to the log group")
+    sys.exit(asyncio.run(_main(parser.parse_args())))
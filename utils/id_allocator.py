@@ -0,0 +1,86 @@
+# utils/id_allocator.py
+"""
+Hi/lo ID allocator.
+
+Instead of one counter round trip per new item, each process reserves a
+block of IDs with a single atomic increment (`store.reserve_ids`) and hands
+them out from memory.  Because the reservation is atomic, any number of bot
+replicas can share the same counter without collisions; IDs stay unique but
+are no longer strictly consecutive across replicas.
+
+The counter always holds the highest ID reserved so far, so the on-disk
+format is unchanged from the old one-at-a-time counter.  `store` is any
+backend from storage/ (see storage/base.py).
+"""
+import asyncio
+
+
+class BlockAllocator:
+    def __init__(self, store, name: str, block_size: int = 20):
+        self.store = store
+        self.name = name
+        self.block_size = max(1, int(block_size))
+        self._next = 0
+        self._high = -1  # empty until the first refill
+        self._lock = asyncio.Lock()
+
+        # ====== METRICS ======
+        self.refills = 0
+        self.reserved = 0
+        self.issued = 0
+        self.wasted = 0
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self._high - self._next + 1)
+
+    async def _reserve(self, count: int) -> tuple[int, int]:
+        """Atomically reserves `count` IDs; returns the inclusive (low, high) range."""
+        high = await self.store.reserve_ids(self.name, count)
+        self.refills += 1
+        self.reserved += count
+        return high - count + 1, high
+
+    async def next_id(self) -> int:
+        async with self._lock:
+            if self.remaining == 0:
+                self._next, self._high = await self._reserve(self.block_size)
+            value = self._next
+            self._next += 1
+            self.issued += 1
+            return value
+
+    async def reserve_range(self, count: int) -> range:
+        """
+        Reserves `count` consecutive IDs in one round trip (for bulk inserts).
+        Bypasses the in-memory block so the range is contiguous.
+        """
+        low, high = await self._reserve(count)
+        self.issued += count
+        return range(low, high + 1)
+
+    async def close(self):
+        """
+        Records IDs reserved by this process but never issued.
+        Call on shutdown; the unused tail of the block is lost for good.
+        """
+        async with self._lock:
+            leftover = self.remaining
+            self._next, self._high = 0, -1
+        if leftover:
+            self.wasted += leftover
+            try:
+                await self.store.add_wasted_ids(self.name, leftover)
+            except Exception as e:
+                print(f"⚠️ Could not record wasted IDs for {self.name}: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "block_size": self.block_size,
+            "refills": self.refills,
+            "reserved": self.reserved,
+            "issued": self.issued,
+            "remaining_in_block": self.remaining,
+            "wasted": self.wasted,
+        }
@@ -0,0 +1,225 @@
+# utils/indexes.py
+"""
+Declarative index registry.
+
+Every query shape the handlers and background tasks issue is listed here
+together with the compound index that serves it.  `ensure_indexes()` runs
+at startup (from `init_db`) and reconciles the live indexes with this
+registry; `index_usage_report()` lists indexes that no query touches.
+"""
+import os
+
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure
+
+
+# Same variable as config.AUDIT_RETENTION_DAYS (config itself needs the bot's env)
+AUDIT_RETENTION_DAYS = int(os.getenv("AUDIT_RETENTION_DAYS", 180))
+
+
+# ====== REGISTRY ======
+# Keys follow the Equality -> Sort -> Range rule.
+# `used_by` is documentation only: it names the call sites the index serves.
+INDEX_REGISTRY = {
+    "submissions": [
+        {
+            "name": "live_by_type",
+            "keys": [("status", ASCENDING), ("type", ASCENDING), ("expires_at", ASCENDING)],
+            "used_by": "item_command.show_category_selection / back_handler counts",
+        },
+        {
+            "name": "live_by_type_id",
+            "keys": [("status", ASCENDING), ("type", ASCENDING), ("_id", ASCENDING), ("expires_at", ASCENDING)],
+            "used_by": "item_command.view_all_handler listing (sorted by _id)",
+        },
+        {
+            "name": "live_by_type_rarity_id",
+            "keys": [
+                ("status", ASCENDING),
+                ("type", ASCENDING),
+                ("rarity_name", ASCENDING),
+                ("_id", ASCENDING),
+                ("expires_at", ASCENDING),
+            ],
+            "used_by": "item_command.rarity_selection_handler listing (sorted by _id)",
+        },
+        {
+            "name": "expiry_sweep",
+            "keys": [("status", ASCENDING), ("is_expired", ASCENDING), ("expires_at", ASCENDING)],
+            "used_by": "tasks.auction_expiry.check_expired_auctions / tasks.cleanup.remove_expired_bids",
+        },
+        {
+            "name": "draft_sweep",
+            "keys": [("submitted_time", ASCENDING)],
+            "partialFilterExpression": {"status": "draft"},
+            "used_by": "utils.drafts.sweep_abandoned_drafts",
+        },
+        {
+            "name": "archive_sweep",
+            "keys": [("status", ASCENDING), ("expires_at", ASCENDING)],
+            "used_by": "tasks.archiver.archive_finished_submissions",
+        },
+        {
+            "name": "seller_items",
+            "keys": [("user_id", ASCENDING), ("type", ASCENDING), ("status", ASCENDING)],
+            "used_by": "my_items.myitems_type_handler",
+        },
+        {
+            "name": "publish_queue",
+            "keys": [("status", ASCENDING), ("_id", ASCENDING)],
+            "partialFilterExpression": {"status": "queued"},
+            "used_by": "tasks.publisher (bulk-imported items waiting to be posted)",
+        },
+    ],
+    "submissions_archive": [
+        {
+            "name": "archive_seller_items",
+            "keys": [("user_id", ASCENDING), ("type", ASCENDING), ("status", ASCENDING)],
+            "used_by": "seller history lookups on archived items",
+        },
+    ],
+    "bids": [
+        {
+            "name": "bids_by_item_time",
+            "keys": [("item_id", ASCENDING), ("time", ASCENDING), ("_id", ASCENDING)],
+            "used_by": "auction_bid.render_bid_history (/bids pages)",
+        },
+    ],
+    "global_bans": [
+        {
+            "name": "ban_user_id",
+            "keys": [("user_id", ASCENDING)],
+            "used_by": "ban checks in add_command / item_command / auction_bid / start_handler",
+        },
+    ],
+    "users": [
+        {
+            "name": "user_user_id",
+            "keys": [("user_id", ASCENDING)],
+            "used_by": "start_handler.start_command upsert",
+        },
+    ],
+    "audit_log": [
+        {
+            "name": "audit_by_time",
+            "keys": [("time", ASCENDING)],
+            "expireAfterSeconds": AUDIT_RETENTION_DAYS * 86400,
+            "used_by": "TTL expiry",
+        },
+        {
+            # A TTL index takes a single field, so the (time, _id) page order needs its own
+            "name": "audit_by_time_id",
+            "keys": [("time", ASCENDING), ("_id", ASCENDING)],
+            "used_by": "audit.render_audit_page (unfiltered /audit)",
+        },
+        {
+            "name": "audit_by_actor",
+            "keys": [("actor_id", ASCENDING), ("time", ASCENDING), ("_id", ASCENDING)],
+            "used_by": "audit.render_audit_page (/audit actor=...)",
+        },
+        {
+            "name": "audit_by_target",
+            "keys": [("target", ASCENDING), ("time", ASCENDING), ("_id", ASCENDING)],
+            "used_by": "audit.render_audit_page (/audit target=...)",
+        },
+    ],
+}
+
+# Options that are part of an index's identity when comparing specs.
+_SPEC_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+
+def _spec_options(spec: dict) -> dict:
+    return {k: spec[k] for k in _SPEC_OPTIONS if k in spec}
+
+
+def _same_index(existing: dict, spec: dict) -> bool:
+    """Compare a live index (from index_information) with a registry entry."""
+    if list(existing.get("key", [])) != [(k, d) for k, d in spec["keys"]]:
+        return False
+    for option in _SPEC_OPTIONS:
+        if existing.get(option) != spec.get(option):
+            return False
+    return True
+
+
+# ====== RECONCILE ======
+async def ensure_indexes(db, drop_unknown: bool = False) -> dict:
+    """
+    Create missing registry indexes and rebuild the ones whose spec changed.
+    Indexes that exist in MongoDB but not in the registry are reported and
+    only dropped when `drop_unknown=True`.
+    Returns {"created": [...], "rebuilt": [...], "unknown": [...]}.
+    """
+    summary = {"created": [], "rebuilt": [], "unknown": []}
+
+    for collection_name, specs in INDEX_REGISTRY.items():
+        collection = db[collection_name]
+        existing = await collection.index_information()
+        wanted = {spec["name"] for spec in specs}
+
+        for spec in specs:
+            name = spec["name"]
+            current = existing.get(name)
+            if current is not None and _same_index(current, spec):
+                continue
+
+            try:
+                if current is not None:
+                    await collection.drop_index(name)
+                await collection.create_index(spec["keys"], name=name, **_spec_options(spec))
+            except OperationFailure as e:
+                # e.g. the same key pattern already exists under another name
+                print(f"⚠️ Could not build index {collection_name}.{name}: {e}")
+                continue
+
+            summary["rebuilt" if current is not None else "created"].append(f"{collection_name}.{name}")
+
+        for name in existing:
+            if name == "_id_" or name in wanted:
+                continue
+            if drop_unknown:
+                await collection.drop_index(name)
+                print(f"🗑️ Dropped unregistered index {collection_name}.{name}")
+            summary["unknown"].append(f"{collection_name}.{name}")
+
+    for key in ("created", "rebuilt"):
+        for name in summary[key]:
+            print(f"🧭 Index {key}: {name}")
+    for name in summary["unknown"]:
+        print(f"ℹ️ Index not in registry: {name}")
+
+    return summary
+
+
+# ====== USAGE REPORT ======
+async def index_usage_report(db) -> list[dict]:
+    """
+    Report indexes that no query has used since the server last restarted
+    (via `$indexStats`), plus indexes that are not declared in the registry.
+    Each row: {"collection", "name", "ops", "registered"}.
+    """
+    report = []
+
+    for collection_name, specs in INDEX_REGISTRY.items():
+        registered = {spec["name"] for spec in specs}
+        try:
+            stats = await db[collection_name].aggregate([{"$indexStats": {}}]).to_list(length=None)
+        except OperationFailure as e:
+            print(f"⚠️ $indexStats unavailable for {collection_name}: {e}")
+            continue
+
+        for row in stats:
+            name = row.get("name")
+            if name == "_id_":
+                continue
+            ops = int(row.get("accesses", {}).get("ops", 0))
+            if ops == 0 or name not in registered:
+                report.append({
+                    "collection": collection_name,
+                    "name": name,
+                    "ops": ops,
+                    "registered": name in registered,
+                })
+
+    return report
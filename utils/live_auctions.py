@@ -0,0 +1,299 @@
+# utils/live_auctions.py
+"""
+In-process read model of every running auction.
+
+/items (listings and category counts) and /myitems are answered from
+memory.  An item is in the model while it is approved, not flagged
+`is_expired` and `expires_at` is in the future; it is indexed by type,
+type + rarity (both ordered by `_id`, for keyset pages), seller and
+expiry.
+
+Keeping it current:
+
+    startup            `init_live_auctions` loads it from one `list_open` read
+    this process       the code paths that change a live item call
+                       `refresh` (approve / publish), `apply` (bids) or
+                       `discard` (end, /rm) right after their write
+    other processes    status / bid / removed events from utils/events.py
+    drift check        tasks/live_auctions.py reloads the open set every
+                       LIVE_MODEL_CHECK_SECONDS, counts the differences and
+                       swaps in the fresh copy when there are any
+
+Until the first load, the helpers below return None and callers use the
+database as before.
+
+`catalog_version(type, rarity)` changes whenever a listing of that type
+(or type + rarity) would render differently: an item appears, goes away
+or its listed fields change.  Bids do not change it.  Rendered /items
+pages are cached against it (utils/page_cache.py).
+"""
+import bisect
+import heapq
+from datetime import datetime
+
+from bson import ObjectId
+
+from storage import LIVE_STATUS, get_store
+from utils import events
+from utils.background import spawn
+
+# What listings, counts and /myitems read
+MODEL_FIELDS = (
+    "type", "rarity_name", "user_id", "status", "expires_at", "is_expired",
+    "waifu_name", "anime_name", "channel_id", "channel_message_id", "current_bid", "base_bid",
+)
+
+# What /items pages show; changes to anything else (bids) keep cached pages
+LISTED_FIELDS = ("type", "rarity_name", "waifu_name", "anime_name", "channel_id", "channel_message_id")
+
+_state = {
+    "loaded": False,
+    "epoch": 0,            # bumped by full reloads
+    "versions": {},        # type / (type, rarity_name) -> listing version
+    "docs": {},            # _id -> document (MODEL_FIELDS)
+    "by_type": {},         # type -> sorted [sort key]
+    "by_rarity": {},       # (type, rarity_name) -> sorted [sort key]
+    "by_seller": {},       # user_id -> {_id}
+    "expiry": [],          # heap of (expires_at, sort key); stale entries are skipped
+    "mutations": 0,        # bumped on every change; a drift check racing one is discarded
+}
+
+# In-process counters, shown in /status
+LIVE_MODEL_METRICS = {
+    "reads": 0,
+    "fallbacks": 0,
+    "updates": 0,
+    "checks": 0,
+    "drift": 0,
+    "rebuilds": 0,
+}
+
+
+def _key(item_id) -> tuple:
+    # Counter IDs sort before legacy ObjectIds, as in Mongo
+    return (1, item_id) if isinstance(item_id, ObjectId) else (0, item_id)
+
+
+def _is_live(doc: dict, now: datetime) -> bool:
+    return (
+        doc.get("status") == LIVE_STATUS
+        and doc.get("is_expired") is not True
+        and doc.get("expires_at") is not None
+        and doc["expires_at"] > now
+    )
+
+
+# ====== INDEX MAINTENANCE ======
+def _bump(doc: dict):
+    versions = _state["versions"]
+    for key in (doc.get("type"), (doc.get("type"), doc.get("rarity_name"))):
+        versions[key] = versions.get(key, 0) + 1
+
+
+def _unindex(item_id, bump: bool = True):
+    doc = _state["docs"].pop(item_id, None)
+    if doc is None:
+        return
+    if bump:
+        _bump(doc)
+    key = _key(item_id)
+    for index, name in ((_state["by_type"], doc.get("type")), (_state["by_rarity"], (doc.get("type"), doc.get("rarity_name")))):
+        keys = index.get(name)
+        if keys:
+            pos = bisect.bisect_left(keys, key)
+            if pos < len(keys) and keys[pos] == key:
+                del keys[pos]
+    seller = _state["by_seller"].get(doc.get("user_id"))
+    if seller:
+        seller.discard(item_id)
+
+
+def _index(item_id, doc: dict):
+    old = _state["docs"].get(item_id)
+    if not _is_live(doc, datetime.utcnow()):
+        _unindex(item_id)
+        return
+    doc = {field: doc.get(field) for field in MODEL_FIELDS}
+    doc["_id"] = item_id
+    listed_changed = old is None or any(old.get(field) != doc.get(field) for field in LISTED_FIELDS)
+    _unindex(item_id, bump=listed_changed)
+    if listed_changed:
+        _bump(doc)
+    key = _key(item_id)
+    _state["docs"][item_id] = doc
+    bisect.insort(_state["by_type"].setdefault(doc["type"], []), key)
+    bisect.insort(_state["by_rarity"].setdefault((doc["type"], doc["rarity_name"]), []), key)
+    _state["by_seller"].setdefault(doc.get("user_id"), set()).add(item_id)
+    heapq.heappush(_state["expiry"], (doc["expires_at"], key))
+
+
+def _expire(now: datetime):
+    """Drops items whose auction time is over (the expiry task flags them later)."""
+    heap = _state["expiry"]
+    while heap and heap[0][0] <= now:
+        expires_at, key = heapq.heappop(heap)
+        doc = _state["docs"].get(key[1])
+        if doc is not None and doc["expires_at"] == expires_at:
+            _unindex(key[1])
+
+
+def _replace(docs: list[dict]):
+    for name in ("docs", "by_type", "by_rarity", "by_seller", "versions"):
+        _state[name] = {}
+    _state["expiry"] = []
+    _state["epoch"] += 1
+    for doc in docs:
+        _index(doc["_id"], doc)
+    _state["loaded"] = True
+
+
+# ====== LOAD / DRIFT CHECK ======
+async def _snapshot() -> list[dict]:
+    docs = await get_store().list_open(MODEL_FIELDS)
+    now = datetime.utcnow()
+    return [doc for doc in docs if _is_live(doc, now)]
+
+
+async def load_live_auctions() -> int:
+    _replace(await _snapshot())
+    LIVE_MODEL_METRICS["rebuilds"] += 1
+    return len(_state["docs"])
+
+
+async def check_live_auctions() -> int:
+    """Compares the model with the database; rebuilds it on drift. Returns the differences found."""
+    mutations = _state["mutations"]
+    fresh = {doc["_id"]: doc for doc in await _snapshot()}
+    if _state["mutations"] != mutations:
+        return 0  # changed while we were reading; try again next round
+    LIVE_MODEL_METRICS["checks"] += 1
+    _expire(datetime.utcnow())
+
+    current = _state["docs"]
+    drift = len(current.keys() ^ fresh.keys())
+    for item_id in current.keys() & fresh.keys():
+        if any(current[item_id].get(field) != fresh[item_id].get(field) for field in MODEL_FIELDS):
+            drift += 1
+    if drift:
+        LIVE_MODEL_METRICS["drift"] += drift
+        LIVE_MODEL_METRICS["rebuilds"] += 1
+        _replace(list(fresh.values()))
+        print(f"⚠️ Live auction model drifted by {drift} item(s); rebuilt with {len(fresh)}.")
+    return drift
+
+
+# ====== CHANGES ======
+def apply(item_id, changes: dict):
+    """Merges a write this process just made (e.g. a bid) into the model."""
+    _state["mutations"] += 1
+    LIVE_MODEL_METRICS["updates"] += 1
+    doc = _state["docs"].get(item_id)
+    if doc is not None:
+        _index(item_id, {**doc, **changes})
+
+
+def discard(item_id):
+    """The auction ended or the item was removed."""
+    _state["mutations"] += 1
+    LIVE_MODEL_METRICS["updates"] += 1
+    _unindex(item_id)
+
+
+async def _reload_item(item_id):
+    _state["mutations"] += 1
+    doc, archived = await get_store().get_submission(item_id, MODEL_FIELDS)
+    _state["mutations"] += 1
+    LIVE_MODEL_METRICS["updates"] += 1
+    if doc is None or archived:
+        _unindex(item_id)
+    else:
+        _index(item_id, doc)
+
+
+def refresh(item_id):
+    """Re-reads one item in the background (it may have just gone live or stopped being live)."""
+    if _state["loaded"]:
+        spawn(_reload_item(item_id), "live model refresh")
+
+
+async def on_event(event: dict):
+    if not _state["loaded"]:
+        return
+    if event["kind"] == "removed":
+        discard(event["item_id"])
+    elif event["kind"] == "bid":
+        apply(event["item_id"], event["fields"])
+    else:
+        await _reload_item(event["item_id"])
+
+
+async def init_live_auctions() -> int:
+    """Subscribes the model to the event bus and loads it."""
+    # Subscribed first: if the load fails, the drift check loads it later
+    # and events (ignored until then) are applied from that point on
+    events.subscribe(on_event)
+    return await load_live_auctions()
+
+
+# ====== READS (None = not loaded, ask the database) ======
+def _served() -> bool:
+    if not _state["loaded"]:
+        LIVE_MODEL_METRICS["fallbacks"] += 1
+        return False
+    LIVE_MODEL_METRICS["reads"] += 1
+    _expire(datetime.utcnow())
+    return True
+
+
+def _project(doc: dict, fields) -> dict:
+    if fields is None:
+        return dict(doc)
+    return {"_id": doc["_id"], **{field: doc.get(field) for field in fields}}
+
+
+def count_live(item_type: str, rarity_name: str = None):
+    if not _served():
+        return None
+    keys = _state["by_rarity"].get((item_type, rarity_name)) if rarity_name else _state["by_type"].get(item_type)
+    return len(keys or ())
+
+
+def list_live(item_type: str, rarity_name: str = None, after=None, before=None, limit: int = 10, fields=None):
+    """Same contract as Storage.list_live: ordered by `_id`, keyset cursors."""
+    if not _served():
+        return None
+    keys = (_state["by_rarity"].get((item_type, rarity_name)) if rarity_name else _state["by_type"].get(item_type)) or []
+    if before is not None:
+        end = bisect.bisect_left(keys, _key(before))
+        page = keys[max(0, end - limit):end]
+    else:
+        start = bisect.bisect_right(keys, _key(after)) if after is not None else 0
+        page = keys[start:start + limit]
+    return [_project(_state["docs"][key[1]], fields) for key in page]
+
+
+def list_seller_live(user_id, item_type: str, limit: int = 100, fields=None):
+    if not _served():
+        return None
+    docs = sorted(
+        (_state["docs"][item_id] for item_id in _state["by_seller"].get(user_id, ())),
+        key=lambda doc: _key(doc["_id"]),
+    )
+    return [_project(doc, fields) for doc in docs if doc.get("type") == item_type][:limit]
+
+
+def catalog_version(item_type: str, rarity_name: str = None):
+    """Changes whenever that listing would render differently; None before the first load."""
+    if not _state["loaded"]:
+        return None
+    _expire(datetime.utcnow())
+    key = (item_type, rarity_name) if rarity_name else item_type
+    return _state["epoch"], _state["versions"].get(key, 0)
+
+
+def live_model_stats() -> dict:
+    return {
+        **LIVE_MODEL_METRICS,
+        "loaded": _state["loaded"],
+        "size": len(_state["docs"]),
+    }
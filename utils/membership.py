@@ -0,0 +1,150 @@
+# utils/membership.py
+"""
+Cached "is this user in the group and the channel?" check.
+
+/add, /items, /bid and every photo need it.  Answers are cached per
+(chat, user):
+
+    miss        both chats are asked at the same time (get_chat_member)
+    join/leave  handlers/membership.py receives the chat_member update
+                and overwrites the entry, so a user who just joined is
+                let in on their next try
+    TTL         members are re-checked after MEMBERSHIP_TTL_SECONDS and
+                non-members after MEMBERSHIP_NEGATIVE_TTL_SECONDS, in
+                case an update was missed (the bot only receives
+                chat_member updates where it is an admin)
+
+API errors are treated as "not a member", as before, but not cached.
+
+With a shared cache (utils/shared_cache.py, namespace "member") a local
+miss is looked up there before asking Telegram, answers are stored there
+for the other processes, and a join / leave seen by one process drops
+the entry in all of them.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+
+from utils import shared_cache
+
+from config import (
+    GROUP_ID,
+    CHANNEL_ID,
+    MEMBERSHIP_TTL_SECONDS,
+    MEMBERSHIP_NEGATIVE_TTL_SECONDS,
+    MEMBERSHIP_CACHE_SIZE,
+)
+
+# Anything else (member, administrator, creator, restricted) counts as in the chat
+NOT_MEMBER_STATUSES = ("left", "kicked")
+
+# (chat_id, user_id) -> (is member, expires at time.monotonic())
+_cache: "OrderedDict[tuple[int, int], tuple[bool, float]]" = OrderedDict()
+
+# In-process counters, shown in /status
+MEMBERSHIP_METRICS = {
+    "hits": 0,
+    "misses": 0,
+    "api_errors": 0,
+    "updates": 0,
+}
+
+
+def _store(chat_id: int, user_id: int, member: bool):
+    ttl = MEMBERSHIP_TTL_SECONDS if member else MEMBERSHIP_NEGATIVE_TTL_SECONDS
+    key = (int(chat_id), int(user_id))
+    _cache[key] = (member, time.monotonic() + ttl)
+    _cache.move_to_end(key)
+    while len(_cache) > MEMBERSHIP_CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+def _shared_key(chat_id: int, user_id: int) -> str:
+    return f"{int(chat_id)}:{int(user_id)}"
+
+
+def _cached(chat_id: int, user_id: int):
+    entry = _cache.get((int(chat_id), int(user_id)))
+    if entry is not None and entry[1] > time.monotonic():
+        return entry[0]
+    shared = shared_cache.get("member", _shared_key(chat_id, user_id))
+    if shared is not None:
+        _store(chat_id, user_id, shared)
+    return shared
+
+
+def _share(chat_id: int, user_id: int, member: bool, version: int = None):
+    ttl = MEMBERSHIP_TTL_SECONDS if member else MEMBERSHIP_NEGATIVE_TTL_SECONDS
+    shared_cache.put("member", _shared_key(chat_id, user_id), member, ttl=ttl, version=version)
+
+
+async def _fetch(bot, chat_id: int, user_id: int):
+    seen = shared_cache.current_version()
+    try:
+        member = await bot.get_chat_member(chat_id, user_id)
+    except Exception as e:
+        MEMBERSHIP_METRICS["api_errors"] += 1
+        print(f"⚠️ get_chat_member({chat_id}, {user_id}) failed: {e}")
+        return None
+    result = member.status not in NOT_MEMBER_STATUSES
+    _store(chat_id, user_id, result)
+    _share(chat_id, user_id, result, seen)
+    return result
+
+
+# ====== LOOKUP ======
+async def is_member(user_id: int, context, chats=None) -> bool:
+    """True if the user is in every chat of `chats` (default: the group and the channel)."""
+    chats = chats or (GROUP_ID, CHANNEL_ID)
+    missing = []
+    for chat_id in chats:
+        cached = _cached(chat_id, user_id)
+        if cached is False:
+            MEMBERSHIP_METRICS["hits"] += 1
+            return False
+        if cached is None:
+            missing.append(chat_id)
+    MEMBERSHIP_METRICS["hits"] += len(chats) - len(missing)
+    if not missing:
+        return True
+
+    MEMBERSHIP_METRICS["misses"] += len(missing)
+    results = await asyncio.gather(*(_fetch(context.bot, chat_id, user_id) for chat_id in missing))
+    return all(results)
+
+
+# ====== UPDATES ======
+def record_member_update(chat_id: int, user_id: int, status: str):
+    """Called for every chat_member update (join, leave, ban, promotion...)."""
+    MEMBERSHIP_METRICS["updates"] += 1
+    member = status not in NOT_MEMBER_STATUSES
+    _store(chat_id, user_id, member)
+    # Other processes drop their copy, then read this one
+    shared_cache.invalidate("member", _shared_key(chat_id, user_id))
+    _share(chat_id, user_id, member)
+
+
+def forget_member(user_id: int):
+    """Drops every cached answer for a user."""
+    for key in [key for key in _cache if key[1] == int(user_id)]:
+        del _cache[key]
+
+
+def _on_shared_invalidate(key):
+    if key is None:
+        _cache.clear()
+        return
+    chat_id, user_id = key.split(":")
+    _cache.pop((int(chat_id), int(user_id)), None)
+
+
+shared_cache.on_invalidate("member", _on_shared_invalidate)
+
+
+def membership_stats() -> dict:
+    lookups = MEMBERSHIP_METRICS["hits"] + MEMBERSHIP_METRICS["misses"]
+    return {
+        **MEMBERSHIP_METRICS,
+        "size": len(_cache),
+        "hit_rate": round(MEMBERSHIP_METRICS["hits"] / lookups, 3) if lookups else 0.0,
+    }
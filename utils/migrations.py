@@ -0,0 +1,222 @@
+# utils/migrations.py
+"""
+Resumable, batched data migrations.
+
+Usage:
+    python -m utils.migrations                 # run every pending migration
+    python -m utils.migrations --dry-run       # only report what would change
+    python -m utils.migrations --only global_bans_user_id --batch-size 200
+
+Each migration walks its collection in `_id` order, a small batch at a
+time, and writes with an unordered `bulk_write`.  Every write is guarded by
+the old value, so documents changed concurrently by the bot are skipped
+instead of overwritten, and no long-running lock is held.  Progress
+(the last `_id` handled) is saved in the `migrations` collection so an
+interrupted run continues where it stopped.
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from bson import ObjectId
+from pymongo import UpdateOne, DeleteOne
+
+from utils.codecs import canonical_user_id
+
+
+# ====== MIGRATION DEFINITIONS ======
+# field: the identifier to normalize
+# legacy_field: an older field name holding the same value (renamed to `field`)
+# dedupe: delete a legacy document if a canonical one already exists
+MIGRATIONS = [
+    {
+        "name": "global_bans_user_id",
+        "collection": "global_bans",
+        "field": "user_id",
+        "dedupe": True,
+    },
+    {
+        "name": "submissions_user_id",
+        "collection": "submissions",
+        "field": "user_id",
+        "dedupe": False,
+    },
+    {
+        "name": "users_user_id",
+        "collection": "users",
+        "field": "user_id",
+        "legacy_field": "id",
+        "dedupe": True,
+    },
+]
+
+
+def _legacy_query(migration: dict) -> dict:
+    """Documents that still need converting."""
+    field = migration["field"]
+    clauses = [{field: {"$type": "string"}}, {field: {"$type": "double"}}]
+    legacy_field = migration.get("legacy_field")
+    if legacy_field:
+        clauses.append({field: {"$exists": False}, legacy_field: {"$exists": True}})
+    return {"$or": clauses}
+
+
+def _after_id(last_id) -> dict:
+    """
+    Documents past `last_id` in `_id` order.  $gt only compares within one
+    BSON type, and collections such as submissions mix counter integers
+    with legacy ObjectIds, so the types that sort later (numbers < strings
+    < ObjectIds) are added explicitly, as in MongoStorage._id_range.
+    """
+    if isinstance(last_id, ObjectId):
+        return {"_id": {"$gt": last_id}}
+    later = ["objectId"] if isinstance(last_id, str) else ["string", "objectId"]
+    return {"$or": [{"_id": {"$gt": last_id}}, *({"_id": {"$type": kind}} for kind in later)]}
+
+
+def _plan_document(migration: dict, doc: dict):
+    """Returns (canonical_value, guard_filter, update) or None if unconvertible."""
+    field = migration["field"]
+    legacy_field = migration.get("legacy_field")
+
+    if field in doc:
+        raw = doc[field]
+        guard = {"_id": doc["_id"], field: raw}
+        update = {"$set": {field: None}}
+    else:
+        raw = doc.get(legacy_field)
+        guard = {"_id": doc["_id"], field: {"$exists": False}, legacy_field: raw}
+        update = {"$set": {field: None}, "$unset": {legacy_field: ""}}
+
+    try:
+        value = canonical_user_id(raw)
+    except ValueError:
+        return None
+
+    update["$set"][field] = value
+    return value, guard, update
+
+
+# ====== RUNNER ======
+async def run_migration(db, migration: dict, batch_size: int = 500, pause: float = 0.2, dry_run: bool = False) -> dict:
+    name = migration["name"]
+    collection = db[migration["collection"]]
+    field = migration["field"]
+    state_collection = db["migrations"]
+
+    state = await state_collection.find_one({"_id": name}) or {}
+    if state.get("done") and not dry_run:
+        print(f"✅ Migration {name} already completed.")
+        return state
+
+    last_id = None if dry_run else state.get("last_id")
+    totals = {"scanned": 0, "converted": 0, "deduped": 0, "invalid": 0, "conflicts": 0}
+    started = time.perf_counter()
+    base_query = _legacy_query(migration)
+
+    print(f"🚚 Migration {name}{' (dry run)' if dry_run else ''} starting after _id={last_id}")
+
+    while True:
+        query = base_query if last_id is None else {"$and": [base_query, _after_id(last_id)]}
+        projection = {field: 1}
+        if migration.get("legacy_field"):
+            projection[migration["legacy_field"]] = 1
+
+        batch = await collection.find(query, projection).sort("_id", 1).limit(batch_size).to_list(length=batch_size)
+        if not batch:
+            break
+
+        planned = []
+        for doc in batch:
+            plan = _plan_document(migration, doc)
+            if plan is None:
+                totals["invalid"] += 1
+                print(f"⚠️ {name}: cannot convert {field} on _id={doc['_id']}")
+                continue
+            planned.append((doc, *plan))
+
+        existing = set()
+        if migration.get("dedupe") and planned:
+            values = list({value for _, value, _, _ in planned})
+            cursor = collection.find({field: {"$in": values}}, {field: 1})
+            existing = {row[field] async for row in cursor}
+
+        ops = []
+        for doc, value, guard, update in planned:
+            if value in existing:
+                ops.append(DeleteOne(guard))
+                totals["deduped"] += 1
+            else:
+                ops.append(UpdateOne(guard, update))
+                totals["converted"] += 1
+                if migration.get("dedupe"):
+                    existing.add(value)
+
+        totals["scanned"] += len(batch)
+        last_id = batch[-1]["_id"]
+
+        if ops and not dry_run:
+            result = await collection.bulk_write(ops, ordered=False)
+            touched = result.modified_count + result.deleted_count
+            totals["conflicts"] += len(ops) - touched
+
+        if not dry_run:
+            await state_collection.update_one(
+                {"_id": name},
+                {"$set": {"last_id": last_id, "updated_at": datetime.utcnow()}},
+                upsert=True,
+            )
+
+        elapsed = time.perf_counter() - started
+        rate = totals["scanned"] / elapsed if elapsed else 0
+        print(
+            f"📦 {name}: scanned={totals['scanned']} converted={totals['converted']} "
+            f"deduped={totals['deduped']} invalid={totals['invalid']} "
+            f"conflicts={totals['conflicts']} ({rate:.0f} docs/s)"
+        )
+
+        if len(batch) < batch_size:
+            break
+        await asyncio.sleep(pause)  # let the live bot breathe between batches
+
+    if not dry_run:
+        await state_collection.update_one(
+            {"_id": name},
+            {"$set": {"done": True, "finished_at": datetime.utcnow(), **totals}},
+            upsert=True,
+        )
+    print(f"🏁 Migration {name} finished in {time.perf_counter() - started:.1f}s: {totals}")
+    return totals
+
+
+async def pending_migrations(db) -> list[str]:
+    """
+    Names of migrations that still have legacy documents.
+    The type checks are bounded by the index on the migrated field.
+    """
+    pending = []
+    for migration in MIGRATIONS:
+        if await db[migration["collection"]].find_one(_legacy_query(migration), {"_id": 1}):
+            pending.append(migration["name"])
+    return pending
+
+
+# ====== CLI ======
+async def _main(args):
+    from utils.database import db
+
+    selected = [m for m in MIGRATIONS if not args.only or m["name"] in args.only]
+    if not selected:
+        print(f"❌ Unknown migration(s): {args.only}")
+        return
+    for migration in selected:
+        await run_migration(db, migration, args.batch_size, args.pause, args.dry_run)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Normalize identifier types in MongoDB.")
+    parser.add_argument("--dry-run", action="store_true", help="report changes without writing")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--pause", type=float, default=0.2, help="seconds to sleep between batches")
+    parser.add_argument("--only", nargs="*", help="migration names to run")
+    asyncio.run(_main(parser.parse_args()))
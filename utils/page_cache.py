@@ -0,0 +1,92 @@
+# utils/page_cache.py
+"""
+Rendered /items pages.
+
+Many users press through the same listing pages, so each rendered page
+(text + keyboard) is kept under its (category, rarity, cursor) key
+together with the catalog version it was rendered from
+(utils/live_auctions.catalog_version).  A page is served again only
+while that version is unchanged.  An approval, end or removal in one
+category / rarity re-renders just those listings; bids never do, since
+listings don't show them.
+
+Nothing is cached until the live auction model has loaded (no version
+to check against).
+"""
+import time
+from collections import OrderedDict
+
+from utils.single_flight import single_flight
+from config import PAGE_CACHE_SIZE
+
+# key -> (version, text, reply_markup)
+_pages: OrderedDict = OrderedDict()
+
+# In-process counters, shown in /status
+PAGE_CACHE_METRICS = {
+    "hits": 0,
+    "misses": 0,
+    "stale": 0,
+    "renders": 0,
+    "render_ms_total": 0.0,
+    "render_ms_max": 0.0,
+}
+
+
+def get_page(key, version):
+    """(text, reply_markup) rendered at `version`, or None."""
+    if version is None:
+        return None
+    entry = _pages.get(key)
+    if entry is None:
+        PAGE_CACHE_METRICS["misses"] += 1
+        return None
+    if entry[0] != version:
+        PAGE_CACHE_METRICS["stale"] += 1
+        del _pages[key]
+        return None
+    PAGE_CACHE_METRICS["hits"] += 1
+    _pages.move_to_end(key)
+    return entry[1], entry[2]
+
+
+def put_page(key, version, text: str, reply_markup):
+    if version is None:
+        return
+    _pages[key] = (version, text, reply_markup)
+    _pages.move_to_end(key)
+    while len(_pages) > PAGE_CACHE_SIZE:
+        _pages.popitem(last=False)
+
+
+async def cached_page(key, version, render):
+    """
+    Serves the page from the cache, or awaits `render()` -> (text, reply_markup)
+    and keeps it.  Concurrent misses for the same page share one render.
+    """
+    page = get_page(key, version)
+    if page is not None:
+        return page
+    return await single_flight(("page", key, version), lambda: _render(key, version, render))
+
+
+async def _render(key, version, render):
+    started = time.perf_counter()
+    text, reply_markup = await render()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    PAGE_CACHE_METRICS["renders"] += 1
+    PAGE_CACHE_METRICS["render_ms_total"] += elapsed_ms
+    PAGE_CACHE_METRICS["render_ms_max"] = max(PAGE_CACHE_METRICS["render_ms_max"], elapsed_ms)
+    put_page(key, version, text, reply_markup)
+    return text, reply_markup
+
+
+def page_cache_stats() -> dict:
+    lookups = PAGE_CACHE_METRICS["hits"] + PAGE_CACHE_METRICS["misses"] + PAGE_CACHE_METRICS["stale"]
+    renders = PAGE_CACHE_METRICS["renders"]
+    return {
+        **PAGE_CACHE_METRICS,
+        "size": len(_pages),
+        "hit_rate": round(PAGE_CACHE_METRICS["hits"] / lookups, 3) if lookups else 0.0,
+        "avg_render_ms": round(PAGE_CACHE_METRICS["render_ms_total"] / renders, 2) if renders else 0.0,
+    }
@@ -0,0 +1,120 @@
+# utils/pagination.py
+"""
+Keyset (cursor) pagination helpers.
+
+A page cursor is packed into Telegram callback_data, which is limited to
+64 bytes, so it is kept compact:
+
+    ""          -> first page
+    "n<id>.<p>" -> page <p>, items after <id> in page order
+    "p<id>.<p>" -> page <p>, items before <id> in page order
+
+<id> is the sort key in base 36: an item _id, or for time-ordered lists
+a "<time>,<tie-breaker>" pair (entries sharing a timestamp are told apart
+by their _id).  A legacy ObjectId is written as "~" plus its 96 bits in
+base 36 ("~" is not a base-36 digit).  Old callback data that carries a
+plain page number is treated as the first page.
+"""
+from typing import Any, Awaitable, Callable, Optional, Union
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+CALLBACK_DATA_LIMIT = 64  # bytes, enforced by Telegram
+_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+# ====== BASE36 ======
+def to_base36(value: int) -> str:
+    if value < 0:
+        return "-" + to_base36(-value)
+    if value == 0:
+        return "0"
+    out = ""
+    while value:
+        value, rem = divmod(value, 36)
+        out = _DIGITS[rem] + out
+    return out
+
+
+def from_base36(text: str) -> int:
+    return int(text, 36)
+
+
+# ====== CURSOR ENCODING ======
+Key = Union[int, ObjectId, tuple]
+
+
+def _encode_part(value: Union[int, ObjectId]) -> str:
+    if isinstance(value, ObjectId):
+        return "~" + to_base36(int(str(value), 16))
+    return to_base36(int(value))
+
+
+def _decode_part(text: str) -> Union[int, ObjectId]:
+    if text.startswith("~"):
+        return ObjectId(format(from_base36(text[1:]), "024x"))
+    return from_base36(text)
+
+
+def encode_cursor(direction: str, key: Key, page: int) -> str:
+    """
+    direction is 'n' (after key) or 'p' (before key).  `key` is an int, an
+    ObjectId, or a tuple of those (compared in order).
+    """
+    parts = key if isinstance(key, tuple) else (key,)
+    return f"{direction}{','.join(_encode_part(part) for part in parts)}.{page}"
+
+
+def decode_cursor(token: Optional[str]) -> tuple[Optional[str], Optional[Key], int]:
+    """
+    Returns (direction, key, page). Anything unparseable (including the
+    legacy page-number format) decodes to the first page: (None, None, 1).
+    """
+    if not token or token[0] not in ("n", "p") or "." not in token:
+        return None, None, 1
+    try:
+        raw_key, raw_page = token[1:].split(".", 1)
+        parts = tuple(_decode_part(part) for part in raw_key.split(","))
+        return token[0], parts if len(parts) > 1 else parts[0], max(int(raw_page), 1)
+    except (ValueError, InvalidId):
+        return None, None, 1
+
+
+def fits_callback_data(data: str) -> bool:
+    return len(data.encode("utf-8")) <= CALLBACK_DATA_LIMIT
+
+
+# ====== PAGE FETCH ======
+async def fetch_page(
+    fetch: Callable[..., Awaitable[list]],
+    token: Optional[str],
+    limit: int = 10,
+    key_from_cursor: Optional[Callable[[Key], Any]] = None,
+):
+    """
+    Fetches one page through a storage listing such as `store.list_live`.
+    `fetch(after=..., before=..., limit=...)` must return items in display
+    order; it is asked for `limit + 1` items after (or before) the cursor's
+    key, so the cost does not grow with the page number.  `key_from_cursor`
+    converts the decoded cursor key back to what `fetch` expects (e.g.
+    (epoch µs, id) -> (datetime, id)); when it returns None (a cursor from
+    an older format) the first page is shown.
+
+    Returns (items, page, has_prev, has_next).
+    """
+    direction, value, page = decode_cursor(token)
+    if value is not None and key_from_cursor:
+        value = key_from_cursor(value)
+        if value is None:
+            direction, page = None, 1
+
+    if direction == "p":
+        items = await fetch(before=value, limit=limit + 1)
+        has_prev = len(items) > limit
+        # The items closest to the cursor are the last ones
+        return items[-limit:], (page if has_prev else 1), has_prev, True
+
+    items = await fetch(after=value if direction == "n" else None, limit=limit + 1)
+    has_next = len(items) > limit
+    return items[:limit], page, direction == "n" and page > 1, has_next
@@ -0,0 +1,152 @@
+# utils/publishing.py
+"""
+Posting an approved item to the group and channel.
+
+Used by the approve button (handlers/approval_handler.py) and by the
+paced publisher for bulk-imported items (tasks/publisher.py).  `item` is
+a `repository.APPROVAL` record.
+"""
+from datetime import datetime, timedelta
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.ext import ContextTypes, JobQueue
+
+from storage import store
+from handlers.add_command import GROUP_ID, CHANNEL_ID, GROUP_URL
+from utils.db_policy import ADMIN
+from utils.chat_cache import public_post_link
+from utils import live_auctions
+
+AUCTION_DURATION = timedelta(days=3)
+
+
+# ====== AUTO UNPIN AFTER DELAY ======
+async def unpin_after_delay(context: ContextTypes.DEFAULT_TYPE):
+    """Automatically unpins the auction post after 3 days."""
+    data = context.job.data
+    chat_id = int(data.get("chat_id"))
+    message_id = int(data.get("message_id"))
+
+    try:
+        await context.bot.unpin_chat_message(chat_id=chat_id, message_id=message_id)
+        print(f"✅ Unpinned message {message_id} in chat {chat_id}")
+    except Exception as e:
+        err = str(e).lower()
+        if "message to unpin not found" in err or "message can't be unpinned" in err:
+            print(f"⚠️ Already unpinned or deleted ({message_id})")
+        elif "chat not found" in err:
+            print(f"⚠️ Chat {chat_id} no longer exists or bot removed.")
+        else:
+            print(f"[Error unpinning message {message_id}] {e}")
+
+
+def auction_caption(item) -> str:
+    type_name = (item.type or "item").capitalize()
+    rarity_text = f"{item.rarity or ''}𝗥𝗔𝗥𝗜𝗧𝗬: {item.rarity_name or ''}"
+    caption = (
+        f"🆔 Item ID: {item.id}\n"
+        f"🎬 Anime name: {item.anime_name or ''}\n"
+        f"💞 {type_name} name: {item.waifu_name or ''}\n"
+        f"{rarity_text}\n\n"
+        f"💰 Base Bid: {item.base_bid or 0}\n\n"
+    )
+    if item.optional_tag and item.optional_tag != "—":
+        caption += str(item.optional_tag)
+    return caption
+
+
+# ====== PUBLISH ======
+async def _post_to_group(bot, item, caption: str, job_queue=None):
+    """Sends and pins the group post. Returns its message ID, or None if sending failed."""
+    try:
+        group_msg = await bot.send_photo(
+            chat_id=int(GROUP_ID),
+            photo=item.file_id,
+            caption=caption,
+            parse_mode="HTML",
+        )
+    except Exception as e:
+        print(f"[Error sending in group] {e}")
+        return None
+
+    try:
+        # Pin message
+        await bot.pin_chat_message(chat_id=int(GROUP_ID), message_id=group_msg.message_id)
+
+        # Schedule unpin after 3 days
+        if isinstance(job_queue, JobQueue):
+            job_queue.run_once(
+                unpin_after_delay,
+                when=AUCTION_DURATION,
+                data={"chat_id": GROUP_ID, "message_id": group_msg.message_id},
+                name=f"unpin_{group_msg.message_id}",
+            )
+    except Exception as e:
+        print(f"[Error pinning in group] {e}")
+    return group_msg.message_id
+
+
+async def publish_submission(bot, item, job_queue=None, changes: dict = None):
+    """
+    Posts `item` to the group (pinned, unpinned again after 3 days) and the
+    channel, then saves the post IDs and the auction end time in one write;
+    `changes` are included in it when the channel post went out.
+    A retry whose group post already went out (the item has a
+    `group_message_id`) only posts to the channel.
+    Returns (posted to the channel, channel post link or None).
+    """
+    new_caption = auction_caption(item)
+    sent_msg = None
+    group_post_link = None
+    post_info = {}
+
+    # === Step 1: Send to group (unless an earlier attempt did) ===
+    group_message_id = getattr(item, "group_message_id", None)
+    if not group_message_id:
+        group_message_id = await _post_to_group(bot, item, new_caption, job_queue)
+        if group_message_id:
+            post_info["group_message_id"] = group_message_id
+
+    # Build group link (username from the chat cache)
+    if group_message_id:
+        try:
+            group_post_link = await public_post_link(bot, GROUP_ID, group_message_id)
+        except Exception as e:
+            print(f"[Error building group link] {e}")
+
+    # === Step 2: Send to channel ===
+    try:
+        bid_url = group_post_link if group_post_link else f"{GROUP_URL}?start=bid_{item.id}"
+        bid_keyboard = InlineKeyboardMarkup([[InlineKeyboardButton("💸 Bid Now", url=bid_url)]])
+
+        sent_msg = await bot.send_photo(
+            chat_id=int(CHANNEL_ID),
+            photo=item.file_id,
+            caption=new_caption,
+            parse_mode="HTML",
+            reply_markup=bid_keyboard,
+        )
+    except Exception as e:
+        print(f"[Error sending to channel] {e}")
+
+    # === Step 3: Update submission info (one write for both posts) ===
+    if sent_msg:
+        post_info.update(changes or {})
+        post_info.update({
+            "channel_id": CHANNEL_ID,
+            "channel_message_id": sent_msg.message_id,
+            "expires_at": datetime.utcnow() + AUCTION_DURATION,
+            "is_expired": False,
+        })
+    if post_info:
+        await store.update_submission(item.id, post_info, op_class=ADMIN)
+    live_auctions.refresh(item.id)
+
+    # === Step 4: Channel post link ===
+    try:
+        if sent_msg:
+            link = await public_post_link(bot, CHANNEL_ID, sent_msg.message_id)
+            if link:
+                return True, link
+    except Exception as e:
+        print(f"[Error building channel post link] {e}")
+    return sent_msg is not None, None
@@ -0,0 +1,406 @@
+# utils/query_plans.py
+"""
+Query-plan regression check.
+
+Seeds a throwaway database with synthetic data (utils/synthetic_data.py),
+builds the registry indexes (utils/indexes.py), then runs `explain()` for
+every query shape the handlers and tasks issue.  A shape fails when its
+winning plan contains a COLLSCAN, or when it examines more documents per
+returned document than `--max-ratio`.
+
+    python -m utils.query_plans --spawn --scale 100000
+    python -m utils.query_plans --url mongodb://localhost:27017 --scale 1000000
+
+`--spawn` starts an ephemeral `mongod` (must be on PATH) in a temporary
+directory and removes it afterwards.  The exit status is non-zero when any
+shape fails, so the check can gate a deploy.
+
+The same check runs under pytest, one test per shape (tests/test_query_plans.py):
+
+    PLANCHECK_MONGO_URL=mongodb://localhost:27017 python -m pytest tests
+
+The server comes from TEST_MONGO_URL / PLANCHECK_MONGO_URL, else a `mongod`
+on PATH (tests/conftest.py); without either the tests skip.
+
+The shapes are not copies of the queries: each entry in QUERY_SHAPES calls
+the MongoStorage method against a recording stand-in for the database and
+explains what it sent, so storage changes show up here (and in the tests)
+by themselves.  A new query needs a new entry.
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from utils.db_policy import ANALYTICS, BID, BROWSE
+from utils.indexes import ensure_indexes
+from utils.synthetic_data import seed_database
+
+PLAN_DB = "AUCTIONBOT_PLANCHECK"
+DEFAULT_MAX_RATIO = 2.0
+
+
+# ====== QUERY SHAPES ======
+# One entry per query the bot issues: the MongoStorage call that issues it,
+# with the arguments its caller passes (values are representative; only the
+# shape matters to the planner).  The filter, sort and limit checked are the
+# ones that call actually sends (see capture_query below), so a query changed
+# in storage/mongo.py is checked as it now is.  `query` picks one of several
+# queries a call sends (default: the first).
+QUERY_SHAPES = [
+    {
+        "name": "items.count_by_type",
+        "source": "MongoStorage.count_live (item_command.count_live)",
+        "call": lambda store, now: store.count_live("waifu", now, op_class=BROWSE),
+    },
+    {
+        "name": "items.view_all_first_page",
+        "source": "MongoStorage.list_live (item_command.view_all_handler)",
+        "call": lambda store, now: store.list_live("waifu", now, limit=11, op_class=BROWSE),
+    },
+    {
+        "name": "items.view_all_next_page",
+        "source": "MongoStorage.list_live (item_command.view_all_handler)",
+        "call": lambda store, now: store.list_live("waifu", now, after=1000, limit=11, op_class=BROWSE),
+    },
+    {
+        "name": "items.view_all_prev_page",
+        "source": "MongoStorage.list_live (item_command.view_all_handler)",
+        "call": lambda store, now: store.list_live("waifu", now, before=900000, limit=11, op_class=BROWSE),
+    },
+    {
+        "name": "items.by_rarity",
+        "source": "MongoStorage.list_live (item_command.rarity_selection_handler)",
+        "call": lambda store, now: store.list_live("husbando", now, "Rare", limit=11, op_class=BROWSE),
+    },
+    {
+        "name": "myitems.by_seller",
+        "source": "MongoStorage.list_seller_live (my_items.myitems_type_handler)",
+        "call": lambda store, now: store.list_seller_live(5_000_000_007, "waifu", limit=100, op_class=BROWSE),
+    },
+    {
+        "name": "bid.lookup_item",
+        "source": "MongoStorage.get_submission (repository.find, auction_bid.bid_command)",
+        "call": lambda store, now: store.get_submission(42, ("status", "current_bid"), op_class=BID),
+    },
+    {
+        "name": "bids.history_page",
+        "source": "MongoStorage.list_bids (auction_bid.render_bid_history)",
+        "call": lambda store, now: store.list_bids(42, limit=11, op_class=BROWSE),
+    },
+    {
+        "name": "expiry.sweep",
+        "source": "MongoStorage.list_expired_live (tasks.auction_expiry / tasks.cleanup)",
+        "call": lambda store, now: store.list_expired_live(now),
+    },
+    {
+        "name": "archiver.batch",
+        "source": "MongoStorage.archive_finished (tasks.archiver)",
+        "call": lambda store, now: store.archive_finished(now - timedelta(days=30), 500),
+        # The sweep reads whole finished ranges; ordering by _id costs extra keys,
+        # so only the COLLSCAN rule applies.
+        "max_ratio": None,
+    },
+    {
+        "name": "drafts.sweep",
+        "source": "MongoStorage.delete_drafts_before (utils.drafts.sweep_abandoned_drafts)",
+        "call": lambda store, now: store.delete_drafts_before(now - timedelta(hours=6)),
+    },
+    {
+        "name": "publisher.next_queued",
+        "source": "MongoStorage.list_by_status (tasks.publisher.publish_next)",
+        "call": lambda store, now: store.list_by_status("queued", limit=1, fields=("_id",)),
+    },
+    {
+        "name": "audit.recent",
+        "source": "MongoStorage.list_audit (audit.render_audit_page)",
+        "call": lambda store, now: store.list_audit(limit=11, op_class=ANALYTICS),
+    },
+    {
+        "name": "audit.by_actor",
+        "source": "MongoStorage.list_audit (audit.render_audit_page, actor=..., older page)",
+        "call": lambda store, now: store.list_audit(
+            actor_id=1, after=(now, ObjectId.from_datetime(now)), limit=11, op_class=ANALYTICS
+        ),
+    },
+    {
+        "name": "audit.by_target",
+        "source": "MongoStorage.list_audit (audit.render_audit_page, target=...)",
+        "call": lambda store, now: store.list_audit(target="5000000003", limit=11, op_class=ANALYTICS),
+    },
+    {
+        "name": "events.poll_snapshot",
+        "source": "MongoStorage.list_open (tasks.event_feed.poll_open_submissions)",
+        "call": lambda store, now: store.list_open(),
+    },
+    {
+        "name": "bans.lookup",
+        "source": "MongoStorage.get_ban (add_command.is_globally_banned / check_user_status)",
+        "call": lambda store, now: store.get_ban(5_000_000_003),
+    },
+    {
+        "name": "users.lookup",
+        "source": "MongoStorage.get_user / touch_user (start_handler.start_command)",
+        "call": lambda store, now: store.get_user(5_000_000_003),
+    },
+]
+
+
+class _Recorder:
+    """
+    Stands in for a Motor database / collection / cursor: records the
+    filter, sort and limit of every query sent through it and answers as
+    an empty database would.
+    """
+
+    def __init__(self, log: list, collection: str = None, query: dict = None):
+        self.name = f"{PLAN_DB}_CAPTURE"
+        self._log = log
+        self._collection = collection
+        self._query = query
+
+    # database
+    def __getitem__(self, collection: str):
+        return _Recorder(self._log, collection)
+
+    def __getattr__(self, collection: str):
+        if collection.startswith("_"):
+            raise AttributeError(collection)
+        return _Recorder(self._log, collection)
+
+    # collection
+    def with_options(self, **options):
+        return self
+
+    def _record(self, kind: str, query: dict, **shape) -> dict:
+        entry = {"collection": self._collection, "kind": kind, "filter": query or {}, **shape}
+        self._log.append(entry)
+        return entry
+
+    def find(self, query=None, projection=None, **options):
+        return _Recorder(self._log, self._collection, self._record("find", query))
+
+    async def find_one(self, query=None, projection=None, **options):
+        self._record("find", query, limit=1)
+        return None
+
+    async def count_documents(self, query, **options):
+        self._record("count", query)
+        return 0
+
+    async def _write(self, query, *args, **options):
+        # A write's filter is planned like a find
+        self._record("find", query)
+        return _Result()
+
+    update_one = update_many = delete_one = delete_many = _write
+    find_one_and_update = find_one_and_delete = _write
+
+    # cursor
+    def sort(self, key, direction=None):
+        keys = [(key, direction)] if isinstance(key, str) else key
+        self._query["sort"] = dict(keys)
+        return self
+
+    def limit(self, count: int):
+        self._query["limit"] = count
+        return self
+
+    def batch_size(self, count: int):
+        return self
+
+    async def to_list(self, length=None):
+        return []
+
+
+class _Result:
+    matched_count = deleted_count = modified_count = 0
+    upserted_id = None
+
+    def __bool__(self):
+        return False  # find_one_and_*: no document
+
+
+# One log for every capture: policy_collection() caches collection handles
+# by database name, so the recorder behind them has to stay the same
+_captured: list = []
+
+
+async def capture_query(shape: dict, now: datetime) -> dict:
+    """The query `shape["call"]` sends: {collection, kind, filter[, sort, limit]}."""
+    from storage.mongo import MongoStorage
+
+    _captured.clear()
+    await shape["call"](MongoStorage(_Recorder(_captured)), now)
+    if not _captured:
+        raise RuntimeError(f"{shape['name']}: {shape['source']} sent no query")
+    return _captured[shape.get("query", 0)]
+
+
+async def build_query_shapes(now: datetime) -> list[dict]:
+    """QUERY_SHAPES with the query each call sends filled in."""
+    shapes = []
+    for shape in QUERY_SHAPES:
+        query = await capture_query(shape, now)
+        shapes.append({key: value for key, value in shape.items() if key != "call"} | query)
+    return shapes
+
+
+# ====== PLAN INSPECTION ======
+def plan_stages(plan: dict) -> list[str]:
+    """Flattens a winning plan into its list of stage names."""
+    stages = []
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, dict):
+            continue
+        if "stage" in node:
+            stages.append(node["stage"])
+        for key in ("inputStage", "queryPlan"):
+            if key in node:
+                stack.append(node[key])
+        stack.extend(node.get("inputStages", []))
+    return stages
+
+
+async def explain_shape(db, shape: dict) -> dict:
+    collection = shape["collection"]
+    if shape.get("kind") == "count":
+        command = {"count": collection, "query": shape["filter"]}
+        returned = await db[collection].count_documents(shape["filter"])
+    else:
+        command = {"find": collection, "filter": shape["filter"]}
+        if shape.get("sort"):
+            command["sort"] = shape["sort"]
+        if shape.get("limit"):
+            command["limit"] = shape["limit"]
+        returned = None
+
+    explain = await db.command("explain", command, verbosity="executionStats")
+    planner = explain.get("queryPlanner", {})
+    stats = explain.get("executionStats", {})
+    stages = plan_stages(planner.get("winningPlan", {}))
+
+    if returned is None:
+        returned = stats.get("nReturned", 0)
+    examined = stats.get("totalDocsExamined", 0)
+
+    return {
+        "stages": stages,
+        "returned": returned,
+        "docs_examined": examined,
+        "keys_examined": stats.get("totalKeysExamined", 0),
+        "ratio": examined / max(returned, 1),
+    }
+
+
+async def check_query_plans(db, max_ratio: float = DEFAULT_MAX_RATIO) -> list[dict]:
+    """Explains every shape; returns one result row per shape with `ok` and `reason`."""
+    results = []
+    for shape in await build_query_shapes(datetime.utcnow()):
+        row = {"name": shape["name"], "source": shape["source"]}
+        row.update(await explain_shape(db, shape))
+
+        limit = shape.get("max_ratio", max_ratio)
+        if "COLLSCAN" in row["stages"]:
+            row["ok"], row["reason"] = False, "COLLSCAN"
+        elif limit is not None and row["ratio"] > limit:
+            row["ok"], row["reason"] = False, f"docs examined/returned {row['ratio']:.1f} > {limit}"
+        else:
+            row["ok"], row["reason"] = True, ""
+        results.append(row)
+    return results
+
+
+async def seed_and_check(
+    db, scale: int = 10_000, seed: int = 42, max_ratio: float = DEFAULT_MAX_RATIO, reseed: bool = True
+) -> list[dict]:
+    """Seeds `db` (unless `reseed` is False), builds the registry indexes and explains every shape."""
+    if reseed:
+        started = time.perf_counter()
+        counts = await seed_database(db, scale=scale, seed=seed)
+        print(f"🌱 Seeded {counts} in {time.perf_counter() - started:.1f}s")
+    await ensure_indexes(db)
+    return await check_query_plans(db, max_ratio)
+
+
+def print_report(results: list[dict]):
+    for row in results:
+        mark = "✅" if row["ok"] else "❌"
+        print(
+            f"{mark} {row['name']:<28} {'>'.join(reversed(row['stages'])):<40} "
+            f"returned={row['returned']:<7} docs={row['docs_examined']:<7} keys={row['keys_examined']:<7} "
+            f"{row['reason']}"
+        )
+
+
+# ====== EPHEMERAL MONGOD ======
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def spawn_mongod():
+    """Starts a throwaway mongod; returns (process, url, data_dir)."""
+    binary = shutil.which("mongod")
+    if not binary:
+        raise RuntimeError("mongod not found on PATH (needed for --spawn)")
+    data_dir = tempfile.mkdtemp(prefix="amongo-plans-")
+    port = _free_port()
+    process = subprocess.Popen(
+        [binary, "--dbpath", data_dir, "--port", str(port), "--bind_ip", "127.0.0.1", "--quiet"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return process, f"mongodb://127.0.0.1:{port}", data_dir
+
+
+# ====== CLI ======
+async def _main(args) -> int:
+    process = data_dir = None
+    url = args.url or os.getenv("PLANCHECK_MONGO_URL")
+    if args.spawn:
+        process, url, data_dir = spawn_mongod()
+    if not url:
+        print("❌ Provide --url (or PLANCHECK_MONGO_URL) or use --spawn.")
+        return 2
+
+    client = AsyncIOMotorClient(url, serverSelectionTimeoutMS=20000)
+    try:
+        db = client[args.db]
+        await db.command("ping")
+
+        results = await seed_and_check(db, args.scale, args.seed, args.max_ratio, reseed=not args.no_seed)
+        print_report(results)
+        failed = [row for row in results if not row["ok"]]
+        print(f"{'❌' if failed else '✅'} {len(results) - len(failed)}/{len(results)} query shapes passed.")
+        return 1 if failed else 0
+    finally:
+        client.close()
+        if process:
+            process.terminate()
+            process.wait(timeout=30)
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail on COLLSCANs or inefficient plans for bot queries.")
+    parser.add_argument("--url", help="MongoDB URL of a disposable server")
+    parser.add_argument("--spawn", action="store_true", help="start an ephemeral local mongod")
+    parser.add_argument("--db", default=PLAN_DB)
+    parser.add_argument("--scale", type=int, default=10_000, help="number of submissions (1e4 to 1e6)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--max-ratio", type=float, default=DEFAULT_MAX_RATIO)
+    parser.add_argument("--no-seed", action="store_true", help="reuse data already in --db")
+    sys.exit(asyncio.run(_main(parser.parse_args())))
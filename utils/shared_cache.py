@@ -0,0 +1,268 @@
+# utils/shared_cache.py
+"""
+Cache tier shared by every bot process on the same host.
+
+Each worker keeps its own in-process caches (ban list, membership, chat
+metadata).  With SHARED_CACHE_PATH set, they are backed by one SQLite
+file in WAL mode, so a worker that has just looked something up saves
+its siblings the Mongo / Telegram call, and a change made by one worker
+reaches the others within SHARED_CACHE_POLL_MS.  No server is involved.
+
+    entries         (namespace, key) -> JSON value, with the log position
+                    (version) its data was read at and an optional expiry
+    invalidations   append-only log of (seq, namespace, key); a NULL key
+                    means the whole namespace
+
+    value = shared_cache.get("member", "-100123:42")
+    seen = shared_cache.current_version()   # before asking Telegram
+    shared_cache.put("member", "-100123:42", True, ttl=3600, version=seen)
+    shared_cache.invalidate("member", "-100123:42")   # siblings drop it too
+
+    shared_cache.on_invalidate("member", callback)   # callback(key or None)
+
+An entry older than the newest invalidation of its key or namespace is
+never served, so a value fetched just before another process changed
+it cannot be written back over the change.
+
+tasks/shared_cache.py reads the log every SHARED_CACHE_POLL_MS and calls
+the callbacks registered for each namespace (another process's changes
+only), and prunes old log rows and expired entries.
+
+The file is read with the standard sqlite3 module, synchronously: a
+point read on a local WAL file takes microseconds, less than handing it
+to a thread.  Writers wait at most SHARED_CACHE_BUSY_MS for the lock;
+a busy or broken file counts as a miss, never as an error.  Without
+SHARED_CACHE_PATH every function is a no-op and `get` always misses.
+"""
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Callable, Optional
+
+from config import SHARED_CACHE_PATH, SHARED_CACHE_BUSY_MS, SHARED_CACHE_LOG_RETENTION_SECONDS
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS entries (
+        namespace TEXT NOT NULL,
+        key TEXT NOT NULL,
+        value TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        expires_at REAL,
+        PRIMARY KEY (namespace, key)
+    )""",
+    """CREATE TABLE IF NOT EXISTS invalidations (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        namespace TEXT NOT NULL,
+        key TEXT,
+        pid INTEGER NOT NULL,
+        at REAL NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS invalidations_by_key ON invalidations (namespace, key, seq)",
+)
+
+_state = {
+    "conn": None,
+    "last_seq": 0,      # newest invalidation this process has applied
+    "disabled": not SHARED_CACHE_PATH,
+}
+_callbacks: dict[str, list[Callable[[Optional[str]], Any]]] = {}
+
+# In-process counters, shown in /status
+SHARED_CACHE_METRICS = {
+    "hits": 0,
+    "misses": 0,
+    "writes": 0,
+    "invalidations_sent": 0,
+    "invalidations_received": 0,
+    "errors": 0,
+}
+
+
+def enabled() -> bool:
+    return not _state["disabled"]
+
+
+def _conn() -> Optional[sqlite3.Connection]:
+    if _state["disabled"]:
+        return None
+    if _state["conn"] is None:
+        try:
+            conn = sqlite3.connect(SHARED_CACHE_PATH, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={SHARED_CACHE_BUSY_MS}")
+            for statement in SCHEMA:
+                conn.execute(statement)
+            # Only changes made from now on concern this process
+            row = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM invalidations").fetchone()
+            _state["last_seq"] = row[0]
+            _state["conn"] = conn
+            print(f"✅ Shared cache ready ({SHARED_CACHE_PATH}, WAL)")
+        except sqlite3.Error as e:
+            print(f"⚠️ Shared cache disabled ({SHARED_CACHE_PATH}): {e}")
+            _state["disabled"] = True
+            return None
+    return _state["conn"]
+
+
+def _run(sql: str, params: tuple = (), fetch: str = None):
+    conn = _conn()
+    if conn is None:
+        return None
+    try:
+        cursor = conn.execute(sql, params)
+        if fetch == "one":
+            return cursor.fetchone()
+        if fetch == "all":
+            return cursor.fetchall()
+        return cursor
+    except sqlite3.Error as e:
+        SHARED_CACHE_METRICS["errors"] += 1
+        print(f"⚠️ Shared cache error: {e}")
+        return None
+
+
+# ====== ENTRIES ======
+def current_version() -> int:
+    """Current log position; pass it to `put` for data read after this call."""
+    row = _run("SELECT COALESCE(MAX(seq), 0) FROM invalidations", fetch="one")
+    return row[0] if row else 0
+
+
+def get(namespace: str, key: str, default=None):
+    row = _run(
+        "SELECT value FROM entries e WHERE namespace = ? AND key = ? "
+        "AND (expires_at IS NULL OR expires_at > ?) "
+        "AND seq >= (SELECT COALESCE(MAX(seq), 0) FROM invalidations i "
+        "            WHERE i.namespace = e.namespace AND (i.key = e.key OR i.key IS NULL))",
+        (namespace, str(key), time.time()),
+        fetch="one",
+    )
+    if row is None:
+        if enabled():
+            SHARED_CACHE_METRICS["misses"] += 1
+        return default
+    SHARED_CACHE_METRICS["hits"] += 1
+    return json.loads(row[0])
+
+
+def put(namespace: str, key: str, value, ttl: float = None, version: int = None):
+    """
+    Stores a JSON-serialisable value; `ttl` in seconds (None = until
+    invalidated).  `version` is what `current_version()` returned before
+    the data was read (default: now).
+    """
+    if not enabled():
+        return
+    if version is None:
+        version = current_version()
+    expires_at = time.time() + ttl if ttl else None
+    cursor = _run(
+        "INSERT INTO entries (namespace, key, value, seq, expires_at) VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT(namespace, key) DO UPDATE SET value = excluded.value, seq = excluded.seq, "
+        "expires_at = excluded.expires_at WHERE excluded.seq >= entries.seq",
+        (namespace, str(key), json.dumps(value, default=str), version, expires_at),
+    )
+    if cursor is not None:
+        SHARED_CACHE_METRICS["writes"] += 1
+
+
+def invalidate(namespace: str, key: str = None):
+    """Drops the entry (or the whole namespace) here and in every other process."""
+    if not enabled():
+        return
+    conn = _conn()
+    if conn is None:
+        return
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if key is None:
+                conn.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+            else:
+                conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, str(key)))
+            conn.execute(
+                "INSERT INTO invalidations (namespace, key, pid, at) VALUES (?, ?, ?, ?)",
+                (namespace, None if key is None else str(key), os.getpid(), time.time()),
+            )
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+        SHARED_CACHE_METRICS["invalidations_sent"] += 1
+    except sqlite3.Error as e:
+        SHARED_CACHE_METRICS["errors"] += 1
+        print(f"⚠️ Shared cache invalidation failed ({namespace}/{key}): {e}")
+
+
+# ====== CROSS-PROCESS INVALIDATION ======
+def on_invalidate(namespace: str, callback: Callable[[Optional[str]], Any]):
+    """`callback(key)` runs when another process invalidates `key` (None: everything) in `namespace`."""
+    _callbacks.setdefault(namespace, []).append(callback)
+
+
+def poll_invalidations() -> int:
+    """Applies other processes' invalidations since the last poll. Returns how many."""
+    if _conn() is None:  # opening it sets last_seq, so connect before reading it
+        return 0
+    rows = _run(
+        "SELECT seq, namespace, key, pid FROM invalidations WHERE seq > ? ORDER BY seq",
+        (_state["last_seq"],),
+        fetch="all",
+    )
+    if not rows:
+        return 0
+    applied = 0
+    for seq, namespace, key, pid in rows:
+        _state["last_seq"] = seq
+        if pid == os.getpid():
+            continue
+        for callback in _callbacks.get(namespace, ()):
+            try:
+                callback(key)
+            except Exception as e:
+                print(f"⚠️ Shared cache callback failed ({namespace}/{key}): {e}")
+        applied += 1
+    SHARED_CACHE_METRICS["invalidations_received"] += applied
+    return applied
+
+
+def prune(now: float = None) -> int:
+    """
+    Removes expired entries and invalidation rows older than the retention
+    window, together with the entries written before those rows (nothing
+    would be left to prove them stale).
+    """
+    if not enabled():
+        return 0
+    now = now or time.time()
+    row = _run(
+        "SELECT MAX(seq) FROM invalidations WHERE at < ?", (now - SHARED_CACHE_LOG_RETENTION_SECONDS,), fetch="one"
+    )
+    cutoff_seq = row[0] if row and row[0] is not None else 0
+    removed = 0
+    for sql, params in (
+        ("DELETE FROM entries WHERE (expires_at IS NOT NULL AND expires_at <= ?) OR seq < ?", (now, cutoff_seq)),
+        ("DELETE FROM invalidations WHERE seq <= ?", (cutoff_seq,)),
+    ):
+        cursor = _run(sql, params)
+        if cursor is not None:
+            removed += cursor.rowcount
+    return removed
+
+
+def close():
+    if _state["conn"] is not None:
+        _state["conn"].close()
+        _state["conn"] = None
+
+
+def shared_cache_stats() -> dict:
+    lookups = SHARED_CACHE_METRICS["hits"] + SHARED_CACHE_METRICS["misses"]
+    return {
+        **SHARED_CACHE_METRICS,
+        "enabled": enabled(),
+        "path": SHARED_CACHE_PATH,
+        "hit_rate": round(SHARED_CACHE_METRICS["hits"] / lookups, 3) if lookups else 0.0,
+    }
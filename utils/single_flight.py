@@ -0,0 +1,55 @@
+# utils/single_flight.py
+"""
+Single-flight coalescing of identical concurrent reads.
+
+    record = await single_flight(("find", "BidCheck", 42, "bid"), lambda: ...)
+
+The first caller for a key starts the read in its own task; everyone who
+asks for the same key while it is in flight awaits that task and gets
+the same result (or exception).  Nothing is cached: once the read
+finishes the next caller starts a new one.  During a spike, database
+load therefore follows the number of distinct queries, not users.
+
+Results are shared between callers, so they must not be mutated
+(repository records are namedtuples).  Cancelling one caller does not
+cancel the read for the others.  Round trips are counted once, against
+the caller that started the read.
+"""
+import asyncio
+from typing import Awaitable, Callable, Hashable
+
+_inflight: dict = {}
+
+# In-process counters, shown in /status
+SINGLE_FLIGHT_METRICS = {
+    "flights": 0,
+    "shared": 0,
+}
+
+
+def _finished(key, task: asyncio.Task):
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    if not task.cancelled():
+        task.exception()  # marks it retrieved even if every caller went away
+
+
+async def single_flight(key: Hashable, factory: Callable[[], Awaitable]):
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(factory())
+        _inflight[key] = task
+        task.add_done_callback(lambda done, key=key: _finished(key, done))
+        SINGLE_FLIGHT_METRICS["flights"] += 1
+    else:
+        SINGLE_FLIGHT_METRICS["shared"] += 1
+    return await asyncio.shield(task)
+
+
+def single_flight_stats() -> dict:
+    calls = SINGLE_FLIGHT_METRICS["flights"] + SINGLE_FLIGHT_METRICS["shared"]
+    return {
+        **SINGLE_FLIGHT_METRICS,
+        "in_flight": len(_inflight),
+        "shared_rate": round(SINGLE_FLIGHT_METRICS["shared"] / calls, 3) if calls else 0.0,
+    }
@@ -0,0 +1,224 @@
+# utils/stats.py
+"""
+Rollup counters behind /status.
+
+The `stats` collection holds one `global` document with running totals
+and one `day:YYYY-MM-DD` document per UTC day with the same counters:
+
+    users, banned_users                  new users / bans (net of unbans)
+    submitted, pending                   sent for review / waiting for review
+    approved, rejected                   review outcomes (imports count as approved)
+    live, ended, sold                    running auctions / ended / ended with a winner
+    bids, bid_volume                     bids placed and their total amount
+    gmv, by_rarity.<name>.sold / .gmv    clearing prices of sold items
+
+The helpers below are called right after the write they describe.  Each
+one is a single atomic increment of both documents, sent in the
+background (utils/background.py).  `live` and `pending` are gauges;
+the daily documents only see their changes, not their levels.
+
+    python -m utils.stats --rebuild      # recompute everything from the collections
+
+The rebuild overwrites the documents it computes, so increments made
+while it scans are lost: run it with the bot stopped.  The bot itself
+rebuilds on startup, before polling and the background tasks, when no
+`global` document exists yet.
+"""
+import argparse
+import asyncio
+import sys
+from collections import defaultdict
+from datetime import datetime
+
+from storage import LIVE_STATUS, get_store
+from utils.background import spawn
+
+GLOBAL = "global"
+COUNTERS = (
+    "users", "banned_users", "submitted", "pending", "approved", "rejected",
+    "live", "ended", "sold", "bids", "bid_volume", "gmv",
+)
+
+
+def day_key(when: datetime = None) -> str:
+    return f"day:{(when or datetime.utcnow()).strftime('%Y-%m-%d')}"
+
+
+def _keys(when: datetime = None) -> list[str]:
+    """The documents a change at `when` counts towards."""
+    return [GLOBAL, day_key(when)] if when else [GLOBAL]
+
+
+def _rarity_key(rarity_name) -> str:
+    # Field names cannot contain dots
+    return str(rarity_name or "Unknown").replace(".", "_")
+
+
+def _bump(changes: dict):
+    changes = {k: v for k, v in changes.items() if v}
+    if changes:
+        spawn(get_store().inc_stats(_keys(datetime.utcnow()), changes), "stats")
+
+
+# ====== EVENTS ======
+def user_created():
+    _bump({"users": 1})
+
+
+def user_banned(banned: bool = True):
+    _bump({"banned_users": 1 if banned else -1})
+
+
+def item_submitted():
+    _bump({"submitted": 1, "pending": 1})
+
+
+def item_decided(approved: bool):
+    if approved:
+        _bump({"pending": -1, "approved": 1, "live": 1})
+    else:
+        _bump({"pending": -1, "rejected": 1})
+
+
+def items_imported(count: int):
+    """Bulk imports skip review; they go live one by one through `item_published`."""
+    _bump({"submitted": count, "approved": count})
+
+
+def item_published():
+    _bump({"live": 1})
+
+
+def publish_failed():
+    """A queued import that could not be posted; it is rejected instead of going live."""
+    _bump({"approved": -1, "rejected": 1})
+
+
+def bid_placed(amount: int):
+    _bump({"bids": 1, "bid_volume": amount})
+
+
+def auction_ended(item):
+    """`item` is a repository.AUCTION_RESULT record."""
+    changes = {"live": -1, "ended": 1}
+    if item.last_bidder_id and item.current_bid:
+        rarity = f"by_rarity.{_rarity_key(item.rarity_name)}"
+        changes.update({
+            "sold": 1,
+            "gmv": item.current_bid,
+            f"{rarity}.sold": 1,
+            f"{rarity}.gmv": item.current_bid,
+        })
+    _bump(changes)
+
+
+def item_removed(status):
+    """/rm of an item that was still counted as live or pending."""
+    if status == LIVE_STATUS:
+        _bump({"live": -1})
+    elif status == "pending":
+        _bump({"pending": -1})
+
+
+# ====== READ ======
+async def read_stats(op_class: str = None) -> tuple[dict, dict]:
+    """(global, today) in one read; missing documents are empty dicts."""
+    today = day_key()
+    docs = await get_store().get_stats([GLOBAL, today], op_class=op_class)
+    return docs.get(GLOBAL, {}), docs.get(today, {})
+
+
+def clearing_prices(doc: dict) -> list[tuple[str, int, float]]:
+    """(rarity, sold, average clearing price), highest average first."""
+    rows = [
+        (name, values.get("sold", 0), values.get("gmv", 0) / values["sold"])
+        for name, values in (doc.get("by_rarity") or {}).items() if values.get("sold")
+    ]
+    return sorted(rows, key=lambda row: row[2], reverse=True)
+
+
+# ====== REBUILD ======
+async def rebuild_stats(store=None) -> dict:
+    """Recomputes every stats document from the collections (one streaming pass each)."""
+    store = store or get_store()
+    docs = defaultdict(lambda: defaultdict(int))
+    rarity = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))  # doc key -> rarity -> {sold, gmv}
+
+    def add(when, changes: dict):
+        for key in _keys(when):
+            for field, amount in changes.items():
+                docs[key][field] += amount
+
+    async for batch in store.scan("users"):
+        for user in batch:
+            add(user.get("created_at"), {"users": 1})
+    docs[GLOBAL]["banned_users"] = len(await store.list_banned_ids())
+
+    for collection in ("submissions", "submissions_archive"):
+        async for batch in store.scan(collection):
+            for item in batch:
+                status = item.get("status")
+                if status in (None, "draft"):
+                    continue
+                add(item.get("submitted_time"), {"submitted": 1})
+                if status == "pending":
+                    docs[GLOBAL]["pending"] += 1
+                elif status == "rejected":
+                    add(item.get("submitted_time"), {"rejected": 1})
+                elif status in (LIVE_STATUS, "ended", "sold"):
+                    add(item.get("submitted_time"), {"approved": 1})
+                if status == LIVE_STATUS:
+                    docs[GLOBAL]["live"] += 1
+                if status in ("ended", "sold"):
+                    ended_at = item.get("expires_at")
+                    add(ended_at, {"ended": 1})
+                    price = item.get("current_bid") or 0
+                    if item.get("last_bidder_id") and price:
+                        add(ended_at, {"sold": 1, "gmv": price})
+                        for key in _keys(ended_at):
+                            by_rarity = rarity[key][_rarity_key(item.get("rarity_name"))]
+                            by_rarity["sold"] += 1
+                            by_rarity["gmv"] += price
+
+    async for batch in store.scan("bids"):
+        for bid in batch:
+            add(bid.get("time"), {"bids": 1, "bid_volume": bid.get("bid") or 0})
+
+    result = []
+    for key, counters in docs.items():
+        doc = {"_id": key, **counters}
+        if rarity.get(key):
+            doc["by_rarity"] = {name: dict(values) for name, values in rarity[key].items()}
+        result.append(doc)
+    await store.replace_stats(result)
+    print(f"📈 Rebuilt stats: {len(result)} documents.")
+    return {doc["_id"]: doc for doc in result}
+
+
+async def ensure_stats():
+    """First start with rollups: build them from the existing data."""
+    if not await get_store().get_stats([GLOBAL]):
+        await rebuild_stats()
+
+
+# ====== CLI ======
+async def _main(args) -> int:
+    store = get_store()
+    await store.init()
+    try:
+        if args.rebuild:
+            await rebuild_stats(store)
+        overall, today = await read_stats()
+        for name in COUNTERS:
+            print(f"{name:>14}: {overall.get(name, 0):>10} (today {today.get(name, 0)})")
+        for name, sold, avg in clearing_prices(overall):
+            print(f"{name:>14}: {sold} sold, avg clearing price {avg:.0f}")
+    finally:
+        await store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show or rebuild the /status rollups.")
+    parser.add_argument("--rebuild", action="store_true", help="recompute from the collections")
+    sys.exit(asyncio.run(_main(parser.parse_args())))
@@ -0,0 +1,75 @@
+# utils/submission_rules.py
+"""
+Validation and parsing rules for new submissions.
+
+Shared by the interactive /add flow (`handle_photo`, `handle_base_bid`)
+and the bulk importer (utils/bulk_import.py), so an imported row is
+accepted exactly when the same photo caption and base bid would be
+accepted in private chat.
+"""
+import re
+from typing import Optional
+
+from config import RARITY_MAP
+
+ITEM_TYPES = ("waifu", "husbando")
+
+
+def find_rarity(caption: str) -> Optional[str]:
+    """The first rarity emoji that appears in the caption."""
+    return next((emoji for emoji in RARITY_MAP if emoji in caption), None)
+
+
+def check_caption(caption: str, item_type: str, rarity: str) -> Optional[str]:
+    """Returns the error message shown to the seller, or None if the caption is acceptable."""
+    if "waifu" in caption.lower() and item_type != "waifu":
+        return "❌ You selected Husbando, but this looks like a Waifu."
+    if "husbando" in caption.lower() and item_type != "husbando":
+        return "❌ You selected Waifu, but this looks like a Husbando."
+
+    found_rarity = find_rarity(caption)
+    if not found_rarity:
+        return f"⚠️ Please include a rarity emoji in your caption (like {rarity})."
+    if found_rarity != rarity:
+        return (
+            f"❌ You selected rarity {rarity} ({RARITY_MAP.get(rarity, 'Unknown')}), "
+            f"but your caption has {found_rarity} ({RARITY_MAP.get(found_rarity, 'Unknown')})."
+        )
+    return None
+
+
+def parse_caption(caption: str) -> dict:
+    """
+    Extracts anime / character names and the optional tag:
+
+        🔵 RARITY
+        Naruto 3/12
+        7: Hinata Hyuga x1
+        #tag
+    """
+    lines = [line.strip() for line in caption.strip().split("\n") if line.strip()]
+    anime_name = "Unknown"
+    waifu_name = "Unknown"
+    optional_tag = "—"
+
+    if len(lines) > 1:
+        anime_name = re.sub(r"\s*\d+\/\d+\.?\s*$", "", lines[1]).strip()
+    if len(lines) > 2:
+        waifu_line = lines[2].strip()
+        parts = waifu_line.split(":")
+        if len(parts) > 1:
+            waifu_name = parts[1].split("x1")[0].strip()
+        else:
+            waifu_name = waifu_line
+    if len(lines) > 3:
+        possible_tag = lines[-1]
+        if "RARITY" not in possible_tag.upper():
+            optional_tag = possible_tag
+
+    return {"anime_name": anime_name, "waifu_name": waifu_name, "optional_tag": optional_tag}
+
+
+def parse_base_bid(text: str) -> Optional[int]:
+    """Base bids are plain non-negative integers."""
+    text = str(text).strip()
+    return int(text) if text.isdigit() else None
@@ -0,0 +1,211 @@
+# utils/synthetic_data.py
+"""
+Seeded generator of realistic bot data (submissions, users, global_bans,
+bids, audit_log) for load and query-plan testing.  The same seed and scale always
+produce the same documents.
+
+    await seed_database(db, scale=100_000, seed=42)
+
+`scale` is the number of submissions; users, bans, bids and audit entries are derived
+from it.  Documents follow the shapes the handlers write.
+"""
+import random
+from datetime import datetime, timedelta
+
+# Approximate status mix of a long-running deployment
+STATUS_WEIGHTS = {
+    "approved": 0.03,
+    "pending": 0.01,
+    "draft": 0.005,
+    "ended": 0.80,
+    "rejected": 0.155,
+}
+
+RARITIES = {
+    "🔵": "Common",
+    "🔴": "Medium",
+    "🟠": "Rare",
+    "🟡": "Legendary",
+    "💮": "Exclusive",
+    "🔮": "Limited",
+    "🎐": "Celestial",
+}
+RARITY_WEIGHTS = [0.35, 0.25, 0.18, 0.1, 0.06, 0.04, 0.02]
+
+ANIME = [
+    "Naruto", "One Piece", "Bleach", "Jujutsu Kaisen", "Chainsaw Man", "Spy x Family",
+    "Demon Slayer", "Hunter x Hunter", "Frieren", "Oshi no Ko", "Blue Lock", "Re:Zero",
+]
+
+CHANNEL_ID = -1002875695805
+BATCH_SIZE = 5000
+
+
+def _weighted(rng: random.Random, weights: dict):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def generate_users(rng: random.Random, count: int, now: datetime):
+    for i in range(count):
+        user_id = 5_000_000_000 + i
+        first_seen = now - timedelta(days=rng.uniform(0, 365))
+        yield {
+            "user_id": user_id,
+            "full_name": f"User {i}",
+            "username": f"user_{i}" if rng.random() < 0.7 else None,
+            "created_at": first_seen,
+            "last_seen": first_seen + timedelta(days=rng.uniform(0, 30)),
+        }
+
+
+def generate_bans(rng: random.Random, user_ids: list, count: int, now: datetime):
+    for user_id in rng.sample(user_ids, min(count, len(user_ids))):
+        yield {
+            "user_id": user_id,
+            "reason": "synthetic",
+            "banned_by": 1,
+            "timestamp": now - timedelta(days=rng.uniform(0, 365)),
+        }
+
+
+def generate_audit_entries(rng: random.Random, user_ids: list, count: int, now: datetime):
+    admins = [1, 2, 3]
+    for _ in range(count):
+        action = rng.choice(["approve", "approve", "approve", "reject", "forceend", "rm", "aban", "unaban"])
+        target = rng.choice(user_ids) if action in ("aban", "unaban") else rng.randint(1, max(1, len(user_ids) * 5))
+        yield {
+            "time": now - timedelta(days=rng.uniform(0, 180)),
+            "action": action,
+            "actor_id": rng.choice(admins),
+            "actor_name": "Admin",
+            "target": str(target),
+            "details": {},
+        }
+
+
+def generate_submission(rng: random.Random, item_id: int, user_ids: list, now: datetime) -> dict:
+    status = _weighted(rng, STATUS_WEIGHTS)
+    rarity = rng.choices(list(RARITIES), weights=RARITY_WEIGHTS)[0]
+    item_type = "waifu" if rng.random() < 0.6 else "husbando"
+    seller = rng.choice(user_ids)
+
+    if status == "approved":
+        submitted = now - timedelta(hours=rng.uniform(0, 72))
+        expires_at = submitted + timedelta(days=3)
+    elif status in ("pending", "draft"):
+        submitted = now - timedelta(hours=rng.uniform(0, 12))
+        expires_at = submitted + timedelta(days=3)
+    else:
+        submitted = now - timedelta(days=rng.uniform(3, 365))
+        expires_at = submitted + timedelta(days=3)
+
+    base_bid = rng.choice([50, 100, 200, 500, 1000])
+    current_bid = base_bid + rng.randrange(0, 50) * 5 if status in ("approved", "ended") else 0
+
+    anime = rng.choice(ANIME)
+    name = f"Character {item_id}"
+    return {
+        "_id": item_id,
+        "user_id": seller,
+        "user_name": f"User {seller}",
+        "username": None,
+        "type": item_type,
+        "rarity": rarity,
+        "rarity_name": RARITIES[rarity],
+        "anime_name": anime,
+        "waifu_name": name,
+        "optional_tag": "—",
+        "caption": f"{rarity} RARITY\n{anime} 1/1\n{item_id}: {name} x1",
+        "file_id": f"AgACAgUAAx{item_id:012d}",
+        "submitted_time": submitted,
+        "status": status,
+        "base_bid": base_bid,
+        "channel_id": CHANNEL_ID if status in ("approved", "ended") else None,
+        "previous_bidders": [],
+        "channel_message_id": item_id if status in ("approved", "ended") else None,
+        "group_message_id": item_id if status in ("approved", "ended") else None,
+        "expires_at": expires_at,
+        "is_expired": status == "ended",
+        "current_bid": current_bid,
+        "last_bidder_id": rng.choice(user_ids) if current_bid > base_bid else None,
+        "last_bidder_username": None,
+        "last_bid_time": submitted + timedelta(hours=1) if current_bid > base_bid else None,
+    }
+
+
+def generate_bids(rng: random.Random, submission: dict, user_ids: list):
+    if submission["status"] not in ("approved", "ended") or submission["current_bid"] <= submission["base_bid"]:
+        return
+    amount = submission["base_bid"]
+    time = submission["submitted_time"]
+    while amount < submission["current_bid"]:
+        amount = min(amount + 5 * rng.randint(2, 10), submission["current_bid"])
+        time += timedelta(minutes=rng.uniform(1, 120))
+        bidder = rng.choice(user_ids)
+        yield {
+            "_id": f"{submission['_id']}:{amount}:{bidder}",
+            "item_id": submission["_id"],
+            "user_id": bidder,
+            "username": None,
+            "bid": amount,
+            "time": time,
+        }
+
+
+async def _insert_batched(collection, docs, batch_size: int = BATCH_SIZE) -> int:
+    batch, total = [], 0
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            await collection.insert_many(batch, ordered=False)
+            total += len(batch)
+            batch = []
+    if batch:
+        await collection.insert_many(batch, ordered=False)
+        total += len(batch)
+    return total
+
+
+async def seed_database(db, scale: int = 10_000, seed: int = 42, drop: bool = True) -> dict:
+    """Fills `db` with `scale` submissions and matching users, bans and bids."""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+
+    if drop:
+        for name in ("submissions", "users", "global_bans", "bids", "audit_log"):
+            await db[name].drop()
+
+    user_count = max(10, scale // 5)
+    users = list(generate_users(rng, user_count, now))
+    user_ids = [u["user_id"] for u in users]
+
+    counts = {
+        "users": await _insert_batched(db.users, users),
+        "global_bans": await _insert_batched(db.global_bans, generate_bans(rng, user_ids, max(1, scale // 100), now)),
+        "audit_log": await _insert_batched(db.audit_log, generate_audit_entries(rng, user_ids, max(1, scale // 10), now)),
+    }
+
+    submissions_total = bids_total = 0
+    batch, bid_batch = [], []
+    for item_id in range(1, scale + 1):
+        submission = generate_submission(rng, item_id, user_ids, now)
+        batch.append(submission)
+        bid_batch.extend(generate_bids(rng, submission, user_ids))
+        if len(batch) >= BATCH_SIZE:
+            await db.submissions.insert_many(batch, ordered=False)
+            submissions_total += len(batch)
+            batch = []
+        if len(bid_batch) >= BATCH_SIZE:
+            await db.bids.insert_many(bid_batch, ordered=False)
+            bids_total += len(bid_batch)
+            bid_batch = []
+    if batch:
+        await db.submissions.insert_many(batch, ordered=False)
+        submissions_total += len(batch)
+    if bid_batch:
+        await db.bids.insert_many(bid_batch, ordered=False)
+        bids_total += len(bid_batch)
+
+    counts["submissions"] = submissions_total
+    counts["bids"] = bids_total
+    return counts
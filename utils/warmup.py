@@ -0,0 +1,105 @@
+# utils/warmup.py
+"""
+Startup warm-up.
+
+Right after a deploy the first requests used to pay for every cold path
+at once: opening Mongo connections, loading the ban list and the live
+auction model, fetching the group / channel.  `warm_up` now does all of
+that before the bot starts polling, with the stages running
+concurrently:
+
+    connections     MONGO_MIN_POOL_SIZE pings at once, so that many pool
+                    connections are open (a single ping on other backends)
+    bans            utils/ban_cache.load_bans
+    live auctions   utils/live_auctions.init_live_auctions
+    chats           utils/chat_cache.warm_chats for the group and channel
+
+Each stage gets WARMUP_STAGE_TIMEOUT_SECONDS.  A stage that fails or
+times out is logged and skipped; every cache it would have filled falls
+back to the database / API on its own, so the bot still starts.
+
+`is_ready()` stays False until all stages have finished; the health
+endpoint in main.py answers 503 until then, so Render keeps routing to
+the previous instance.  Stage timings are printed and shown in /status.
+"""
+import asyncio
+import time
+
+from storage import get_store
+from utils.ban_cache import load_bans
+from utils.chat_cache import warm_chats
+from utils.live_auctions import init_live_auctions
+from config import MONGO_MIN_POOL_SIZE, WARMUP_STAGE_TIMEOUT_SECONDS
+
+_state = {
+    "ready": False,
+    "total_ms": None,
+    "stages": {},   # name -> {"ms": float, "ok": bool, "result": ...}
+}
+
+
+def is_ready() -> bool:
+    return _state["ready"]
+
+
+async def _stage(name: str, coro):
+    started = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(coro, WARMUP_STAGE_TIMEOUT_SECONDS)
+        ok = True
+    except Exception as e:
+        result = f"{type(e).__name__}: {e}"
+        ok = False
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    _state["stages"][name] = {"ms": round(elapsed_ms, 1), "ok": ok, "result": result}
+    if ok:
+        print(f"🔥 Warm-up {name}: {elapsed_ms:.0f} ms ({result})")
+    else:
+        print(f"⚠️ Warm-up {name} failed after {elapsed_ms:.0f} ms: {result}")
+
+
+async def _open_connections() -> str:
+    store = get_store()
+    count = MONGO_MIN_POOL_SIZE if store.name == "mongo" else 1
+    await asyncio.gather(*(store.ping() for _ in range(max(count, 1))))
+    return f"{count} connection(s)"
+
+
+async def _load_bans() -> str:
+    return f"{await load_bans()} banned"
+
+
+async def _load_live_auctions() -> str:
+    return f"{await init_live_auctions()} live"
+
+
+async def _warm_chats(bot, chat_ids) -> str:
+    cached = await warm_chats(bot, chat_ids)
+    return f"{cached}/{len(set(chat_ids))} chat(s)"
+
+
+async def warm_up(bot, chat_ids) -> dict:
+    """Runs every stage concurrently, then marks the bot ready. Returns the stage report."""
+    started = time.perf_counter()
+    await asyncio.gather(
+        _stage("connections", _open_connections()),
+        _stage("bans", _load_bans()),
+        _stage("live auctions", _load_live_auctions()),
+        _stage("chats", _warm_chats(bot, chat_ids)),
+    )
+    _state["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    _state["ready"] = True
+    failed = [name for name, stage in _state["stages"].items() if not stage["ok"]]
+    print(
+        f"✅ Warm-up finished in {_state['total_ms']:.0f} ms"
+        + (f" ({', '.join(failed)} failed)" if failed else "")
+    )
+    return warmup_stats()
+
+
+def warmup_stats() -> dict:
+    return {
+        "ready": _state["ready"],
+        "total_ms": _state["total_ms"],
+        "stages": {name: dict(stage) for name, stage in _state["stages"].items()},
+    }